@@ -0,0 +1,501 @@
+"""Carga de DataFrames en tablas de base de datos para los nodos destino.
+
+Para motores sin comando de carga masiva disponible, el DataFrame se parte en
+bloques de 'chunk_size' filas que se insertan en paralelo sobre K conexiones
+del pool de SQLAlchemy; cada bloque es una transacción (tamaño de commit).
+
+Modos de carga (load_mode):
+  - direct: inserta directamente en la tabla destino.
+  - atomic: todo o nada; se carga en paralelo en una tabla de staging y después
+    se pasa a la tabla destino con un único INSERT ... SELECT transaccional.
+  - resumable: cada bloque registra su offset y el tamaño de bloque en la tabla
+    de progreso (PROGRESS_TABLE) dentro de la misma transacción; un reintento con
+    el mismo load_id salta los bloques ya confirmados. El load_id por defecto se
+    deriva del contenido de los datos, y un reintento con otro chunk_size se rechaza
+    (los offsets registrados ya no coinciden con los bloques).
+
+Con if_exists='swap' la carga va a '<tabla>__staging' por el camino rápido (sin
+transacción global), se construyen los índices y después se intercambia con la
+tabla destino en una única operación atómica: los lectores nunca ven la tabla
+ausente ni a medio cargar.
+
+Las tablas se crean con DDL explícito generado desde el esquema de Polars
+(tipos por dialecto, longitudes VARCHAR y clave primaria), en lugar de dejar
+que pandas adivine los tipos. Los índices secundarios se crean después de la
+carga y, opcionalmente, los existentes se eliminan antes y se recrean al final.
+"""
+import hashlib
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import polars as pl
+
+PROGRESS_TABLE = 'etl_load_progress'
+STAGING_SUFFIX = '__staging'
+OLD_SUFFIX = '__old'
+LOAD_MODES = ('direct', 'atomic', 'resumable')
+
+Progress = Callable[[str], None]
+
+
+class LoadStopped(KeyboardInterrupt):
+    """Carga interrumpida por una solicitud de parada."""
+
+
+def quote(engine: Any, name: str) -> str:
+    """Cita un identificador (admite 'esquema.tabla') según el dialecto del engine."""
+    prep = engine.dialect.identifier_preparer
+    return '.'.join(prep.quote(part) for part in str(name).split('.'))
+
+
+def table_exists(engine: Any, table: str) -> bool:
+    from sqlalchemy import inspect
+    schema, _, name = str(table).rpartition('.')
+    return inspect(engine).has_table(name, schema=schema or None)
+
+
+def default_load_id(df: pl.DataFrame, table: str) -> str:
+    """Identificador de una carga: tabla, columnas y hash del contenido fila a fila.
+    Dos cargas con la misma forma pero datos distintos no comparten progreso."""
+    digest = hashlib.sha1(f"{table}|{','.join(df.columns)}|{df.height}".encode('utf-8'))
+    if df.height:
+        digest.update(df.hash_rows(seed=0).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _string_type(dialect: str, length: Optional[int]) -> str:
+    if dialect == 'mssql':
+        return f"NVARCHAR({length})" if length and length <= 4000 else "NVARCHAR(MAX)"
+    if length:
+        return f"VARCHAR({length})"
+    return 'TEXT'
+
+
+def sql_type(dtype: Any, dialect: str, length: Optional[int] = None) -> str:
+    """Tipo SQL de un dtype de Polars para un dialecto ('postgresql', 'mysql', 'mssql', 'sqlite', ...).
+    length solo aplica a columnas de texto: None genera TEXT (o NVARCHAR(MAX))."""
+    base = dtype.base_type() if hasattr(dtype, 'base_type') else dtype
+    if base in (pl.Int8, pl.Int16, pl.UInt8):
+        return 'INTEGER' if dialect == 'sqlite' else 'SMALLINT'
+    if base in (pl.Int32, pl.UInt16):
+        return 'INTEGER'
+    if base in (pl.Int64, pl.UInt32):
+        return 'INTEGER' if dialect == 'sqlite' else 'BIGINT'
+    if base == pl.UInt64:
+        return 'BIGINT UNSIGNED' if dialect == 'mysql' else 'NUMERIC(20, 0)'
+    if base == pl.Float32:
+        return 'FLOAT' if dialect == 'mysql' else 'REAL'
+    if base == pl.Float64:
+        return {'mysql': 'DOUBLE', 'mssql': 'FLOAT', 'sqlite': 'REAL'}.get(dialect, 'DOUBLE PRECISION')
+    if base == pl.Decimal:
+        precision = getattr(dtype, 'precision', None) or 38
+        scale = getattr(dtype, 'scale', None) or 0
+        return f"NUMERIC({precision}, {scale})"
+    if base == pl.Boolean:
+        return 'BIT' if dialect == 'mssql' else 'BOOLEAN'
+    if base == pl.Date:
+        return 'DATE'
+    if base == pl.Datetime:
+        tz = getattr(dtype, 'time_zone', None)
+        if dialect == 'postgresql':
+            return 'TIMESTAMP WITH TIME ZONE' if tz else 'TIMESTAMP'
+        if dialect == 'mysql':
+            return 'DATETIME(6)'
+        if dialect == 'mssql':
+            return 'DATETIMEOFFSET' if tz else 'DATETIME2'
+        return 'TIMESTAMP'
+    if base == pl.Time:
+        return 'TIME'
+    if base == pl.Duration:
+        return 'INTERVAL' if dialect == 'postgresql' else 'BIGINT'
+    if base == pl.Binary:
+        return {'postgresql': 'BYTEA', 'mysql': 'LONGBLOB', 'mssql': 'VARBINARY(MAX)'}.get(dialect, 'BLOB')
+    if base in (pl.List, pl.Struct, pl.Array):
+        return {'postgresql': 'JSONB', 'mysql': 'JSON'}.get(dialect, _string_type(dialect, None))
+    # Utf8/String, Categorical, Enum, Object, Null
+    return _string_type(dialect, length)
+
+
+def _auto_varchar(df: pl.DataFrame, col: str) -> int:
+    """Longitud VARCHAR a partir de los datos: máximo observado redondeado hacia arriba (mínimo 16)."""
+    try:
+        longest = int(df[col].cast(pl.Utf8).str.len_chars().max() or 0)
+    except Exception:
+        return 255
+    size = 16
+    while size < longest:
+        size *= 2
+    return size
+
+
+def create_table_sql(engine: Any, df: pl.DataFrame, table: str,
+                     primary_key: Optional[List[str]] = None,
+                     varchar_lengths: Optional[Dict[str, int]] = None,
+                     varchar_default: Any = None,
+                     indexed: Optional[List[str]] = None) -> str:
+    """Genera CREATE TABLE desde el esquema del DataFrame para el dialecto del engine.
+    varchar_lengths fija la longitud por columna; varchar_default aplica a las demás
+    columnas de texto (entero, o 'auto' para calcularla de los datos). En MySQL y SQL
+    Server las columnas de texto de la clave primaria y de los índices (indexed) no
+    admiten TEXT/NVARCHAR(MAX): se usa 255 si no hay otra longitud.
+    En una tabla de staging la clave primaria lleva nombre único: PostgreSQL y SQL Server
+    no renombran la restricción (ni su índice) con la tabla en swap_tables, y la
+    siguiente carga no podría volver a crear '<tabla>__staging_pkey'."""
+    dialect = engine.dialect.name
+    pk = [c for c in (primary_key or []) if c in df.columns]
+    missing = [c for c in (primary_key or []) if c not in df.columns]
+    if missing:
+        raise ValueError(f"Columnas de clave primaria inexistentes: {missing}")
+    lengths = dict(varchar_lengths or {})
+    keyed = set(pk) | set(indexed or [])
+    cols_sql = []
+    for name, dtype in df.schema.items():
+        length = lengths.get(name)
+        if length is None and dtype in (pl.Utf8, pl.Categorical) and varchar_default:
+            length = _auto_varchar(df, name) if str(varchar_default).lower() == 'auto' else int(varchar_default)
+        if length is None and name in keyed and dialect in ('mysql', 'mssql'):
+            length = 255
+        col = f"{quote(engine, name)} {sql_type(dtype, dialect, length)}"
+        if name in pk:
+            col += ' NOT NULL'
+        cols_sql.append(col)
+    if pk:
+        constraint = f"PRIMARY KEY ({', '.join(quote(engine, c) for c in pk)})"
+        if str(table).endswith(STAGING_SUFFIX):
+            base = re.sub(r'\W', '_', table[:-len(STAGING_SUFFIX)].rpartition('.')[2])
+            name = f"pk_{base[:40]}_{unique_suffix()}"
+            constraint = f"CONSTRAINT {quote(engine, name)} {constraint}"
+        cols_sql.append(constraint)
+    return f"CREATE TABLE {quote(engine, table)} (\n  " + ',\n  '.join(cols_sql) + "\n)"
+
+
+def create_table(engine: Any, df: pl.DataFrame, table: str, replace: bool,
+                 options: Optional[Dict[str, Any]] = None) -> None:
+    """Crea la tabla con DDL explícito; con replace elimina antes la existente."""
+    from sqlalchemy import text
+    options = options or {}
+    indexed = options.get('indexed_columns') or [c for group in options.get('indexes') or [] for c in group]
+    ddl = create_table_sql(engine, df, table, options.get('primary_key'),
+                           options.get('varchar_lengths'), options.get('varchar_default'), indexed)
+    with engine.begin() as conn:
+        if replace:
+            conn.execute(text(f"DROP TABLE IF EXISTS {quote(engine, table)}"))
+        conn.execute(text(ddl))
+
+
+def index_name(table: str, columns: List[str], suffix: str = '') -> str:
+    raw = f"ix_{str(table).rpartition('.')[2]}_{'_'.join(columns)}"
+    raw = re.sub(r'\W', '_', raw)
+    return (raw[:60 - len(suffix) - 1] + '_' + suffix) if suffix else raw[:60]
+
+
+def existing_indexes(engine: Any, table: str) -> List[Dict[str, Any]]:
+    """Índices secundarios (sin la clave primaria) de la tabla según el inspector de SQLAlchemy."""
+    from sqlalchemy import inspect
+    schema, _, name = str(table).rpartition('.')
+    try:
+        return [ix for ix in inspect(engine).get_indexes(name, schema=schema or None)
+                if ix.get('name') and all(ix.get('column_names') or [None])]
+    except Exception:
+        return []
+
+
+def create_index(engine: Any, table: str, columns: List[str], name: Optional[str] = None,
+                 unique: bool = False) -> None:
+    from sqlalchemy import text
+    name = name or index_name(table, columns)
+    cols = ', '.join(quote(engine, c) for c in columns)
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE {'UNIQUE ' if unique else ''}INDEX {quote(engine, name)} "
+                          f"ON {quote(engine, table)} ({cols})"))
+
+
+def drop_index(engine: Any, table: str, name: str) -> None:
+    from sqlalchemy import text
+    dialect = engine.dialect.name
+    if dialect in ('mysql', 'mssql'):
+        sql = f"DROP INDEX {quote(engine, name)} ON {quote(engine, table)}"
+    else:
+        schema = str(table).rpartition('.')[0]
+        sql = f"DROP INDEX {quote(engine, f'{schema}.{name}' if schema else name)}"
+    with engine.begin() as conn:
+        conn.execute(text(sql))
+
+
+def build_indexes(engine: Any, table: str, indexes: List[List[str]],
+                  progress: Optional[Progress] = None, name_suffix: str = '') -> None:
+    """Crea los índices configurados que aún no existan (se llama después de la carga).
+    name_suffix distingue los nombres cuando la tabla se renombrará después (swap)."""
+    progress = progress or (lambda _m: None)
+    present = {tuple(ix['column_names']) for ix in existing_indexes(engine, table)}
+    for cols in indexes or []:
+        if not cols or tuple(cols) in present:
+            continue
+        progress(f"Creando índice sobre {table} ({', '.join(cols)})")
+        create_index(engine, table, cols, index_name(table, cols, name_suffix) if name_suffix else None)
+
+
+def unique_suffix() -> str:
+    """Sufijo corto para nombres de índice o clave primaria que deben sobrevivir a un
+    renombrado de tabla (milisegundos más unos bits aleatorios: dos cargas seguidas no chocan)."""
+    return format(int(time.time() * 1000), 'x') + uuid.uuid4().hex[:4]
+
+
+def swap_tables(engine: Any, staging: str, table: str, keep_old: bool = False,
+                progress: Optional[Progress] = None) -> None:
+    """Sustituye 'table' por 'staging' de forma atómica.
+    PostgreSQL y SQLite renombran dentro de una transacción (DDL transaccional),
+    MySQL usa un único RENAME TABLE con ambos cambios y SQL Server sp_rename en
+    una transacción. La tabla anterior queda como '<tabla>__old' si keep_old,
+    si no se elimina después del intercambio."""
+    from sqlalchemy import text
+    progress = progress or (lambda _m: None)
+    dialect = engine.dialect.name
+    schema, _, name = str(table).rpartition('.')
+    old = f"{table}{OLD_SUFFIX}"
+    old_name = f"{name}{OLD_SUFFIX}"
+    exists = table_exists(engine, table)
+
+    # Misma conexión para todo: en SQLite otra conexión del pool puede tener el esquema en caché
+    with engine.begin() as conn:
+        if exists:
+            conn.execute(text(f"DROP TABLE IF EXISTS {quote(engine, old)}"))
+        if dialect == 'mysql':
+            renames = [f"{quote(engine, staging)} TO {quote(engine, table)}"]
+            if exists:
+                renames.insert(0, f"{quote(engine, table)} TO {quote(engine, old)}")
+            conn.execute(text(f"RENAME TABLE {', '.join(renames)}"))
+        elif dialect == 'mssql':
+            if exists:
+                conn.execute(text("EXEC sp_rename :src, :dst"), {'src': table, 'dst': old_name})
+            conn.execute(text("EXEC sp_rename :src, :dst"), {'src': staging, 'dst': name})
+        else:
+            prep = engine.dialect.identifier_preparer
+            if exists:
+                conn.execute(text(f"ALTER TABLE {quote(engine, table)} RENAME TO {prep.quote(old_name)}"))
+            conn.execute(text(f"ALTER TABLE {quote(engine, staging)} RENAME TO {prep.quote(name)}"))
+    progress(f"Tabla {table} intercambiada con {staging}")
+    if exists and not keep_old:
+        _drop_table(engine, old)
+        progress(f"Tabla anterior {old} eliminada")
+
+
+def _insert_chunk(engine: Any, df: pl.DataFrame, table: str, start: int,
+                  load_id: Optional[str], chunk_size: int) -> int:
+    from sqlalchemy import text
+    pdf = df.to_pandas()
+    with engine.begin() as conn:
+        pdf.to_sql(table, conn, if_exists='append', index=False)
+        if load_id is not None:
+            conn.execute(
+                text(f"INSERT INTO {quote(engine, PROGRESS_TABLE)} (load_id, chunk_start, row_count, chunk_size) "
+                     "VALUES (:load_id, :start, :rows, :chunk_size)"),
+                {'load_id': load_id, 'start': start, 'rows': len(pdf), 'chunk_size': chunk_size},
+            )
+    return len(pdf)
+
+
+def insert_parallel(engine: Any, df: pl.DataFrame, table: str,
+                    workers: int = 4, chunk_size: int = 10000,
+                    progress: Optional[Progress] = None,
+                    should_stop: Optional[Callable[[], bool]] = None,
+                    load_id: Optional[str] = None,
+                    skip_offsets: Optional[set] = None) -> int:
+    """Inserta df en la tabla (que ya debe existir) en bloques concurrentes.
+    Cada bloque se convierte a pandas por separado para no duplicar en memoria
+    todo el DataFrame. Devuelve el número de filas insertadas en esta llamada."""
+    progress = progress or (lambda _m: None)
+    starts = [s for s in range(0, df.height, max(1, chunk_size)) if s not in (skip_offsets or set())]
+    if not starts:
+        return 0
+    lock = threading.Lock()
+    done = {'rows': 0, 'chunks': 0}
+
+    def run(start: int) -> int:
+        if should_stop and should_stop():
+            raise LoadStopped("Carga detenida por el usuario")
+        n = _insert_chunk(engine, df.slice(start, chunk_size), table, start, load_id, chunk_size)
+        with lock:
+            done['rows'] += n
+            done['chunks'] += 1
+            progress(f"Bloque {done['chunks']}/{len(starts)} confirmado ({done['rows']} filas)")
+        return n
+
+    workers = max(1, min(workers, len(starts)))
+    if workers == 1:
+        return sum(run(s) for s in starts)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='etl-insert') as pool:
+        return sum(pool.map(run, starts))
+
+
+def _ensure_progress_table(engine: Any) -> None:
+    from sqlalchemy import inspect, text
+    if table_exists(engine, PROGRESS_TABLE):
+        # Tablas de progreso anteriores no guardaban el tamaño de bloque
+        if 'chunk_size' not in {c['name'] for c in inspect(engine).get_columns(PROGRESS_TABLE)}:
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {quote(engine, PROGRESS_TABLE)} ADD chunk_size BIGINT"))
+        return
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE {quote(engine, PROGRESS_TABLE)} ("
+            "load_id VARCHAR(64) NOT NULL, chunk_start BIGINT NOT NULL, row_count BIGINT NOT NULL, "
+            "chunk_size BIGINT)"
+        ))
+
+
+def _committed_offsets(engine: Any, load_id: str, chunk_size: int) -> set:
+    """Offsets ya confirmados de la carga. Si se registraron con otro tamaño de bloque
+    no se corresponden con los bloques actuales y la reanudación se rechaza."""
+    from sqlalchemy import text
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(f"SELECT chunk_start, chunk_size FROM {quote(engine, PROGRESS_TABLE)} WHERE load_id = :load_id"),
+            {'load_id': load_id},
+        ).fetchall()
+    sizes = {None if r[1] is None else int(r[1]) for r in rows}
+    if sizes - {chunk_size}:
+        raise ValueError(
+            f"La carga {load_id} se inició con chunk_size {', '.join(str(x) for x in sizes)} y el "
+            f"reintento usa {chunk_size}: use el mismo tamaño de bloque o elimine su progreso de {PROGRESS_TABLE}")
+    return {int(r[0]) for r in rows}
+
+
+def _clear_progress(engine: Any, load_id: str) -> None:
+    from sqlalchemy import text
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {quote(engine, PROGRESS_TABLE)} WHERE load_id = :load_id"),
+                     {'load_id': load_id})
+
+
+def _drop_table(engine: Any, table: str) -> None:
+    from sqlalchemy import text
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {quote(engine, table)}"))
+
+
+def load_frame(engine: Any, df: pl.DataFrame, table: str, if_exists: str = 'replace',
+               options: Optional[Dict[str, Any]] = None,
+               progress: Optional[Progress] = None,
+               should_stop: Optional[Callable[[], bool]] = None) -> int:
+    """Carga df en 'table' según options:
+      - load_mode: 'direct' | 'atomic' | 'resumable'
+      - workers: conexiones concurrentes (defecto 4)
+      - chunk_size: filas por bloque/commit (defecto 10000)
+      - load_id: identificador del modo reanudable (defecto: derivado de tabla, columnas y contenido)
+      - primary_key, varchar_lengths, varchar_default: DDL de la tabla (ver create_table_sql)
+      - indexes: lista de listas de columnas; un índice por lista, creado tras la carga
+      - indexed_columns: columnas de índices creados aparte (destino por lotes, swap);
+        solo acotan su longitud de texto en el DDL
+      - drop_indexes: elimina los índices existentes antes de cargar y los recrea al final
+      - keep_old: con if_exists='swap', conservar la tabla anterior como '<tabla>__old'
+    if_exists se aplica como en pandas ('replace' | 'append' | 'fail') o 'swap'.
+    """
+    options = options or {}
+    progress = progress or (lambda _m: None)
+    mode = str(options.get('load_mode') or 'direct').strip().lower()
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Modo de carga no soportado: {mode} (válidos: {', '.join(LOAD_MODES)})")
+    if_exists = (if_exists or 'replace').lower()
+    if if_exists == 'swap':
+        return _load_swap(engine, df, table, mode, options, progress, should_stop)
+    exists = table_exists(engine, table)
+    if exists and if_exists == 'fail':
+        raise ValueError(f"La tabla {table} ya existe (if_exists='fail')")
+
+    # Índices existentes fuera durante la carga masiva (solo si la tabla se conserva)
+    dropped: List[Dict[str, Any]] = []
+    if options.get('drop_indexes') and exists and (if_exists != 'replace' or mode == 'atomic'):
+        dropped = existing_indexes(engine, table)
+        for ix in dropped:
+            progress(f"Eliminando índice {ix['name']} antes de la carga")
+            drop_index(engine, table, ix['name'])
+    try:
+        if mode == 'atomic':
+            rows = _load_atomic(engine, df, table, if_exists, exists, options, progress, should_stop)
+        else:
+            rows = _load_direct(engine, df, table, if_exists, exists, mode, options, progress, should_stop)
+    finally:
+        for ix in dropped:
+            progress(f"Recreando índice {ix['name']}")
+            create_index(engine, table, ix['column_names'], ix['name'], bool(ix.get('unique')))
+    build_indexes(engine, table, options.get('indexes'), progress)
+    return rows
+
+
+def _load_swap(engine: Any, df: pl.DataFrame, table: str, mode: str, options: Dict[str, Any],
+               progress: Progress, should_stop: Optional[Callable[[], bool]]) -> int:
+    """Carga en '<tabla>__staging', crea índices y la intercambia con la tabla destino.
+    Los bloques se confirman por separado (el intercambio final es lo único atómico);
+    en modo reanudable un reintento continúa llenando la misma tabla de staging."""
+    staging = f"{table}{STAGING_SUFFIX}"
+    staging_mode = 'resumable' if mode == 'resumable' else 'direct'
+    progress(f"Carga con intercambio: {df.height} filas a {staging}")
+    staging_opts = {k: v for k, v in options.items() if k not in ('indexes', 'drop_indexes')}
+    staging_opts.setdefault('indexed_columns', [c for group in options.get('indexes') or [] for c in group])
+    rows = _load_direct(engine, df, staging, 'replace', table_exists(engine, staging), staging_mode,
+                        staging_opts, progress, should_stop)
+    build_indexes(engine, staging, options.get('indexes'), progress, name_suffix=unique_suffix())
+    swap_tables(engine, staging, table, bool(options.get('keep_old')), progress)
+    return rows
+
+
+def _load_atomic(engine: Any, df: pl.DataFrame, table: str, if_exists: str, exists: bool,
+                 options: Dict[str, Any], progress: Progress,
+                 should_stop: Optional[Callable[[], bool]]) -> int:
+    from sqlalchemy import text
+    workers = int(options.get('workers') or 4)
+    chunk_size = int(options.get('chunk_size') or 10000)
+    staging = f"{table}__load"
+    progress(f"Carga atómica: {df.height} filas a staging {staging} con {workers} conexiones")
+    create_table(engine, df, staging, True, {k: v for k, v in options.items() if k != 'primary_key'})
+    try:
+        insert_parallel(engine, df, staging, workers, chunk_size, progress, should_stop)
+        if not exists:
+            create_table(engine, df, table, False, options)
+        cols = ', '.join(quote(engine, c) for c in df.columns)
+        with engine.begin() as conn:
+            if exists and if_exists == 'replace':
+                # DELETE (no DROP) para que el reemplazo sea parte de la misma transacción
+                conn.execute(text(f"DELETE FROM {quote(engine, table)}"))
+            conn.execute(text(
+                f"INSERT INTO {quote(engine, table)} ({cols}) SELECT {cols} FROM {quote(engine, staging)}"
+            ))
+    finally:
+        _drop_table(engine, staging)
+    progress(f"Carga atómica confirmada en {table}")
+    return df.height
+
+
+def _load_direct(engine: Any, df: pl.DataFrame, table: str, if_exists: str, exists: bool, mode: str,
+                 options: Dict[str, Any], progress: Progress,
+                 should_stop: Optional[Callable[[], bool]]) -> int:
+    workers = int(options.get('workers') or 4)
+    chunk_size = int(options.get('chunk_size') or 10000)
+    load_id = None
+    skip: set = set()
+    if mode == 'resumable':
+        load_id = str(options.get('load_id') or default_load_id(df, table))
+        _ensure_progress_table(engine)
+        skip = _committed_offsets(engine, load_id, chunk_size)
+        if skip:
+            progress(f"Reanudando carga {load_id}: {len(skip)} bloques ya confirmados")
+    if not skip and (not exists or if_exists == 'replace'):
+        create_table(engine, df, table, exists, options)
+    progress(f"Insertando {df.height} filas en {table} con {workers} conexiones (bloques de {chunk_size})")
+    rows = insert_parallel(engine, df, table, workers, chunk_size, progress, should_stop,
+                           load_id=load_id, skip_offsets=skip)
+    if load_id is not None:
+        _clear_progress(engine, load_id)
+    return rows
+
+
+def pool_kwargs(workers: Optional[int]) -> Dict[str, Any]:
+    """Tamaño de pool de SQLAlchemy para K conexiones concurrentes."""
+    if not workers or workers <= 1:
+        return {}
+    return {'pool_size': workers, 'max_overflow': 2}
@@ -0,0 +1,137 @@
+"""Tablas Delta Lake como origen y destino (librería 'deltalake', sin Spark).
+
+Funciona sobre el sistema de archivos local/NFS sin red; las URIs de objeto
+(s3://, ...) reciben storage_options como en el resto de orígenes.
+
+Escritura (delta_mode):
+  - append: añade archivos en una nueva versión
+  - overwrite: reemplaza la tabla completa (las versiones previas siguen en el log)
+  - overwrite_partitions: reemplaza solo las particiones presentes en el DataFrame
+    (o las que cumplan 'delta_predicate'); requiere 'partition_by'
+  - merge: upsert por 'merge_keys' (actualiza coincidencias e inserta el resto)
+Lectura: versión concreta ('delta_version', viaje en el tiempo) y filtros que
+Polars empuja al escaneo, descartando archivos con las estadísticas min/max del log.
+Mantenimiento (pasos de Job): compact() y vacuum().
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+import polars as pl
+
+DELTA_MODES = ('append', 'overwrite', 'overwrite_partitions', 'merge')
+# Retención por defecto de vacuum (igual que Delta: 7 días)
+DEFAULT_RETENTION_HOURS = 168
+
+
+def _deltalake():
+    try:
+        import deltalake
+    except ImportError as e:
+        raise ImportError("Para tablas Delta Lake instale 'deltalake' (pip install deltalake)") from e
+    return deltalake
+
+
+def table_exists(path: str, storage_options: Optional[Dict[str, Any]] = None) -> bool:
+    deltalake = _deltalake()
+    try:
+        deltalake.DeltaTable(path, storage_options=storage_options or None)
+        return True
+    except Exception:
+        # TableNotFoundError según versión de deltalake
+        return False
+
+
+def scan(path: str, version: Optional[int] = None,
+         storage_options: Optional[Dict[str, Any]] = None) -> pl.LazyFrame:
+    """LazyFrame de la tabla (opcionalmente en una versión anterior)."""
+    _deltalake()
+    return pl.scan_delta(path, version=version, storage_options=storage_options or None)
+
+
+def _sql_literal(value: Any) -> str:
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def partition_predicate(df: pl.DataFrame, partition_by: List[str]) -> str:
+    """Predicado SQL que cubre exactamente las particiones presentes en df."""
+    parts = []
+    for row in df.select(partition_by).unique().iter_rows():
+        conds = [f"{col} IS NULL" if val is None else f"{col} = {_sql_literal(val)}"
+                 for col, val in zip(partition_by, row)]
+        parts.append('(' + ' AND '.join(conds) + ')')
+    return ' OR '.join(parts)
+
+
+def write(df: pl.DataFrame, path: str,
+          mode: str = 'append',
+          partition_by: Optional[List[str]] = None,
+          merge_keys: Optional[List[str]] = None,
+          predicate: Optional[str] = None,
+          storage_options: Optional[Dict[str, Any]] = None,
+          progress: Optional[Callable[[str], None]] = None) -> None:
+    """Escribe df en la tabla Delta de 'path' según mode (ver docstring del módulo).
+    Si la tabla aún no existe, merge y overwrite_partitions la crean con df."""
+    emit = progress or (lambda _m: None)
+    mode = (mode or 'append').strip().lower()
+    if mode not in DELTA_MODES:
+        raise ValueError(f"Modo Delta no soportado: {mode} (use {', '.join(DELTA_MODES)})")
+    _deltalake()
+    opts = storage_options or None
+    write_options: Dict[str, Any] = {}
+    if partition_by:
+        write_options['partition_by'] = partition_by
+    exists = table_exists(path, storage_options)
+
+    if mode == 'merge' and exists:
+        if not merge_keys:
+            raise ValueError("El modo merge requiere 'merge_keys'")
+        on = ' AND '.join(f"t.{k} = s.{k}" for k in merge_keys)
+        emit(f"Delta merge en {path} por {', '.join(merge_keys)}")
+        metrics = (df.write_delta(path, mode='merge', storage_options=opts,
+                                  delta_merge_options={'predicate': on, 'source_alias': 's', 'target_alias': 't'})
+                   .when_matched_update_all()
+                   .when_not_matched_insert_all()
+                   .execute())
+        emit(f"Delta merge: {metrics.get('num_target_rows_updated', 0)} actualizadas, "
+             f"{metrics.get('num_target_rows_inserted', 0)} insertadas")
+        return
+
+    if mode == 'overwrite_partitions' and exists:
+        if not (predicate or partition_by):
+            raise ValueError("overwrite_partitions requiere 'partition_by' o 'delta_predicate'")
+        predicate = predicate or partition_predicate(df, partition_by or [])
+        if not predicate:
+            emit("Delta: DataFrame vacío, no hay particiones que reemplazar")
+            return
+        emit(f"Delta: reemplazando particiones donde {predicate}")
+        df.write_delta(path, mode='overwrite', storage_options=opts,
+                       delta_write_options={**write_options, 'predicate': predicate})
+        return
+
+    delta_mode = 'overwrite' if mode == 'overwrite' else 'append'
+    emit(f"Delta {delta_mode} en {path} ({df.height} filas)")
+    df.write_delta(path, mode=delta_mode, storage_options=opts, delta_write_options=write_options or None)
+
+
+def compact(path: str, target_size_mb: Optional[int] = None,
+            storage_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Reescribe archivos pequeños en archivos de ~target_size_mb. Devuelve las métricas de deltalake."""
+    deltalake = _deltalake()
+    dt = deltalake.DeltaTable(path, storage_options=storage_options or None)
+    target = int(target_size_mb) * 1024 * 1024 if target_size_mb else None
+    return dt.optimize.compact(target_size=target)
+
+
+def vacuum(path: str, retention_hours: Optional[int] = DEFAULT_RETENTION_HOURS,
+           dry_run: bool = False, enforce_retention_duration: bool = True,
+           storage_options: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Borra archivos que ya no referencia ninguna versión dentro de la retención. Devuelve los archivos."""
+    deltalake = _deltalake()
+    dt = deltalake.DeltaTable(path, storage_options=storage_options or None)
+    return dt.vacuum(retention_hours=retention_hours, dry_run=dry_run,
+                     enforce_retention_duration=enforce_retention_duration)
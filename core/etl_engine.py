@@ -1,11 +1,30 @@
 import polars as pl
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
 import networkx as nx
 from PyQt6.QtCore import QObject, pyqtSignal
 import os
+import re
 import pandas as pd
+import io
 import json
 import requests
+from contextlib import contextmanager
+
+from . import (db_load, delta_lake, file_io, file_manifest, filesystem, fixed_width, flatten, orc_avro,
+               preview, source_cache, tail_source, xml_stream)
+
+# Límite de filas por hoja de Excel (incluye la fila de cabecera)
+EXCEL_MAX_ROWS = 1048576
+# Filas por lote en lecturas de base de datos en streaming
+DEFAULT_STREAM_BATCH_SIZE = 50000
+# Transformaciones fila a fila que pueden aplicarse lote a lote
+STREAMING_TRANSFORMS = ('filter', 'map', 'cast', 'flatten')
+# Orígenes que pueden producir lotes ('stream_results')
+STREAMING_SOURCES = ('database', 'api', 'fixed_width', 'xml')
+# Orígenes de archivo que pueden leer un directorio con manifiesto ('file_manifest')
+MANIFEST_SOURCES = ('csv', 'excel', 'json', 'parquet', 'ipc', 'orc', 'avro')
+# Orígenes cuyo 'path' admite una lista de archivos (micro-lotes de core.watch_runner)
+MULTI_FILE_SOURCES = ('csv', 'excel', 'json', 'parquet', 'ipc', 'feather', 'arrow', 'orc', 'avro', 'fixed_width', 'xml')
 
 class ETLEngine(QObject):
     # Señales
@@ -18,6 +37,9 @@ class ETLEngine(QObject):
         self.pipeline = nx.DiGraph()
         self.node_dataframes = {}  # Almacena los dataframes de cada nodo
         self._stop_requested = False  # Bandera para detener ejecución
+        self.cache_dir: Optional[str] = None  # Caché de orígenes CSV (la fijan GUI/jobs/servicios por proyecto)
+        self.state_dir: Optional[str] = None  # Estado persistente de orígenes (offsets de tail), por proyecto
+        self._pending_state: List[Callable[[], None]] = []  # Se guarda solo si el pipeline termina bien (offsets, manifiestos)
         
     def set_pipeline(self, pipeline: nx.DiGraph, node_configs: Dict[int, Dict[str, Any]]):
         """Establece el pipeline a partir del grafo visual y las configuraciones"""
@@ -65,8 +87,9 @@ class ETLEngine(QObject):
             subtype = str(subtype).strip().lower()
             self.execution_progress.emit(f"DEBUG - Subtype normalizado: '{subtype}'")
 
-        # Usar datos precargados si existen
-        if 'dataframe' in config and isinstance(config['dataframe'], (pl.DataFrame, pd.DataFrame)):
+        # Usar datos precargados si existen (una vista previa del diseñador no: se lee el origen completo)
+        if ('dataframe' in config and isinstance(config['dataframe'], (pl.DataFrame, pd.DataFrame))
+                and not preview.is_preview(config)):
             self.execution_progress.emit(f"Usando datos precargados en nodo {node_id}")
             df = config['dataframe']
             if isinstance(df, pd.DataFrame):
@@ -79,11 +102,29 @@ class ETLEngine(QObject):
             return res
 
         try:
+            if subtype in MANIFEST_SOURCES and self._cfg_bool(config, 'file_manifest'):
+                df = self._read_manifest_source(node_id, subtype, config)
+                res = self._apply_select_and_rename(df, config)
+                try:
+                    self.execution_progress.emit(f"Nodo origen {node_id} columnas: {list(res.columns)}")
+                except Exception:
+                    pass
+                return res
+
+            if subtype in ('csv', 'json') and self._cfg_bool(config, 'tail_follow'):
+                df = self._read_tail_source(node_id, subtype, config)
+                res = self._apply_select_and_rename(df, config)
+                try:
+                    self.execution_progress.emit(f"Nodo origen {node_id} columnas: {list(res.columns)}")
+                except Exception:
+                    pass
+                return res
+
             if subtype == 'csv':
                 path = config.get('path')
                 if not path:
                     raise ValueError(f"No se especificó ruta de archivo para el nodo {node_id}")
-                df = pl.read_csv(path)
+                df = self._read_file_source('csv', path, config)
                 res = self._apply_select_and_rename(df, config)
                 try:
                     self.execution_progress.emit(f"Nodo origen {node_id} columnas: {list(res.columns)}")
@@ -95,12 +136,7 @@ class ETLEngine(QObject):
                 path = config.get('path')
                 if not path:
                     raise ValueError(f"No se especificó ruta de archivo para el nodo {node_id}")
-                # pl.read_excel puede no estar disponible en todas las versiones; fallback a pandas
-                try:
-                    df = pl.read_excel(path)
-                except Exception:
-                    pdf = pd.read_excel(path)
-                    df = pl.from_pandas(pdf)
+                df = self._read_file_source('excel', path, config)
                 res = self._apply_select_and_rename(df, config)
                 try:
                     self.execution_progress.emit(f"Nodo origen {node_id} columnas: {list(res.columns)}")
@@ -112,27 +148,93 @@ class ETLEngine(QObject):
                 path = config.get('path')
                 if not path:
                     raise ValueError(f"No se especificó ruta de archivo para el nodo {node_id}")
-                with open(path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                # Detectar estructura
-                if isinstance(data, list):
-                    df = pl.DataFrame(data)
-                elif isinstance(data, dict):
-                    # Si tiene 'data' o similar, intentar usarlo
-                    key = 'data' if 'data' in data else None
-                    if key:
-                        df = pl.DataFrame(data[key])
-                    else:
-                        df = pl.DataFrame([data])
-                else:
-                    raise ValueError("Estructura JSON no soportada para conversión a DataFrame")
+                # Lista de registros, dict con 'data' o un único objeto; .ndjson/.jsonl
+                # (o 'json_lines') se leen como JSON Lines
+                df = self._read_file_source('json', path, config)
                 return self._apply_select_and_rename(df, config)
 
             elif subtype == 'parquet':
                 path = config.get('path')
                 if not path:
                     raise ValueError(f"No se especificó ruta de archivo para el nodo {node_id}")
-                df = pl.read_parquet(path)
+                df = self._read_file_source('parquet', path, config)
+                res = self._apply_select_and_rename(df, config)
+                try:
+                    self.execution_progress.emit(f"Nodo origen {node_id} columnas: {list(res.columns)}")
+                except Exception:
+                    pass
+                return res
+
+            elif subtype in ('ipc', 'feather', 'arrow'):
+                path = config.get('path')
+                if not path:
+                    raise ValueError(f"No se especificó ruta de archivo para el nodo {node_id}")
+                df = self._read_file_source('ipc', path, config)
+                res = self._apply_select_and_rename(df, config)
+                try:
+                    self.execution_progress.emit(f"Nodo origen {node_id} columnas: {list(res.columns)}")
+                except Exception:
+                    pass
+                return res
+
+            elif subtype == 'fixed_width':
+                path = config.get('path')
+                if not path:
+                    raise ValueError(f"No se especificó ruta de archivo para el nodo {node_id}")
+                fs_options = self._fs_options(config)
+                frames = [fixed_width.read(p, config, fs_options=fs_options) for p in self._source_paths(path)]
+                df = frames[0] if len(frames) == 1 else pl.concat(frames, how='diagonal_relaxed')
+                self.execution_progress.emit(f"Ancho fijo {path}: {df.height} registros")
+                res = self._apply_select_and_rename(df, config)
+                try:
+                    self.execution_progress.emit(f"Nodo origen {node_id} columnas: {list(res.columns)}")
+                except Exception:
+                    pass
+                return res
+
+            elif subtype == 'xml':
+                path = config.get('path')
+                if not path:
+                    raise ValueError(f"No se especificó ruta de archivo para el nodo {node_id}")
+                columns = self._projection_columns(config)
+                self.execution_progress.emit(f"XML {path}: registros '{config.get('xml_record_path')}', columnas={columns or 'todas'}")
+                fs_options = self._fs_options(config)
+                frames = [xml_stream.read(p, config, columns=columns, fs_options=fs_options) for p in self._source_paths(path)]
+                df = frames[0] if len(frames) == 1 else pl.concat(frames, how='diagonal_relaxed')
+                res = self._apply_select_and_rename(self._collect_pushdown(df.lazy(), config), config)
+                try:
+                    self.execution_progress.emit(f"Nodo origen {node_id} columnas: {list(res.columns)}")
+                except Exception:
+                    pass
+                return res
+
+            elif subtype in ('orc', 'avro'):
+                path = config.get('path')
+                if not path:
+                    raise ValueError(f"No se especificó ruta de archivo para el nodo {node_id}")
+                df = self._read_file_source(subtype, path, config)
+                res = self._apply_select_and_rename(df, config)
+                try:
+                    self.execution_progress.emit(f"Nodo origen {node_id} columnas: {list(res.columns)}")
+                except Exception:
+                    pass
+                return res
+
+            elif subtype == 'delta':
+                path = config.get('path')
+                if not path:
+                    raise ValueError(f"No se especificó ruta de tabla Delta para el nodo {node_id}")
+                if isinstance(path, (list, tuple)):
+                    raise ValueError(f"El nodo {node_id} lee una tabla Delta (un directorio), no una lista de archivos")
+                if filesystem.is_local(path):
+                    path = filesystem.local_path(path)
+                version = self._cfg_int(config, 'delta_version')
+                storage = self._fs_options(config).get('storage_options')
+                if version is not None:
+                    self.execution_progress.emit(f"Leyendo tabla Delta {path} en la versión {version}")
+                # Filtros y proyección se empujan al escaneo: los archivos cuyas
+                # estadísticas min/max no cumplen el filtro no se leen
+                df = self._collect_pushdown(delta_lake.scan(path, version, storage), config)
                 res = self._apply_select_and_rename(df, config)
                 try:
                     self.execution_progress.emit(f"Nodo origen {node_id} columnas: {list(res.columns)}")
@@ -152,6 +254,11 @@ class ETLEngine(QObject):
                     raise ValueError("Debe especificar una consulta SQL en la configuración del nodo de base de datos")
 
                 conn_str = self._build_connection_string(db_type, host, port, user, password, database)
+                if self._cfg_bool(config, 'stream_results'):
+                    # Cursor de servidor sin pipeline por lotes aguas abajo: se concatenan los lotes
+                    batches = list(self._iter_sql_batches(db_type, conn_str, query, config))
+                    df = pl.concat(batches, how='vertical_relaxed') if batches else pl.DataFrame()
+                    return self._apply_select_and_rename(df, config)
                 self.execution_progress.emit(f"Leyendo desde base de datos ({db_type})...")
                 try:
                     if (db_type or '').lower() == 'mysql':
@@ -190,41 +297,8 @@ class ETLEngine(QObject):
                 return res
 
             elif subtype == 'api':
-                url = config.get('url')
-                method = (config.get('method') or 'GET').upper()
-                headers = self._parse_kv_string(config.get('headers')) if isinstance(config.get('headers'), str) else config.get('headers')
-                params = self._parse_kv_string(config.get('params')) if isinstance(config.get('params'), str) else config.get('params')
-                if not url:
-                    raise ValueError("Debe especificar una URL para el origen API")
-                self.execution_progress.emit(f"Llamando API {method} {url}...")
-                resp = requests.request(method, url, headers=headers, params=params, timeout=60)
-                resp.raise_for_status()
-                try:
-                    data = resp.json()
-                except Exception:
-                    # Intentar CSV si el contenido lo parece
-                    try:
-                        from io import BytesIO
-                        df = pl.read_csv(BytesIO(resp.content))
-                        res = self._apply_select_and_rename(df, config)
-                        try:
-                            self.execution_progress.emit(f"Nodo origen {node_id} columnas: {list(res.columns)}")
-                        except Exception:
-                            pass
-                        return res
-                    except Exception:
-                        raise ValueError("La respuesta de la API no es JSON ni CSV soportado")
-                # Normalizar JSON
-                if isinstance(data, list):
-                    df = pl.DataFrame(data)
-                elif isinstance(data, dict):
-                    key = 'data' if 'data' in data else None
-                    if key:
-                        df = pl.DataFrame(data[key])
-                    else:
-                        df = pl.DataFrame([data])
-                else:
-                    raise ValueError("Estructura de respuesta de API no soportada")
+                batches = list(self._iter_api_batches(config))
+                df = batches[0] if len(batches) == 1 else pl.concat(batches, how='diagonal_relaxed')
                 return self._apply_select_and_rename(df, config)
 
             # Casos adicionales para manejar variaciones comunes
@@ -233,7 +307,7 @@ class ETLEngine(QObject):
                 path = config.get('path')
                 if not path:
                     raise ValueError(f"No se especificó ruta de archivo para el nodo {node_id}")
-                df = pl.read_csv(path)
+                df = self._read_file_source('csv', path, config)
                 res = self._apply_select_and_rename(df, config)
                 return res
                 
@@ -242,11 +316,7 @@ class ETLEngine(QObject):
                 path = config.get('path')
                 if not path:
                     raise ValueError(f"No se especificó ruta de archivo para el nodo {node_id}")
-                try:
-                    df = pl.read_excel(path)
-                except Exception:
-                    pdf = pd.read_excel(path)
-                    df = pl.from_pandas(pdf)
+                df = self._read_file_source('excel', path, config)
                 res = self._apply_select_and_rename(df, config)
                 return res
                 
@@ -296,7 +366,7 @@ class ETLEngine(QObject):
 
             else:
                 # Información detallada del error
-                available_subtypes = ['csv', 'excel', 'json', 'parquet', 'database', 'api']
+                available_subtypes = ['csv', 'excel', 'json', 'parquet', 'ipc', 'database', 'api']
                 error_msg = f"Tipo de origen desconocido o no soportado para nodo {node_id}.\n"
                 error_msg += f"Subtype recibido: '{subtype}' (tipo: {type(subtype)})\n"
                 error_msg += f"Subtipos válidos: {available_subtypes}\n"
@@ -555,6 +625,10 @@ class ETLEngine(QObject):
                 else:
                     self.execution_progress.emit(f"No se especificaron operaciones de casteo para nodo {node_id}")
                     result_df = df
+
+            elif subtype == 'flatten':
+                # Aplanado de struct/list: rutas con puntos, profundidad y listas a expandir
+                result_df = flatten.flatten_from_config(result_df, config)
             else:
                 self.execution_progress.emit(f"Tipo de transformación desconocido para nodo {node_id}")
                 result_df = df
@@ -582,38 +656,55 @@ class ETLEngine(QObject):
         # Post-procesamiento opcional en destino (selección/renombrado)
         df_to_write = self._apply_select_and_rename(df, config)
 
-        if subtype in ('csv', 'excel', 'json', 'parquet'):
+        if subtype in ('csv', 'excel', 'json', 'parquet', 'ipc', 'feather', 'arrow', 'orc', 'avro'):
             path = config.get('path')
             if not path:
                 self.execution_progress.emit(f"No se especificó ruta de destino para nodo {node_id}")
                 raise ValueError(f"No se especificó ruta de destino para nodo {node_id}")
             try:
-                if os.path.isdir(path):
+                fs_options = self._fs_options(config)
+                if filesystem.is_local(path):
+                    path = filesystem.local_path(path)
+                if filesystem.isdir(path, fs_options):
                     raise ValueError(f"La ruta especificada es un directorio: {path}")
-                out_dir = os.path.dirname(path)
-                if out_dir:
-                    os.makedirs(out_dir, exist_ok=True)
+                filesystem.makedirs_for(path, fs_options)
 
                 # Determinar formato: si hay 'format' úsalo, si no, según subtipo
-                default_fmt = 'excel' if subtype == 'excel' else ('json' if subtype == 'json' else ('parquet' if subtype == 'parquet' else 'csv'))
-                format_type = (config.get('format') or default_fmt).lower()
+                default_fmt = {'excel': 'excel', 'json': 'json', 'parquet': 'parquet', 'ipc': 'ipc', 'feather': 'ipc',
+                               'arrow': 'ipc', 'orc': 'orc', 'avro': 'avro'}.get(subtype, 'csv')
+                format_type = self._file_format(config.get('format') or default_fmt)
                 self.execution_progress.emit(f"Guardando datos en {path} como {format_type.upper()}...")
 
-                if format_type == 'csv':
-                    df_to_write.write_csv(path)
-                elif format_type == 'parquet':
-                    df_to_write.write_parquet(path)
-                elif format_type == 'json':
-                    df_to_write.write_json(path)
-                elif format_type == 'excel':
-                    # Polars no tiene write_excel estable: usar pandas
-                    pdf = df_to_write.to_pandas()
-                    try:
-                        pdf.to_excel(path, index=False)
-                    except Exception as e:
-                        raise ValueError(f"Error escribiendo Excel: {e}")
+                codec = None
+                if format_type in ('csv', 'json', 'json_lines'):
+                    codec = file_io.resolve_output_compression(path, config.get('compression'))
+                if format_type in ('json', 'json_lines'):
+                    self._write_json(df_to_write, path, format_type == 'json_lines', codec, config)
+                elif codec:
+                    self._write_compressed(df_to_write, path, format_type, codec, config)
                 else:
-                    df_to_write.write_csv(path)
+                    with self._output_target(path, fs_options) as target:
+                        if format_type == 'csv':
+                            df_to_write.write_csv(target)
+                        elif format_type == 'parquet':
+                            self._write_parquet(df_to_write, target, config)
+                        elif format_type == 'ipc':
+                            compression = str(config.get('ipc_compression') or 'uncompressed').strip().lower()
+                            if compression not in ('uncompressed', 'lz4', 'zstd'):
+                                compression = 'uncompressed'
+                            df_to_write.write_ipc(target, compression=compression)
+                        elif format_type == 'orc':
+                            orc_avro.write_orc(df_to_write, target, compression=config.get('orc_compression') or None,
+                                               stripe_size_mb=self._cfg_int(config, 'orc_stripe_size_mb'))
+                        elif format_type == 'avro':
+                            orc_avro.write_avro(df_to_write, target, compression=config.get('avro_compression') or None)
+                        elif format_type == 'excel':
+                            try:
+                                self._write_excel(df_to_write, target, config)
+                            except Exception as e:
+                                raise ValueError(f"Error escribiendo Excel: {e}")
+                        else:
+                            df_to_write.write_csv(target)
 
                 self.execution_progress.emit(f"Datos guardados en {path}")
             except Exception as e:
@@ -622,6 +713,25 @@ class ETLEngine(QObject):
                 traceback.print_exc()
                 raise
 
+        elif subtype == 'delta':
+            path = config.get('path')
+            if not path:
+                raise ValueError(f"No se especificó ruta de tabla Delta para nodo {node_id}")
+            if filesystem.is_local(path):
+                path = filesystem.local_path(path)
+            try:
+                delta_lake.write(df_to_write, path,
+                                 mode=str(config.get('delta_mode') or 'append'),
+                                 partition_by=self._parse_list(config.get('partition_by')),
+                                 merge_keys=self._parse_list(config.get('merge_keys')),
+                                 predicate=str(config.get('delta_predicate') or '').strip() or None,
+                                 storage_options=self._fs_options(config).get('storage_options'),
+                                 progress=self.execution_progress.emit)
+                self.execution_progress.emit(f"Datos guardados en la tabla Delta {path}")
+            except Exception as e:
+                self.execution_progress.emit(f"Error al escribir tabla Delta: {e}")
+                raise
+
         elif subtype == 'database':
             # Escritura a base de datos con pandas + sqlalchemy
             db_type = config.get('db_type')
@@ -635,26 +745,27 @@ class ETLEngine(QObject):
                 raise ValueError("Debe especificar el nombre de la tabla de destino ('table')")
             conn_str = self._build_connection_string(db_type, host, port, user, password, database)
             self.execution_progress.emit(f"Escribiendo datos en base de datos tabla {table}...")
-            pdf = df_to_write.to_pandas()
+            workers = self._cfg_int(config, 'insert_workers')
             try:
                 if (db_type or '').lower() == 'mysql':
-                    engine = self._make_sqlalchemy_engine(db_type, conn_str, config)
+                    engine = self._make_sqlalchemy_engine(db_type, conn_str, config, pool_size=workers)
                     if_exists = (config.get('if_exists') or 'replace').lower()
-                    pdf.to_sql(table, engine, if_exists=if_exists, index=False)
+                    self._write_database(df_to_write, engine, table, if_exists, config)
                 else:
                     from sqlalchemy import create_engine
-                    engine = create_engine(conn_str)
+                    engine = create_engine(conn_str, **db_load.pool_kwargs(workers))
                     if_exists = (config.get('if_exists') or 'replace').lower()
-                    pdf.to_sql(table, engine, if_exists=if_exists, index=False)
+                    self._write_database(df_to_write, engine, table, if_exists, config)
                 self.execution_progress.emit(f"Datos escritos en la tabla {table}")
             except Exception as e:
                 # Reintentar alternando SSL (solo MySQL)
                 if (db_type or '').lower() == 'mysql' and self._should_retry_ssl(e, config):
                     try:
                         retry_mode = 'DISABLED' if self._was_ssl_enabled(config) else 'REQUIRED'
-                        engine = self._make_sqlalchemy_engine(db_type, conn_str, config, ssl_mode_override=retry_mode)
+                        engine = self._make_sqlalchemy_engine(db_type, conn_str, config, ssl_mode_override=retry_mode,
+                                                              pool_size=workers)
                         if_exists = (config.get('if_exists') or 'replace').lower()
-                        pdf.to_sql(table, engine, if_exists=if_exists, index=False)
+                        self._write_database(df_to_write, engine, table, if_exists, config)
                         self.execution_progress.emit(f"Reintento MySQL con SSL='{retry_mode}' exitoso")
                     except Exception as ie:
                         self.execution_progress.emit(f"Error al escribir en base de datos: {ie}")
@@ -700,6 +811,7 @@ class ETLEngine(QObject):
         try:
             self.execution_progress.emit("Iniciando ejecución del pipeline...")
             self._stop_requested = False
+            self._pending_state = []
             
             # Validar pipeline
             if not nx.is_directed_acyclic_graph(self.pipeline):
@@ -730,15 +842,22 @@ class ETLEngine(QObject):
                 
             # Execute pipeline
             node_results = {}
+            streamed = set()  # Nodos ya procesados lote a lote
             for node_id in sorted_nodes:
                 if self._stop_requested:
                     self.execution_progress.emit("Ejecución detenida por el usuario")
                     self.execution_finished.emit(False, "Ejecución detenida por el usuario")
                     return False
+                if node_id in streamed:
+                    continue
                 node_type = self.pipeline.nodes[node_id]['type']
                 
                 try:
-                    if node_type == 'source':
+                    chain = self._streaming_chain(node_id) if node_type == 'source' else None
+                    if chain:
+                        self._execute_streaming(node_id, chain, node_results)
+                        streamed.update(chain)
+                    elif node_type == 'source':
                         df = self.execute_source(node_id)
                         node_results[node_id] = df
                         self.node_dataframes[node_id] = df
@@ -806,6 +925,10 @@ class ETLEngine(QObject):
                     self.execution_finished.emit(False, f"Error en nodo {node_id}: {str(e)}")
                     return False
                     
+            # Offsets de orígenes tail y manifiestos: solo cuando todos los destinos terminaron bien
+            for commit in self._pending_state:
+                commit()
+            self._pending_state = []
             self.execution_progress.emit("Pipeline ejecutado correctamente")
             self.execution_finished.emit(True, "Pipeline ejecutado correctamente")
             return node_results
@@ -817,6 +940,414 @@ class ETLEngine(QObject):
             self.execution_finished.emit(False, f"Error al ejecutar pipeline: {str(e)}")
             return False
 
+    def _write_database(self, df: pl.DataFrame, engine, table: str, if_exists: str, config: Dict[str, Any],
+                        build_indexes: bool = True) -> None:
+        """Escribe en la tabla destino con core.db_load: la tabla se crea con DDL explícito
+        desde el esquema de Polars (tipos exactos, sin la inferencia de pandas) y admite:
+          - primary_key: 'a,b'
+          - varchar_lengths: 'col:100,col2:20'; varchar_default: entero o 'auto' (por datos)
+          - indexes: 'a;b,c' (un índice por grupo, creados después de la carga)
+          - drop_indexes: eliminar índices existentes antes de cargar y recrearlos al final
+          - pandas_to_sql: volver a pandas.to_sql (tipos inferidos por pandas); solo
+            si no se usa ninguna de las opciones anteriores ni de carga
+        if_exists='swap' carga en '<tabla>__staging' y la intercambia atómicamente con la
+        tabla destino al terminar ('swap_keep_old' conserva la anterior como '<tabla>__old').
+        Con 'insert_workers', 'insert_chunk_size' o 'load_mode' (atomic/resumable) se
+        inserta por bloques en paralelo; sin ellos, todo en un único bloque/transacción.
+        build_indexes=False crea la tabla para los índices pero los deja para el llamador."""
+        mode = str(config.get('load_mode') or '').strip().lower() or 'direct'
+        workers = self._cfg_int(config, 'insert_workers') or 1
+        groups = self._index_groups(config)
+        plain = (mode == 'direct' and workers <= 1 and not self._cfg_int(config, 'insert_chunk_size') and not groups
+                 and not any(str(config.get(k) or '').strip() for k in ('primary_key', 'varchar_lengths', 'varchar_default'))
+                 and not self._cfg_bool(config, 'drop_indexes'))
+        if plain and if_exists in ('replace', 'append', 'fail') and self._cfg_bool(config, 'pandas_to_sql'):
+            df.to_pandas().to_sql(table, engine, if_exists=if_exists, index=False)
+            return
+        chunk_size = self._cfg_int(config, 'insert_chunk_size') or (10000 if mode != 'direct' or workers > 1 else max(df.height, 1))
+        lengths: Dict[str, int] = {}
+        for col, n in (self._parse_kv_string(config.get('varchar_lengths')) or {}).items():
+            try:
+                lengths[col] = int(n)
+            except ValueError:
+                self.execution_progress.emit(f"Aviso: longitud VARCHAR inválida para {col}: {n}")
+        db_load.load_frame(
+            engine, df, table, if_exists,
+            options={
+                'load_mode': mode,
+                'workers': workers,
+                'chunk_size': chunk_size,
+                'load_id': config.get('load_id'),
+                'primary_key': self._parse_list(config.get('primary_key')),
+                'varchar_lengths': lengths,
+                'varchar_default': config.get('varchar_default') or None,
+                'indexes': groups if build_indexes else [],
+                'indexed_columns': [c for group in groups for c in group],
+                'drop_indexes': self._cfg_bool(config, 'drop_indexes'),
+                'keep_old': self._cfg_bool(config, 'swap_keep_old'),
+            },
+            progress=self.execution_progress.emit,
+            should_stop=lambda: self._stop_requested,
+        )
+
+    # Ejecución por lotes (streaming)
+    def _streaming_chain(self, source_id: int) -> Optional[List[int]]:
+        """Devuelve la cadena lineal [transformaciones..., destino] que sigue a un origen en
+        streaming si todos sus nodos pueden procesarse lote a lote; None en otro caso."""
+        config = self.pipeline.nodes[source_id].get('config') or {}
+        if str(config.get('subtype') or '').strip().lower() not in STREAMING_SOURCES or not self._cfg_bool(config, 'stream_results'):
+            return None
+        if isinstance(config.get('dataframe'), (pl.DataFrame, pd.DataFrame)) and not preview.is_preview(config):
+            return None
+        chain: List[int] = []
+        current = source_id
+        while True:
+            succs = list(self.pipeline.successors(current))
+            if len(succs) != 1 or self.pipeline.in_degree(succs[0]) != 1:
+                return None
+            nxt = succs[0]
+            node = self.pipeline.nodes[nxt]
+            subtype = str((node.get('config') or {}).get('subtype') or '').lower()
+            chain.append(nxt)
+            if node.get('type') == 'destination':
+                return chain if self._supports_batch_sink(node.get('config') or {}) else None
+            if node.get('type') != 'transform' or subtype not in STREAMING_TRANSFORMS:
+                return None
+            current = nxt
+
+    def _execute_streaming(self, source_id: int, chain: List[int], node_results: Dict[int, Any]) -> None:
+        """Ejecuta origen -> transformaciones -> destino lote a lote con memoria acotada.
+        La escritura del primer lote empieza antes de que termine la consulta. Como
+        resultado de cada nodo se conserva solo el primer lote (vista previa)."""
+        config = self.pipeline.nodes[source_id]['config']
+        dest_id = chain[-1]
+        subtype = str(config.get('subtype') or '').strip().lower()
+        if subtype == 'api':
+            batches = self._iter_api_batches(config)
+        elif subtype == 'fixed_width':
+            batches = self._iter_fixed_width_batches(config)
+        elif subtype == 'xml':
+            batches = self._iter_xml_batches(config)
+        else:
+            conn_str = self._build_connection_string(config.get('db_type'), config.get('host'), config.get('port'),
+                                                     config.get('user'), config.get('password'), config.get('database'))
+            if not config.get('query'):
+                raise ValueError("Debe especificar una consulta SQL en la configuración del nodo de base de datos")
+            batches = self._iter_sql_batches(config.get('db_type'), conn_str, config.get('query'), config)
+        sink = None
+        total = 0
+        ok = False
+        try:
+            for i, batch in enumerate(batches):
+                if self._stop_requested:
+                    raise KeyboardInterrupt("Ejecución detenida por el usuario")
+                outputs = [(source_id, self._apply_select_and_rename(batch, config))]
+                for node_id in chain[:-1]:
+                    outputs.append((node_id, self.execute_transform(node_id, outputs[-1][1])))
+                out = outputs[-1][1]
+                if sink is None:
+                    sink = self._open_batch_sink(dest_id)
+                sink[0](self._apply_select_and_rename(out, self.pipeline.nodes[dest_id]['config']))
+                total += out.height
+                if i == 0:
+                    for node_id, df in outputs + [(dest_id, out)]:
+                        node_results[node_id] = df
+                        self.node_dataframes[node_id] = df
+                        self.node_executed.emit(node_id, df)
+            ok = True
+        finally:
+            if sink is not None:
+                sink[1](ok)
+        self.execution_progress.emit(f"Streaming completado: {total} filas escritas en nodo {dest_id}")
+
+    def _iter_sql_batches(self, db_type: Optional[str], conn_str: str, query: str,
+                          config: Dict[str, Any]) -> Iterator[pl.DataFrame]:
+        """Lee una consulta con cursor de servidor y produce lotes de 'stream_batch_size' filas.
+        stream_results hace que SQLAlchemy use cursores con nombre en PostgreSQL (psycopg2)
+        y SSCursor en MySQL (pymysql): el servidor envía las filas a medida que se consumen."""
+        batch_size = self._cfg_int(config, 'stream_batch_size', DEFAULT_STREAM_BATCH_SIZE) or DEFAULT_STREAM_BATCH_SIZE
+        engine = self._make_sqlalchemy_engine(db_type, conn_str, config)
+        self.execution_progress.emit(f"Leyendo desde base de datos ({db_type}) en streaming, lotes de {batch_size} filas...")
+        try:
+            with engine.connect() as conn:
+                for n, batch in enumerate(self._iter_result_batches(conn, query, batch_size), start=1):
+                    self.execution_progress.emit(f"Lote {n} leído ({batch.height} filas)")
+                    yield batch
+        finally:
+            engine.dispose()
+
+    def _iter_result_batches(self, conn: Any, query: str, batch_size: int,
+                             params: Optional[Dict[str, Any]] = None) -> Iterator[pl.DataFrame]:
+        """Lotes de batch_size filas de una consulta sobre una conexión abierta (cursor de servidor).
+        El esquema del primer lote se impone a los siguientes para mantener tipos estables;
+        una consulta sin filas produce un único lote vacío con sus columnas."""
+        from sqlalchemy import text
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(text(query), params or {})
+        columns = list(result.keys())
+        schema = None
+        for rows in result.partitions(batch_size):
+            batch = pl.DataFrame([tuple(r) for r in rows], schema=columns, orient='row', infer_schema_length=None)
+            if schema is None:
+                schema = batch.schema
+            else:
+                batch = batch.cast({c: t for c, t in schema.items() if t != pl.Null}, strict=False)
+            yield batch
+        if schema is None:
+            # Consulta sin filas: un lote vacío para que el destino se cree igualmente
+            yield pl.DataFrame(schema=columns)
+
+    def _iter_api_batches(self, config: Dict[str, Any]) -> Iterator[pl.DataFrame]:
+        """Descarga la respuesta de la API en streaming y la convierte en lotes de DataFrame.
+        Config soportada:
+          - api_format: 'auto' (defecto, por Content-Type y primer byte) | 'json' | 'ndjson' | 'csv'
+          - json_path: ruta con puntos del array de registros ('data', 'result.items'; '' = raíz)
+          - stream_batch_size: registros por lote (defecto DEFAULT_STREAM_BATCH_SIZE)
+        JSON con array raíz o json_path se parsea de forma incremental (ijson); NDJSON va
+        al lector nativo de Polars por lotes de líneas. Un objeto sin json_path se
+        interpreta como antes: 'data' si existe o el objeto como única fila."""
+        url = config.get('url')
+        method = (config.get('method') or 'GET').upper()
+        headers = self._parse_kv_string(config.get('headers')) if isinstance(config.get('headers'), str) else config.get('headers')
+        params = self._parse_kv_string(config.get('params')) if isinstance(config.get('params'), str) else config.get('params')
+        if not url:
+            raise ValueError("Debe especificar una URL para el origen API")
+        batch_size = self._cfg_int(config, 'stream_batch_size', DEFAULT_STREAM_BATCH_SIZE) or DEFAULT_STREAM_BATCH_SIZE
+        fmt = str(config.get('api_format') or 'auto').strip().lower()
+        json_path = str(config.get('json_path') or '').strip()
+        self.execution_progress.emit(f"Llamando API {method} {url}...")
+        with requests.request(method, url, headers=headers, params=params, timeout=60, stream=True) as resp:
+            resp.raise_for_status()
+            # Descomprimir gzip/deflate de la respuesta al leer del stream
+            resp.raw.decode_content = True
+            # Que urllib3 no cierre el stream al llegar al final: lo cierra el 'with'
+            resp.raw.auto_close = False
+            body = io.BufferedReader(resp.raw, buffer_size=1024 * 1024)
+            ctype = (resp.headers.get('Content-Type') or '').lower()
+            if fmt == 'auto':
+                head = body.peek(64).lstrip()[:1]
+                if 'ndjson' in ctype or 'jsonl' in ctype or 'json-seq' in ctype:
+                    fmt = 'ndjson'
+                elif 'csv' in ctype or (head and head not in (b'[', b'{')):
+                    fmt = 'csv'
+                elif head == b'{' and not json_path:
+                    fmt = 'json_object'
+                else:
+                    fmt = 'json'
+            self.execution_progress.emit(f"Respuesta API ({ctype or 'sin Content-Type'}) leída como {fmt}")
+            if fmt == 'csv':
+                yield pl.read_csv(body)
+            elif fmt == 'ndjson':
+                for n, batch in enumerate(file_io.iter_ndjson_batches(body, batch_size), start=1):
+                    self.execution_progress.emit(f"Lote {n} leído ({batch.height} registros)")
+                    yield batch
+            elif fmt == 'json_object':
+                yield file_io.frame_from_json_data(json.load(body))
+            else:
+                for n, batch in enumerate(file_io.iter_json_batches(body, json_path, batch_size), start=1):
+                    self.execution_progress.emit(f"Lote {n} leído ({batch.height} registros)")
+                    yield batch
+
+    def _iter_fixed_width_batches(self, config: Dict[str, Any]) -> Iterator[pl.DataFrame]:
+        """Lotes de ~'stream_batch_size' registros de un archivo de ancho fijo."""
+        path = config.get('path')
+        if not path:
+            raise ValueError("No se especificó ruta de archivo de ancho fijo")
+        batch_size = self._cfg_int(config, 'stream_batch_size', DEFAULT_STREAM_BATCH_SIZE)
+        fs_options = self._fs_options(config)
+        n = 0
+        for p in self._source_paths(path):
+            for batch in fixed_width.iter_batches(p, config, batch_size, fs_options):
+                n += 1
+                self.execution_progress.emit(f"Lote {n} leído ({batch.height} registros)")
+                yield batch
+
+    def _iter_xml_batches(self, config: Dict[str, Any]) -> Iterator[pl.DataFrame]:
+        """Lotes de hasta 'stream_batch_size' registros de un XML leído con iterparse."""
+        path = config.get('path')
+        if not path:
+            raise ValueError("No se especificó ruta de archivo XML")
+        paths = self._source_paths(path)
+        batch_size = self._cfg_int(config, 'stream_batch_size', DEFAULT_STREAM_BATCH_SIZE)
+        fs_options = self._fs_options(config)
+        columns = self._projection_columns(config)
+        if not columns and not str(config.get('xml_columns') or '').strip():
+            # Sin columnas fijas, una columna nueva en un lote posterior rompería el destino por lotes
+            columns = []
+            for p in paths:
+                columns += [c for c in xml_stream.discover_columns(p, config, fs_options) if c not in columns]
+            self.execution_progress.emit(f"XML sin 'xml_columns': {len(columns)} columnas descubiertas en una primera pasada")
+        n = 0
+        for p in paths:
+            for batch in xml_stream.iter_batches(p, config, batch_size, columns=columns, fs_options=fs_options):
+                n += 1
+                self.execution_progress.emit(f"Lote {n} leído ({batch.height} registros)")
+                yield batch
+
+    def _supports_batch_sink(self, config: Dict[str, Any]) -> bool:
+        subtype = str(config.get('subtype') or '').lower()
+        if subtype == 'database':
+            # atomic/resumable son todo o nada sobre el DataFrame completo (una staging y
+            # un INSERT SELECT, claves de progreso por bloque): lote a lote cada lote se
+            # confirmaría por separado, así que esos modos usan la ruta materializada
+            return (str(config.get('load_mode') or '').strip().lower() or 'direct') == 'direct'
+        if subtype in ('csv', 'json', 'parquet', 'ipc', 'feather', 'arrow', 'orc'):
+            fmt = self._file_format(config.get('format') or subtype)
+            if fmt == 'parquet' and self._parse_list(config.get('parquet_sort_by')):
+                # parquet_sort_by ordena el archivo completo (estadísticas por row group
+                # sin solapes); ordenar cada lote no lo garantiza: ruta materializada
+                return False
+            return fmt in ('csv', 'json', 'json_lines', 'parquet', 'ipc', 'orc')
+        return False
+
+    def _open_batch_sink(self, node_id: int) -> Tuple[Callable[[pl.DataFrame], None], Callable[[bool], None]]:
+        """Abre un destino incremental y devuelve (escribir_lote, cerrar(ok)).
+        CSV añade filas (cabecera solo en el primer lote), JSON/NDJSON añade objetos al
+        array o líneas, Parquet escribe un row group por lote, IPC un record batch por
+        lote, ORC los stripes que correspondan y base de datos inserta con 'append'
+        tras aplicar 'if_exists' en el primer lote (solo load_mode 'direct'; ver
+        _supports_batch_sink). cerrar(False) elimina el archivo
+        parcial de los destinos de archivo."""
+        config = self.pipeline.nodes[node_id]['config']
+        subtype = str(config.get('subtype') or '').lower()
+        state: Dict[str, Any] = {'first': True}
+
+        if subtype == 'database':
+            table = config.get('table')
+            if not table:
+                raise ValueError("Debe especificar el nombre de la tabla de destino ('table')")
+            db_type = config.get('db_type')
+            conn_str = self._build_connection_string(db_type, config.get('host'), config.get('port'),
+                                                     config.get('user'), config.get('password'), config.get('database'))
+            engine = self._make_sqlalchemy_engine(db_type, conn_str, config)
+            if_exists = (config.get('if_exists') or 'replace').lower()
+            self.execution_progress.emit(f"Escribiendo en la tabla {table} por lotes...")
+
+            # Los índices secundarios se crean una sola vez, al cerrar. En modo swap todos
+            # los lotes van a la tabla de staging y el intercambio se hace al final.
+            batch_config = {**config, 'drop_indexes': False}
+            swap = if_exists == 'swap'
+            target = f"{table}{db_load.STAGING_SUFFIX}" if swap else table
+
+            def write_db(df: pl.DataFrame) -> None:
+                first_mode = 'replace' if swap else if_exists
+                self._write_database(df, engine, target, first_mode if state['first'] else 'append', batch_config,
+                                     build_indexes=False)
+                state['first'] = False
+
+            def close_db(ok: bool) -> None:
+                try:
+                    if ok and not state['first']:
+                        if swap:
+                            db_load.build_indexes(engine, target, self._index_groups(config), self.execution_progress.emit,
+                                                  name_suffix=db_load.unique_suffix())
+                            db_load.swap_tables(engine, target, table, self._cfg_bool(config, 'swap_keep_old'),
+                                                self.execution_progress.emit)
+                        else:
+                            db_load.build_indexes(engine, table, self._index_groups(config), self.execution_progress.emit)
+                finally:
+                    engine.dispose()
+
+            return write_db, close_db
+
+        path = config.get('path')
+        if not path:
+            raise ValueError(f"No se especificó ruta de destino para nodo {node_id}")
+        fs_options = self._fs_options(config)
+        if filesystem.is_local(path):
+            path = filesystem.local_path(path)
+        filesystem.makedirs_for(path, fs_options)
+        fmt = self._file_format(config.get('format') or subtype)
+        self.execution_progress.emit(f"Guardando datos en {path} como {fmt.upper()} por lotes...")
+
+        def discard(ok: bool) -> None:
+            # Un error a mitad deja un archivo parcial que parecería válido: se elimina
+            if not ok:
+                filesystem.remove(path, fs_options)
+                self.execution_progress.emit(f"Salida parcial eliminada: {path}")
+
+        if fmt == 'csv':
+            codec = file_io.resolve_output_compression(path, config.get('compression'))
+            fh = file_io.open_output(path, codec, self._cfg_int(config, 'compression_level'), fs_options=fs_options)
+
+            def write_csv(df: pl.DataFrame) -> None:
+                df.write_csv(fh, include_header=state['first'])
+                state['first'] = False
+
+            def close_csv(ok: bool) -> None:
+                fh.close()
+                discard(ok)
+
+            return write_csv, close_csv
+
+        if fmt in ('json', 'json_lines'):
+            codec = file_io.resolve_output_compression(path, config.get('compression'))
+            fh = file_io.open_output(path, codec, self._cfg_int(config, 'compression_level'), fs_options=fs_options)
+            writer = file_io.JsonWriter(fh, fmt == 'json_lines',
+                                        self._cfg_int(config, 'json_batch_size', file_io.JSON_WRITE_BATCH_ROWS))
+
+            def close_json(ok: bool) -> None:
+                try:
+                    if ok:
+                        writer.finish()
+                finally:
+                    fh.close()
+                    discard(ok)
+
+            return writer.write, close_json
+
+        if fmt == 'orc':
+            fh = filesystem.open_file(path, 'wb', fs_options)
+            orc_writer = orc_avro.OrcBatchWriter(fh, compression=config.get('orc_compression') or None,
+                                                 stripe_size_mb=self._cfg_int(config, 'orc_stripe_size_mb'))
+
+            def close_orc(ok: bool) -> None:
+                try:
+                    orc_writer.close()
+                finally:
+                    fh.close()
+                    discard(ok)
+
+            return orc_writer.write, close_orc
+
+        import pyarrow as pa
+        fh = filesystem.open_file(path, 'wb', fs_options)
+
+        def write_arrow(df: pl.DataFrame) -> None:
+            table = df.to_arrow()
+            if state['first']:
+                state['schema'] = table.schema
+                if fmt == 'parquet':
+                    import pyarrow.parquet as pq
+                    compression = str(config.get('parquet_compression') or 'zstd').strip().lower()
+                    if compression in ('uncompressed', 'none', 'sin compresión', 'sin compresion'):
+                        compression = 'none'
+                    state['writer'] = pq.ParquetWriter(
+                        fh, table.schema, compression=compression,
+                        compression_level=self._cfg_int(config, 'parquet_compression_level'),
+                        use_dictionary=self._cfg_bool(config, 'parquet_dictionary', True),
+                        write_statistics=self._cfg_bool(config, 'parquet_statistics', True))
+                else:
+                    compression = str(config.get('ipc_compression') or 'uncompressed').strip().lower()
+                    options = pa.ipc.IpcWriteOptions(compression=compression if compression in ('lz4', 'zstd') else None)
+                    state['writer'] = pa.ipc.new_file(fh, table.schema, options=options)
+                state['first'] = False
+            elif table.schema != state['schema']:
+                table = table.cast(state['schema'])
+            if fmt == 'parquet':
+                state['writer'].write_table(table, row_group_size=self._cfg_int(config, 'parquet_row_group_size'))
+            else:
+                state['writer'].write_table(table)
+
+        def close_arrow(ok: bool) -> None:
+            try:
+                if 'writer' in state:
+                    state['writer'].close()
+            finally:
+                fh.close()
+                discard(ok)
+
+        return write_arrow, close_arrow
+
     # Utilidades
     def request_stop(self):
         """Solicita detener la ejecución del pipeline lo más pronto posible."""
@@ -839,12 +1370,518 @@ class ETLEngine(QObject):
             pass
         return result
 
+    def _parse_list(self, s: Any) -> List[str]:
+        """Convierte 'a,b,c' (o una lista) en lista de strings sin vacíos."""
+        if s is None:
+            return []
+        if isinstance(s, (list, tuple)):
+            return [str(x).strip() for x in s if str(x).strip()]
+        return [p.strip() for p in str(s).split(',') if p.strip()]
+
+    def _index_groups(self, config: Dict[str, Any]) -> List[List[str]]:
+        """'a;b,c' -> [['a'], ['b', 'c']]: un índice por grupo separado por ';'."""
+        groups = [self._parse_list(g) for g in str(config.get('indexes') or '').split(';')]
+        return [g for g in groups if g]
+
+    def _cfg_bool(self, config: Dict[str, Any], key: str, default: bool = False) -> bool:
+        """Lee un flag booleano de la config aceptando bool, '1', 'true', 'yes', 'si'."""
+        val = config.get(key)
+        if val is None or (isinstance(val, str) and not val.strip()):
+            return default
+        if isinstance(val, bool):
+            return val
+        return str(val).strip().lower() in ('1', 'true', 'yes', 'si', 'sí')
+
+    def _cfg_int(self, config: Dict[str, Any], key: str, default: Optional[int] = None) -> Optional[int]:
+        """Lee un entero de la config; valores vacíos o inválidos devuelven el default."""
+        val = config.get(key)
+        if val is None or (isinstance(val, str) and not val.strip()):
+            return default
+        try:
+            return int(str(val).strip())
+        except Exception:
+            return default
+
+    def _fs_options(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Opciones de core.filesystem para rutas remotas a partir de la config del nodo:
+          - storage_options: dict, JSON o 'k:v,k2:v2' (credenciales, endpoint_url, ...)
+          - fs_cache_dir: directorio local de caché por bloques
+          - fs_block_size: tamaño de bloque de lectura en bytes
+        """
+        storage = config.get('storage_options')
+        if isinstance(storage, str):
+            text = storage.strip()
+            if text.startswith('{'):
+                try:
+                    storage = json.loads(text)
+                except Exception:
+                    storage = None
+            else:
+                storage = self._parse_kv_string(text)
+        opts: Dict[str, Any] = {'storage_options': storage if isinstance(storage, dict) else {}}
+        cache_dir = str(config.get('fs_cache_dir') or '').strip()
+        if cache_dir:
+            opts['cache_dir'] = cache_dir
+        block_size = self._cfg_int(config, 'fs_block_size')
+        if block_size:
+            opts['block_size'] = block_size
+        return opts
+
+    @contextmanager
+    def _output_target(self, path: str, fs_options: Dict[str, Any]):
+        """Destino de escritura: la ruta tal cual si es local (writers nativos) o
+        un stream fsspec abierto en 'wb' si es remota (subida multiparte al cerrar)."""
+        if filesystem.is_local(path):
+            yield filesystem.local_path(path)
+            return
+        with filesystem.open_file(path, 'wb', fs_options) as fh:
+            yield fh
+
+    def _pushdown_filters(self, rules: Any, mode: str) -> Optional[List[Any]]:
+        """Convierte reglas {column, op, value} a filtros DNF de pyarrow para podar row groups.
+        Solo se traducen comparaciones e 'in'; en modo 'any' todas deben ser traducibles."""
+        if not isinstance(rules, list):
+            return None
+        ops = {'>': '>', '<': '<', '==': '==', '!=': '!=', '>=': '>=', '<=': '<=', 'in': 'in'}
+        preds = []
+        for r in rules:
+            col = r.get('column')
+            op = ops.get(str(r.get('op', '')).lower())
+            val = r.get('value')
+            if not col or op is None:
+                if mode == 'any':
+                    return None
+                continue
+            if op == 'in':
+                if not isinstance(val, (list, tuple, set)):
+                    # Texto u otro escalar: el filtro exacto lo interpreta (ver _in_values), aquí no se poda
+                    if mode == 'any':
+                        return None
+                    continue
+                val = self._in_values(val)
+            preds.append((col, op, val))
+        if not preds:
+            return None
+        return [[p] for p in preds] if mode == 'any' else preds
+
+    def _in_values(self, val: Any) -> List[Any]:
+        """Valores de una regla 'in': lista/tupla/conjunto tal cual, texto 'a,b' separado por
+        comas (como lo guarda el panel) y cualquier otro escalar como lista de un elemento."""
+        if isinstance(val, (list, tuple, set)):
+            return list(val)
+        if isinstance(val, str):
+            return [v.strip() for v in val.split(',') if v.strip()]
+        return [val]
+
+    def _source_paths(self, path: Any) -> List[str]:
+        """Rutas de un origen de archivo: 'path' puede ser una ruta o una lista (micro-lote)."""
+        paths = list(path) if isinstance(path, (list, tuple)) else [path]
+        return [filesystem.local_path(p) if filesystem.is_local(p) else p for p in paths]
+
+    def _read_file_source(self, subtype: str, path: str, config: Dict[str, Any]) -> pl.DataFrame:
+        """Lee un origen de archivo local o remoto con descompresión transparente.
+        gzip/bz2/xz/zstd se descomprimen en streaming y los .zip se leen como
+        multi-archivo (filtro opcional 'zip_member_pattern', p.ej. 'ventas_*.csv').
+        Las URIs remotas (s3://, sftp://, memory://, ...) pasan por core.filesystem.
+        En Parquet se leen solo las columnas de 'output_cols' y, con 'source_filter_rules'
+        (mismo formato que el nodo filtro), solo los row groups que pueden cumplirlas.
+        Los CSV con 'source_cache' se leen de su copia columnar (ver core.source_cache);
+        sin caché, los CSV locales en UTF-8 se escanean en lazy con las mismas opciones.
+        'path' también puede ser una lista de archivos (p.ej. un micro-lote de
+        core.watch_runner): se leen con la misma configuración y se concatenan.
+        """
+        if isinstance(path, (list, tuple)):
+            frames = [self._read_file_source(subtype, p, config) for p in path]
+            if not frames:
+                raise ValueError("La lista de archivos del origen está vacía")
+            self.execution_progress.emit(f"{len(frames)} archivos leídos y concatenados")
+            return frames[0] if len(frames) == 1 else pl.concat(frames, how='diagonal_relaxed')
+        fs_options = self._fs_options(config)
+        if subtype == 'csv':
+            # Un byte no UTF-8 tras el prefijo analizado: se relee como cp1252 (ver file_io)
+            return file_io.with_encoding_fallback(lambda: self._read_csv_source(path, config, fs_options),
+                                                  config, self.execution_progress.emit)
+        return self._read_file_uncached(subtype, path, config, fs_options)
+
+    def _read_csv_source(self, path: str, config: Dict[str, Any], fs_options: Dict[str, Any]) -> pl.DataFrame:
+        # Codificación/delimitador/comillas: se detectan una vez y quedan en el config
+        opts = file_io.resolve_csv_options(path, config, fs_options)
+        self.execution_progress.emit(
+            f"CSV {path}: encoding={opts['encoding']} separador={opts['csv']['separator']!r} "
+            f"comillas={opts['csv']['quote_char']!r}"
+        )
+        cache = source_cache.cache_from_config(config, self.cache_dir)
+        if cache is not None:
+            return self._read_cached_source(cache, 'csv', path, config, fs_options)
+        if file_io.can_scan_csv(path, opts, fs_options):
+            # Local y UTF-8: escaneo lazy con proyección y filtros empujados al lector
+            return self._collect_pushdown(file_io.scan_csv(path, opts), config)
+        return self._read_file_uncached('csv', path, config, fs_options)
+
+    def _read_file_uncached(self, subtype: str, path: str, config: Dict[str, Any], fs_options: Dict[str, Any]) -> pl.DataFrame:
+        """Lectura directa del archivo, sin pasar por la caché de orígenes."""
+        remote = not filesystem.is_local(path)
+        codec = file_io.detect_compression(path, fs_options)
+        options = file_io.resolve_csv_options(path, config, fs_options) if subtype == 'csv' else None
+        if subtype == 'json' and config.get('json_lines') not in (None, ''):
+            # Forzar JSON Lines (o JSON) sin depender de la extensión .ndjson/.jsonl
+            options = {'json_lines': self._cfg_bool(config, 'json_lines')}
+        if codec is None and subtype == 'parquet':
+            return self._read_parquet_source(path, config, fs_options)
+        if subtype in ('orc', 'avro'):
+            return self._read_orc_avro_source(subtype, path, config, fs_options)
+        if codec is None:
+            if subtype == 'ipc' and not remote:
+                return self._read_ipc(filesystem.local_path(path))
+            if remote:
+                self.execution_progress.emit(f"Leyendo {path} a través de fsspec")
+            return file_io.read_file(subtype, path, options=options, fs_options=fs_options)
+        self.execution_progress.emit(f"Archivo comprimido ({codec}): descomprimiendo en streaming {path}")
+        return file_io.read_file(subtype, path, options=options,
+                                 member_pattern=config.get('zip_member_pattern') or None,
+                                 fs_options=fs_options)
+
+    def _read_cached_source(self, cache: 'source_cache.SourceCache', subtype: str, path: str,
+                            config: Dict[str, Any], fs_options: Dict[str, Any]) -> pl.DataFrame:
+        """Lee un origen a través de la caché columnar: se parsea una vez y después se
+        escanea la copia con 'output_cols' y 'source_filter_rules' empujados al lector."""
+        entry, hit, df = cache.get_or_create(
+            path, source_cache.reader_options(subtype, config),
+            lambda: self._read_file_uncached(subtype, path, config, fs_options), fs_options)
+        if hit:
+            self.execution_progress.emit(f"Caché de origen: usando {entry} para {path}")
+            return self._collect_pushdown(cache.scan(entry), config)
+        if entry:
+            self.execution_progress.emit(f"Caché de origen: copia {cache.fmt} guardada en {entry}")
+        return self._collect_pushdown(df.lazy(), config)
+
+    def _collect_pushdown(self, lf: pl.LazyFrame, config: Dict[str, Any]) -> pl.DataFrame:
+        """Aplica 'source_filter_rules' y la proyección de 'output_cols' a un LazyFrame y lo materializa."""
+        rules = config.get('source_filter_rules')
+        mode = (config.get('source_filter_mode') or 'all').lower()
+        wanted = [c.split('.', 1)[1] if '.' in c else c for c in self._parse_list(config.get('output_cols'))]
+        expr = self._filter_rules_expr(rules, mode) if isinstance(rules, list) and rules else None
+        names = lf.collect_schema().names()
+        if expr is not None:
+            lf = lf.filter(expr)
+        cols = [c for c in wanted if c in names]
+        if cols:
+            lf = lf.select(cols)
+        return lf.collect()
+
+    def _read_parquet_source(self, path: str, config: Dict[str, Any], fs_options: Dict[str, Any]) -> pl.DataFrame:
+        """Parquet con proyección de columnas y poda de row groups.
+        Local: scan_parquet con select/filter (Polars empuja ambos al lector).
+        Remoto: se lee el footer, y solo se descargan los rangos de bytes de las columnas
+        y row groups necesarios (en paralelo según el backend); el filtro exacto se aplica después.
+        """
+        rules = config.get('source_filter_rules')
+        mode = (config.get('source_filter_mode') or 'all').lower()
+        wanted = [c.split('.', 1)[1] if '.' in c else c for c in self._parse_list(config.get('output_cols'))]
+        expr = self._filter_rules_expr(rules, mode) if isinstance(rules, list) and rules else None
+        if filesystem.is_local(path):
+            return self._collect_pushdown(pl.scan_parquet(filesystem.local_path(path)), config)
+
+        import pyarrow.parquet as pq
+        fs, fs_path = filesystem.get_fs(path, fs_options)
+        names = pq.read_schema(fs_path, filesystem=fs).names
+        cols = [c for c in wanted if c in names]
+        # Las columnas del filtro también hay que descargarlas
+        filter_cols = [r.get('column') for r in (rules or []) if isinstance(r, dict) and r.get('column') in names]
+        read_cols = list(dict.fromkeys(cols + filter_cols)) if cols else None
+        filters = self._pushdown_filters(rules, mode) if expr is not None else None
+        self.execution_progress.emit(
+            f"Parquet remoto {path}: columnas={read_cols or 'todas'} filtros={filters or 'ninguno'}"
+        )
+        df = file_io.read_file('parquet', path, options={'columns': read_cols, 'filters': filters},
+                               fs_options=fs_options)
+        if expr is not None:
+            df = df.filter(expr)
+        if cols:
+            df = df.select(cols)
+        return df
+
+    def _read_tail_source(self, node_id: int, subtype: str, config: Dict[str, Any]) -> pl.DataFrame:
+        """Solo las líneas completas nuevas de un log CSV/NDJSON (ver core.tail_source).
+        El nuevo offset queda pendiente y se guarda al terminar el pipeline sin errores."""
+        path = config.get('path')
+        if not path:
+            raise ValueError(f"No se especificó ruta de archivo para el nodo {node_id}")
+        if not filesystem.is_local(path) or file_io.detect_compression(path):
+            raise ValueError("El modo tail solo admite archivos locales sin comprimir")
+        path = filesystem.local_path(path)
+        store = tail_source.TailState(self.state_dir)
+        key = tail_source.state_key(node_id, path, config)
+        segments, new_state, notes = tail_source.read_new(path, store.load(key), self._cfg_int(config, 'tail_max_bytes'))
+        for note in notes:
+            self.execution_progress.emit(f"Tail: {note}")
+        options = file_io.resolve_csv_options(path, config) if subtype == 'csv' else {}
+        df = tail_source.parse_segments(subtype, segments, options, path)
+        self.execution_progress.emit(f"Tail {path}: {sum(len(seg[2]) for seg in segments)} bytes nuevos, "
+                                     f"{df.height} filas (offset {new_state['offset']})")
+        self._pending_state.append(lambda: store.save(key, new_state))
+        return self._collect_pushdown(df.lazy(), config)
+
+    def _read_manifest_source(self, node_id: int, subtype: str, config: Dict[str, Any]) -> pl.DataFrame:
+        """Solo los archivos nuevos o modificados de un directorio de llegada.
+        'path' es el directorio (patrón en 'manifest_pattern') o un patrón ('/entrada/*.csv').
+        Los archivos leídos se registran en el manifiesto (ruta, tamaño, mtime y hash si
+        'manifest_hash') al terminar el pipeline sin errores; 'reprocess_window_hours'
+        vuelve a leer los modificados en las últimas N horas aunque ya estén registrados."""
+        path = config.get('path')
+        if not path or isinstance(path, (list, tuple)):
+            raise ValueError(f"El nodo {node_id} con manifiesto necesita un directorio o patrón en 'path'")
+        if not filesystem.is_local(path):
+            raise ValueError("El manifiesto de archivos solo admite directorios locales")
+        path = filesystem.local_path(path)
+        if os.path.isdir(path):
+            directory, pattern = path, str(config.get('manifest_pattern') or '').strip() or '*'
+        else:
+            directory, pattern = os.path.split(path)
+            if not any(ch in pattern for ch in '*?[') or not os.path.isdir(directory or '.'):
+                raise ValueError(f"No existe el directorio de llegada: {path}")
+        scope = str(config.get('manifest_scope') or '').strip() or f"{node_id}|{os.path.abspath(path)}"
+        window = self._cfg_int(config, 'reprocess_window_hours')
+        store = file_manifest.FileManifest(file_manifest.manifest_path(self.state_dir))
+        found = file_manifest.list_files(directory, pattern, self._cfg_bool(config, 'manifest_recursive'))
+        selected, touched = store.select_changed(scope, found, with_hash=self._cfg_bool(config, 'manifest_hash', True),
+                                                 reprocess_window=window * 3600 if window else None)
+        self.execution_progress.emit(f"Manifiesto {directory}: {len(found)} archivos, {len(selected)} nuevos o "
+                                     f"modificados, {len(found) - len(selected)} ya procesados")
+        if touched:
+            self._pending_state.append(lambda: store.record(scope, touched))
+        if not selected:
+            return self._empty_source_frame(subtype, found, config)
+        df = self._read_file_source(subtype, [e['path'] for e in selected], config)
+        self._pending_state.append(lambda: store.record(scope, selected))
+        return df
+
+    def _empty_source_frame(self, subtype: str, paths: List[str], config: Dict[str, Any]) -> pl.DataFrame:
+        """Sin archivos nuevos: DataFrame vacío con el esquema del archivo más reciente de
+        'paths' para que filtros y selección de columnas posteriores no fallen. Se toma de
+        los metadatos (core.schema_eval) o, si no bastan, de la primera fila."""
+        from . import schema_eval  # schema_eval importa este módulo
+        if not paths:
+            return pl.DataFrame()
+        latest = max(paths, key=lambda p: (os.path.getmtime(p), p))
+        # Copia: la detección CSV de un archivo ya procesado no debe escribir en el nodo
+        probe = {**config, 'path': latest}
+        try:
+            schema = schema_eval.file_schema(subtype, probe)
+            if schema is not None:
+                return schema_eval.empty_frame(schema)
+            return preview.read_file_head(subtype, latest, probe, 1).head(0)
+        except Exception as e:
+            self.execution_progress.emit(f"Aviso: sin esquema de {latest} ({e})")
+            return pl.DataFrame()
+
+    def _projection_columns(self, config: Dict[str, Any]) -> Optional[List[str]]:
+        """Columnas que debe leer un origen con proyección: 'output_cols' más las de
+        'source_filter_rules' (None = todas)."""
+        rules = config.get('source_filter_rules')
+        wanted = [c.split('.', 1)[1] if '.' in c else c for c in self._parse_list(config.get('output_cols'))]
+        filter_cols = [r.get('column') for r in (rules or []) if isinstance(r, dict) and r.get('column')] if isinstance(rules, list) else []
+        return list(dict.fromkeys(wanted + filter_cols)) if wanted else None
+
+    def _read_orc_avro_source(self, subtype: str, path: str, config: Dict[str, Any],
+                              fs_options: Dict[str, Any]) -> pl.DataFrame:
+        """ORC/Avro con proyección de 'output_cols' (y de las columnas de 'source_filter_rules').
+        ORC se lee por stripes en paralelo ('read_workers', defecto: núcleos disponibles)."""
+        read_cols = self._projection_columns(config)
+        options = {'columns': read_cols, 'workers': self._cfg_int(config, 'read_workers')}
+        self.execution_progress.emit(f"{subtype.upper()} {path}: columnas={read_cols or 'todas'}")
+        df = file_io.read_file(subtype, path, options=options,
+                               member_pattern=config.get('zip_member_pattern') or None,
+                               fs_options=fs_options)
+        return self._collect_pushdown(df.lazy(), config)
+
+    def _write_compressed(self, df: pl.DataFrame, path: str, format_type: str, codec: str, config: Dict[str, Any]) -> None:
+        """Escribe CSV comprimiendo al vuelo ('compression' y 'compression_level' del nodo)."""
+        level = self._cfg_int(config, 'compression_level')
+        self.execution_progress.emit(f"Comprimiendo salida con {codec} (nivel {level if level is not None else 'por defecto'})")
+        with file_io.open_output(path, codec, level, fs_options=self._fs_options(config)) as fh:
+            df.write_csv(fh)
+
+    def _write_json(self, df: pl.DataFrame, path: str, json_lines: bool, codec: Optional[str], config: Dict[str, Any]) -> None:
+        """JSON (array) o NDJSON escrito por bloques de 'json_batch_size' filas directamente
+        al archivo (comprimido si hay códec): nunca se arma el documento completo en memoria."""
+        level = self._cfg_int(config, 'compression_level')
+        if codec:
+            self.execution_progress.emit(f"Comprimiendo salida con {codec} (nivel {level if level is not None else 'por defecto'})")
+        with file_io.open_output(path, codec, level, fs_options=self._fs_options(config)) as fh:
+            writer = file_io.JsonWriter(fh, json_lines, self._cfg_int(config, 'json_batch_size', file_io.JSON_WRITE_BATCH_ROWS))
+            writer.write(df)
+            writer.finish()
+
+    @staticmethod
+    def _file_format(fmt: str) -> str:
+        """Normaliza el formato de salida de la UI/config ('IPC/Feather', 'JSON Lines', ...)."""
+        fmt = str(fmt or '').strip().lower()
+        if fmt in ('ipc/feather', 'feather', 'arrow'):
+            return 'ipc'
+        if fmt in ('json lines', 'json_lines', 'jsonl', 'ndjson'):
+            return 'json_lines'
+        return fmt
+
+    def _read_ipc(self, path: str) -> pl.DataFrame:
+        """Lee un archivo Arrow IPC/Feather v2.
+        Se abre con memory-map de pyarrow: si el archivo no está comprimido los buffers
+        apuntan directamente al archivo mapeado (zero-copy) y las páginas se cargan bajo
+        demanda; si está comprimido (lz4/zstd) pyarrow descomprime al leer.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.ipc as pa_ipc
+            source = pa.memory_map(path, 'r')
+            table = pa_ipc.open_file(source).read_all()
+            return pl.from_arrow(table, rechunk=False)
+        except Exception:
+            # Feather v1 / formato stream u otros: lector nativo de Polars
+            return pl.read_ipc(path)
+
+    def _write_parquet(self, df: pl.DataFrame, path: str, config: Dict[str, Any]) -> None:
+        """Escribe Parquet respetando las opciones de layout del nodo destino.
+        Config soportada:
+          - parquet_compression: 'zstd' (defecto) | 'lz4' | 'snappy' | 'gzip' | 'brotli' | 'uncompressed'
+          - parquet_compression_level: nivel del códec (zstd 1-22, gzip 0-9, brotli 0-11)
+          - parquet_row_group_size: filas por row group
+          - parquet_statistics: escribir estadísticas min/max (defecto True)
+          - parquet_dictionary: codificación diccionario (defecto True)
+          - parquet_sort_by: columnas 'a,b' para ordenar antes de escribir; junto con las
+            estadísticas permite a los lectores saltar row groups completos (con esta
+            opción el destino no se escribe por lotes; ver _supports_batch_sink)
+        """
+        compression = str(config.get('parquet_compression') or 'zstd').strip().lower()
+        if compression in ('none', 'sin compresión', 'sin compresion'):
+            compression = 'uncompressed'
+        level = self._cfg_int(config, 'parquet_compression_level')
+        row_group_size = self._cfg_int(config, 'parquet_row_group_size')
+        statistics = self._cfg_bool(config, 'parquet_statistics', True)
+        dictionary = self._cfg_bool(config, 'parquet_dictionary', True)
+
+        sort_cols = [c for c in self._parse_list(config.get('parquet_sort_by')) if c in df.columns]
+        if sort_cols:
+            self.execution_progress.emit(f"Ordenando por {sort_cols} antes de escribir Parquet...")
+            df = df.sort(sort_cols)
+
+        kwargs: Dict[str, Any] = {'compression': compression, 'statistics': statistics}
+        if level is not None and compression not in ('uncompressed', 'snappy', 'lz4'):
+            kwargs['compression_level'] = level
+        if row_group_size:
+            kwargs['row_group_size'] = row_group_size
+        if not dictionary:
+            # El writer nativo de Polars no permite desactivar diccionario: delegar en pyarrow
+            kwargs['use_pyarrow'] = True
+            kwargs['pyarrow_options'] = {'use_dictionary': False}
+        self.execution_progress.emit(
+            f"Parquet: compresión={compression} nivel={level} row_group_size={row_group_size} "
+            f"estadísticas={statistics} diccionario={dictionary}"
+        )
+        df.write_parquet(path, **kwargs)
+
+    def _write_excel(self, df: pl.DataFrame, path: str, config: Dict[str, Any]) -> None:
+        """Escribe Excel en modo streaming (xlsxwriter constant_memory), sin pasar por pandas.
+        Config soportada:
+          - excel_sheet: nombre base de la hoja (defecto 'Datos')
+          - excel_split_by: columna cuyos valores generan una hoja por valor
+          - excel_max_rows: filas de datos por hoja antes de continuar en otra
+            (tope: límite de Excel de 1.048.576 filas incluyendo cabecera)
+        Si xlsxwriter no está instalado se usa el camino anterior pandas/openpyxl.
+        """
+        try:
+            import xlsxwriter
+        except ImportError:
+            self.execution_progress.emit("xlsxwriter no disponible: escribiendo Excel con pandas/openpyxl")
+            df.to_pandas().to_excel(path, index=False)
+            return
+
+        base_sheet = str(config.get('excel_sheet') or 'Datos').strip() or 'Datos'
+        max_rows = self._cfg_int(config, 'excel_max_rows', EXCEL_MAX_ROWS - 1) or (EXCEL_MAX_ROWS - 1)
+        max_rows = max(1, min(max_rows, EXCEL_MAX_ROWS - 1))
+
+        # Particiones lógicas (una hoja por valor de excel_split_by, si aplica)
+        split_by = str(config.get('excel_split_by') or '').strip()
+        if split_by and split_by in df.columns:
+            parts = [(str(part[split_by][0]) if part.height else base_sheet, part)
+                     for part in df.partition_by(split_by, maintain_order=True)]
+        else:
+            parts = [(base_sheet, df)]
+
+        wb = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            'remove_timezone': True,
+            'nan_inf_to_errors': True,
+            'strings_to_numbers': False,
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+        })
+        used_names: set = set()
+
+        def sheet_name(name: str) -> str:
+            clean = re.sub(r'[\[\]:*?/\\]', '_', name)[:31] or 'Hoja'
+            candidate, n = clean, 2
+            while candidate.lower() in used_names:
+                suffix = f"_{n}"
+                candidate = clean[:31 - len(suffix)] + suffix
+                n += 1
+            used_names.add(candidate.lower())
+            return candidate
+
+        try:
+            header_fmt = wb.add_format({'bold': True})
+            date_fmt = wb.add_format({'num_format': 'yyyy-mm-dd'})
+            datetime_fmt = wb.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+            time_fmt = wb.add_format({'num_format': 'hh:mm:ss'})
+            total_sheets = 0
+            for name, part in parts:
+                col_fmts = []
+                for dtype in part.dtypes:
+                    if dtype == pl.Date:
+                        col_fmts.append(date_fmt)
+                    elif dtype == pl.Datetime:
+                        col_fmts.append(datetime_fmt)
+                    elif dtype == pl.Time:
+                        col_fmts.append(time_fmt)
+                    else:
+                        col_fmts.append(None)
+                # Excel necesita al menos una hoja aunque no haya filas
+                offsets = range(0, part.height, max_rows) if part.height else [0]
+                for offset in offsets:
+                    if self._stop_requested:
+                        raise KeyboardInterrupt("Ejecución detenida por el usuario")
+                    ws = wb.add_worksheet(sheet_name(name))
+                    total_sheets += 1
+                    ws.write_row(0, 0, part.columns, header_fmt)
+                    r = 1
+                    for row in part.slice(offset, max_rows).iter_rows():
+                        for c, v in enumerate(row):
+                            if v is None:
+                                continue
+                            fmt = col_fmts[c]
+                            if fmt is not None:
+                                ws.write_datetime(r, c, v, fmt)
+                            elif isinstance(v, (list, dict)):
+                                ws.write_string(r, c, json.dumps(v, default=str, ensure_ascii=False))
+                            else:
+                                ws.write(r, c, v)
+                        r += 1
+            self.execution_progress.emit(f"Excel: {df.height} filas escritas en {total_sheets} hoja(s)")
+        finally:
+            wb.close()
+
     def _execute_filter_rules(self, df: pl.DataFrame, rules: list, mode: str) -> pl.DataFrame:
         """Aplica reglas de filtro estructuradas.
         Cada regla: {column, op, value}
         op en: '>', '<', '==', '!=', '>=', '<=', 'contains', 'in', 'isnull', 'notnull'
         mode: 'all' (AND) o 'any' (OR)
         """
+        final = self._filter_rules_expr(rules, mode)
+        if final is None:
+            return df
+        return df.filter(final)
+
+    def _filter_rules_expr(self, rules: list, mode: str) -> Optional[pl.Expr]:
+        """Construye la expresión Polars de unas reglas de filtro (None si no hay reglas válidas)."""
         exprs = []
         for r in rules:
             col = r.get('column')
@@ -868,11 +1905,7 @@ class ETLEngine(QObject):
             elif op == 'contains' and isinstance(val, str):
                 e = pl.col(col).cast(pl.Utf8).str.contains(val)
             elif op == 'in':
-                try:
-                    seq = list(val) if not isinstance(val, list) else val
-                except Exception:
-                    seq = [val]
-                e = pl.col(col).is_in(seq)
+                e = pl.col(col).is_in(self._in_values(val))
             elif op == 'isnull':
                 e = pl.col(col).is_null()
             elif op == 'notnull':
@@ -880,14 +1913,14 @@ class ETLEngine(QObject):
             if e is not None:
                 exprs.append(e)
         if not exprs:
-            return df
+            return None
         final = exprs[0]
         for e in exprs[1:]:
             if mode == 'any':
                 final = final | e
             else:
                 final = final & e
-        return df.filter(final)
+        return final
 
     def _execute_join(self, left_df: pl.DataFrame, config: Dict[str, Any]) -> pl.DataFrame:
         """Ejecuta un join entre left_df y config['other_dataframe'] respetando join_cols/join_pairs,
@@ -1072,7 +2105,8 @@ class ETLEngine(QObject):
             pdf = pd.read_sql_query(query, engine)
             return pl.from_pandas(pdf)
 
-    def _make_sqlalchemy_engine(self, db_type: Optional[str], conn_str: str, config: Dict[str, Any], ssl_mode_override: Optional[str] = None):
+    def _make_sqlalchemy_engine(self, db_type: Optional[str], conn_str: str, config: Dict[str, Any], ssl_mode_override: Optional[str] = None,
+                                pool_size: Optional[int] = None):
         """Crea un engine SQLAlchemy contemplando SSL/timeout para MySQL.
         Config soportada en nodos DB (MySQL):
           - ssl_mode: 'DISABLED' | 'REQUIRED' | 'VERIFY_CA' | 'VERIFY_IDENTITY'
@@ -1108,7 +2142,8 @@ class ETLEngine(QObject):
                     ssl_dict['key'] = key
                 connect_args['ssl'] = ssl_dict
         # Otros motores: sin cambios
-        return create_engine(conn_str, connect_args=connect_args, pool_pre_ping=True, pool_recycle=300)
+        return create_engine(conn_str, connect_args=connect_args, pool_pre_ping=True, pool_recycle=300,
+                             **db_load.pool_kwargs(pool_size))
 
     def _was_ssl_enabled(self, config: Dict[str, Any]) -> bool:
         mode = str(config.get('ssl_mode') or '').strip().upper()
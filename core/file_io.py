@@ -0,0 +1,834 @@
+"""E/S de archivos compartida por el motor ETL y la GUI.
+
+Detecta compresión por extensión o bytes mágicos (gzip, bz2, xz, zstd, zip) y
+descomprime en streaming, sin archivos temporales. Los .zip se tratan como un
+origen multi-archivo: cada miembro que coincide con el formato se lee y se
+concatena. En escritura se comprime con el códec y nivel configurados.
+
+Las rutas pueden ser locales o URIs remotas (s3://, memory://, ...): la apertura
+se delega en core.filesystem y fs_options se pasa tal cual.
+
+En CSV, la codificación, el delimitador y las comillas se detectan de un prefijo
+del archivo (sniff_csv) y lo que no es UTF-8 se transcodifica al leer, en una sola
+pasada. El resto de opciones del lector (cabecera, nulos, decimal con coma, ...) se
+toman del config del nodo (csv_reader_kwargs) y se aplican igual en la lectura
+directa (read_csv) y en el escaneo lazy (scan_csv).
+"""
+import bz2
+import codecs
+import csv
+import fnmatch
+import gzip
+import inspect
+import io
+import json
+import lzma
+import os
+import zipfile
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+
+import pandas as pd
+import polars as pl
+
+from . import filesystem, orc_avro
+
+# Extensión -> códec
+COMPRESSION_BY_EXT = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+    '.zst': 'zstd',
+    '.zstd': 'zstd',
+    '.zip': 'zip',
+}
+# Códec -> extensión por defecto al escribir
+EXT_BY_COMPRESSION = {'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz', 'zstd': '.zst', 'zip': '.zip'}
+# Bytes mágicos al inicio del archivo
+_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+    (b'PK\x03\x04', 'zip'),
+)
+# Extensiones de miembros ZIP aceptadas por subtipo de origen
+_MEMBER_EXTS = {
+    'csv': ('.csv', '.txt', '.tsv'),
+    'json': ('.json', '.ndjson', '.jsonl'),
+    'parquet': ('.parquet',),
+    'ipc': ('.arrow', '.feather', '.ipc'),
+    'excel': ('.xlsx', '.xls'),
+    'orc': ('.orc',),
+    'avro': ('.avro',),
+    'fixed_width': ('.txt', '.dat', '.fwf'),
+    'xml': ('.xml',),
+}
+
+# Bytes del inicio del archivo usados para detectar codificación/delimitador/comillas
+SNIFF_BYTES = 64 * 1024
+CSV_DELIMITERS = ',;\t|'
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Opciones del lector CSV en el config del nodo (mismo nombre que en Polars)
+CSV_READER_KEYS = ('has_header', 'skip_rows', 'comment_prefix', 'null_values', 'infer_schema_length',
+                   'n_threads', 'low_memory', 'rechunk', 'try_parse_dates', 'decimal_comma', 'columns')
+_CSV_BOOL_KEYS = ('has_header', 'low_memory', 'rechunk', 'try_parse_dates', 'decimal_comma')
+_CSV_INT_KEYS = ('skip_rows', 'n_threads')
+
+Source = Union[str, BinaryIO]
+T = TypeVar('T')
+
+
+def detect_compression(path: str, fs_options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Devuelve el códec de compresión de un archivo o None si no está comprimido.
+    Primero mira la extensión y, si no es concluyente, los bytes mágicos.
+    Los .xlsx son ZIP por diseño y nunca se consideran comprimidos.
+    """
+    lower = str(path).lower()
+    if lower.endswith(('.xlsx', '.xlsm')):
+        return None
+    ext = os.path.splitext(lower)[1]
+    if ext in COMPRESSION_BY_EXT:
+        return COMPRESSION_BY_EXT[ext]
+    try:
+        with filesystem.open_file(path, 'rb', fs_options) as fh:
+            head = fh.read(8)
+    except (OSError, ValueError):
+        return None
+    for magic, codec in _MAGIC:
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def strip_compression_ext(path: str) -> str:
+    """'datos.csv.gz' -> 'datos.csv'. Útil para inferir el formato interno."""
+    root, ext = os.path.splitext(str(path))
+    if ext.lower() in COMPRESSION_BY_EXT:
+        return root
+    return str(path)
+
+
+class _Stacked(io.BufferedIOBase):
+    """Stream de (des)compresión que al cerrarse cierra también el stream base.
+    GzipFile/BZ2File/LZMAFile no cierran un fileobj que no abrieron ellos."""
+
+    def __init__(self, outer: BinaryIO, raw: BinaryIO):
+        super().__init__()
+        self._outer = outer
+        self._raw = raw
+
+    def readable(self) -> bool:
+        return self._outer.readable()
+
+    def writable(self) -> bool:
+        return self._outer.writable()
+
+    def read(self, size: int = -1) -> bytes:
+        return self._outer.read(size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self._outer.read1(size)
+
+    def readinto(self, b) -> int:
+        return self._outer.readinto(b)
+
+    def write(self, b) -> int:
+        return self._outer.write(b)
+
+    def close(self) -> None:
+        if not self.closed:
+            try:
+                self._outer.close()
+            finally:
+                self._raw.close()
+        super().close()
+
+
+def _decompressing_reader(raw: BinaryIO, codec: str) -> BinaryIO:
+    if codec == 'gzip':
+        return _Stacked(gzip.GzipFile(fileobj=raw, mode='rb'), raw)
+    if codec == 'bz2':
+        return _Stacked(bz2.BZ2File(raw, mode='rb'), raw)
+    if codec == 'xz':
+        return _Stacked(lzma.LZMAFile(raw, mode='rb'), raw)
+    if codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("Para leer archivos .zst instale 'zstandard' (pip install zstandard)") from e
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    raise ValueError(f"Compresión no soportada: {codec}")
+
+
+def iter_input_streams(path: str,
+                       subtype: Optional[str] = None,
+                       member_pattern: Optional[str] = None,
+                       fs_options: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[str, BinaryIO]]:
+    """Itera (nombre, stream binario descomprimido) de un archivo de entrada.
+    - Sin compresión: un único stream del archivo.
+    - gzip/bz2/xz/zstd: un único stream que descomprime al leer.
+    - zip: un stream por miembro; se filtra por member_pattern (glob) o, si no se
+      indica, por las extensiones propias del subtipo.
+    El llamador es responsable de cerrar cada stream.
+    """
+    codec = detect_compression(path, fs_options)
+    if codec is None:
+        yield path, filesystem.open_file(path, 'rb', fs_options)
+        return
+    if codec != 'zip':
+        yield path, _decompressing_reader(filesystem.open_file(path, 'rb', fs_options), codec)
+        return
+    exts = _MEMBER_EXTS.get((subtype or '').lower())
+    with _OwningZipFile(filesystem.open_file(path, 'rb', fs_options)) as zf:
+        for info in zf.infolist():
+            name = info.filename
+            base = os.path.basename(name)
+            if info.is_dir() or not base or name.startswith('__MACOSX/') or base.startswith('.'):
+                continue
+            if member_pattern:
+                if not fnmatch.fnmatch(name, member_pattern) and not fnmatch.fnmatch(base, member_pattern):
+                    continue
+            elif exts and not strip_compression_ext(base).lower().endswith(exts):
+                continue
+            yield name, zf.open(info, 'r')
+
+
+def open_output(path: str, compression: Optional[str] = None, level: Optional[int] = None,
+                fs_options: Optional[Dict[str, Any]] = None) -> BinaryIO:
+    """Abre un stream binario de escritura comprimiendo con el códec indicado.
+    compression None/'auto' infiere por extensión; 'none'/'uncompressed' escribe plano.
+    Para 'zip' se crea un único miembro con el nombre del archivo sin '.zip'.
+    """
+    codec = resolve_output_compression(path, compression)
+    raw = filesystem.open_file(path, 'wb', fs_options)
+    if codec is None:
+        return raw
+    if codec == 'gzip':
+        return _Stacked(gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=9 if level is None else level), raw)
+    if codec == 'bz2':
+        return _Stacked(bz2.BZ2File(raw, mode='wb', compresslevel=9 if level is None else level), raw)
+    if codec == 'xz':
+        return _Stacked(lzma.LZMAFile(raw, mode='wb', preset=level), raw)
+    if codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("Para escribir archivos .zst instale 'zstandard' (pip install zstandard)") from e
+        cctx = zstandard.ZstdCompressor(level=3 if level is None else level)
+        return cctx.stream_writer(raw, closefd=True)
+    if codec == 'zip':
+        zf = _OwningZipFile(raw, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=level)
+        member = os.path.basename(strip_compression_ext(path)) or 'data'
+        return _ZipMemberWriter(zf, member)
+    raise ValueError(f"Compresión no soportada: {codec}")
+
+
+def resolve_output_compression(path: str, compression: Optional[str] = None) -> Optional[str]:
+    """Normaliza el códec de salida: explícito en config o inferido por la extensión."""
+    codec = str(compression or 'auto').strip().lower()
+    if codec in ('', 'auto'):
+        return COMPRESSION_BY_EXT.get(os.path.splitext(str(path).lower())[1])
+    if codec in ('none', 'uncompressed', 'sin compresión', 'sin compresion'):
+        return None
+    if codec == 'gz':
+        codec = 'gzip'
+    if codec == 'zst':
+        codec = 'zstd'
+    if codec not in EXT_BY_COMPRESSION:
+        raise ValueError(f"Compresión no soportada: {compression}")
+    return codec
+
+
+class _OwningZipFile(zipfile.ZipFile):
+    """ZipFile que cierra también el stream subyacente recibido como fileobj."""
+
+    def __init__(self, fileobj: BinaryIO, *args, **kwargs):
+        super().__init__(fileobj, *args, **kwargs)
+        self._owned = fileobj
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._owned.close()
+
+
+class _ZipMemberWriter(io.RawIOBase):
+    """Stream de escritura sobre un miembro de un ZipFile que cierra también el archivo."""
+
+    def __init__(self, zf: zipfile.ZipFile, member: str):
+        super().__init__()
+        self._zf = zf
+        self._fh = zf.open(member, 'w', force_zip64=True)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        return self._fh.write(b)
+
+    def close(self) -> None:
+        if not self.closed:
+            try:
+                self._fh.close()
+            finally:
+                self._zf.close()
+        super().close()
+
+
+def frame_from_json_data(data: Any) -> pl.DataFrame:
+    """Convierte JSON ya parseado en DataFrame: lista de registros, dict con 'data' o un único objeto."""
+    if isinstance(data, list):
+        return pl.DataFrame(data)
+    if isinstance(data, dict):
+        if 'data' in data:
+            return pl.DataFrame(data['data'])
+        return pl.DataFrame([data])
+    raise ValueError("Estructura JSON no soportada para conversión a DataFrame")
+
+
+def json_path_prefix(json_path: Optional[str]) -> str:
+    """Ruta con puntos ('data', 'result.items', '$.data') -> prefijo ijson de sus elementos."""
+    path = (json_path or '').strip()
+    if path.startswith('$'):
+        path = path[1:].lstrip('.')
+    return f"{path}.item" if path else 'item'
+
+
+def _align_nulls(df: pl.DataFrame, schema: Optional[Dict[str, Any]]) -> pl.DataFrame:
+    """Columnas sin valores en este lote (tipo Null) toman el tipo del primer lote."""
+    if not schema:
+        return df
+    fix = {c: schema[c] for c, t in df.schema.items() if t == pl.Null and schema.get(c, pl.Null) != pl.Null}
+    return df.cast(fix) if fix else df
+
+
+def _records_frame(records: List[Any], schema: Optional[Dict[str, Any]]) -> pl.DataFrame:
+    rows = [r if isinstance(r, dict) else {'value': r} for r in records]
+    return _align_nulls(pl.DataFrame(rows, infer_schema_length=None), schema)
+
+
+def iter_json_batches(stream: BinaryIO, json_path: Optional[str] = None,
+                      batch_size: int = 10000) -> Iterator[pl.DataFrame]:
+    """Extrae en lotes de DataFrame los registros del array en 'json_path' ('' = raíz).
+    Con 'ijson' (opcional) el JSON se parsea de forma incremental mientras se lee el
+    stream: nunca coexisten el cuerpo completo, el árbol de objetos y el DataFrame.
+    Sin ijson se parsea el documento entero y se recorre la ruta."""
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+    if ijson is None:
+        data = json.load(stream)
+        for key in json_path_prefix(json_path).split('.')[:-1]:
+            data = data[key]
+        records = data if isinstance(data, list) else [data]
+        items: Iterator[Any] = iter(records)
+    else:
+        items = ijson.items(stream, json_path_prefix(json_path), use_float=True)
+    batch: List[Any] = []
+    schema = None
+    for rec in items:
+        batch.append(rec)
+        if len(batch) >= batch_size:
+            df = _records_frame(batch, schema)
+            schema = schema or df.schema
+            batch = []
+            yield df
+    if batch or schema is None:
+        yield _records_frame(batch, schema)
+
+
+def iter_ndjson_batches(stream: BinaryIO, batch_size: int = 10000) -> Iterator[pl.DataFrame]:
+    """NDJSON por lotes de líneas, cada lote leído con el lector nativo de Polars."""
+    lines: List[bytes] = []
+    schema = None
+    for line in stream:
+        if line.strip():
+            lines.append(line if line.endswith(b'\n') else line + b'\n')
+        if len(lines) >= batch_size:
+            df = _align_nulls(pl.read_ndjson(io.BytesIO(b''.join(lines)), infer_schema_length=None), schema)
+            schema = schema or df.schema
+            lines = []
+            yield df
+    if lines:
+        yield _align_nulls(pl.read_ndjson(io.BytesIO(b''.join(lines)), infer_schema_length=None), schema)
+    elif schema is None:
+        yield pl.DataFrame()
+
+
+# Filas serializadas por bloque al escribir JSON/NDJSON
+JSON_WRITE_BATCH_ROWS = 10000
+
+
+class JsonWriter:
+    """Escritura JSON incremental sobre un stream binario (no lo cierra).
+    json_lines=True escribe NDJSON (un objeto por línea). Si no, un array JSON
+    emitido como '[', los objetos de cada bloque separados por comas y ']' en
+    finish(), sin construir el documento completo en memoria."""
+
+    def __init__(self, fh: BinaryIO, json_lines: bool = False, batch_size: int = JSON_WRITE_BATCH_ROWS):
+        self._fh = fh
+        self.json_lines = json_lines
+        self.batch_size = max(1, int(batch_size or JSON_WRITE_BATCH_ROWS))
+        self._empty = True
+
+    def write(self, df: pl.DataFrame) -> None:
+        for offset in range(0, df.height, self.batch_size):
+            buf = io.BytesIO()
+            df.slice(offset, self.batch_size).write_ndjson(buf)
+            data = buf.getvalue()
+            if not self.json_lines:
+                # Los saltos de línea dentro de valores van escapados: cada '\n' separa objetos
+                data = (b'[\n' if self._empty else b',\n') + data.rstrip(b'\n').replace(b'\n', b',\n')
+            self._fh.write(data)
+            self._empty = False
+
+    def finish(self) -> None:
+        if not self.json_lines:
+            self._fh.write(b'[]' if self._empty else b'\n]')
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Codificación de un prefijo de archivo: BOM, después UTF-8 estricto y, si no
+    decodifica, cp1252 (o latin-1, que acepta cualquier byte)."""
+    for bom, name in _BOMS:
+        if sample.startswith(bom):
+            return name
+    try:
+        # final=False: el prefijo puede cortar un carácter multibyte al final
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        sample.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def is_utf8(encoding: Optional[str]) -> bool:
+    """True si Polars puede leer la codificación sin transcodificar (UTF-8, con o sin BOM)."""
+    if not encoding:
+        return True
+    try:
+        return codecs.lookup(encoding).name in ('utf-8', 'utf-8-sig')
+    except LookupError:
+        return encoding.lower().replace('-', '') in ('utf8', 'utf8lossy')
+
+
+def sniff_csv(path: str,
+              member_pattern: Optional[str] = None,
+              fs_options: Optional[Dict[str, Any]] = None,
+              sample_bytes: int = SNIFF_BYTES) -> Dict[str, str]:
+    """Detecta en una sola lectura de un prefijo la codificación, el delimitador y el
+    carácter de comillas de un CSV (comprimido o no; en .zip, del primer miembro).
+    Devuelve {'encoding', 'separator', 'quote_char'}."""
+    sample = b''
+    for _name, stream in iter_input_streams(path, subtype='csv', member_pattern=member_pattern,
+                                            fs_options=fs_options):
+        with stream:
+            sample = stream.read(sample_bytes)
+        break
+    encoding = detect_encoding(sample)
+    text = codecs.getincrementaldecoder(encoding)(errors='replace').decode(sample, final=False)
+    # Solo líneas completas: la última puede estar cortada
+    lines = text.splitlines()
+    if len(lines) > 1 and len(sample) >= sample_bytes:
+        lines = lines[:-1]
+    separator, quote_char = ',', '"'
+    try:
+        dialect = csv.Sniffer().sniff('\n'.join(lines[:50]), delimiters=CSV_DELIMITERS)
+        separator = dialect.delimiter
+        quote_char = dialect.quotechar or '"'
+    except csv.Error:
+        pass
+    return {'encoding': encoding, 'separator': separator, 'quote_char': quote_char}
+
+
+def _split_values(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    return [v.strip() for v in str(value).split(',') if v.strip()]
+
+
+def csv_reader_kwargs(config: Dict[str, Any]) -> Dict[str, Any]:
+    """kwargs de pl.read_csv/scan_csv para las claves CSV_READER_KEYS del config.
+    Acepta los valores como texto (panel) o ya tipados; vacíos o inválidos se omiten
+    y el lector usa su valor por defecto."""
+    kwargs: Dict[str, Any] = {}
+    for key in CSV_READER_KEYS:
+        val = config.get(key)
+        if val is None or (isinstance(val, str) and not val.strip()):
+            continue
+        if key in _CSV_BOOL_KEYS:
+            kwargs[key] = val if isinstance(val, bool) else str(val).strip().lower() in ('1', 'true', 'yes', 'si', 'sí')
+        elif key in _CSV_INT_KEYS:
+            try:
+                kwargs[key] = int(str(val).strip())
+            except ValueError:
+                continue
+        elif key == 'infer_schema_length':
+            text = str(val).strip().lower()
+            if text in ('all', 'none', 'todo', 'todas'):
+                # Inferir el esquema con el archivo completo
+                kwargs[key] = None
+            else:
+                try:
+                    kwargs[key] = int(text)
+                except ValueError:
+                    continue
+        elif key in ('null_values', 'columns'):
+            values = _split_values(val)
+            if values:
+                kwargs[key] = values
+        else:
+            kwargs[key] = str(val)
+    return kwargs
+
+
+def supported_kwargs(func: Any, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Solo los kwargs que acepta func: las opciones cambian entre versiones de Polars
+    (p.ej. n_threads/rechunk ya no existen en read_csv) y entre read_csv y scan_csv."""
+    try:
+        params = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return kwargs
+    if any(p.kind == inspect.Parameter.VAR_KEYWORD for p in params.values()):
+        return kwargs
+    return {k: v for k, v in kwargs.items() if k in params}
+
+
+def resolve_csv_options(path: str, config: Dict[str, Any],
+                        fs_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Opciones de lectura CSV para read_file/scan_csv a partir del config del nodo.
+    Si faltan 'encoding', 'separator' o 'quote_char' se detectan con sniff_csv y se
+    guardan en el config, de modo que la detección solo ocurre la primera vez.
+    Las demás opciones del lector salen de csv_reader_kwargs."""
+    if not all(config.get(k) for k in ('encoding', 'separator', 'quote_char')):
+        detected = sniff_csv(path, member_pattern=config.get('zip_member_pattern') or None,
+                             fs_options=fs_options)
+        for key, val in detected.items():
+            if not config.get(key):
+                # El tabulador se guarda escrito como '\t' para que sea editable en el panel
+                config[key] = '\\t' if val == '\t' else val
+    separator = str(config['separator']).replace('\\t', '\t')
+    return {
+        'encoding': config['encoding'],
+        'csv': {'separator': separator, 'quote_char': config['quote_char'], **csv_reader_kwargs(config)},
+    }
+
+
+# Codificación de reintento para un CSV detectado como UTF-8 con bytes inválidos
+# más allá del prefijo analizado (típico de exportaciones de ERP en Windows)
+FALLBACK_ENCODING = 'cp1252'
+
+
+def is_utf8_error(exc: BaseException) -> bool:
+    """True si el error de lectura de Polars se debe a bytes que no son UTF-8."""
+    return isinstance(exc, pl.exceptions.ComputeError) and 'utf-8' in str(exc).lower()
+
+
+def with_encoding_fallback(read: Callable[[], T], config: Dict[str, Any],
+                           warn: Optional[Callable[[str], None]] = None) -> T:
+    """Ejecuta read() y, si falla por UTF-8 inválido con una codificación UTF-8 detectada
+    (la detección solo mira SNIFF_BYTES), guarda FALLBACK_ENCODING en config['encoding']
+    y repite la lectura: read() debe volver a resolver las opciones desde el config."""
+    try:
+        return read()
+    except pl.exceptions.ComputeError as e:
+        encoding = str(config.get('encoding') or '')
+        if not is_utf8_error(e) or not is_utf8(encoding) or 'lossy' in encoding.lower():
+            raise
+        config['encoding'] = FALLBACK_ENCODING
+        if warn:
+            warn(f"Aviso: el CSV no es UTF-8 válido más allá de los primeros {SNIFF_BYTES // 1024} KB; "
+                 f"se relee como {FALLBACK_ENCODING}")
+        return read()
+
+
+class _TranscodingReader(io.RawIOBase):
+    """Stream binario que transcodifica a UTF-8 otro stream binario al leer.
+    Trabaja por bloques con un decodificador incremental: una sola pasada y
+    memoria acotada, sin archivos temporales."""
+
+    def __init__(self, raw: BinaryIO, encoding: str, chunk_size: int = 1024 * 1024):
+        super().__init__()
+        self._raw = raw
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._chunk_size = chunk_size
+        self._pending = b''
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._pending and not self._eof:
+            chunk = self._raw.read(self._chunk_size)
+            if not chunk:
+                self._eof = True
+                self._pending = self._decoder.decode(b'', final=True).encode('utf-8')
+            else:
+                self._pending = self._decoder.decode(chunk).encode('utf-8')
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._raw.close()
+        super().close()
+
+
+def _read_csv(src: Source, options: Dict[str, Any]) -> pl.DataFrame:
+    """pl.read_csv con transcodificación en streaming si la codificación no es UTF-8."""
+    kwargs = supported_kwargs(pl.read_csv, dict(options.get('csv') or {}))
+    encoding = options.get('encoding')
+    if is_utf8(encoding):
+        if encoding and 'lossy' in encoding.lower():
+            kwargs['encoding'] = 'utf8-lossy'
+        return pl.read_csv(src, **kwargs)
+    if isinstance(src, str):
+        with io.BufferedReader(_TranscodingReader(open(src, 'rb'), encoding)) as fh:
+            return pl.read_csv(fh, **kwargs)
+    return pl.read_csv(io.BufferedReader(_TranscodingReader(src, encoding)), **kwargs)
+
+
+def can_scan_csv(path: str, options: Dict[str, Any], fs_options: Optional[Dict[str, Any]] = None) -> bool:
+    """True si el CSV se puede escanear en lazy: archivo local sin comprimir y en UTF-8."""
+    return (filesystem.is_local(path) and detect_compression(path, fs_options) is None
+            and is_utf8(options.get('encoding')))
+
+
+def scan_csv(path: str, options: Dict[str, Any]) -> pl.LazyFrame:
+    """pl.scan_csv con las mismas opciones que la lectura directa (ver can_scan_csv).
+    'columns' se aplica como proyección, que Polars empuja al lector."""
+    kwargs = dict(options.get('csv') or {})
+    columns = kwargs.pop('columns', None)
+    encoding = options.get('encoding')
+    if encoding and 'lossy' in encoding.lower():
+        kwargs['encoding'] = 'utf8-lossy'
+    lf = pl.scan_csv(filesystem.local_path(path), **supported_kwargs(pl.scan_csv, kwargs))
+    if columns:
+        lf = lf.select(columns)
+    return lf
+
+
+def _read_plain(subtype: str, src: Source, options: Dict[str, Any]) -> pl.DataFrame:
+    """Lee un archivo (ruta local o stream binario ya descomprimido) de un subtipo dado."""
+    is_path = isinstance(src, str)
+    if subtype == 'csv':
+        return _read_csv(src, options)
+    if subtype == 'json':
+        if options.get('json_lines'):
+            # NDJSON: lector nativo de Polars (json.load falla con "Extra data")
+            return pl.read_ndjson(src, infer_schema_length=None)
+        if is_path:
+            with open(src, 'r', encoding='utf-8') as f:
+                return frame_from_json_data(json.load(f))
+        return frame_from_json_data(json.load(io.TextIOWrapper(src, encoding='utf-8')))
+    # Formatos que necesitan acceso aleatorio: desde stream se cargan en memoria
+    data = src if is_path else io.BytesIO(src.read())
+    if subtype == 'parquet':
+        return pl.read_parquet(data, columns=options.get('columns') or None)
+    if subtype == 'ipc':
+        return pl.read_ipc(data)
+    if subtype == 'orc':
+        return orc_avro.read_orc(data, columns=options.get('columns'), workers=options.get('workers'))
+    if subtype == 'avro':
+        return orc_avro.read_avro(data, columns=options.get('columns'))
+    if subtype == 'excel':
+        try:
+            return pl.read_excel(data)
+        except Exception:
+            if not is_path:
+                data.seek(0)
+            return pl.from_pandas(pd.read_excel(data))
+    raise ValueError(f"Subtipo de archivo no soportado: {subtype}")
+
+
+def is_ndjson_name(name: str) -> bool:
+    """True si el nombre (sin extensión de compresión) es de un JSON Lines (.ndjson/.jsonl)."""
+    return strip_compression_ext(name or '').lower().endswith(('.ndjson', '.jsonl'))
+
+
+def _json_options(options: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Opciones de lectura JSON con 'json_lines' deducido de la extensión si no viene explícito."""
+    if options.get('json_lines') is not None:
+        return options
+    return {**options, 'json_lines': is_ndjson_name(name)}
+
+
+def read_stream(subtype: str, stream: BinaryIO, options: Optional[Dict[str, Any]] = None) -> pl.DataFrame:
+    """Lee un stream binario ya descomprimido (p.ej. un BytesIO) con las opciones de read_file."""
+    return _read_plain((subtype or '').lower(), stream, options or {})
+
+
+def read_file(subtype: str, path: str,
+              options: Optional[Dict[str, Any]] = None,
+              member_pattern: Optional[str] = None,
+              fs_options: Optional[Dict[str, Any]] = None) -> pl.DataFrame:
+    """Lee un origen de archivo (local o remoto) con descompresión transparente.
+    options admite claves por formato (p.ej. {'csv': {...kwargs de pl.read_csv}}),
+    'encoding' (CSV no UTF-8: se transcodifica en streaming; ver resolve_csv_options),
+    'columns' (proyección), 'filters' (DNF de pyarrow para podar row groups Parquet)
+    y 'json_lines' (NDJSON; por defecto se deduce de la extensión .ndjson/.jsonl).
+    Los miembros de un .zip se leen por separado y se concatenan (diagonal_relaxed).
+    """
+    options = options or {}
+    subtype = (subtype or '').lower()
+    codec = detect_compression(path, fs_options)
+    if codec is None:
+        if subtype == 'json':
+            options = _json_options(options, path)
+        if filesystem.is_local(path):
+            return _read_plain(subtype, filesystem.local_path(path), options)
+        if subtype == 'parquet':
+            table = filesystem.read_parquet_table(path, columns=options.get('columns'),
+                                                  filters=options.get('filters'), fs_options=fs_options)
+            return pl.from_arrow(table)
+        with filesystem.open_file(path, 'rb', fs_options) as fh:
+            return _read_plain(subtype, fh, options)
+    frames: List[pl.DataFrame] = []
+    for name, stream in iter_input_streams(path, subtype=subtype, member_pattern=member_pattern,
+                                           fs_options=fs_options):
+        with stream:
+            member_options = _json_options(options, name) if subtype == 'json' else options
+            frames.append(_read_plain(subtype, stream, member_options))
+    if not frames:
+        raise ValueError(f"El archivo comprimido no contiene miembros de tipo {subtype}: {path}")
+    if len(frames) == 1:
+        return frames[0]
+    return pl.concat(frames, how='diagonal_relaxed')
+
+
+class _PrefixedReader(io.RawIOBase):
+    """Stream que devuelve primero unos bytes ya leídos y después el resto del stream."""
+
+    def __init__(self, prefix: bytes, raw: BinaryIO):
+        self._prefix = prefix
+        self._raw = raw
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if self._prefix:
+            n = min(len(b), len(self._prefix))
+            b[:n] = self._prefix[:n]
+            self._prefix = self._prefix[n:]
+            return n
+        data = self._raw.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+def _csv_prefix(stream: BinaryIO, quote_char: Optional[str], records: int) -> bytes:
+    """Primeros registros de un CSV (UTF-8); un campo entre comillas con saltos de línea
+    ocupa varias líneas pero cuenta como un solo registro."""
+    quote = (quote_char or '"').encode('utf-8')
+    out: List[bytes] = []
+    quotes = 0
+    for line in stream:
+        out.append(line)
+        quotes += line.count(quote)
+        if quotes % 2 == 0:
+            records -= 1
+            if records <= 0:
+                break
+    return b''.join(out)
+
+
+def _read_csv_head(src: Source, n_rows: int, options: Dict[str, Any]) -> pl.DataFrame:
+    """Cabeza de un CSV desde un stream: solo se descomprime/transcodifica el prefijo necesario."""
+    encoding = options.get('encoding')
+    if not is_utf8(encoding):
+        src = io.BufferedReader(_TranscodingReader(src, encoding))
+    csv_opts = dict(options.get('csv') or {})
+    # Cabecera y filas saltadas también cuentan como registros
+    records = n_rows + 1 + int(csv_opts.get('skip_rows') or 0)
+    prefix = _csv_prefix(src, csv_opts.get('quote_char'), records)
+    head_opts = {'encoding': 'utf8-lossy' if encoding and 'lossy' in encoding.lower() else 'utf-8',
+                 'csv': {**csv_opts, 'n_rows': n_rows}}
+    return _read_csv(io.BytesIO(prefix), head_opts)
+
+
+def _read_json_head(stream: BinaryIO, n_rows: int, ndjson: bool) -> pl.DataFrame:
+    if ndjson:
+        return next(iter_ndjson_batches(stream, batch_size=n_rows)).head(n_rows)
+    # Array raíz o {'data': [...]} como frame_from_json_data; un objeto suelto es una fila
+    first = stream.read(1)
+    while first and first.isspace():
+        first = stream.read(1)
+    rest = io.BufferedReader(_PrefixedReader(first, stream))
+    if first == b'{':
+        data = json.load(rest)
+        return frame_from_json_data(data).head(n_rows)
+    return next(iter_json_batches(rest, None, batch_size=n_rows)).head(n_rows)
+
+
+def read_head(subtype: str, path: str, n_rows: int,
+              options: Optional[Dict[str, Any]] = None,
+              member_pattern: Optional[str] = None,
+              fs_options: Optional[Dict[str, Any]] = None) -> pl.DataFrame:
+    """Primeras n_rows filas de un origen de archivo (vista previa), leyendo lo mínimo:
+    scan lazy con head en CSV/Parquet/IPC/NDJSON locales, prefijo de líneas en CSV
+    comprimidos o no UTF-8, primer lote en JSON, stripes iniciales en ORC y n_rows en
+    Avro/Excel. En .zip solo se lee el primer miembro. Mismas opciones que read_file."""
+    options = options or {}
+    subtype = (subtype or '').lower()
+    n_rows = max(0, int(n_rows))
+    codec = detect_compression(path, fs_options)
+    local = filesystem.local_path(path) if filesystem.is_local(path) and codec is None else None
+    if subtype == 'csv' and can_scan_csv(path, options, fs_options):
+        return scan_csv(path, options).head(n_rows).collect()
+    if local is not None:
+        is_ndjson = is_ndjson_name(local)
+        if subtype == 'parquet':
+            return pl.scan_parquet(local).head(n_rows).collect()
+        if subtype == 'ipc':
+            return pl.scan_ipc(local).head(n_rows).collect()
+        if subtype == 'json' and is_ndjson:
+            return pl.scan_ndjson(local).head(n_rows).collect()
+        if subtype == 'orc':
+            reader = orc_avro._orc().ORCFile(local)
+            batches, rows = [], 0
+            for i in range(reader.nstripes):
+                if rows >= n_rows:
+                    break
+                batches.append(reader.read_stripe(i))
+                rows += batches[-1].num_rows
+            if not batches:
+                return pl.from_arrow(reader.schema.empty_table())
+            import pyarrow as pa
+            return pl.from_arrow(pa.Table.from_batches(batches)).head(n_rows)
+    for name, stream in iter_input_streams(path, subtype=subtype, member_pattern=member_pattern,
+                                           fs_options=fs_options):
+        with stream:
+            if subtype == 'csv':
+                return _read_csv_head(stream, n_rows, options)
+            if subtype == 'json':
+                return _read_json_head(stream, n_rows, is_ndjson_name(name))
+            data = io.BytesIO(stream.read()) if codec is not None or local is None else local
+            if subtype == 'avro':
+                return pl.read_avro(data, n_rows=n_rows)
+            if subtype == 'excel':
+                try:
+                    return pl.read_excel(data, read_options={'n_rows': n_rows})
+                except Exception:
+                    if not isinstance(data, str):
+                        data.seek(0)
+                    return pl.from_pandas(pd.read_excel(data, nrows=n_rows))
+            return _read_plain(subtype, data, options).head(n_rows)
+    raise ValueError(f"El archivo comprimido no contiene miembros de tipo {subtype}: {path}")
@@ -0,0 +1,171 @@
+"""Manifiesto de archivos ya procesados, en SQLite dentro del sidecar del proyecto.
+
+Cada entrada guarda ruta, tamaño, fecha de modificación y (opcionalmente) hash
+del contenido, agrupadas por 'scope' (un servicio de vigilancia, un nodo
+origen con 'file_manifest'...). Con hash, un archivo con otra mtime pero el
+mismo contenido no se vuelve a procesar. El archivo por defecto es <proyecto>.fetl.logs/state/manifest.sqlite.
+Se abre una conexión por operación (modo WAL), así que varios hilos o procesos
+del mismo proyecto pueden usarlo a la vez.
+"""
+import fnmatch
+import hashlib
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .tail_source import default_state_dir
+
+MANIFEST_FILE = 'manifest.sqlite'
+HASH_CHUNK = 4 * 1024 * 1024
+# Sufijos de archivos que todavía se están escribiendo (copias parciales)
+PARTIAL_SUFFIXES = ('.tmp', '.part', '.partial', '.crdownload', '.filepart')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS manifest (
+    scope TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    hash TEXT,
+    processed_at TEXT,
+    PRIMARY KEY (scope, path)
+)
+"""
+
+
+def manifest_path(state_dir: Optional[str] = None) -> str:
+    return os.path.join(state_dir or default_state_dir(), MANIFEST_FILE)
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 del contenido leído por bloques."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_entry(path: str, with_hash: bool = False) -> Dict[str, Any]:
+    """Entrada del manifiesto para un archivo local: {path, size, mtime, hash}."""
+    st = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': st.st_size, 'mtime': st.st_mtime,
+            'hash': file_hash(path) if with_hash else None}
+
+
+def list_files(directory: str, pattern: str = '*', recursive: bool = False,
+               skip_dirs: Iterable[Optional[str]] = ()) -> List[str]:
+    """Archivos de 'directory' cuyo nombre cumple 'pattern', sin ocultos ni copias parciales."""
+    skip = {d for d in skip_dirs if d}
+    out: List[str] = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) not in skip and not d.startswith('.'))
+        for name in sorted(files):
+            if name.startswith('.') or name.lower().endswith(PARTIAL_SUFFIXES):
+                continue
+            if fnmatch.fnmatch(name, pattern or '*'):
+                out.append(os.path.join(root, name))
+        if not recursive:
+            break
+    return out
+
+
+class FileManifest:
+    """Lectura y registro de archivos procesados por scope."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(_SCHEMA)
+        return conn
+
+    def lookup(self, scope: str, paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Entradas registradas de 'paths' (clave: ruta absoluta)."""
+        wanted = [os.path.abspath(p) for p in paths]
+        found: Dict[str, Dict[str, Any]] = {}
+        if not wanted:
+            return found
+        conn = self._connect()
+        try:
+            # Por tramos: SQLite limita el número de parámetros por consulta
+            for i in range(0, len(wanted), 500):
+                part = wanted[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT path, size, mtime, hash, processed_at FROM manifest "
+                    f"WHERE scope = ? AND path IN ({','.join('?' * len(part))})", [scope, *part])
+                for path, size, mtime, digest, processed_at in rows:
+                    found[path] = {'path': path, 'size': size, 'mtime': mtime, 'hash': digest,
+                                   'processed_at': processed_at}
+        finally:
+            conn.close()
+        return found
+
+    def is_unchanged(self, entry: Dict[str, Any], recorded: Optional[Dict[str, Any]]) -> bool:
+        """True si el archivo ya está registrado con el mismo tamaño y mtime (y hash, si ambos lo tienen)."""
+        if not recorded or recorded.get('size') != entry.get('size') or recorded.get('mtime') != entry.get('mtime'):
+            return False
+        if entry.get('hash') and recorded.get('hash'):
+            return entry['hash'] == recorded['hash']
+        return True
+
+    def select_changed(self, scope: str, paths: Iterable[str], with_hash: bool = False,
+                       reprocess_window: Optional[float] = None,
+                       now: Optional[float] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Separa 'paths' en (a procesar, solo tocados).
+        A procesar: nuevos, con otro tamaño/mtime (y otro hash si with_hash) o modificados
+        hace menos de 'reprocess_window' segundos. Solo tocados: mtime distinto pero mismo
+        hash; no se releen, pero conviene registrarlos para no volver a calcular el hash."""
+        now = time.time() if now is None else now
+        entries = []
+        for path in paths:
+            try:
+                entries.append(file_entry(path))
+            except OSError:
+                continue
+        recorded = self.lookup(scope, [e['path'] for e in entries])
+        selected: List[Dict[str, Any]] = []
+        touched: List[Dict[str, Any]] = []
+        for entry in entries:
+            previous = recorded.get(entry['path'])
+            in_window = bool(reprocess_window) and entry['mtime'] >= now - reprocess_window
+            if not in_window and self.is_unchanged(entry, previous):
+                continue
+            if with_hash:
+                entry['hash'] = file_hash(entry['path'])
+                if not in_window and previous and previous.get('hash') == entry['hash']:
+                    touched.append(entry)
+                    continue
+            selected.append(entry)
+        return selected, touched
+
+    def record(self, scope: str, entries: Iterable[Dict[str, Any]]) -> int:
+        """Registra (o actualiza) las entradas como procesadas ahora. Devuelve cuántas."""
+        now = datetime.now().isoformat(timespec='seconds')
+        rows = [(scope, os.path.abspath(e['path']), e.get('size'), e.get('mtime'), e.get('hash'), now)
+                for e in entries]
+        if not rows:
+            return 0
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO manifest (scope, path, size, mtime, hash, processed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows)
+        finally:
+            conn.close()
+        return len(rows)
+
+    def entries(self, scope: str) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT path, size, mtime, hash, processed_at FROM manifest "
+                                "WHERE scope = ? ORDER BY path", (scope,)).fetchall()
+        finally:
+            conn.close()
+        return [{'path': r[0], 'size': r[1], 'mtime': r[2], 'hash': r[3], 'processed_at': r[4]} for r in rows]
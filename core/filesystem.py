@@ -0,0 +1,228 @@
+"""Capa de sistema de archivos para orígenes y destinos.
+
+Las rutas locales (sin protocolo o con file://) se resuelven con el sistema de
+archivos del SO para conservar los lectores nativos (memory-map, multihilo).
+Cualquier otra URI (s3://, memory://, sftp://, gcs://, http://, ...) se abre con
+fsspec, que es dependencia opcional: solo se importa cuando hace falta.
+
+Opciones comunes (fs_options):
+  - storage_options: dict pasado al filesystem de fsspec (credenciales, endpoint, ...)
+  - cache_dir: directorio local de caché por bloques ('blockcache' de fsspec)
+  - block_size: tamaño de bloque de lectura en bytes
+"""
+import os
+import re
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+_PROTOCOL_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.\-]*)://')
+
+
+def split_protocol(path: str) -> Tuple[Optional[str], str]:
+    """'s3://bucket/x.csv' -> ('s3', 'bucket/x.csv'); rutas locales -> (None, path)."""
+    m = _PROTOCOL_RE.match(str(path))
+    if not m:
+        return None, str(path)
+    return m.group(1).lower(), str(path)[m.end():]
+
+
+def is_local(path: str) -> bool:
+    proto, _ = split_protocol(path)
+    # 'c://' no es protocolo: son letras de unidad en Windows
+    return proto in (None, 'file', 'local') or (proto is not None and len(proto) == 1)
+
+
+def local_path(path: str) -> str:
+    """Quita el prefijo file:// de una ruta local."""
+    proto, rest = split_protocol(path)
+    if proto in ('file', 'local'):
+        return rest
+    return str(path)
+
+
+def _fsspec():
+    try:
+        import fsspec
+    except ImportError as e:
+        raise ImportError("Para rutas remotas (s3://, memory://, sftp://, ...) instale 'fsspec' "
+                          "y el backend del protocolo (s3fs, paramiko, ...)") from e
+    return fsspec
+
+
+def get_fs(path: str, fs_options: Optional[Dict[str, Any]] = None) -> Tuple[Any, str]:
+    """Devuelve (filesystem fsspec, ruta dentro del filesystem).
+    Con cache_dir, el filesystem se envuelve en 'blockcache': los bloques leídos
+    se guardan en disco local y lecturas posteriores no vuelven a la red.
+    """
+    fsspec = _fsspec()
+    opts = fs_options or {}
+    storage_options = dict(opts.get('storage_options') or {})
+    proto, _ = split_protocol(path)
+    protocol = proto or 'file'
+    cache_dir = opts.get('cache_dir')
+    # memory:// ya está en RAM y sus archivos no son por bloques: no se cachea
+    if cache_dir and not is_local(path) and protocol != 'memory':
+        os.makedirs(cache_dir, exist_ok=True)
+        fs = fsspec.filesystem('blockcache', target_protocol=protocol,
+                               target_options=storage_options, cache_storage=cache_dir)
+    else:
+        fs = fsspec.filesystem(protocol, **storage_options)
+    return fs, fs._strip_protocol(path)
+
+
+def open_file(path: str, mode: str = 'rb', fs_options: Optional[Dict[str, Any]] = None) -> BinaryIO:
+    """Abre un archivo local o remoto. Las lecturas remotas usan la caché 'background',
+    que descarga el siguiente bloque en un hilo mientras se procesa el actual."""
+    if is_local(path):
+        return open(local_path(path), mode)
+    fs, fs_path = get_fs(path, fs_options)
+    kwargs: Dict[str, Any] = {}
+    block_size = (fs_options or {}).get('block_size')
+    if block_size:
+        kwargs['block_size'] = int(block_size)
+    if 'r' in mode and not (fs_options or {}).get('cache_dir') and split_protocol(path)[0] != 'memory':
+        kwargs['cache_type'] = 'background'
+    return fs.open(fs_path, mode, **kwargs)
+
+
+def exists(path: str, fs_options: Optional[Dict[str, Any]] = None) -> bool:
+    if is_local(path):
+        return os.path.exists(local_path(path))
+    fs, fs_path = get_fs(path, fs_options)
+    return fs.exists(fs_path)
+
+
+def isdir(path: str, fs_options: Optional[Dict[str, Any]] = None) -> bool:
+    if is_local(path):
+        return os.path.isdir(local_path(path))
+    fs, fs_path = get_fs(path, fs_options)
+    return fs.isdir(fs_path)
+
+
+def stat(path: str, fs_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Tamaño y fecha de modificación (epoch) de un archivo: {'size', 'mtime'}."""
+    if is_local(path):
+        st = os.stat(local_path(path))
+        return {'size': st.st_size, 'mtime': st.st_mtime}
+    fs, fs_path = get_fs(path, fs_options)
+    info = fs.info(fs_path)
+    mtime = info.get('mtime') or info.get('LastModified') or info.get('last_modified') or info.get('created')
+    if hasattr(mtime, 'timestamp'):
+        mtime = mtime.timestamp()
+    try:
+        mtime = float(mtime) if mtime is not None else None
+    except (TypeError, ValueError):
+        mtime = None
+    return {'size': int(info.get('size') or 0), 'mtime': mtime}
+
+
+def remove(path: str, fs_options: Optional[Dict[str, Any]] = None) -> None:
+    """Elimina un archivo si existe (p.ej. una salida parcial tras un error)."""
+    if is_local(path):
+        try:
+            os.remove(local_path(path))
+        except FileNotFoundError:
+            pass
+        return
+    fs, fs_path = get_fs(path, {k: v for k, v in (fs_options or {}).items() if k != 'cache_dir'})
+    if fs.exists(fs_path):
+        fs.rm(fs_path)
+
+
+def glob(pattern: str, fs_options: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Expande un patrón glob devolviendo rutas con el mismo protocolo que el patrón."""
+    if is_local(pattern):
+        import glob as _glob
+        return sorted(_glob.glob(local_path(pattern)))
+    # Sin caché por bloques: el listado debe reflejar el estado actual del remoto
+    opts = {k: v for k, v in (fs_options or {}).items() if k != 'cache_dir'}
+    fs, fs_path = get_fs(pattern, opts)
+    return [fs.unstrip_protocol(p) for p in sorted(fs.glob(fs_path))]
+
+
+def makedirs_for(path: str, fs_options: Optional[Dict[str, Any]] = None) -> None:
+    """Crea el directorio padre de una ruta de salida (no-op en object stores)."""
+    if is_local(path):
+        out_dir = os.path.dirname(local_path(path))
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        return
+    fs, fs_path = get_fs(path, fs_options)
+    parent = fs._parent(fs_path)
+    if parent:
+        try:
+            fs.makedirs(parent, exist_ok=True)
+        except Exception:
+            # Object stores no tienen directorios reales
+            pass
+
+
+def _stats_may_match(stats: Any, op: str, value: Any) -> bool:
+    """Indica si un row group con estadísticas min/max puede contener filas que cumplan (op, value)."""
+    if stats is None or not stats.has_min_max:
+        return True
+    lo, hi = stats.min, stats.max
+    try:
+        if op == '==':
+            return lo <= value <= hi
+        if op == '!=':
+            return not (lo == hi == value)
+        if op == '>':
+            return hi > value
+        if op == '>=':
+            return hi >= value
+        if op == '<':
+            return lo < value
+        if op == '<=':
+            return lo <= value
+        if op == 'in':
+            return any(lo <= v <= hi for v in value)
+    except TypeError:
+        pass
+    return True
+
+
+def prune_row_groups(metadata: Any, filters: List[Any]) -> List[int]:
+    """Row groups que pueden cumplir 'filters' (DNF: lista de tuplas = AND, lista de listas = OR de ANDs)."""
+    groups = filters if filters and isinstance(filters[0], list) else [filters]
+    names = [metadata.schema.column(i).path for i in range(metadata.num_columns)]
+    keep = []
+    for rg in range(metadata.num_row_groups):
+        row_group = metadata.row_group(rg)
+        for conj in groups:
+            ok = True
+            for col, op, value in conj:
+                if col in names and not _stats_may_match(row_group.column(names.index(col)).statistics, op, value):
+                    ok = False
+                    break
+            if ok:
+                keep.append(rg)
+                break
+    return keep
+
+
+def read_parquet_table(path: str,
+                       columns: Optional[List[str]] = None,
+                       filters: Optional[List[Any]] = None,
+                       fs_options: Optional[Dict[str, Any]] = None) -> Any:
+    """Lee un Parquet remoto descargando solo lo necesario y devuelve una tabla pyarrow.
+    Primero se lee el footer; con 'filters' (DNF de pyarrow) se descartan los row
+    groups cuyas estadísticas min/max no pueden cumplirlos. Después se piden en
+    bloque los rangos de bytes de las columnas y row groups restantes (concurrente
+    en backends async como s3/http). El filtro exacto por fila queda para el llamador.
+    """
+    import pyarrow.parquet as pq
+    from fsspec.parquet import open_parquet_file
+    fs, fs_path = get_fs(path, fs_options)
+    row_groups = None
+    if filters:
+        with fs.open(fs_path, 'rb') as fh:
+            metadata = pq.ParquetFile(fh).metadata
+        row_groups = prune_row_groups(metadata, filters)
+        if not row_groups:
+            return metadata.schema.to_arrow_schema().empty_table().select(columns or metadata.schema.names)
+    with open_parquet_file(fs_path, fs=fs, columns=columns or None, row_groups=row_groups,
+                           engine='pyarrow') as fh:
+        pf = pq.ParquetFile(fh)
+        if row_groups is None:
+            return pf.read(columns=columns or None)
+        return pf.read_row_groups(row_groups, columns=columns or None)
@@ -0,0 +1,102 @@
+"""Aplanado de columnas anidadas (struct/list) con operaciones nativas de Polars.
+
+Los orígenes JSON/API producen columnas struct y list. El nodo 'flatten' las
+convierte en columnas planas sin pasar por pandas.json_normalize:
+  - flatten_paths: rutas con puntos a extraer ('customer.address.city, items').
+    Solo se decodifican esos campos (struct.field sobre un LazyFrame, así que el
+    resto de la estructura no se materializa). Una ruta que atraviesa una lista
+    de structs devuelve la lista de valores del campo. Sin rutas se aplanan
+    todas las columnas struct.
+  - flatten_depth: niveles de struct a desanidar (vacío = todos)
+  - explode_columns: rutas de listas que se expanden a filas (una tras otra:
+    varias listas generan el producto cartesiano)
+  - flatten_separator: separador de los nombres resultantes (defecto '_',
+    'customer.address.city' -> 'customer_address_city')
+"""
+from typing import Any, Dict, List, Optional
+
+import polars as pl
+
+DEFAULT_SEPARATOR = '_'
+
+
+def _split(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [p.strip() for p in str(value or '').split(',') if p.strip()]
+
+
+def _path_expr(schema: Dict[str, Any], parts: List[str]) -> pl.Expr:
+    """Expresión que extrae una ruta anidada; en listas de structs se aplica a cada elemento."""
+    if parts[0] not in schema:
+        raise ValueError(f"Columna '{parts[0]}' no encontrada para la ruta '{'.'.join(parts)}'")
+    expr = pl.col(parts[0])
+    dtype = schema[parts[0]]
+    inner: List[str] = []
+    for field in parts[1:]:
+        if isinstance(dtype, pl.List):
+            # Resto de la ruta dentro de cada elemento de la lista
+            inner.append(field)
+            dtype = dtype.inner
+            continue
+        if not isinstance(dtype, pl.Struct):
+            raise ValueError(f"'{field}' no es accesible en la ruta '{'.'.join(parts)}' (tipo {dtype})")
+        expr = expr.struct.field(field)
+        dtype = {f.name: f.dtype for f in dtype.fields}.get(field)
+        if dtype is None:
+            raise ValueError(f"Campo '{field}' no existe en la ruta '{'.'.join(parts)}'")
+    if inner:
+        elem = pl.element()
+        for field in inner:
+            elem = elem.struct.field(field)
+        expr = expr.list.eval(elem)
+    return expr
+
+
+def flatten_frame(df: pl.DataFrame,
+                  paths: Any = None,
+                  depth: Optional[int] = None,
+                  explode: Any = None,
+                  separator: str = DEFAULT_SEPARATOR) -> pl.DataFrame:
+    """Aplana un DataFrame según rutas, profundidad y listas a expandir (ver docstring del módulo)."""
+    sep = separator or DEFAULT_SEPARATOR
+    lf = df.lazy()
+    schema = dict(lf.collect_schema())
+    selected = [p.split('.') for p in _split(paths)]
+    if selected:
+        roots = {parts[0] for parts in selected}
+        exprs = [pl.col(c) for c in schema if c not in roots]
+        exprs += [_path_expr(schema, parts).alias(sep.join(parts)) for parts in selected]
+        lf = lf.select(exprs)
+    to_explode = {p.replace('.', sep) for p in _split(explode)}
+    level = 0
+    while True:
+        schema = dict(lf.collect_schema())
+        for col in [c for c in schema if c in to_explode and isinstance(schema[c], pl.List)]:
+            lf = lf.explode(col)
+            to_explode.discard(col)
+        schema = dict(lf.collect_schema())
+        structs = [c for c, t in schema.items() if isinstance(t, pl.Struct)]
+        if not structs or (depth is not None and level >= depth):
+            break
+        exprs = []
+        for col, dtype in schema.items():
+            if col in structs:
+                exprs += [pl.col(col).struct.field(f.name).alias(f"{col}{sep}{f.name}") for f in dtype.fields]
+            else:
+                exprs.append(pl.col(col))
+        lf = lf.select(exprs)
+        level += 1
+    return lf.collect()
+
+
+def flatten_from_config(df: pl.DataFrame, config: Dict[str, Any]) -> pl.DataFrame:
+    """flatten_frame con las claves del nodo (flatten_paths, flatten_depth, explode_columns, flatten_separator)."""
+    depth = config.get('flatten_depth')
+    try:
+        depth = int(depth) if depth not in (None, '') else None
+    except (TypeError, ValueError):
+        depth = None
+    return flatten_frame(df, paths=config.get('flatten_paths'), depth=depth,
+                         explode=config.get('explode_columns'),
+                         separator=str(config.get('flatten_separator') or DEFAULT_SEPARATOR))
@@ -54,6 +54,10 @@ class JobRunner:
       id, name, max_parallel?, on_error: "stop"|"continue",
       stages: [ { parallel: bool, steps: [ { etl_id, overrides? } ] } ]
     }
+    Otros steps: { service_id, action: start|stop } y mantenimiento Delta Lake
+    { delta_path, action: compact|vacuum, target_size_mb?, retention_hours?,
+      dry_run?, enforce_retention?, storage_options? } y replicación de tablas
+    { replicate: {connection, tables|include|exclude, destination, ...} } (ver core.replication).
     """
 
     def __init__(self, project: Dict[str, Any], logs_root: str, ui_writer: Optional[Callable[[str], None]] = None):
@@ -135,8 +139,12 @@ class JobRunner:
                             futures.append(ex.submit(self._run_single_etl, etl_doc, overrides, write))
                         elif svc_id:
                             futures.append(ex.submit(self._run_service_action, s, write))
+                        elif s.get('delta_path'):
+                            futures.append(ex.submit(self._run_delta_maintenance, s, write))
+                        elif isinstance(s.get('replicate'), dict):
+                            futures.append(ex.submit(self._run_replication, s, write))
                         else:
-                            write("[WARN] Step inválido (falta etl_id o service_id)")
+                            write("[WARN] Step inválido (falta etl_id, service_id, delta_path o replicate)")
                     for fut in as_completed(futures):
                         ok, info = fut.result()
                         if not ok:
@@ -170,8 +178,12 @@ class JobRunner:
                         ok, info = self._run_single_etl(etl_doc, overrides, write)
                     elif svc_id:
                         ok, info = self._run_service_action(s, write)
+                    elif s.get('delta_path'):
+                        ok, info = self._run_delta_maintenance(s, write)
+                    elif isinstance(s.get('replicate'), dict):
+                        ok, info = self._run_replication(s, write)
                     else:
-                        write("[WARN] Step inválido (falta etl_id o service_id)")
+                        write("[WARN] Step inválido (falta etl_id, service_id, delta_path o replicate)")
                         ok, info = False, "step invalido"
                     if not ok:
                         success_overall = False
@@ -228,7 +240,7 @@ class JobRunner:
                 return False, f"service {svc_id} not found"
             # Import dinámico para evitar ciclo
             try:
-                from core.service_runner import ServiceRunner  # type: ignore
+                from core.service_runner import create_service_runner  # type: ignore
             except Exception as e:
                 write(f"[SERVICE] import error: {e}")
                 return False, str(e)
@@ -248,7 +260,7 @@ class JobRunner:
                 # start por defecto
                 runner = self._service_runners.get(svc_id)
                 if not runner:
-                    runner = ServiceRunner(self.project, svc_doc, self.logs_root, ui_writer=write)
+                    runner = create_service_runner(self.project, svc_doc, self.logs_root, ui_writer=write)
                     self._service_runners[svc_id] = runner
                 try:
                     runner.start()
@@ -264,6 +276,49 @@ class JobRunner:
                 pass
             return False, str(e)
 
+    def _run_delta_maintenance(self, step: Dict[str, Any], write: Callable[[str], None]) -> Tuple[bool, str]:
+        """Compacta o limpia (vacuum) una tabla Delta: {'delta_path', 'action': 'compact'|'vacuum', ...}.
+        Devuelve (ok, info)."""
+        path = str(step.get('delta_path') or '').strip()
+        action = str(step.get('action') or 'compact').lower()
+        storage = step.get('storage_options') if isinstance(step.get('storage_options'), dict) else None
+        try:
+            from . import delta_lake
+            if action == 'compact':
+                metrics = delta_lake.compact(path, target_size_mb=step.get('target_size_mb') or None,
+                                             storage_options=storage)
+                info = (f"{metrics.get('numFilesRemoved', 0)} archivos compactados en "
+                        f"{metrics.get('numFilesAdded', 0)}")
+            elif action == 'vacuum':
+                retention = step.get('retention_hours')
+                files = delta_lake.vacuum(path,
+                                          retention_hours=delta_lake.DEFAULT_RETENTION_HOURS if retention in (None, '') else int(retention),
+                                          dry_run=bool(step.get('dry_run')),
+                                          enforce_retention_duration=step.get('enforce_retention', True) is not False,
+                                          storage_options=storage)
+                verb = 'a borrar' if step.get('dry_run') else 'borrados'
+                info = f"{len(files)} archivos {verb}"
+            else:
+                write(f"[DELTA] acción no soportada: {action}")
+                return False, f"delta action {action} not supported"
+            write(f"[DELTA {path}] {action}: {info}")
+            return True, info
+        except Exception as e:
+            write(f"[DELTA {path}] {action} error: {e}")
+            return False, str(e)
+
+    def _run_replication(self, step: Dict[str, Any], write: Callable[[str], None]) -> Tuple[bool, str]:
+        """Replica tablas de una base de datos con un pool compartido: {'replicate': {...}}.
+        Devuelve (ok, info)."""
+        try:
+            from .replication import Replicator
+            replicator = Replicator(step.get('replicate') or {}, os.path.join(self.logs_root, "state"), write,
+                                    stop_event=self._stop_event, cache_dir=os.path.join(self.logs_root, "cache"))
+            return replicator.run()
+        except Exception as e:
+            write(f"[REPLICATE] error: {e}")
+            return False, str(e)
+
     def _run_single_etl(self,
                         etl_doc: Dict[str, Any],
                         overrides: Optional[Dict[str, Any]],
@@ -273,6 +328,8 @@ class JobRunner:
         _apply_overrides(node_cfgs, overrides)
 
         engine = ETLEngine()
+        engine.cache_dir = os.path.join(self.logs_root, "cache")
+        engine.state_dir = os.path.join(self.logs_root, "state")
         # Registrar engine para stop()
         with self._active_lock:
             self._active_engines.append(engine)
@@ -0,0 +1,89 @@
+"""Vistas previas acotadas de orígenes para el diseñador.
+
+Al abrir un pipeline o cargar un origen desde el panel solo se leen las primeras
+filas: scan lazy con head en archivos (file_io.read_head), la consulta envuelta
+en LIMIT/TOP en bases de datos y el primer lote de la respuesta en APIs. El
+DataFrame resultante se marca con PREVIEW_KEY en el config del nodo y el motor
+no lo usa como datos precargados: la ejecución vuelve a leer el origen completo.
+"""
+import re
+from typing import Any, Dict, Iterator, Optional
+
+import pandas as pd
+import polars as pl
+
+from . import delta_lake, file_io, fixed_width, xml_stream
+
+# Marca de los nodos cuyo 'dataframe' es una vista previa (primeras filas)
+PREVIEW_KEY = 'preview_only'
+# Filas leídas por origen en la vista previa
+DEFAULT_PREVIEW_ROWS = 1000
+
+FILE_SOURCES = ('csv', 'excel', 'json', 'parquet', 'ipc', 'orc', 'avro', 'fixed_width', 'xml', 'delta')
+
+_WRAPPABLE_RE = re.compile(r'^\s*(select|with)\b', re.IGNORECASE)
+
+
+def _first(batches: Iterator[pl.DataFrame]) -> pl.DataFrame:
+    """Primer lote de un generador, cerrándolo después (libera el archivo o la respuesta)."""
+    try:
+        return next(batches)
+    finally:
+        batches.close()
+
+
+def is_preview(config: Dict[str, Any]) -> bool:
+    return bool((config or {}).get(PREVIEW_KEY))
+
+
+def limit_query(query: str, db_type: Optional[str], n_rows: int) -> str:
+    """Envuelve la consulta para que el servidor devuelva como mucho n_rows filas.
+    SQL Server usa TOP (las CTE y ORDER BY no admiten subconsulta: se devuelve tal
+    cual y la lectura se corta en el cliente); el resto de dialectos, LIMIT."""
+    q = str(query or '').strip().rstrip(';').strip()
+    if not _WRAPPABLE_RE.match(q):
+        return q
+    kind = (db_type or '').strip().lower()
+    n = max(0, int(n_rows))
+    if kind in ('sql server', 'mssql', 'sqlserver'):
+        if re.match(r'^\s*with\b', q, re.IGNORECASE) or re.search(r'\border\s+by\b', q, re.IGNORECASE):
+            return q
+        return f"SELECT TOP {n} * FROM ({q}) AS _preview"
+    if kind == 'oracle':
+        return f"SELECT * FROM ({q}) WHERE ROWNUM <= {n}"
+    return f"SELECT * FROM ({q}) AS _preview LIMIT {n}"
+
+
+def read_sql_head(conn: Any, query: str, db_type: Optional[str], n_rows: int) -> pl.DataFrame:
+    """Primeras n_rows filas de una consulta sobre una conexión SQLAlchemy abierta."""
+    from sqlalchemy import text
+    sql = limit_query(query, db_type, n_rows)
+    # Lectura por bloques: si la consulta no se pudo envolver, solo se trae el primer bloque
+    chunks = pd.read_sql(text(sql), conn, chunksize=max(1, int(n_rows)))
+    pdf = next(iter(chunks), None)
+    if pdf is None:
+        return pl.DataFrame()
+    return pl.from_pandas(pdf.head(n_rows))
+
+
+def read_api_head(config: Dict[str, Any], engine: Any, n_rows: int) -> pl.DataFrame:
+    """Primer lote de la respuesta de la API (el resto no se descarga)."""
+    return _first(engine._iter_api_batches({**config, 'stream_batch_size': max(1, int(n_rows))})).head(n_rows)
+
+
+def read_file_head(subtype: str, path: str, config: Dict[str, Any], n_rows: int) -> pl.DataFrame:
+    """Primeras n_rows filas de un origen de archivo. En CSV la detección de
+    codificación/delimitador se guarda en el config, igual que en la lectura completa."""
+    member_pattern = config.get('zip_member_pattern') or None
+    if subtype == 'fixed_width':
+        return _first(fixed_width.iter_batches(path, config, batch_rows=n_rows)).head(n_rows)
+    if subtype == 'xml':
+        return _first(xml_stream.iter_batches(path, config, batch_rows=n_rows)).head(n_rows)
+    if subtype == 'delta':
+        version = str(config.get('delta_version') or '').strip()
+        return delta_lake.scan(path, int(version) if version else None).head(n_rows).collect()
+    if subtype == 'csv':
+        return file_io.with_encoding_fallback(
+            lambda: file_io.read_head('csv', path, n_rows, options=file_io.resolve_csv_options(path, config),
+                                      member_pattern=member_pattern), config)
+    return file_io.read_head(subtype, path, n_rows, member_pattern=member_pattern)
@@ -71,6 +71,14 @@ class ProjectManager:
             raise ValueError("Project path not set")
         return f"{self.path}.logs"
 
+    def cache_root(self) -> str:
+        """Caché columnar de orígenes del proyecto (ver core.source_cache)."""
+        return os.path.join(self.logs_root(), "cache")
+
+    def state_root(self) -> str:
+        """Estado persistente de orígenes entre ejecuciones (offsets de tail, ver core.tail_source)."""
+        return os.path.join(self.logs_root(), "state")
+
     def ensure_logs_root(self) -> str:
         root = self.logs_root()
         try:
@@ -0,0 +1,432 @@
+"""Replicación de muchas tablas de una base de datos (paso 'replicate' de los Jobs).
+
+Todas las lecturas comparten un único engine SQLAlchemy (un pool de conexiones
+para el paso completo, no una conexión por ETL). Las tablas se extraen en
+paralelo (max_workers) y, con 'partitions' > 1, cada tabla se lee por rangos de
+una columna numérica también en paralelo sobre el mismo pool. Las filas se leen
+con cursor de servidor en lotes de 'stream_batch_size' y cada lote se escribe en
+cuanto llega con el destino por lotes del motor (mismas opciones que en el
+diseñador); los formatos sin escritura por lotes (Excel, Avro, Delta) reciben la
+tabla completa.
+
+Config del paso ({'replicate': {...}}):
+  - connection: mismos campos que un nodo origen de base de datos (db_type, host,
+    port, user, password, database, ssl_*, connect_timeout)
+  - schema: esquema de las tablas (opcional)
+  - tables: tablas a copiar (lista o 'a,b'); vacío = todas las del esquema
+  - include / exclude: patrones glob separados por comas ('ventas_*', '*_tmp')
+  - destination: config de un nodo destino; en 'path' y 'table' se sustituyen
+    {table}, {schema}, {date} (AAAAMMDD) y {ts} (AAAAMMDD_HHMMSS)
+  - max_workers: lecturas simultáneas (defecto 4)
+  - stream_batch_size: filas por lote de lectura (defecto DEFAULT_STREAM_BATCH_SIZE)
+  - partitions / partition_column: lectura por rangos; por defecto la clave
+    primaria si es una sola columna entera
+  - watermark_column: columna creciente (fecha de modificación, id autoincremental);
+    cada ejecución lee solo las filas con valor mayor que la marca guardada. Para
+    no sobrescribir lo ya copiado, los destinos de base de datos y Delta se escriben
+    en modo append y los de archivo deben llevar {ts} en la ruta (si no, el paso falla)
+  - table_options: {tabla: {partitions, partition_column, watermark_column, where}}
+  - name: nombre del estado de marcas de agua (defecto: la base de datos)
+Las marcas se guardan en <state_dir>/replication/<nombre>.json, la de cada
+tabla solo cuando su destino terminó bien.
+"""
+import fnmatch
+import json
+import os
+import queue
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import networkx as nx
+import polars as pl
+
+from . import db_load
+from .etl_engine import DEFAULT_STREAM_BATCH_SIZE, ETLEngine
+from .tail_source import default_state_dir
+
+DEFAULT_WORKERS = 4
+_INT_TYPES = ('INT', 'SERIAL')
+
+
+def _as_list(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [p.strip() for p in str(value or '').split(',') if p.strip()]
+
+
+def select_tables(available: List[str], tables: Any = None, include: Any = None, exclude: Any = None) -> List[str]:
+    """Tablas a replicar: la lista explícita (o todas), filtrada por include/exclude."""
+    explicit = _as_list(tables)
+    chosen = explicit or sorted(available)
+    patterns = _as_list(include)
+    if patterns:
+        chosen = [t for t in chosen if any(fnmatch.fnmatch(t.lower(), p.lower()) for p in patterns)]
+    skip = _as_list(exclude)
+    return [t for t in chosen if not any(fnmatch.fnmatch(t.lower(), p.lower()) for p in skip)]
+
+
+def render_template(template: str, table: str, schema: Optional[str], now: datetime) -> str:
+    values = {'table': table, 'schema': schema or '', 'date': now.strftime('%Y%m%d'),
+              'ts': now.strftime('%Y%m%d_%H%M%S')}
+    return re.sub(r'\{(table|schema|date|ts)\}', lambda m: values[m.group(1)], str(template))
+
+
+def split_ranges(lo: Any, hi: Any, parts: int) -> List[Tuple[Any, Any, bool]]:
+    """Rangos [inicio, fin) que cubren lo..hi; el último incluye 'hi' (tercer valor True)."""
+    if lo is None or hi is None:
+        return []
+    if parts <= 1 or hi <= lo:
+        return [(lo, hi, True)]
+    step = (hi - lo) / parts
+    if isinstance(lo, int) and isinstance(hi, int):
+        step = max(1, -(-(hi - lo) // parts))
+    bounds = [lo + step * i for i in range(parts) if lo + step * i < hi]
+    return [(b, bounds[i + 1] if i + 1 < len(bounds) else hi, i + 1 == len(bounds)) for i, b in enumerate(bounds)]
+
+
+def _json_value(value: Any) -> Any:
+    """Marca de agua serializable: números tal cual, el resto como texto ISO."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+    return str(value)
+
+
+class WatermarkState:
+    """Marcas de agua por tabla en un JSON; escritura atómica y protegida por lock."""
+
+    def __init__(self, state_dir: Optional[str], name: str):
+        safe = re.sub(r'[^A-Za-z0-9_.-]+', '_', name or 'replication')
+        self.path = os.path.join(state_dir or default_state_dir(), 'replication', f"{safe}.json")
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+
+    def get(self, table: str) -> Any:
+        return (self.data.get(table) or {}).get('watermark')
+
+    def save(self, table: str, column: str, value: Any) -> None:
+        with self._lock:
+            self.data[table] = {'column': column, 'watermark': _json_value(value),
+                                'updated_at': datetime.now().isoformat(timespec='seconds')}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+
+
+class Replicator:
+    """Ejecuta un paso 'replicate'. run() devuelve (ok, resumen)."""
+
+    def __init__(self, spec: Dict[str, Any], state_dir: Optional[str], write: Callable[[str], None],
+                 stop_event: Optional[threading.Event] = None, cache_dir: Optional[str] = None):
+        self.spec = spec or {}
+        self.state_dir = state_dir
+        self.cache_dir = cache_dir
+        self.write = write
+        self.stop_event = stop_event or threading.Event()
+        self.connection = dict(self.spec.get('connection') or {})
+        self.schema = str(self.spec.get('schema') or '').strip() or None
+        self.workers = max(1, int(self.spec.get('max_workers') or DEFAULT_WORKERS))
+        self.batch_size = max(1, int(self.spec.get('stream_batch_size') or DEFAULT_STREAM_BATCH_SIZE))
+        self.now = datetime.now()
+        self.state = WatermarkState(state_dir, str(self.spec.get('name') or self.connection.get('database') or 'replication'))
+        self._helper = ETLEngine()
+        self._engine: Any = None
+        self._reader: Optional[ThreadPoolExecutor] = None
+
+    # ---- Conexión y metadatos ----
+    def _connect(self) -> Any:
+        conn = self.connection
+        conn_str = self._helper._build_connection_string(conn.get('db_type'), conn.get('host'), conn.get('port'),
+                                                         conn.get('user'), conn.get('password'), conn.get('database'))
+        # Tablas y lecturas por rango usan conexiones a la vez
+        return self._helper._make_sqlalchemy_engine(conn.get('db_type'), conn_str, conn, pool_size=self.workers * 2)
+
+    def _qualified(self, table: str) -> str:
+        return db_load.quote(self._engine, f"{self.schema}.{table}" if self.schema else table)
+
+    def _table_options(self, table: str) -> Dict[str, Any]:
+        opts = self.spec.get('table_options') or {}
+        merged = {k: self.spec.get(k) for k in ('partitions', 'partition_column', 'watermark_column', 'where')}
+        merged.update({k: v for k, v in (opts.get(table) or {}).items() if v not in (None, '')})
+        return merged
+
+    def _default_partition_column(self, inspector: Any, table: str) -> Optional[str]:
+        pk = (inspector.get_pk_constraint(table, schema=self.schema) or {}).get('constrained_columns') or []
+        if len(pk) != 1:
+            return None
+        for col in inspector.get_columns(table, schema=self.schema):
+            if col['name'] == pk[0] and any(t in str(col['type']).upper() for t in _INT_TYPES):
+                return pk[0]
+        return None
+
+    def _uses_watermark(self) -> bool:
+        opts = self.spec.get('table_options') or {}
+        return bool(self.spec.get('watermark_column')) or any(
+            (o or {}).get('watermark_column') for o in opts.values())
+
+    def _check_destination(self) -> None:
+        """Con marca de agua cada ejecución trae solo las filas nuevas: un destino de archivo
+        con ruta fija las sustituiría por la copia anterior. Se exige {ts} en la ruta."""
+        if not self._uses_watermark():
+            return
+        dest = self.spec.get('destination') or {}
+        subtype = str(dest.get('subtype') or '').lower()
+        if subtype in ('database', 'delta'):
+            return
+        if '{ts}' not in str(dest.get('path') or ''):
+            raise ValueError("Con 'watermark_column' la ruta del destino debe incluir {ts} "
+                             "(o usar un destino de base de datos o Delta, que se escriben en modo append)")
+
+    # ---- Lectura ----
+    def _batches(self, sql: str, params: Dict[str, Any]) -> Iterator[pl.DataFrame]:
+        with self._engine.connect() as conn:
+            yield from self._helper._iter_result_batches(conn, sql, self.batch_size, params)
+
+    def _scalar_row(self, sql: str, params: Dict[str, Any]) -> Tuple[Any, ...]:
+        from sqlalchemy import text
+        with self._engine.connect() as conn:
+            return tuple(conn.execute(text(sql), params).fetchone() or ())
+
+    def _table_queries(self, table: str, opts: Dict[str, Any],
+                       inspector_lock: threading.Lock) -> Tuple[List[Tuple[str, Dict[str, Any]]], Optional[str]]:
+        """Consultas (una por partición) de las filas a copiar y columna de marca de agua (si aplica)."""
+        from sqlalchemy import inspect
+        source = self._qualified(table)
+        conditions: List[str] = []
+        params: Dict[str, Any] = {}
+        if opts.get('where'):
+            conditions.append(f"({opts['where']})")
+        wm_col = str(opts.get('watermark_column') or '').strip() or None
+        with inspector_lock:
+            inspector = inspect(self._engine)
+            names = [c['name'] for c in inspector.get_columns(table, schema=self.schema)]
+            parts = int(opts.get('partitions') or 1)
+            part_col = str(opts.get('partition_column') or '').strip() or (
+                self._default_partition_column(inspector, table) if parts > 1 else None)
+        if wm_col and wm_col not in names:
+            self.write(f"[REPLICATE {table}] sin columna '{wm_col}': copia completa")
+            wm_col = None
+        if wm_col:
+            last = self.state.get(table)
+            if last is not None:
+                conditions.append(f"{db_load.quote(self._engine, wm_col)} > :wm_last")
+                params['wm_last'] = last
+        base = f"SELECT * FROM {source}"
+        where = ' AND '.join(conditions)
+
+        ranges: List[Tuple[Any, Any, bool]] = []
+        if parts > 1 and part_col in names:
+            qcol = db_load.quote(self._engine, part_col)
+            lo, hi = (self._scalar_row(f"SELECT MIN({qcol}), MAX({qcol}) FROM {source}"
+                                       + (f" WHERE {where}" if where else ''), params) or (None, None))
+            ranges = split_ranges(lo, hi, parts)
+        elif parts > 1:
+            self.write(f"[REPLICATE {table}] sin columna de partición numérica: lectura única")
+        if len(ranges) <= 1:
+            return [(base + (f" WHERE {where}" if where else ''), params)], wm_col
+
+        qcol = db_load.quote(self._engine, part_col)
+        queries = []
+        for start, end, last_range in ranges:
+            cond = f"{qcol} >= :p_lo AND {qcol} {'<=' if last_range else '<'} :p_hi"
+            queries.append((base + ' WHERE ' + ' AND '.join(conditions + [cond]), {**params, 'p_lo': start, 'p_hi': end}))
+        self.write(f"[REPLICATE {table}] {len(queries)} particiones por {part_col}")
+        return queries, wm_col
+
+    def _iter_table(self, queries: List[Tuple[str, Dict[str, Any]]]) -> Iterator[pl.DataFrame]:
+        """Lotes de todas las consultas de una tabla. Las particiones se leen en paralelo en
+        el pool de lectura y sus lotes se entregan según llegan por una cola acotada."""
+        if len(queries) == 1:
+            yield from self._batches(*queries[0])
+            return
+        pending: queue.Queue = queue.Queue(maxsize=self.workers * 2)
+        cancel = threading.Event()
+        done = object()
+
+        def put(item: Any) -> None:
+            while not cancel.is_set():
+                try:
+                    pending.put(item, timeout=0.2)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce(sql: str, params: Dict[str, Any]) -> None:
+            try:
+                for batch in self._batches(sql, params):
+                    if cancel.is_set():
+                        return
+                    put(batch)
+            except BaseException as e:
+                put(e)
+            finally:
+                put(done)
+
+        futures = [self._reader.submit(produce, sql, params) for sql, params in queries]
+        remaining = len(futures)
+        try:
+            while remaining:
+                item = pending.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, BaseException):
+                    raise item
+                else:
+                    yield item
+        finally:
+            cancel.set()
+            for fut in futures:
+                fut.exception()
+
+    # ---- Escritura ----
+    def _open_destination(self, table: str, append: bool) -> Tuple[Callable[[pl.DataFrame], None], Callable[[bool], None]]:
+        """(escribir_lote, cerrar(ok)) del destino de la tabla. Con append los destinos de
+        base de datos y Delta acumulan las filas en lugar de reemplazar la copia anterior."""
+        dest = dict(self.spec.get('destination') or {})
+        for key in ('path', 'table'):
+            if dest.get(key):
+                dest[key] = render_template(dest[key], table, self.schema, self.now)
+        if append:
+            dest['if_exists'] = 'append'
+            dest['delta_mode'] = 'append'
+        cfgs = {1: {'subtype': 'dataframe'}, 2: dest}
+        g = nx.DiGraph()
+        g.add_node(1, type='source', config=cfgs[1])
+        g.add_node(2, type='destination', config=cfgs[2])
+        g.add_edge(1, 2)
+        engine = ETLEngine()
+        engine.cache_dir = self.cache_dir
+        engine.state_dir = self.state_dir
+        engine.set_pipeline(g, cfgs)
+        dest_config = engine.pipeline.nodes[2]['config']
+        if engine._supports_batch_sink(dest_config):
+            write, close = engine._open_batch_sink(2)
+            return lambda df: write(engine._apply_select_and_rename(df, dest_config)), close
+
+        # Formato sin escritura por lotes: la tabla completa con un pipeline normal
+        frames: List[pl.DataFrame] = []
+
+        def close_full(ok: bool) -> None:
+            if not ok:
+                return
+            engine.pipeline.nodes[1]['config']['dataframe'] = pl.concat(frames, how='diagonal_relaxed')
+            messages: List[str] = []
+            engine.execution_finished.connect(lambda success, msg: messages.append(msg))
+            if engine.execute_pipeline() is False:
+                raise RuntimeError(messages[-1] if messages else 'error en el destino')
+
+        return frames.append, close_full
+
+    def _copy_table(self, table: str, batches: Iterator[pl.DataFrame], wm_col: Optional[str],
+                    skip_empty: bool) -> Optional[Tuple[int, Any]]:
+        """Escribe los lotes en el destino. Devuelve (filas, máximo de wm_col), o None si no
+        llegó ninguna fila y skip_empty (sin filas nuevas: el destino no se toca)."""
+        sink = None
+        rows, high, empty = 0, None, None
+        ok = False
+        try:
+            for batch in batches:
+                if self.stop_event.is_set():
+                    raise InterruptedError('detenido')
+                if batch.height == 0:
+                    empty = batch
+                    continue
+                if sink is None:
+                    sink = self._open_destination(table, append=wm_col is not None)
+                sink[0](batch)
+                rows += batch.height
+                if wm_col:
+                    top = batch[wm_col].max()
+                    if top is not None and (high is None or top > high):
+                        high = top
+            if sink is None:
+                if skip_empty:
+                    return None
+                # Tabla vacía: el destino se crea igualmente con sus columnas
+                sink = self._open_destination(table, append=wm_col is not None)
+                sink[0](empty if empty is not None else pl.DataFrame())
+            ok = True
+        finally:
+            if sink is not None:
+                sink[1](ok)
+        return rows, high
+
+    def _replicate_table(self, table: str, inspector_lock: threading.Lock) -> Tuple[str, bool, str]:
+        if self.stop_event.is_set():
+            return table, False, 'detenido'
+        opts = self._table_options(table)
+        try:
+            queries, wm_col = self._table_queries(table, opts, inspector_lock)
+            batches = self._iter_table(queries)
+            try:
+                copied = self._copy_table(table, batches, wm_col,
+                                          skip_empty=wm_col is not None and self.state.get(table) is not None)
+            finally:
+                # Detiene las lecturas de particiones pendientes si la escritura falló
+                batches.close()
+            if copied is None:
+                self.write(f"[REPLICATE {table}] sin filas nuevas")
+                return table, True, '0 filas'
+            rows, high = copied
+            if wm_col and high is not None:
+                self.state.save(table, wm_col, high)
+            self.write(f"[REPLICATE {table}] {rows} filas copiadas")
+            return table, True, f"{rows} filas"
+        except InterruptedError:
+            return table, False, 'detenido'
+        except Exception as e:
+            self.write(f"[REPLICATE {table}] ERROR: {e}")
+            return table, False, str(e)
+
+    def run(self) -> Tuple[bool, str]:
+        from sqlalchemy import inspect
+        try:
+            self._check_destination()
+        except ValueError as e:
+            self.write(f"[REPLICATE] {e}")
+            return False, str(e)
+        try:
+            self._engine = self._connect()
+        except Exception as e:
+            self.write(f"[REPLICATE] error de conexión: {e}")
+            return False, str(e)
+        try:
+            available = inspect(self._engine).get_table_names(schema=self.schema)
+            tables = select_tables(available, self.spec.get('tables'), self.spec.get('include'), self.spec.get('exclude'))
+            missing = [t for t in _as_list(self.spec.get('tables')) if t not in available]
+            for t in missing:
+                self.write(f"[REPLICATE] tabla no encontrada: {t}")
+            tables = [t for t in tables if t in available]
+            self.write(f"[REPLICATE] {len(tables)} tablas, {self.workers} en paralelo")
+            inspector_lock = threading.Lock()
+            failed = list(missing)
+            with ThreadPoolExecutor(max_workers=self.workers) as reader, \
+                    ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(tables) or 1))) as ex:
+                self._reader = reader
+                futures = [ex.submit(self._replicate_table, t, inspector_lock) for t in tables]
+                for fut in as_completed(futures):
+                    table, ok, _info = fut.result()
+                    if not ok:
+                        failed.append(table)
+            info = f"{len(tables) - len(failed) + len(missing)} de {len(tables) + len(missing)} tablas replicadas"
+            if failed:
+                info += f"; con error: {', '.join(sorted(failed))}"
+            self.write(f"[REPLICATE] {info}")
+            return not failed, info
+        except Exception as e:
+            self.write(f"[REPLICATE] error: {e}")
+            return False, str(e)
+        finally:
+            self._reader = None
+            self._engine.dispose()
@@ -0,0 +1,140 @@
+"""Esquema de salida de cada nodo sin leer datos (propagación de columnas en el diseñador).
+
+Orígenes: solo metadatos. Cabecera e inferencia del escaneo lazy en CSV
+locales UTF-8, footer en Parquet, esquema en IPC/ORC/Delta y NDJSON (primeras
+filas), columnas declaradas en ancho fijo y XML ('xml_columns'), o el esquema
+del DataFrame ya cargado en el nodo. Bases de datos, APIs y el resto de casos
+devuelven None (esquema desconocido hasta cargar datos).
+Transformaciones: se ejecuta la transformación del motor sobre DataFrames
+vacíos con el esquema de entrada, así que nombres y tipos coinciden con los de
+una ejecución real sin procesar una sola fila.
+Destinos: el esquema de entrada con su selección/renombrado.
+Un nodo con alguna entrada desconocida también queda como None.
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+import networkx as nx
+import pandas as pd
+import polars as pl
+
+from . import delta_lake, file_io, filesystem, fixed_width
+from .etl_engine import ETLEngine
+
+# Claves con datos en memoria que no forman parte de la configuración
+DATA_KEYS = ('dataframe', 'other_dataframe')
+# Marca de los nodos cuyo 'dataframe' es solo un esquema (DataFrame sin filas)
+SCHEMA_ONLY_KEY = 'schema_only'
+
+
+def empty_frame(schema: Any) -> pl.DataFrame:
+    return pl.DataFrame(schema=schema)
+
+
+def frame_schema(df: Any) -> Optional[pl.Schema]:
+    if isinstance(df, pl.DataFrame):
+        return df.schema
+    if isinstance(df, pd.DataFrame):
+        return pl.from_pandas(df.head(0)).schema
+    return None
+
+
+def file_schema(subtype: str, config: Dict[str, Any]) -> Optional[pl.Schema]:
+    """Esquema de un origen de archivo desde sus metadatos (None si no se puede sin leer datos)."""
+    if subtype == 'fixed_width':
+        return fixed_width.empty_frame(config).schema
+    if subtype == 'xml':
+        cols = [c.strip() for c in str(config.get('xml_columns') or '').split(',') if c.strip()]
+        return pl.Schema({c: pl.String for c in cols}) if cols else None
+    path = config.get('path')
+    if isinstance(path, (list, tuple)):
+        path = path[0] if path else None
+    if not isinstance(path, str) or not path or not filesystem.is_local(path):
+        return None
+    local = filesystem.local_path(path)
+    if subtype == 'delta':
+        version = config.get('delta_version')
+        return delta_lake.scan(local, version=int(version) if str(version or '').strip() else None).collect_schema()
+    if not os.path.isfile(local):
+        return None
+    if subtype == 'csv':
+        # Copia: la detección de codificación/separador no debe escribir en el nodo
+        options = file_io.resolve_csv_options(local, dict(config))
+        return file_io.scan_csv(local, options).collect_schema() if file_io.can_scan_csv(local, options) else None
+    if file_io.detect_compression(local) is not None:
+        return None
+    if subtype == 'parquet':
+        return pl.scan_parquet(local).collect_schema()
+    if subtype == 'ipc':
+        return pl.scan_ipc(local).collect_schema()
+    if subtype == 'json' and file_io.is_ndjson_name(local):
+        return pl.scan_ndjson(local).collect_schema()
+    if subtype == 'orc':
+        import pyarrow.orc as orc
+        return pl.from_arrow(orc.ORCFile(local).schema.empty_table()).schema
+    return None
+
+
+def source_schema(config: Dict[str, Any], engine: Optional[ETLEngine] = None) -> Optional[pl.Schema]:
+    """Esquema de salida de un nodo origen (con 'output_cols'/'column_rename' aplicados)."""
+    engine = engine or ETLEngine()
+    schema = frame_schema(config.get('dataframe'))
+    if schema is None:
+        try:
+            schema = file_schema(str(config.get('subtype') or '').strip().lower(), config)
+        except Exception:
+            return None
+    if schema is None:
+        return None
+    return engine._apply_select_and_rename(empty_frame(schema), config).schema
+
+
+def output_schemas(graph: nx.DiGraph) -> Dict[int, Optional[pl.Schema]]:
+    """Esquema de salida de todos los nodos del grafo del diseñador (None = desconocido)."""
+    work = nx.DiGraph()
+    for nid, data in graph.nodes(data=True):
+        cfg = {k: v for k, v in (data.get('config') or {}).items() if k not in DATA_KEYS}
+        work.add_node(nid, type=data.get('type'), config=cfg)
+    for nid in graph.nodes:
+        # Mismo orden de predecesores que el grafo original (entrada izquierda/derecha del join)
+        work.add_edges_from((p, nid) for p in graph.predecessors(nid))
+    try:
+        order = list(nx.topological_sort(work))
+    except nx.NetworkXUnfeasible:
+        return {}
+    engine = ETLEngine()
+    engine.set_pipeline(work, {})
+    out: Dict[int, Optional[pl.Schema]] = {}
+    for nid in order:
+        ntype = work.nodes[nid].get('type')
+        if ntype == 'source':
+            out[nid] = source_schema(graph.nodes[nid].get('config') or {}, engine)
+            continue
+        inputs = [out.get(p) for p in work.predecessors(nid)]
+        out[nid] = None if not inputs or any(s is None for s in inputs) else _node_schema(engine, nid, ntype, inputs)
+    return out
+
+
+def input_schemas(graph: nx.DiGraph, node_id: int, schemas: Dict[int, Optional[pl.Schema]]) -> List[Optional[pl.Schema]]:
+    """Esquemas de entrada de un nodo, en el orden en que el motor toma sus entradas."""
+    return [schemas.get(p) for p in graph.predecessors(node_id)]
+
+
+def _node_schema(engine: ETLEngine, node_id: int, node_type: str, inputs: List[pl.Schema]) -> Optional[pl.Schema]:
+    config = engine.pipeline.nodes[node_id]['config']
+    frames = [empty_frame(s) for s in inputs]
+    try:
+        if node_type == 'destination':
+            return engine._apply_select_and_rename(frames[0], config).schema
+        if config.get('subtype') == 'join':
+            if len(frames) < 2:
+                return None
+            if config.get('swap_inputs'):
+                frames[0], frames[1] = frames[1], frames[0]
+            config['other_dataframe'] = frames[1]
+        result = engine.execute_transform(node_id, frames[0])
+        return frame_schema(result)
+    except Exception:
+        return None
+    finally:
+        config.pop('other_dataframe', None)
@@ -18,6 +18,18 @@ from core.etl_engine import ETLEngine
 from core.job_runner import JobRunner
 
 
+def create_service_runner(project: Dict[str, Any],
+                          service: Dict[str, Any],
+                          logs_root: str,
+                          ui_writer: Optional[Callable[[str], None]] = None):
+    """Runner según el tipo de servicio: API (ServiceRunner) o vigilancia de directorio
+    (kind 'watch', core.watch_runner.WatchRunner). Ambos exponen start/stop/is_running."""
+    if str((service or {}).get('kind') or '').strip().lower() == 'watch':
+        from core.watch_runner import WatchRunner
+        return WatchRunner(project, service, logs_root, ui_writer=ui_writer)
+    return ServiceRunner(project, service, logs_root, ui_writer=ui_writer)
+
+
 class ServiceRunner:
     """Ejecuta un servicio FastAPI en un hilo, con Basic+JWT, logs sidecar y stop.
 
@@ -261,6 +273,8 @@ class ServiceRunner:
                 g, node_cfgs = _build_graph_from_etl_content(content)
                 _apply_overrides(node_cfgs, overrides)
                 eng = ETLEngine()
+                eng.cache_dir = os.path.join(self.logs_root, 'cache')
+                eng.state_dir = os.path.join(self.logs_root, 'state')
                 eng.set_pipeline(g, node_cfgs)
                 res = eng.execute_pipeline()
                 ok = (res is not False)
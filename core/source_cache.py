@@ -0,0 +1,170 @@
+"""Caché columnar de orígenes CSV.
+
+Parsear un CSV grande en cada ejecución (ETL, job, auto-obtención del diseñador,
+carga desde el panel) es caro. Con 'source_cache' activado en el nodo, la primera
+lectura guarda una copia Parquet (o Arrow IPC) y las siguientes escanean esa copia
+con proyección y filtros empujados al lector.
+
+La clave de cada entrada es un hash de ruta + tamaño + fecha de modificación +
+opciones de lectura, así que cualquier cambio en el archivo o en cómo se parsea
+genera una entrada nueva. El directorio tiene un tamaño máximo y se desalojan
+primero las entradas usadas hace más tiempo (LRU por mtime, que se actualiza en
+cada acierto).
+
+Config del nodo:
+  - source_cache: activar la caché (defecto False)
+  - source_cache_dir: directorio (defecto: <proyecto>.fetl.logs/cache o temporal)
+  - source_cache_max_mb: tamaño máximo del directorio en MB (defecto 2048)
+  - source_cache_format: 'parquet' (defecto) | 'ipc'
+"""
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import polars as pl
+
+from . import filesystem
+
+CACHE_FORMATS = {'parquet': '.parquet', 'ipc': '.arrow'}
+DEFAULT_MAX_MB = 2048
+# Claves de config que cambian el resultado del parseo y forman parte de la clave
+READER_KEYS = ('zip_member_pattern', 'encoding', 'separator', 'quote_char', 'has_header', 'skip_rows',
+               'comment_prefix', 'null_values', 'infer_schema_length', 'try_parse_dates', 'decimal_comma',
+               'columns')
+
+
+def default_cache_dir() -> str:
+    """Directorio de caché cuando no hay proyecto abierto ni 'source_cache_dir'."""
+    return os.path.join(tempfile.gettempdir(), 'freeetl_source_cache')
+
+
+def reader_options(subtype: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Opciones de lectura del nodo que intervienen en la clave de caché."""
+    opts: Dict[str, Any] = {'subtype': subtype}
+    for key in READER_KEYS:
+        val = config.get(key)
+        if val not in (None, ''):
+            opts[key] = val
+    return opts
+
+
+def cache_from_config(config: Dict[str, Any], default_dir: Optional[str] = None) -> Optional['SourceCache']:
+    """SourceCache configurada por el nodo, o None si la caché no está activada."""
+    if str(config.get('source_cache', '')).strip().lower() not in ('1', 'true', 'yes', 'si', 'sí'):
+        return None
+    cache_dir = str(config.get('source_cache_dir') or '').strip() or default_dir or default_cache_dir()
+    try:
+        max_mb = float(config.get('source_cache_max_mb') or DEFAULT_MAX_MB)
+    except (TypeError, ValueError):
+        max_mb = DEFAULT_MAX_MB
+    fmt = str(config.get('source_cache_format') or 'parquet').strip().lower()
+    return SourceCache(cache_dir, max_bytes=int(max_mb * 1024 * 1024), fmt=fmt)
+
+
+class SourceCache:
+    """Copias columnares de archivos fuente en un directorio con límite de tamaño."""
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024, fmt: str = 'parquet'):
+        if fmt not in CACHE_FORMATS:
+            raise ValueError(f"Formato de caché no soportado: {fmt}")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.fmt = fmt
+
+    def key(self, path: str, options: Dict[str, Any], fs_options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Hash de ruta + tamaño + mtime + opciones; None si el archivo no tiene mtime."""
+        info = filesystem.stat(path, fs_options)
+        if info.get('mtime') is None:
+            return None
+        src = os.path.abspath(filesystem.local_path(path)) if filesystem.is_local(path) else str(path)
+        payload = json.dumps([src, info['size'], info['mtime'], options, self.fmt], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + CACHE_FORMATS[self.fmt])
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Ruta de la copia cacheada si existe; marca el acierto para el LRU."""
+        entry = self.entry_path(key)
+        try:
+            os.utime(entry, None)
+        except OSError:
+            return None
+        return entry
+
+    def store(self, key: str, df: pl.DataFrame) -> str:
+        """Escribe la copia (archivo temporal + rename atómico) y aplica el límite de tamaño."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = self.entry_path(key)
+        tmp = os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            if self.fmt == 'ipc':
+                # Sin compresión: la lectura por memory-map es zero-copy
+                df.write_ipc(tmp, compression='uncompressed')
+            else:
+                df.write_parquet(tmp, compression='zstd', statistics=True)
+            os.replace(tmp, entry)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict(keep=entry)
+        return entry
+
+    def get_or_create(self, path: str, options: Dict[str, Any], reader: Callable[[], pl.DataFrame],
+                      fs_options: Optional[Dict[str, Any]] = None) -> Tuple[Optional[str], bool, Optional[pl.DataFrame]]:
+        """Devuelve (copia cacheada, acierto, df leído en un fallo).
+        En un fallo se llama a reader() una vez y se guarda su resultado; el df se
+        devuelve para no volver a leer la copia recién escrita."""
+        key = self.key(path, options, fs_options)
+        if key is None:
+            return None, False, reader()
+        entry = self.lookup(key)
+        if entry:
+            return entry, True, None
+        df = reader()
+        return self.store(key, df), False, df
+
+    def scan(self, entry: str) -> pl.LazyFrame:
+        if self.fmt == 'ipc':
+            return pl.scan_ipc(entry, memory_map=True)
+        return pl.scan_parquet(entry)
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """(ruta, tamaño, último uso) de cada entrada del directorio."""
+        out = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return out
+        for name in names:
+            if not name.endswith(tuple(CACHE_FORMATS.values())) or name.startswith('.'):
+                continue
+            full = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            out.append((full, st.st_size, st.st_mtime))
+        return out
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Borra las entradas menos usadas hasta quedar bajo max_bytes. Devuelve cuántas borró."""
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(e[1] for e in entries)
+        removed = 0
+        for full, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if keep and os.path.abspath(full) == os.path.abspath(keep):
+                continue
+            try:
+                os.remove(full)
+            except OSError:
+                # En uso por otro proceso (Windows): se reintenta en el próximo store
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,211 @@
+"""Seguimiento de archivos de log que solo crecen (CSV / NDJSON) con offsets persistidos.
+
+En modo 'tail_follow' un origen CSV o JSON (leído como NDJSON) procesa en cada
+ejecución solo las líneas completas añadidas desde la anterior. Por nodo se
+guarda en el directorio de estado del proyecto (<proyecto>.fetl.logs/state):
+  - offset en bytes hasta el que se leyó (siempre al final de una línea completa)
+  - inodo y dispositivo del archivo
+  - huella (hash) de los primeros bytes, para detectar un archivo reescrito
+El motor solo guarda el nuevo offset cuando todos los destinos terminaron bien:
+si algo falla, la siguiente ejecución vuelve a leer las mismas líneas.
+
+Rotación y truncado:
+  - inodo distinto (logrotate con create/rename): se termina de leer el archivo
+    rotado (mismo inodo, buscado junto al original: app.log.1, app.log-2024...)
+    desde el offset guardado y después el archivo nuevo desde el principio
+  - mismo inodo pero más corto que el offset, o con otra huella (copytruncate,
+    reescritura): se lee desde el principio
+Solo archivos locales sin comprimir.
+
+Config del nodo:
+  - tail_follow: activar el modo (defecto False)
+  - tail_max_bytes: máximo de bytes nuevos por ejecución (vacío = todos); el
+    resto queda para la siguiente. Cuenta también tras una rotación o un
+    truncado: el resto del archivo rotado y el archivo nuevo se reparten el límite
+  - tail_state_key: clave del estado (defecto: id del nodo + ruta absoluta)
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import polars as pl
+
+from . import file_io
+
+# Bytes iniciales que forman la huella del archivo
+FINGERPRINT_BYTES = 1024
+# Bytes iniciales de los que se toma el esquema cuando no hay líneas nuevas
+SCHEMA_SAMPLE_BYTES = 64 * 1024
+Segment = Tuple[str, int, bytes]
+
+
+def default_state_dir() -> str:
+    """Directorio de estado cuando no hay proyecto abierto."""
+    return os.path.join(tempfile.gettempdir(), 'freeetl_state')
+
+
+class TailState:
+    """Estado por clave (un JSON por nodo) en <state_dir>/tail."""
+
+    def __init__(self, state_dir: Optional[str] = None):
+        self.dir = os.path.join(state_dir or default_state_dir(), 'tail')
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+    def load(self, key: str) -> Dict[str, Any]:
+        try:
+            with open(self._file(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, key: str, state: Dict[str, Any]) -> None:
+        """Escritura atómica (archivo temporal + rename)."""
+        os.makedirs(self.dir, exist_ok=True)
+        target = self._file(key)
+        tmp = f"{target}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({**state, 'key': key}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, target)
+
+
+def state_key(node_id: Any, path: str, config: Dict[str, Any]) -> str:
+    return str(config.get('tail_state_key') or '').strip() or f"{node_id}|{os.path.abspath(path)}"
+
+
+def _fingerprint(path: str, length: int) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+
+def _find_rotated(path: str, inode: int, device: int) -> Optional[str]:
+    """Archivo junto a 'path' cuyo nombre empieza igual y conserva el inodo anterior."""
+    folder = os.path.dirname(os.path.abspath(path))
+    base = os.path.basename(path)
+    try:
+        names = sorted(os.listdir(folder))
+    except OSError:
+        return None
+    for name in names:
+        if name == base or not name.startswith(base):
+            continue
+        candidate = os.path.join(folder, name)
+        try:
+            st = os.stat(candidate)
+        except OSError:
+            continue
+        if st.st_ino == inode and st.st_dev == device:
+            return candidate
+    return None
+
+
+def _read_range(path: str, start: int, limit: Optional[int], complete_lines: bool) -> bytes:
+    """Bytes desde 'start' (hasta 'limit'); con complete_lines se descarta la última línea sin '\\n'."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(limit) if limit else f.read()
+        if limit and len(data) == limit and b'\n' not in data:
+            # Una sola línea más larga que el límite: se completa
+            data += f.readline()
+    if complete_lines:
+        data = data[:data.rfind(b'\n') + 1]
+    return data
+
+
+def read_new(path: str, state: Dict[str, Any], max_bytes: Optional[int] = None) -> Tuple[List[Segment], Dict[str, Any], List[str]]:
+    """Segmentos nuevos [(archivo, offset inicial, bytes)], nuevo estado y avisos."""
+    st = os.stat(path)
+    notes: List[str] = []
+    segments: List[Segment] = []
+    offset = 0
+    same_file = bool(state) and state.get('inode') == st.st_ino and state.get('device') == st.st_dev
+    if same_file:
+        offset = int(state.get('offset') or 0)
+        fp_len = int(state.get('fingerprint_len') or 0)
+        if st.st_size < offset:
+            notes.append(f"{path} truncado ({st.st_size} < {offset} bytes): se lee desde el principio")
+            offset = 0
+        elif fp_len and _fingerprint(path, fp_len) != state.get('fingerprint'):
+            notes.append(f"{path} reescrito (cambió el inicio del archivo): se lee desde el principio")
+            offset = 0
+    elif state:
+        rotated = _find_rotated(path, state.get('inode'), state.get('device'))
+        if rotated:
+            start = int(state.get('offset') or 0)
+            notes.append(f"{path} rotado: se termina de leer {rotated} desde el byte {start}")
+            # El archivo rotado ya no crece: se lee hasta el final, incluida una última línea sin '\n'
+            data = _read_range(rotated, start, max_bytes, complete_lines=False)
+            if start + len(data) < os.path.getsize(rotated):
+                # Límite alcanzado dentro del archivo rotado: el estado sigue apuntando a
+                # su inodo y la siguiente ejecución continúa por la última línea completa
+                data = data[:data.rfind(b'\n') + 1]
+                notes.append(f"{rotated}: límite de {max_bytes} bytes alcanzado, el resto queda para la siguiente ejecución")
+                new_state = {**state, 'offset': start + len(data),
+                             'updated_at': datetime.now().isoformat(timespec='seconds')}
+                return ([(rotated, start, data)] if data else []), new_state, notes
+            if data:
+                segments.append((rotated, start, data))
+        else:
+            notes.append(f"{path} rotado y el archivo anterior no se encontró: se lee el nuevo desde el principio")
+    remaining = max_bytes - sum(len(s[2]) for s in segments) if max_bytes else None
+    data = b''
+    if remaining is None or remaining > 0:
+        data = _read_range(path, offset, remaining, complete_lines=True)
+    if data:
+        segments.append((path, offset, data))
+    new_offset = offset + len(data)
+    fp_len = min(new_offset, FINGERPRINT_BYTES)
+    new_state = {
+        'path': os.path.abspath(path),
+        'inode': st.st_ino,
+        'device': st.st_dev,
+        'offset': new_offset,
+        'fingerprint': _fingerprint(path, fp_len) if fp_len else None,
+        'fingerprint_len': fp_len,
+        'updated_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    return segments, new_state, notes
+
+
+def _first_line(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        line = f.readline()
+    return line if line.endswith(b'\n') else line + b'\n'
+
+
+def _sample_lines(path: str) -> bytes:
+    """Primeras líneas completas del archivo (hasta SCHEMA_SAMPLE_BYTES)."""
+    with open(path, 'rb') as f:
+        data = f.read(SCHEMA_SAMPLE_BYTES)
+    return data[:data.rfind(b'\n') + 1]
+
+
+def parse_segments(subtype: str, segments: List[Segment], options: Dict[str, Any],
+                   path: Optional[str] = None) -> pl.DataFrame:
+    """DataFrame de los segmentos. En CSV con cabecera, a cada segmento que no empieza
+    en el byte 0 se le antepone la primera línea de su archivo. Sin datos nuevos se
+    devuelve un DataFrame vacío con el esquema de las primeras líneas de 'path' (así
+    filtros y columnas posteriores no fallan); sin columnas solo si 'path' está vacío."""
+    has_header = (options.get('csv') or {}).get('has_header', True)
+    frames = []
+    for seg_path, start, data in segments:
+        if subtype == 'csv':
+            if has_header and start > 0:
+                data = _first_line(seg_path) + data
+            frames.append(file_io.read_stream('csv', io.BytesIO(data), options))
+        else:
+            frames.append(pl.read_ndjson(io.BytesIO(data)))
+    if not frames:
+        sample = _sample_lines(path) if path and os.path.isfile(path) else b''
+        if not sample.strip():
+            return pl.DataFrame()
+        if subtype == 'csv':
+            return file_io.read_stream('csv', io.BytesIO(sample), options).head(0)
+        return pl.read_ndjson(io.BytesIO(sample)).head(0)
+    return frames[0] if len(frames) == 1 else pl.concat(frames, how='diagonal_relaxed')
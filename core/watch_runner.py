@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import copy
+import ctypes
+import ctypes.util
+import os
+import select
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.etl_engine import MULTI_FILE_SOURCES, ETLEngine
+from core.file_manifest import FileManifest, list_files, manifest_path
+from core.job_runner import _apply_overrides, _build_graph_from_etl_content
+
+
+class _Inotify:
+    """inotify de Linux vía ctypes (sin dependencias): avisa de archivos cerrados o movidos al directorio."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f'inotify_add_watch {directory}')
+
+    def wait(self, timeout: float) -> bool:
+        """True si llegó algún evento antes de 'timeout' segundos (los eventos se descartan:
+        el runner vuelve a listar el directorio, que es la fuente de verdad)."""
+        ready, _w, _x = select.select([self.fd], [], [], max(0.0, timeout))
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class WatchRunner:
+    """Servicio de ingesta por micro-lotes: vigila un directorio y ejecuta una ETL por lote.
+
+    Mismo ciclo de vida que ServiceRunner (start/stop/is_running, logs sidecar en
+    services/<nombre>). service esperado (subset):
+    {
+      id, name, kind: "watch",
+      watch: {
+        directory, pattern?: "*.csv", recursive?: false,
+        etl_id, source_node,            # el lote se asigna a "<source_node>.path"
+        overrides?: { "<nodeId>.<key>": value },
+        batch_max_files?: 100, batch_max_mb?: 512, batch_window_seconds?: 30,
+        settle_seconds?: 2,             # sin cambios de tamaño/mtime durante este tiempo
+        poll_seconds?: 5, use_inotify?: true,
+        processed?: "move"|"manifest", processed_dir?, failed_dir?
+      }
+    }
+    Un lote se lanza al llegar a batch_max_files archivos o batch_max_mb, o cuando
+    el archivo listo más antiguo lleva batch_window_seconds esperando. Con un solo
+    archivo el origen recibe la ruta; con varios, la lista (se leen y concatenan):
+    el nodo origen debe ser de un tipo de archivo que admita listas (MULTI_FILE_SOURCES)
+    y sin modo tail ni manifiesto propio; si no, el servicio no arranca.
+    Tras una ejecución correcta los archivos se mueven a processed_dir (defecto
+    <directory>/processed) o se registran en el manifiesto SQLite del proyecto
+    (core.file_manifest); un archivo que cambia de tamaño o mtime vuelve a procesarse.
+    Si la ETL falla se mueven a failed_dir si está configurado; si no, no se
+    reintentan hasta que cambien o se reinicie el servicio.
+    inotify solo se usa en Linux y sin recursive; en otro caso se sondea cada poll_seconds.
+    """
+
+    def __init__(self,
+                 project: Dict[str, Any],
+                 service: Dict[str, Any],
+                 logs_root: str,
+                 ui_writer: Optional[Callable[[str], None]] = None) -> None:
+        self.project = project
+        self.service = service
+        self.logs_root = logs_root
+        self.ui_writer = ui_writer
+        self.watch: Dict[str, Any] = dict(service.get('watch') or {})
+        self._thread: Optional[threading.Thread] = None
+        self._should_stop = threading.Event()
+        self._running = threading.Event()
+        self._engine: Optional[ETLEngine] = None
+        # ruta -> {size, mtime, changed_at}: archivos vistos y aún no procesados
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # ruta -> (size, mtime) de archivos cuyo lote falló (sin failed_dir)
+        self._failed: Dict[str, Tuple[int, float]] = {}
+        self._manifest = FileManifest(manifest_path(os.path.join(logs_root, 'state')))
+        self._log_file_path = self._open_log_file()
+
+    # ---- Logging ----
+    def _open_log_file(self) -> str:
+        name = str(self.service.get('name') or self.service.get('id') or 'watch')
+        ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+        dir_path = os.path.join(self.logs_root, 'services', name)
+        os.makedirs(dir_path, exist_ok=True)
+        return os.path.join(dir_path, f'{ts}.log')
+
+    def _log(self, msg: str) -> None:
+        try:
+            with open(self._log_file_path, 'a', encoding='utf-8') as f:
+                f.write(f"{datetime.now().isoformat(timespec='seconds')} | {msg}\n")
+        except Exception:
+            pass
+        if self.ui_writer:
+            try:
+                self.ui_writer(msg)
+            except Exception:
+                pass
+
+    # ---- Configuración ----
+    def _num(self, key: str, default: float) -> float:
+        try:
+            val = self.watch.get(key)
+            return float(val) if val not in (None, '') else default
+        except (TypeError, ValueError):
+            return default
+
+    @property
+    def directory(self) -> str:
+        return os.path.abspath(str(self.watch.get('directory') or '.'))
+
+    def _processed_mode(self) -> str:
+        return 'manifest' if str(self.watch.get('processed') or 'move').strip().lower() == 'manifest' else 'move'
+
+    def _processed_dir(self) -> str:
+        return os.path.abspath(str(self.watch.get('processed_dir') or os.path.join(self.directory, 'processed')))
+
+    def _failed_dir(self) -> Optional[str]:
+        val = str(self.watch.get('failed_dir') or '').strip()
+        return os.path.abspath(val) if val else None
+
+    def _scope(self) -> str:
+        return f"watch:{self.service.get('id') or self.service.get('name') or 'watch'}"
+
+    # ---- Detección de archivos ----
+    def _list_files(self) -> List[str]:
+        return list_files(self.directory, str(self.watch.get('pattern') or '*'),
+                          bool(self.watch.get('recursive')), (self._processed_dir(), self._failed_dir()))
+
+    def _scan(self, now: float) -> None:
+        """Actualiza los archivos pendientes; un cambio de tamaño/mtime reinicia su espera."""
+        seen = {}
+        for path in self._list_files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            seen[path] = (st.st_size, st.st_mtime)
+        for path in list(self._pending):
+            if path not in seen:
+                del self._pending[path]
+        new = [p for p in seen if p not in self._pending and self._failed.get(p) != seen[p]]
+        if new and self._processed_mode() == 'manifest':
+            recorded = self._manifest.lookup(self._scope(), new)
+            new = [p for p in new
+                   if not self._manifest.is_unchanged({'size': seen[p][0], 'mtime': seen[p][1]},
+                                                      recorded.get(os.path.abspath(p)))]
+        for path in new:
+            self._pending[path] = {'size': seen[path][0], 'mtime': seen[path][1], 'changed_at': now}
+        for path, info in self._pending.items():
+            if (info['size'], info['mtime']) != seen[path]:
+                info.update(size=seen[path][0], mtime=seen[path][1], changed_at=now)
+
+    def _ready(self, now: float) -> List[str]:
+        settle = self._num('settle_seconds', 2)
+        ready = [p for p, info in self._pending.items() if now - info['changed_at'] >= settle]
+        return sorted(ready, key=lambda p: (self._pending[p]['mtime'], p))
+
+    def _take_batch(self, now: float, force: bool = False) -> List[str]:
+        """Archivos del próximo lote, o [] si todavía no se cumple ninguna condición de corte."""
+        ready = self._ready(now)
+        if not ready:
+            return []
+        max_files = max(1, int(self._num('batch_max_files', 100)))
+        max_bytes = self._num('batch_max_mb', 512) * 1024 * 1024
+        settle = self._num('settle_seconds', 2)
+        total = sum(self._pending[p]['size'] for p in ready)
+        oldest = min(self._pending[p]['changed_at'] + settle for p in ready)
+        if not (force or len(ready) >= max_files or total >= max_bytes
+                or now - oldest >= self._num('batch_window_seconds', 30)):
+            return []
+        batch: List[str] = []
+        size = 0
+        for path in ready:
+            if batch and (len(batch) >= max_files or size + self._pending[path]['size'] > max_bytes):
+                break
+            batch.append(path)
+            size += self._pending[path]['size']
+        return batch
+
+    # ---- Ejecución ----
+    def _find_etl(self, etl_id: Any) -> Optional[Dict[str, Any]]:
+        for e in (self.project.get('etls') or []):
+            if str(e.get('id')) == str(etl_id):
+                return e
+        return None
+
+    def _build(self, files: List[str], engine: ETLEngine) -> Tuple[Any, Dict[int, Dict[str, Any]]]:
+        """Grafo de la ETL con el lote asignado al nodo origen; ValueError si no puede recibirlo."""
+        etl_id = self.watch.get('etl_id')
+        etl_doc = self._find_etl(etl_id)
+        if not etl_doc:
+            raise ValueError(f"ETL no encontrada: {etl_id}")
+        source_node = self.watch.get('source_node')
+        if source_node in (None, ''):
+            raise ValueError("Falta 'source_node' (nodo origen que recibe el lote)")
+        # Copia: los overrides y la detección CSV no deben escribir en el proyecto
+        g, node_cfgs = _build_graph_from_etl_content(copy.deepcopy(etl_doc.get('content') or {}))
+        overrides = dict(self.watch.get('overrides') or {})
+        overrides[f"{int(source_node)}.path"] = files[0] if len(files) == 1 else list(files)
+        _apply_overrides(node_cfgs, overrides)
+        config = node_cfgs.get(int(source_node))
+        if config is None:
+            raise ValueError(f"El nodo origen {source_node} no existe en la ETL {etl_id}")
+        subtype = str(config.get('subtype') or '').strip().lower()
+        if subtype not in MULTI_FILE_SOURCES:
+            raise ValueError(f"El origen '{subtype}' del nodo {source_node} no admite lotes de archivos "
+                             f"(válidos: {', '.join(MULTI_FILE_SOURCES)})")
+        for flag in ('tail_follow', 'file_manifest'):
+            if engine._cfg_bool(config, flag):
+                raise ValueError(f"El nodo {source_node} usa '{flag}': el servicio ya decide qué archivos leer")
+        return g, node_cfgs
+
+    def _run_etl(self, files: List[str]) -> bool:
+        etl_id = self.watch.get('etl_id')
+        engine = ETLEngine()
+        try:
+            g, node_cfgs = self._build(files, engine)
+        except ValueError as e:
+            self._log(f"[WATCH] {e}")
+            return False
+        engine.cache_dir = os.path.join(self.logs_root, 'cache')
+        engine.state_dir = os.path.join(self.logs_root, 'state')
+        engine.execution_finished.connect(lambda ok, msg: None if ok else self._log(f"[ETL {etl_id}] {msg}"))
+        self._engine = engine
+        try:
+            engine.set_pipeline(g, node_cfgs)
+            return engine.execute_pipeline() is not False
+        except Exception as e:
+            self._log(f"[ETL {etl_id}] ERROR: {e}")
+            return False
+        finally:
+            self._engine = None
+
+    def _move(self, path: str, target_dir: str) -> None:
+        rel = os.path.relpath(os.path.dirname(path), self.directory)
+        dest_dir = os.path.normpath(os.path.join(target_dir, rel))
+        os.makedirs(dest_dir, exist_ok=True)
+        dest = os.path.join(dest_dir, os.path.basename(path))
+        if os.path.exists(dest):
+            base, ext = os.path.splitext(os.path.basename(path))
+            dest = os.path.join(dest_dir, f"{base}.{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}{ext}")
+        shutil.move(path, dest)
+
+    def _process_batch(self, files: List[str]) -> bool:
+        entries = []
+        for path in files:
+            info = self._pending.pop(path, None) or {}
+            entries.append({'path': path, 'size': info.get('size'), 'mtime': info.get('mtime')})
+        size_mb = sum(e['size'] or 0 for e in entries) / (1024 * 1024)
+        self._log(f"[WATCH] Lote de {len(files)} archivos ({size_mb:.1f} MB) -> ETL {self.watch.get('etl_id')}")
+        started = time.monotonic()
+        ok = self._run_etl(files)
+        self._log(f"[WATCH] Lote {'OK' if ok else 'FAILED'} en {time.monotonic() - started:.1f}s")
+        try:
+            if ok and self._processed_mode() == 'manifest':
+                self._manifest.record(self._scope(), entries)
+            elif ok:
+                for path in files:
+                    self._move(path, self._processed_dir())
+            elif self._failed_dir():
+                for path in files:
+                    self._move(path, self._failed_dir())
+            else:
+                for e in entries:
+                    self._failed[e['path']] = (e['size'], e['mtime'])
+        except Exception as e:
+            self._log(f"[WATCH] Error registrando archivos procesados: {e}")
+        self._record_run(ok, len(files))
+        return ok
+
+    def _record_run(self, ok: bool, nfiles: int) -> None:
+        try:
+            runs = self.project.setdefault('runs', []) if isinstance(self.project, dict) else None
+            if isinstance(runs, list):
+                runs.append({'type': 'watch', 'id': self.service.get('id'), 'name': self.service.get('name'),
+                             'ok': bool(ok), 'files': nfiles, 'log_path': self._log_file_path,
+                             'ts': datetime.now().isoformat(timespec='seconds')})
+        except Exception:
+            pass
+
+    def run_once(self, force: bool = False) -> int:
+        """Una pasada: lista el directorio y ejecuta los lotes que cumplan una condición
+        de corte (todos los archivos listos con force). Devuelve los archivos procesados."""
+        now = time.monotonic()
+        self._scan(now)
+        done = 0
+        while not self._should_stop.is_set():
+            batch = self._take_batch(now, force)
+            if not batch:
+                break
+            self._process_batch(batch)
+            done += len(batch)
+        return done
+
+    # ---- Control ----
+    def _make_notifier(self) -> Optional[_Inotify]:
+        if self.watch.get('use_inotify', True) is False or self.watch.get('recursive') or not sys.platform.startswith('linux'):
+            return None
+        try:
+            return _Inotify(self.directory)
+        except (OSError, AttributeError) as e:
+            self._log(f"[WATCH] inotify no disponible ({e}); se usa sondeo")
+            return None
+
+    def _wait(self, notifier: Optional[_Inotify], timeout: float) -> None:
+        """Espera hasta 'timeout' segundos, un evento de inotify o stop()."""
+        deadline = time.monotonic() + timeout
+        while not self._should_stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if notifier is not None:
+                if notifier.wait(min(remaining, 1.0)):
+                    return
+            elif self._should_stop.wait(min(remaining, 1.0)):
+                return
+
+    def _next_timeout(self) -> float:
+        """Hasta el próximo sondeo, o antes si un archivo pendiente puede quedar listo o cerrar lote."""
+        timeout = max(0.1, self._num('poll_seconds', 5))
+        if self._pending:
+            now = time.monotonic()
+            settle = self._num('settle_seconds', 2)
+            window = self._num('batch_window_seconds', 30)
+            for info in self._pending.values():
+                ready_at = info['changed_at'] + settle
+                due = ready_at if ready_at > now else ready_at + window
+                timeout = min(timeout, max(0.1, due - now))
+        return timeout
+
+    def _loop(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        notifier = self._make_notifier()
+        self._log(f"[WATCH] vigilando {self.directory} ({self.watch.get('pattern') or '*'}) "
+                  f"con {'inotify' if notifier else 'sondeo'}")
+        try:
+            while not self._should_stop.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    self._log(f"[WATCH] error: {e}")
+                self._wait(notifier, self._next_timeout())
+        finally:
+            if notifier is not None:
+                notifier.close()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        try:
+            # Un origen que no admite la lista del lote fallaría en cada lote: no se arranca
+            self._build([], ETLEngine())
+        except ValueError as e:
+            self._log(f"[WATCH] no se inicia: {e}")
+            return
+        self._should_stop.clear()
+
+        def _run():
+            try:
+                self._running.set()
+                self._loop()
+            except Exception as e:
+                self._log(f"[WATCH] error: {e}")
+            finally:
+                self._running.clear()
+                self._log("[WATCH] stopped")
+
+        t = threading.Thread(target=_run, daemon=True)
+        self._thread = t
+        t.start()
+
+    def stop(self) -> None:
+        self._should_stop.set()
+        engine = self._engine
+        if engine is not None:
+            try:
+                engine.request_stop()
+            except Exception:
+                pass
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5.0)
+
+    def is_running(self) -> bool:
+        return bool(self._running.is_set())
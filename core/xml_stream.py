@@ -0,0 +1,186 @@
+"""Archivos XML grandes como origen, leídos en streaming con iterparse.
+
+El documento nunca se carga completo: el parser (xml.etree, expat en C) emite
+eventos start/end, cada elemento que coincide con la ruta de registro se
+convierte en una fila y después se libera (clear + remove del padre), igual que
+cualquier elemento que quede fuera de un registro. La memoria depende del
+tamaño del lote, no del archivo. Las filas se acumulan por columnas y cada lote
+se construye como tabla Arrow (columnas string) antes de pasar a Polars.
+
+Config del nodo:
+  - xml_record_path: ruta del elemento que forma cada registro. 'catalogo/producto'
+    coincide con esos elementos en cualquier nivel; con '/' inicial la ruta es
+    absoluta desde la raíz ('/catalogo/productos/producto'). Los namespaces se ignoran.
+  - xml_columns: columnas a extraer ('id, nombre, precio_moneda'); vacío = todas.
+    Con columnas fijas el esquema es estable entre lotes; sin ellas, la lectura por
+    lotes del motor hace antes una pasada de descubrimiento (discover_columns).
+  - xml_attr_prefix: prefijo de las columnas que vienen de atributos (defecto '')
+  - stream_results / stream_batch_size: lectura por lotes de registros
+Mapeo de un registro: atributos -> columnas; hijos sin hijos -> columna con su
+texto; hijos con hijos o atributos -> columnas 'hijo_nieto' / 'hijo_atributo'.
+Si un hijo se repite dentro del registro se conserva el primero.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree as ET
+
+import polars as pl
+
+from . import file_io
+
+# Registros por lote en la lectura completa (no por lotes)
+READ_BATCH_ROWS = 100000
+SEPARATOR = '_'
+_LOCAL_NAMES: Dict[str, str] = {}
+
+
+def _local(tag: Any) -> str:
+    """Nombre sin namespace ('{uri}producto' -> 'producto'); memorizado por etiqueta."""
+    name = _LOCAL_NAMES.get(tag)
+    if name is None:
+        text = str(tag)
+        name = text.rsplit('}', 1)[-1] if text.startswith('{') else text.split(':')[-1]
+        if len(_LOCAL_NAMES) < 10000:
+            _LOCAL_NAMES[tag] = name
+    return name
+
+
+def parse_record_path(path: Any) -> Tuple[List[str], bool]:
+    """('a/b/c' | '/a/b/c') -> (['a','b','c'], absoluta)."""
+    text = str(path or '').strip()
+    parts = [p for p in text.strip('/').split('/') if p]
+    if not parts:
+        raise ValueError("Debe especificar la ruta del elemento de registro XML ('xml_record_path')")
+    return [_local(p) for p in parts], text.startswith('/') and not text.startswith('//')
+
+
+def _matches(stack: List[str], parts: List[str], absolute: bool) -> bool:
+    if absolute:
+        return stack == parts
+    return len(stack) >= len(parts) and stack[-len(parts):] == parts
+
+
+def record_values(elem: ET.Element, attr_prefix: str = '', columns: Optional[set] = None) -> Dict[str, str]:
+    """Valores de un registro según el mapeo del docstring del módulo."""
+    out: Dict[str, str] = {}
+
+    def put(name: str, value: Optional[str]) -> None:
+        if name not in out and (columns is None or name in columns):
+            out[name] = value
+
+    for key, value in elem.attrib.items():
+        put(attr_prefix + _local(key), value)
+
+    def walk(node: ET.Element, prefix: str) -> None:
+        for child in node:
+            name = prefix + _local(child.tag)
+            for key, value in child.attrib.items():
+                put(name + SEPARATOR + attr_prefix + _local(key), value)
+            if len(child):
+                walk(child, name + SEPARATOR)
+            else:
+                text = child.text.strip() if child.text else None
+                put(name, text if text else None)
+
+    if len(elem):
+        walk(elem, '')
+    elif elem.text and elem.text.strip():
+        put(_local(elem.tag), elem.text.strip())
+    return out
+
+
+def iter_records(stream: Any, record_path: Any, attr_prefix: str = '',
+                 columns: Optional[List[str]] = None) -> Iterator[Dict[str, str]]:
+    """Registros (dict columna -> texto) de un stream XML, liberando los elementos ya procesados."""
+    parts, absolute = parse_record_path(record_path)
+    wanted = set(columns) if columns else None
+    tags: List[str] = []
+    elems: List[ET.Element] = []
+    depth = 0
+    record_depth = 0
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            # Dentro de un registro solo cuenta la profundidad
+            if not record_depth:
+                tags.append(_local(elem.tag))
+                elems.append(elem)
+                if _matches(tags, parts, absolute):
+                    record_depth = depth
+            continue
+        depth -= 1
+        if record_depth:
+            if depth + 1 != record_depth:
+                continue
+            yield record_values(elem, attr_prefix, wanted)
+            record_depth = 0
+        tags.pop()
+        elems.pop()
+        # Fuera de un registro (o registro ya emitido): nada más lo referencia
+        elem.clear()
+        if elems:
+            elems[-1].remove(elem)
+
+
+def discover_columns(path: str, config: Dict[str, Any],
+                     fs_options: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Primera pasada: todas las columnas de los registros, en orden de aparición.
+    Fija el esquema de una lectura por lotes sin 'xml_columns', de modo que una
+    columna que solo aparece en lotes posteriores no cambia el esquema a mitad."""
+    record_path = config.get('xml_record_path')
+    attr_prefix = str(config.get('xml_attr_prefix') or '')
+    seen: Dict[str, None] = {}
+    for _name, stream in file_io.iter_input_streams(path, subtype='xml',
+                                                    member_pattern=config.get('zip_member_pattern') or None,
+                                                    fs_options=fs_options):
+        with stream:
+            for record in iter_records(stream, record_path, attr_prefix):
+                for name in record:
+                    seen.setdefault(name)
+    return list(seen)
+
+
+def _arrow_frame(data: Dict[str, List[Optional[str]]]) -> pl.DataFrame:
+    import pyarrow as pa
+    table = pa.table({name: pa.array(values, type=pa.string()) for name, values in data.items()})
+    return pl.from_arrow(table, rechunk=False)
+
+
+def iter_batches(path: str, config: Dict[str, Any], batch_rows: Optional[int] = None,
+                 columns: Optional[List[str]] = None,
+                 fs_options: Optional[Dict[str, Any]] = None) -> Iterator[pl.DataFrame]:
+    """DataFrames de hasta batch_rows registros. 'columns' (o xml_columns) fija las
+    columnas y su orden; si no, las columnas nuevas se añaden al aparecer y los
+    registros que no las tienen quedan a nulo. Compresión, .zip y rutas remotas como en file_io."""
+    record_path = config.get('xml_record_path')
+    parse_record_path(record_path)
+    columns = columns or [c.strip() for c in str(config.get('xml_columns') or '').split(',') if c.strip()] or None
+    attr_prefix = str(config.get('xml_attr_prefix') or '')
+    batch_rows = max(1, batch_rows or READ_BATCH_ROWS)
+    data: Dict[str, List[Optional[str]]] = {c: [] for c in columns or []}
+    rows = 0
+    produced = False
+    for _name, stream in file_io.iter_input_streams(path, subtype='xml',
+                                                    member_pattern=config.get('zip_member_pattern') or None,
+                                                    fs_options=fs_options):
+        with stream:
+            for record in iter_records(stream, record_path, attr_prefix, columns):
+                for name in record:
+                    if name not in data:
+                        data[name] = [None] * rows
+                for name, values in data.items():
+                    values.append(record.get(name))
+                rows += 1
+                if rows >= batch_rows:
+                    produced = True
+                    yield _arrow_frame(data)
+                    data = {name: [] for name in data}
+                    rows = 0
+    if rows or not produced:
+        yield _arrow_frame(data)
+
+
+def read(path: str, config: Dict[str, Any], columns: Optional[List[str]] = None,
+         fs_options: Optional[Dict[str, Any]] = None) -> pl.DataFrame:
+    """Archivo completo: lotes grandes concatenados (las columnas tardías se alinean con nulos)."""
+    frames = list(iter_batches(path, config, columns=columns, fs_options=fs_options))
+    return frames[0] if len(frames) == 1 else pl.concat(frames, how='diagonal')
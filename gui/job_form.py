@@ -114,7 +114,7 @@ class JobConfigForm(QWidget):
         lay_stages.addLayout(controls_steps)
         # Tabla de pasos por etapa
         self.tbl_steps = QTableWidget(0, 3)
-        self.tbl_steps.setHorizontalHeaderLabels(["Tipo", "ID", "Acción"])  # Tipo: ETL/Servicio; Acción para servicio: start/stop
+        self.tbl_steps.setHorizontalHeaderLabels(["Tipo", "ID", "Acción"])  # Tipo: ETL/Servicio/Delta; Acción: start/stop (servicio), compact/vacuum (Delta)
         lay_stages.addWidget(self.tbl_steps)
         root.addWidget(grp_stages)
 
@@ -481,9 +481,15 @@ class JobConfigForm(QWidget):
             steps = st.get('steps') or []
             self.tbl_steps.setRowCount(len(steps))
             for i, s in enumerate(steps):
-                typ = 'ETL' if 'etl_id' in s else 'Servicio'
-                action = s.get('action') or ('start' if 'service_id' in s else '')
-                target_id = s.get('etl_id') or s.get('service_id') or ''
+                if 'replicate' in s:
+                    # Replicación de tablas: se configura en el .fetl; aquí se muestra el origen
+                    rep = s.get('replicate') or {}
+                    typ, action = 'Replicación', ''
+                    target_id = rep.get('name') or (rep.get('connection') or {}).get('database') or ''
+                else:
+                    typ = 'ETL' if 'etl_id' in s else ('Delta' if 'delta_path' in s else 'Servicio')
+                    action = s.get('action') or ('start' if 'service_id' in s else ('compact' if 'delta_path' in s else ''))
+                    target_id = s.get('etl_id') or s.get('service_id') or s.get('delta_path') or ''
                 self.tbl_steps.setItem(i, 0, QTableWidgetItem(typ))
                 self.tbl_steps.setItem(i, 1, QTableWidgetItem(str(target_id)))
                 self.tbl_steps.setItem(i, 2, QTableWidgetItem(str(action)))
@@ -549,6 +555,11 @@ class JobConfigForm(QWidget):
                 if val.startswith('etl'):
                     # Convertir a ETL manteniendo id si fuera posible
                     s = {'etl_id': s.get('etl_id') or '', 'overrides': s.get('overrides') or {}}
+                elif val.startswith('repl'):
+                    s = {'replicate': s.get('replicate') or {'connection': {}, 'tables': [], 'destination': {}}}
+                elif val.startswith('delta'):
+                    # Mantenimiento de tabla Delta: ID = ruta de la tabla, acción compact/vacuum
+                    s = {'delta_path': s.get('delta_path') or '', 'action': 'vacuum' if s.get('action') == 'vacuum' else 'compact'}
                 else:
                     s = {'service_id': s.get('service_id') or '', 'action': s.get('action') or 'start'}
             elif c == 1:  # ID
@@ -557,10 +568,16 @@ class JobConfigForm(QWidget):
                     s['etl_id'] = val
                 elif 'service_id' in s:
                     s['service_id'] = val
+                elif 'delta_path' in s:
+                    s['delta_path'] = val
+                elif 'replicate' in s:
+                    s['replicate'] = {**(s.get('replicate') or {}), 'name': val}
             elif c == 2:  # Acción
                 val = (item.text() or '').strip().lower()
                 if 'service_id' in s:
                     s['action'] = 'stop' if val.startswith('stop') else 'start'
+                elif 'delta_path' in s:
+                    s['action'] = 'vacuum' if val.startswith('vac') else 'compact'
             steps[r] = s
             stages[sel]['steps'] = steps
             self._persist_stages(stages)
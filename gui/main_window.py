@@ -9,6 +9,7 @@ from .pipeline_canvas import PipelineCanvas
 from .node_palette import NodePalette
 from .properties_panel import PropertiesPanel
 from core.etl_engine import ETLEngine
+from core import preview, schema_eval
 import polars as pl
 from core.project_manager import ProjectManager
 from .project_settings_dialog import ProjectSettingsDialog
@@ -355,6 +356,15 @@ class MainWindow(QMainWindow):
                             for second_target_id in self.pipeline_canvas.graph.successors(target_id):
                                 # Asegurar que la transformación se propague correctamente
                                 self.pipeline_canvas.propagate_data_to_target(target_id, second_target_id)
+
+            # Columnas aguas abajo desde los esquemas, aunque no haya datos cargados
+            changed = self.pipeline_canvas.propagate_schemas(node_id)
+            current_id = getattr(self.properties_panel, 'current_node_id', None)
+            if current_id in changed:
+                current_config = self.pipeline_canvas.graph.nodes[current_id].get('config', {})
+                self.properties_panel.set_node_dataframe(current_id, current_config['dataframe'])
+                self.properties_panel.show_node_properties(
+                    current_id, self.pipeline_canvas.graph.nodes[current_id]['type'], current_config)
         
     def handle_node_executed(self, node_id, dataframe):
         """Maneja el evento de nodo ejecutado"""
@@ -951,10 +961,13 @@ class MainWindow(QMainWindow):
         run_menu = menubar.addMenu("Ejecutar")
         run_pipeline_action = run_menu.addAction("Ejecutar Pipeline")
         stop_pipeline_action = run_menu.addAction("Detener Pipeline")
+        run_menu.addSeparator()
+        full_data_action = run_menu.addAction("Cargar datos completos de orígenes")
         
         # Connect actions
         run_pipeline_action.triggered.connect(self.run_pipeline)
         stop_pipeline_action.triggered.connect(self.stop_pipeline)
+        full_data_action.triggered.connect(lambda: self._auto_fetch_source_data(full=True))
         
         # Proyecto connections
         new_project_action.triggered.connect(self.new_project)
@@ -1101,11 +1114,27 @@ class MainWindow(QMainWindow):
             node_configs[node_id] = self.properties_panel.get_node_config(node_id)
             
         # Configurar el motor ETL
+        self.etl_engine.cache_dir = self._source_cache_dir()
+        self.etl_engine.state_dir = self._source_state_dir()
         self.etl_engine.set_pipeline(self.pipeline_canvas.graph, node_configs)
         
         # Ejecutar el pipeline
         self.etl_engine.execute_pipeline()
         
+    def _source_cache_dir(self):
+        """Carpeta de caché de orígenes del proyecto abierto; None usa la temporal por defecto."""
+        try:
+            return self.project_manager.cache_root() if self.project_manager.path else None
+        except Exception:
+            return None
+
+    def _source_state_dir(self):
+        """Carpeta de estado de orígenes (offsets de tail) del proyecto abierto; None usa la temporal."""
+        try:
+            return self.project_manager.state_root() if self.project_manager.path else None
+        except Exception:
+            return None
+
     def stop_pipeline(self):
         """Detiene la ejecución de la pipeline"""
         self.statusBar().showMessage("Deteniendo pipeline...")
@@ -1173,7 +1202,7 @@ class MainWindow(QMainWindow):
             # Si el propio nodo es una transformación de tipo filter/map/aggregate, aplicar preview
             try:
                 st = (updated_config.get('subtype') or '').lower()
-                if st in ['filter', 'map', 'aggregate', 'cast'] and updated_config.get('dataframe') is not None:
+                if st in ['filter', 'map', 'aggregate', 'cast', 'flatten'] and updated_config.get('dataframe') is not None:
                     base_df = updated_config.get('dataframe')
                     if st == 'filter':
                         base_df = self.pipeline_canvas._apply_filter_rules_preview(base_df, updated_config)
@@ -1183,6 +1212,8 @@ class MainWindow(QMainWindow):
                         base_df = self.pipeline_canvas._apply_aggregate_preview(base_df, updated_config)
                     elif st == 'cast':
                         base_df = self.pipeline_canvas._apply_cast_preview(base_df, updated_config)
+                    elif st == 'flatten':
+                        base_df = self.pipeline_canvas._apply_flatten_preview(base_df, updated_config)
                     # Aplicar selección/renombrado del propio nodo si existe
                     preview_df = self.pipeline_canvas._apply_select_and_rename(base_df, updated_config)
                     updated_config['dataframe'] = preview_df
@@ -1264,6 +1295,9 @@ class MainWindow(QMainWindow):
                     elif st == 'cast':
                         base_df = self.pipeline_canvas._apply_cast_preview(source_config['dataframe'], source_config)
                         preview_df = self.pipeline_canvas._apply_select_and_rename(base_df, source_config)
+                    elif st == 'flatten':
+                        base_df = self.pipeline_canvas._apply_flatten_preview(source_config['dataframe'], source_config)
+                        preview_df = self.pipeline_canvas._apply_select_and_rename(base_df, source_config)
                     else:
                         preview_df = self._apply_select_and_rename_preview(source_config['dataframe'], source_config)
                 except Exception as e:
@@ -1371,6 +1405,8 @@ class MainWindow(QMainWindow):
                     config = node.get('config', {}).copy()
                 config.pop('dataframe', None)
                 config.pop('other_dataframe', None)
+                config.pop(schema_eval.SCHEMA_ONLY_KEY, None)
+                config.pop(preview.PREVIEW_KEY, None)
 
                 data['nodes'].append({
                     'id': int(node_id),
@@ -1431,11 +1467,13 @@ class MainWindow(QMainWindow):
                 self.pipeline_canvas.add_edge_simple(src, dst)
 
             self.log_message(f"Pipeline cargado desde {path}")
+            # Columnas de todos los nodos desde los esquemas, antes de leer datos
+            self.pipeline_canvas.propagate_schemas()
             
             # Auto-obtener datos para nodos de origen
             self._auto_fetch_source_data()
             
-            QMessageBox.information(self, "Cargado", "Pipeline cargado correctamente.\nDatos de origen obtenidos automáticamente.")
+            QMessageBox.information(self, "Cargado", "Pipeline cargado correctamente.\nVista previa de los orígenes obtenida automáticamente\n(Ejecutar > Cargar datos completos de orígenes para leerlos enteros).")
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -1460,6 +1498,8 @@ class MainWindow(QMainWindow):
                 config = node.get('config', {}).copy()
             config.pop('dataframe', None)
             config.pop('other_dataframe', None)
+            config.pop(schema_eval.SCHEMA_ONLY_KEY, None)
+            config.pop(preview.PREVIEW_KEY, None)
             data['nodes'].append({
                 'id': int(node_id),
                 'type': node.get('type'),
@@ -1496,6 +1536,7 @@ class MainWindow(QMainWindow):
                 src = int(e['source'])
                 dst = int(e['target'])
                 self.pipeline_canvas.add_edge_simple(src, dst)
+            self.pipeline_canvas.propagate_schemas()
             self.log_message("ETL cargado en Diseñador desde el Proyecto")
         except Exception as e:
             QMessageBox.critical(self, "Proyecto", f"No se pudo cargar el ETL en el Diseñador: {e}")
@@ -1547,8 +1588,9 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Proyecto", f"No se pudo guardar el Diseñador en el ETL: {e}")
     
-    def _auto_fetch_source_data(self):
-        """Obtiene automáticamente los datos para todos los nodos de origen después de cargar un pipeline."""
+    def _auto_fetch_source_data(self, full=False):
+        """Obtiene automáticamente los datos para todos los nodos de origen después de cargar un pipeline.
+        Por defecto solo una vista previa (primeras filas); full=True lee los orígenes completos."""
         try:
             source_nodes = []
             # Identificar todos los nodos de origen
@@ -1561,12 +1603,13 @@ class MainWindow(QMainWindow):
                 self.log_message("No se encontraron nodos de origen para auto-obtener datos")
                 return
             
-            self.log_message(f"Auto-obteniendo datos para {len(source_nodes)} nodos de origen...")
+            mode = "datos completos" if full else f"vista previa ({preview.DEFAULT_PREVIEW_ROWS} filas)"
+            self.log_message(f"Auto-obteniendo {mode} para {len(source_nodes)} nodos de origen...")
             
             # Procesar cada nodo de origen
             for node_id in source_nodes:
                 try:
-                    self._auto_fetch_single_source(node_id)
+                    self._auto_fetch_single_source(node_id, full)
                 except Exception as e:
                     self.log_message(f"Error auto-obteniendo datos del nodo {node_id}: {e}")
                     continue
@@ -1576,7 +1619,7 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.log_message(f"Error en auto-obtención de datos: {e}")
     
-    def _auto_fetch_single_source(self, node_id):
+    def _auto_fetch_single_source(self, node_id, full=False):
         """Obtiene automáticamente los datos de un nodo de origen específico."""
         node = self.pipeline_canvas.graph.nodes[node_id]
         config = node.get('config', {})
@@ -1586,14 +1629,16 @@ class MainWindow(QMainWindow):
         
         if subtype == 'database':
             # Auto-obtener datos de base de datos
-            self._auto_fetch_database_data(node_id, config)
-        elif subtype in ['csv', 'excel', 'json', 'parquet']:
+            self._auto_fetch_database_data(node_id, config, full)
+        elif subtype in preview.FILE_SOURCES:
             # Auto-cargar archivos
-            self._auto_load_file_data(node_id, config, subtype)
+            self._auto_load_file_data(node_id, config, subtype, full)
+        elif subtype == 'api':
+            self._auto_fetch_api_data(node_id, config, full)
         else:
             self.log_message(f"Subtype '{subtype}' no soportado para auto-obtención")
     
-    def _auto_fetch_database_data(self, node_id, config):
+    def _auto_fetch_database_data(self, node_id, config, full=False):
         """Auto-obtiene datos de una base de datos configurada."""
         try:
             # Verificar que todos los campos necesarios estén presentes
@@ -1661,29 +1706,27 @@ class MainWindow(QMainWindow):
             # Ejecutar consulta
             engine = create_engine(url, pool_pre_ping=True, connect_args=connect_args or {})
             with engine.connect() as conn:
-                pdf = pd.read_sql(text(query), conn)
+                if full:
+                    pdf = pd.read_sql(text(query), conn)
+                    # Convertir a Polars
+                    df = pl.from_pandas(pdf) if hasattr(pdf, 'columns') else pl.DataFrame(pdf)
+                else:
+                    # Vista previa: la consulta se envuelve con LIMIT/TOP según el dialecto
+                    df = preview.read_sql_head(conn, query, db_type, preview.DEFAULT_PREVIEW_ROWS)
             
             try:
                 engine.dispose()
             except Exception:
                 pass
             
-            # Convertir a Polars
-            df = pl.from_pandas(pdf) if hasattr(pdf, 'columns') else pl.DataFrame(pdf)
-            
-            # Guardar en configuración
-            config['dataframe'] = df
-            self.pipeline_canvas.graph.nodes[node_id]['config'] = config
-            self.properties_panel.node_configs[node_id] = config
-            self.properties_panel.current_dataframes[node_id] = df
-            
-            self.log_message(f"Nodo {node_id}: Datos de BD obtenidos automáticamente ({len(df)} filas)")
+            self._store_source_dataframe(node_id, config, df, full)
+            self.log_message(f"Nodo {node_id}: Datos de BD obtenidos automáticamente ({len(df)} filas{'' if full else ', vista previa'})")
         
         except Exception as e:
             self.log_message(f"Error auto-obteniendo datos de BD del nodo {node_id}: {e}")
     
-    def _auto_load_file_data(self, node_id, config, file_type):
-        """Auto-carga datos de un archivo configurado."""
+    def _auto_load_file_data(self, node_id, config, file_type, full=False):
+        """Auto-carga datos de un archivo configurado (solo las primeras filas salvo full=True)."""
         try:
             file_path = config.get('path')
             if not file_path:
@@ -1697,17 +1740,41 @@ class MainWindow(QMainWindow):
             
             import pandas as pd
             import polars as pl
+            from core import file_io
+            
+            from core import source_cache
+            member_pattern = config.get('zip_member_pattern') or None
+
+            def read_csv():
+                # Codificación/delimitador/comillas detectados una vez y guardados en el config
+                csv_options = file_io.resolve_csv_options(file_path, config)
+                cache = source_cache.cache_from_config(config, self._source_cache_dir())
+                if cache is None:
+                    return file_io.read_file('csv', file_path, options=csv_options, member_pattern=member_pattern)
+                # Caché columnar: tras el primer parseo se escanea la copia Parquet/IPC
+                entry, hit, cached = cache.get_or_create(
+                    file_path, source_cache.reader_options('csv', config),
+                    lambda: file_io.read_file('csv', file_path, options=csv_options, member_pattern=member_pattern))
+                if hit:
+                    self.log_message(f"Nodo {node_id}: leído desde caché {entry}")
+                    return cache.scan(entry).collect()
+                return cached
             
             # Cargar según el tipo de archivo
-            if file_type == 'csv':
-                try:
-                    df = pl.read_csv(file_path)
-                except:
-                    try:
-                        df = pl.read_csv(file_path, encoding='latin-1')
-                    except:
-                        pdf = pd.read_csv(file_path, encoding='latin-1')
-                        df = pl.from_pandas(pdf) 
+            if not full:
+                # Vista previa: head sobre el escaneo, sin parsear el archivo completo
+                df = preview.read_file_head(file_type, file_path, config, preview.DEFAULT_PREVIEW_ROWS)
+            elif file_type == 'csv':
+                # Bytes no UTF-8 más allá del prefijo analizado: se relee como cp1252
+                df = file_io.with_encoding_fallback(read_csv, config, self.log_message)
+            elif file_type == 'fixed_width':
+                from core import fixed_width
+                df = fixed_width.read(file_path, config)
+            elif file_type == 'xml':
+                from core import xml_stream
+                df = xml_stream.read(file_path, config)
+            elif file_type in ('orc', 'avro') or file_io.detect_compression(file_path):
+                df = file_io.read_file(file_type, file_path, member_pattern=member_pattern)
             elif file_type == 'excel':
                 try:
                     df = pl.read_excel(file_path)
@@ -1718,17 +1785,46 @@ class MainWindow(QMainWindow):
                 df = pl.read_json(file_path)
             elif file_type == 'parquet':
                 df = pl.read_parquet(file_path)
+            elif file_type == 'ipc':
+                df = pl.read_ipc(file_path)
+            elif file_type == 'delta':
+                from core import delta_lake
+                version = str(config.get('delta_version') or '').strip()
+                df = delta_lake.scan(file_path, int(version) if version else None).collect()
             else:
                 self.log_message(f"Tipo de archivo no soportado: {file_type}")
                 return
             
-            # Guardar en configuración
-            config['dataframe'] = df
-            self.pipeline_canvas.graph.nodes[node_id]['config'] = config
-            self.properties_panel.node_configs[node_id] = config
-            self.properties_panel.current_dataframes[node_id] = df
-            
-            self.log_message(f"Nodo {node_id}: Archivo {file_type.upper()} cargado automáticamente ({len(df)} filas)")
+            self._store_source_dataframe(node_id, config, df, full)
+            self.log_message(f"Nodo {node_id}: Archivo {file_type.upper()} cargado automáticamente ({len(df)} filas{'' if full else ', vista previa'})")
         
         except Exception as e:
-            self.log_message(f"Error auto-cargando archivo del nodo {node_id}: {e}")
\ No newline at end of file
+            self.log_message(f"Error auto-cargando archivo del nodo {node_id}: {e}")
+
+    def _auto_fetch_api_data(self, node_id, config, full=False):
+        """Auto-obtiene datos de una API: el primer lote de la respuesta salvo full=True."""
+        try:
+            if not config.get('url'):
+                self.log_message(f"Nodo {node_id}: No hay URL de API configurada")
+                return
+            if full:
+                batches = list(self.etl_engine._iter_api_batches(config))
+                df = batches[0] if len(batches) == 1 else pl.concat(batches, how='diagonal_relaxed')
+            else:
+                df = preview.read_api_head(config, self.etl_engine, preview.DEFAULT_PREVIEW_ROWS)
+            self._store_source_dataframe(node_id, config, df, full)
+            self.log_message(f"Nodo {node_id}: Datos de API obtenidos automáticamente ({len(df)} filas{'' if full else ', vista previa'})")
+        except Exception as e:
+            self.log_message(f"Error auto-obteniendo datos de API del nodo {node_id}: {e}")
+
+    def _store_source_dataframe(self, node_id, config, df, full):
+        """Guarda los datos obtenidos en el nodo. Una vista previa queda marcada para que
+        la ejecución lea el origen completo en vez de usarla como datos precargados."""
+        config['dataframe'] = df
+        if full:
+            config.pop(preview.PREVIEW_KEY, None)
+        else:
+            config[preview.PREVIEW_KEY] = True
+        self.pipeline_canvas.graph.nodes[node_id]['config'] = config
+        self.properties_panel.node_configs[node_id] = config
+        self.properties_panel.current_dataframes[node_id] = df
\ No newline at end of file
@@ -35,6 +35,12 @@ class NodePalette(QWidget):
             ("Archivo Excel", "source", "excel"),
             ("Archivo JSON", "source", "json"),
             ("Archivo Parquet", "source", "parquet"),
+            ("Archivo IPC/Feather", "source", "ipc"),
+            ("Archivo ORC", "source", "orc"),
+            ("Archivo Avro", "source", "avro"),
+            ("Archivo de Ancho Fijo", "source", "fixed_width"),
+            ("Archivo XML", "source", "xml"),
+            ("Tabla Delta Lake", "source", "delta"),
             ("Base de Datos", "source", "database"),
             ("API", "source", "api")
         ]
@@ -55,7 +61,8 @@ class NodePalette(QWidget):
             ("Unión", "transform", "join"),
             ("Agregación", "transform", "aggregate"),
             ("Mapeo", "transform", "map"),
-            ("Casteo", "transform", "cast")
+            ("Casteo", "transform", "cast"),
+            ("Aplanar", "transform", "flatten")
         ]
         
         for name, node_type, subtype in transform_buttons:
@@ -74,6 +81,10 @@ class NodePalette(QWidget):
             ("Archivo Excel", "destination", "excel"),
             ("Archivo JSON", "destination", "json"),
             ("Archivo Parquet", "destination", "parquet"),
+            ("Archivo IPC/Feather", "destination", "ipc"),
+            ("Archivo ORC", "destination", "orc"),
+            ("Archivo Avro", "destination", "avro"),
+            ("Tabla Delta Lake", "destination", "delta"),
             ("Base de Datos", "destination", "database"),
             ("API", "destination", "api")
         ]
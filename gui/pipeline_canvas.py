@@ -7,6 +7,8 @@ import networkx as nx
 import polars as pl
 import math
 
+from core import flatten, schema_eval
+
 class ArrowItem(QGraphicsPathItem):
     """Clase para representar las flechas entre nodos"""
     def __init__(self, start_point, end_point, source_id, target_id):
@@ -228,6 +230,12 @@ class PipelineCanvas(QGraphicsView):
             'excel': 'Excel',
             'json': 'JSON',
             'parquet': 'Parquet',
+            'ipc': 'IPC/Feather',
+            'orc': 'ORC',
+            'avro': 'Avro',
+            'fixed_width': 'Ancho Fijo',
+            'xml': 'XML',
+            'delta': 'Delta Lake',
             'database': 'Base de Datos',
             'api': 'API',
             'filter': 'Filtro',
@@ -235,6 +243,7 @@ class PipelineCanvas(QGraphicsView):
             'aggregate': 'Agregación',
             'map': 'Mapeo',
             'cast': 'Casteo',
+            'flatten': 'Aplanar',
         }
 
     def drawBackground(self, painter, rect):
@@ -327,6 +336,8 @@ class PipelineCanvas(QGraphicsView):
             
             # Propagar datos del origen al destino cuando sea un nodo de transformación
             self.propagate_data_to_target(source_id, target_id)
+            # Sin datos cargados: al menos las columnas, calculadas desde el esquema
+            self.propagate_schemas(source_id)
             
             # Mostrar mensaje de conexión establecida
             message = f"Conexión establecida: {self.node_type_names.get(source_type, source_type)} "
@@ -377,6 +388,8 @@ class PipelineCanvas(QGraphicsView):
                                 base_df = self._apply_aggregate_preview(base_df, source_config)
                             elif st == 'cast':
                                 base_df = self._apply_cast_preview(base_df, source_config)
+                            elif st == 'flatten':
+                                base_df = self._apply_flatten_preview(base_df, source_config)
                             prepared_df = self._apply_select_and_rename(base_df, source_config)
                     else:
                         # Origen es un nodo de fuente o destino: solo aplicar selección/renombrado del origen
@@ -424,6 +437,11 @@ class PipelineCanvas(QGraphicsView):
                     import traceback
                     traceback.print_exc()
                     
+                # Con datos reales el nodo deja de ser solo esquema
+                if source_config.get(schema_eval.SCHEMA_ONLY_KEY):
+                    target_config[schema_eval.SCHEMA_ONLY_KEY] = True
+                else:
+                    target_config.pop(schema_eval.SCHEMA_ONLY_KEY, None)
                 # Actualizar la configuración del nodo
                 self.graph.nodes[target_id]['config'] = target_config
         except Exception as e:
@@ -431,6 +449,45 @@ class PipelineCanvas(QGraphicsView):
             import traceback
             traceback.print_exc()
 
+    def propagate_schemas(self, node_id=None):
+        """Calcula las columnas de los nodos aguas abajo de node_id (todos si es None) sin
+        leer ni transformar datos (core.schema_eval). Los nodos sin datos de preview reciben
+        DataFrames vacíos con su esquema de entrada en 'dataframe'/'other_dataframe', así que
+        las listas de columnas del panel funcionan igual. Devuelve los ids cuyo esquema cambió."""
+        changed = []
+        try:
+            if node_id is None:
+                targets = [n for n in self.graph.nodes if self.graph.nodes[n].get('type') != 'source']
+            elif node_id in self.graph.nodes:
+                targets = list(nx.descendants(self.graph, node_id))
+            else:
+                targets = []
+            if not targets:
+                return changed
+            # Solo hace falta evaluar los nodos de los que dependen los afectados
+            needed = set(targets)
+            for t in targets:
+                needed |= nx.ancestors(self.graph, t)
+            schemas = schema_eval.output_schemas(self.graph.subgraph(needed))
+            for t in targets:
+                config = self.graph.nodes[t].setdefault('config', {})
+                if config.get('dataframe') is not None and not config.get(schema_eval.SCHEMA_ONLY_KEY):
+                    continue
+                inputs = schema_eval.input_schemas(self.graph, t, schemas)
+                if not inputs or inputs[0] is None:
+                    continue
+                frames = [schema_eval.empty_frame(s) for s in inputs[:2]]
+                previous = [schema_eval.frame_schema(config.get(k)) for k in schema_eval.DATA_KEYS[:len(frames)]]
+                if previous == [f.schema for f in frames]:
+                    continue
+                for key, frame in zip(schema_eval.DATA_KEYS, frames):
+                    config[key] = frame
+                config[schema_eval.SCHEMA_ONLY_KEY] = True
+                changed.append(t)
+        except Exception as e:
+            print(f"Error propagando esquemas: {e}")
+        return changed
+
     def _apply_select_and_rename(self, df, config):
         """Aplica la selección y renombrado definidos en el nodo origen."""
         try:
@@ -671,6 +728,13 @@ class PipelineCanvas(QGraphicsView):
         except Exception:
             return df
 
+    def _apply_flatten_preview(self, df, config):
+        """Aplica el aplanado de struct/list (preview) con la misma función que el motor."""
+        try:
+            return flatten.flatten_from_config(self._to_pl(df), config)
+        except Exception:
+            return df
+
     def update_node_visual(self, node_id):
         """Actualiza el título y puntos de conexión del nodo tras cambio de subtipo."""
         try:
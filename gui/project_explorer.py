@@ -197,6 +197,8 @@ class ProjectExplorer(QWidget):
             port = s.get('port')
             dflt = (self.pm.project.get('defaults') or {}).get('services', {}) if isinstance(self.pm.project, dict) else {}
             port_str = str(port if port is not None else dflt.get('port', 8080))
+            if s.get('kind') == 'watch':
+                port_str = '-'
             auth = s.get('auth') or {}
             basic = '✔' if auth.get('basic_user') and auth.get('basic_pass') else ''
             jwt = '✔' if auth.get('jwt_secret') else ''
@@ -8,8 +8,23 @@ import polars as pl
 import pandas as pd
 import os
 import re
+import json
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import URL
+from core import delta_lake, file_io, fixed_width, orc_avro, preview, source_cache
+
+# Tipos de origen/destino basados en archivo (etiquetas de la UI)
+FILE_TYPE_LABELS = ("CSV", "Excel", "JSON", "Parquet", "IPC/Feather", "ORC", "Avro", "Ancho Fijo", "XML", "Delta Lake")
+# Etiqueta de la UI -> subtipo interno de orígenes y destinos
+SUBTYPE_BY_LABEL = {
+    "CSV": "csv", "Excel": "excel", "JSON": "json", "Parquet": "parquet", "IPC/Feather": "ipc",
+    "ORC": "orc", "Avro": "avro", "Ancho Fijo": "fixed_width", "XML": "xml", "Delta Lake": "delta",
+    "Base de Datos": "database", "API": "api",
+}
+# Tipos que solo existen como origen (no se ofrecen en destinos)
+SOURCE_ONLY_LABELS = ("Ancho Fijo", "XML")
+# Filas del botón de vista previa de orígenes de base de datos
+DB_PREVIEW_ROWS = 100
 
 class PropertiesPanel(QWidget):
     node_config_changed = pyqtSignal(int, dict)  # Señal cuando cambia la configuración de un nodo
@@ -22,6 +37,10 @@ class PropertiesPanel(QWidget):
         # Almacenamiento para la configuración de los nodos
         self.node_configs = {}  # {node_id: config_dict}
         self.current_dataframes = {}  # {node_id: df}
+        # Widgets de opciones avanzadas por tipo de nodo: {clave_config: widget}
+        self.source_option_fields = {}
+        self.transform_option_fields = {}
+        self.dest_option_fields = {}
         # Bandera para evitar autosaves reentrantes durante la reconstrucción del panel
         self._ui_rebuilding = False
         # Autosave diferido
@@ -119,6 +138,10 @@ class PropertiesPanel(QWidget):
                 self.column_rename_fields = []
             if hasattr(self, 'join_fields'):
                 self.join_fields = {}
+            # Campos de opciones avanzadas (se recrean en cada panel)
+            self.source_option_fields = {}
+            self.transform_option_fields = {}
+            self.dest_option_fields = {}
         except Exception:
             pass
         for i in reversed(range(self.layout.count())):
@@ -188,7 +211,7 @@ class PropertiesPanel(QWidget):
         
         # Selector de tipo de fuente
         source_type = QComboBox()
-        source_type.addItems(["CSV", "Excel", "JSON", "Parquet", "Base de Datos", "API"])
+        source_type.addItems(list(SUBTYPE_BY_LABEL))
         
         # Establecer el subtipo actual si existe
         subtype = node_data.get('subtype')
@@ -200,6 +223,18 @@ class PropertiesPanel(QWidget):
             source_type.setCurrentText("JSON")
         elif subtype == 'parquet':
             source_type.setCurrentText("Parquet")
+        elif subtype in ('ipc', 'feather', 'arrow'):
+            source_type.setCurrentText("IPC/Feather")
+        elif subtype == 'orc':
+            source_type.setCurrentText("ORC")
+        elif subtype == 'avro':
+            source_type.setCurrentText("Avro")
+        elif subtype == 'fixed_width':
+            source_type.setCurrentText("Ancho Fijo")
+        elif subtype == 'xml':
+            source_type.setCurrentText("XML")
+        elif subtype == 'delta':
+            source_type.setCurrentText("Delta Lake")
         elif subtype == 'database':
             source_type.setCurrentText("Base de Datos")
         elif subtype == 'api':
@@ -246,12 +281,51 @@ class PropertiesPanel(QWidget):
                     pass
         
         # Path del archivo y botón de carga (solo para fuentes basadas en archivos)
-        if (subtype in ('csv', 'excel', 'json', 'parquet')) or (source_type.currentText() in ("CSV", "Excel", "JSON", "Parquet")):
+        is_delta = subtype == 'delta' or source_type.currentText() == "Delta Lake"
+        if (subtype in ('csv', 'excel', 'json', 'parquet', 'ipc', 'orc', 'avro', 'fixed_width', 'xml', 'delta')) or (source_type.currentText() in FILE_TYPE_LABELS):
             file_path = QLineEdit()
             file_path.setText(node_data.get('path', ''))
-            source_layout.addRow("Ruta del archivo:", file_path)
+            source_layout.addRow("Ruta de la tabla:" if is_delta else "Ruta del archivo:", file_path)
             self.file_path_field = file_path
             file_path.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
+            if is_delta:
+                # Viaje en el tiempo: vacío = última versión
+                delta_version = QLineEdit()
+                delta_version.setText(str(node_data.get('delta_version', '') or ''))
+                delta_version.setPlaceholderText("última")
+                source_layout.addRow("Versión:", delta_version)
+                self.source_option_fields['delta_version'] = delta_version
+                delta_version.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
+            else:
+                # Compresión detectada automáticamente; en .zip se puede filtrar qué miembros leer
+                zip_members = QLineEdit()
+                zip_members.setText(str(node_data.get('zip_member_pattern', '') or ''))
+                zip_members.setPlaceholderText("ej. ventas_*.csv (solo .zip)")
+                source_layout.addRow("Miembros ZIP:", zip_members)
+                self.source_option_fields['zip_member_pattern'] = zip_members
+                zip_members.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
+            self._add_storage_fields(source_layout, node_id, node_data, self.source_option_fields, 'source')
+            if subtype == 'orc' or source_type.currentText() == "ORC":
+                # Stripes leídos en paralelo; vacío = núcleos disponibles
+                read_workers = QLineEdit()
+                read_workers.setText(str(node_data.get('read_workers', '') or ''))
+                read_workers.setPlaceholderText("auto")
+                source_layout.addRow("Hilos de lectura:", read_workers)
+                self.source_option_fields['read_workers'] = read_workers
+                read_workers.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
+            if subtype == 'fixed_width' or source_type.currentText() == "Ancho Fijo":
+                self._add_fixed_width_fields(source_layout, node_id, node_data)
+            if subtype == 'xml' or source_type.currentText() == "XML":
+                self._add_xml_fields(source_layout, node_id, node_data)
+            if (subtype in ('csv', 'excel', 'json', 'parquet', 'ipc', 'orc', 'avro')
+                    or source_type.currentText() in ("CSV", "Excel", "JSON", "Parquet", "IPC/Feather", "ORC", "Avro")):
+                self._add_manifest_fields(source_layout, node_id, node_data)
+            if subtype in ('csv', 'json') or source_type.currentText() in ("CSV", "JSON"):
+                self._add_tail_fields(source_layout, node_id, node_data)
+            if subtype == 'csv' or source_type.currentText() == "CSV":
+                self._add_csv_format_fields(source_layout, node_id, node_data)
+                self._add_csv_reader_fields(source_layout, node_id, node_data)
+                self._add_source_cache_fields(source_layout, node_id, node_data)
 
         if subtype == 'csv' or source_type.currentText() == "CSV":
             load_button = QPushButton("Cargar Archivo")
@@ -269,6 +343,30 @@ class PropertiesPanel(QWidget):
             load_button = QPushButton("Cargar Archivo Parquet")
             load_button.clicked.connect(lambda: self.load_file(node_id, file_type='parquet'))
             source_layout.addRow(load_button)
+        elif subtype == 'ipc' or source_type.currentText() == "IPC/Feather":
+            load_button = QPushButton("Cargar Archivo IPC/Feather")
+            load_button.clicked.connect(lambda: self.load_file(node_id, file_type='ipc'))
+            source_layout.addRow(load_button)
+        elif subtype == 'orc' or source_type.currentText() == "ORC":
+            load_button = QPushButton("Cargar Archivo ORC")
+            load_button.clicked.connect(lambda: self.load_file(node_id, file_type='orc'))
+            source_layout.addRow(load_button)
+        elif subtype == 'avro' or source_type.currentText() == "Avro":
+            load_button = QPushButton("Cargar Archivo Avro")
+            load_button.clicked.connect(lambda: self.load_file(node_id, file_type='avro'))
+            source_layout.addRow(load_button)
+        elif subtype == 'fixed_width' or source_type.currentText() == "Ancho Fijo":
+            load_button = QPushButton("Cargar Archivo de Ancho Fijo")
+            load_button.clicked.connect(lambda: self.load_file(node_id, file_type='fixed_width'))
+            source_layout.addRow(load_button)
+        elif subtype == 'xml' or source_type.currentText() == "XML":
+            load_button = QPushButton("Cargar Archivo XML")
+            load_button.clicked.connect(lambda: self.load_file(node_id, file_type='xml'))
+            source_layout.addRow(load_button)
+        elif is_delta:
+            load_button = QPushButton("Cargar Tabla Delta")
+            load_button.clicked.connect(lambda: self.load_delta_table(node_id))
+            source_layout.addRow(load_button)
         
         if subtype == 'database' or source_type.currentText() == "Base de Datos":
             # Configuración de base de datos
@@ -315,9 +413,19 @@ class PropertiesPanel(QWidget):
                 'database': database,
                 'query': query
             }
+            # Lectura en streaming (cursor de servidor, memoria acotada)
+            stream = QCheckBox("Lectura en streaming (cursor de servidor)")
+            stream.setChecked(str(node_data.get('stream_results', '')).strip().lower() in ('1', 'true', 'yes', 'si', 'sí'))
+            stream.setToolTip("Lee la consulta por lotes y escribe cada lote en el destino sin cargar todo en memoria")
+            stream_batch = QLineEdit(); stream_batch.setText(str(node_data.get('stream_batch_size', '') or ''))
+            stream_batch.setPlaceholderText("50000")
+            source_layout.addRow(stream)
+            source_layout.addRow("Filas por lote:", stream_batch)
+            self.source_option_fields.update({'stream_results': stream, 'stream_batch_size': stream_batch})
+            stream.toggled.connect(lambda *_: self._schedule_autosave('source', node_id))
             # Auto-guardado para campos de BD
             db_type.currentTextChanged.connect(lambda *_: self._schedule_autosave('source', node_id))
-            for _fld in [host, port, user, password, database, query]:
+            for _fld in [host, port, user, password, database, query, stream_batch]:
                 _fld.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
             # Botones Base de Datos: Probar conexión y Vista previa
             btn_row = QHBoxLayout()
@@ -357,11 +465,27 @@ class PropertiesPanel(QWidget):
                 'headers': headers,
                 'params': params
             }
+            # Respuesta: formato, ruta del array de registros y lectura por lotes
+            api_format = QComboBox(); api_format.addItems(["auto", "json", "ndjson", "csv"])
+            api_format.setCurrentText(str(node_data.get('api_format') or 'auto'))
+            json_path = QLineEdit(); json_path.setText(str(node_data.get('json_path', '') or ''))
+            json_path.setPlaceholderText("ej. data o result.items (vacío = raíz)")
+            stream = QCheckBox("Escribir por lotes en el destino (streaming)")
+            stream.setChecked(str(node_data.get('stream_results', '')).strip().lower() in ('1', 'true', 'yes', 'si', 'sí'))
+            stream_batch = QLineEdit(); stream_batch.setText(str(node_data.get('stream_batch_size', '') or ''))
+            stream_batch.setPlaceholderText("50000")
+            source_layout.addRow("Formato respuesta:", api_format)
+            source_layout.addRow("Ruta JSON:", json_path)
+            source_layout.addRow(stream)
+            source_layout.addRow("Registros por lote:", stream_batch)
+            self.source_option_fields.update({'api_format': api_format, 'json_path': json_path,
+                                              'stream_results': stream, 'stream_batch_size': stream_batch})
             # Auto-guardado para campos de API
             method.currentTextChanged.connect(lambda *_: self._schedule_autosave('source', node_id))
-            url.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
-            headers.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
-            params.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
+            api_format.currentTextChanged.connect(lambda *_: self._schedule_autosave('source', node_id))
+            stream.toggled.connect(lambda *_: self._schedule_autosave('source', node_id))
+            for _fld in [url, headers, params, json_path, stream_batch]:
+                _fld.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
             
         source_group.setLayout(source_layout)
         self.layout.addWidget(source_group)
@@ -373,7 +497,7 @@ class PropertiesPanel(QWidget):
         
         # Selector de tipo de transformación
         transform_type = QComboBox()
-        transform_type.addItems(["Filtro", "Unión", "Agregación", "Mapeo", "Casteo"])
+        transform_type.addItems(["Filtro", "Unión", "Agregación", "Mapeo", "Casteo", "Aplanar"])
         
         # Establecer el subtipo actual si existe
         subtype = node_data.get('subtype')
@@ -387,6 +511,8 @@ class PropertiesPanel(QWidget):
             transform_type.setCurrentText("Mapeo")
         elif subtype == 'cast':
             transform_type.setCurrentText("Casteo")
+        elif subtype == 'flatten':
+            transform_type.setCurrentText("Aplanar")
             
         transform_layout.addRow("Tipo:", transform_type)
         
@@ -1137,6 +1263,26 @@ class PropertiesPanel(QWidget):
             cg_layout.addWidget(apply_btn)
             cast_group.setLayout(cg_layout)
             transform_layout.addRow(cast_group)
+
+        elif subtype == 'flatten' or transform_type.currentText() == "Aplanar":
+            # UI para aplanado de columnas anidadas (struct/list)
+            paths = QLineEdit(); paths.setText(str(node_data.get('flatten_paths', '') or ''))
+            paths.setPlaceholderText("ej. customer.address.city, items (vacío = todas)")
+            depth = QLineEdit(); depth.setText(str(node_data.get('flatten_depth', '') or ''))
+            depth.setPlaceholderText("vacío = todos los niveles")
+            explode = QLineEdit(); explode.setText(str(node_data.get('explode_columns', '') or ''))
+            explode.setPlaceholderText("listas a expandir en filas, ej. items")
+            separator = QLineEdit(); separator.setText(str(node_data.get('flatten_separator', '') or ''))
+            separator.setPlaceholderText("_")
+            transform_layout.addRow("Rutas:", paths)
+            transform_layout.addRow("Profundidad:", depth)
+            transform_layout.addRow("Expandir listas:", explode)
+            transform_layout.addRow("Separador:", separator)
+            self.transform_option_fields = {'flatten_paths': paths, 'flatten_depth': depth,
+                                            'explode_columns': explode, 'flatten_separator': separator}
+            for _fld in [paths, depth, explode, separator]:
+                _fld.editingFinished.connect(lambda: self._schedule_autosave('transform', node_id))
+                _fld.editingFinished.connect(lambda: QTimer.singleShot(200, lambda: self.fetch_connected_data.emit(node_id)))
             
         # --- Selección de columnas obligatoria para todos los nodos de transformación ---
         # Nota: para 'Unión' ya se muestra una sección dedicada de selección/renombrado,
@@ -1166,7 +1312,7 @@ class PropertiesPanel(QWidget):
         
         # Selector de tipo de destino
         dest_type = QComboBox()
-        dest_type.addItems(["CSV", "Excel", "JSON", "Parquet", "Base de Datos", "API"])
+        dest_type.addItems([label for label in SUBTYPE_BY_LABEL if label not in SOURCE_ONLY_LABELS])
         
         # Establecer el subtipo actual si existe
         subtype = node_data.get('subtype')
@@ -1178,6 +1324,14 @@ class PropertiesPanel(QWidget):
             dest_type.setCurrentText("JSON")
         elif subtype == 'parquet':
             dest_type.setCurrentText("Parquet")
+        elif subtype in ('ipc', 'feather', 'arrow'):
+            dest_type.setCurrentText("IPC/Feather")
+        elif subtype == 'orc':
+            dest_type.setCurrentText("ORC")
+        elif subtype == 'avro':
+            dest_type.setCurrentText("Avro")
+        elif subtype == 'delta':
+            dest_type.setCurrentText("Delta Lake")
         elif subtype == 'database':
             dest_type.setCurrentText("Base de Datos")
         elif subtype == 'api':
@@ -1240,6 +1394,7 @@ class PropertiesPanel(QWidget):
             dest_layout.addRow("Formato:", format_type)
             self.dest_format = format_type
             format_type.currentTextChanged.connect(lambda *_: self._schedule_autosave('destination', node_id))
+            self._add_compression_fields(dest_layout, node_id, node_data)
         elif subtype == 'excel' or dest_type.currentText() == "Excel":
             file_path = QLineEdit()
             file_path.setText(node_data.get('path', ''))
@@ -1254,6 +1409,24 @@ class PropertiesPanel(QWidget):
                 format_type.setCurrentText(node_data['format'])
             dest_layout.addRow("Formato:", format_type)
             self.dest_format = format_type
+
+            # Opciones de escritura Excel (hojas y división automática)
+            xl_sheet = QLineEdit(); xl_sheet.setText(str(node_data.get('excel_sheet', '') or ''))
+            xl_sheet.setPlaceholderText("Datos")
+            xl_split = QLineEdit(); xl_split.setText(str(node_data.get('excel_split_by', '') or ''))
+            xl_split.setPlaceholderText("columna (una hoja por valor)")
+            xl_max_rows = QLineEdit(); xl_max_rows.setText(str(node_data.get('excel_max_rows', '') or ''))
+            xl_max_rows.setPlaceholderText("1048575")
+            dest_layout.addRow("Hoja:", xl_sheet)
+            dest_layout.addRow("Hoja por columna:", xl_split)
+            dest_layout.addRow("Máx. filas por hoja:", xl_max_rows)
+            self.dest_option_fields.update({
+                'excel_sheet': xl_sheet,
+                'excel_split_by': xl_split,
+                'excel_max_rows': xl_max_rows,
+            })
+            for _fld in [xl_sheet, xl_split, xl_max_rows]:
+                _fld.editingFinished.connect(lambda: self._schedule_autosave('destination', node_id))
         elif subtype == 'json' or dest_type.currentText() == "JSON":
             file_path = QLineEdit()
             file_path.setText(node_data.get('path', ''))
@@ -1263,11 +1436,19 @@ class PropertiesPanel(QWidget):
             select_path.clicked.connect(lambda: self.select_output_path('json'))
             dest_layout.addRow(select_path)
             format_type = QComboBox()
-            format_type.addItems(["JSON"])
+            # JSON: array escrito por bloques; JSON Lines: un objeto por línea (NDJSON)
+            format_type.addItems(["JSON", "JSON Lines"])
             if 'format' in node_data:
                 format_type.setCurrentText(node_data['format'])
             dest_layout.addRow("Formato:", format_type)
             self.dest_format = format_type
+            format_type.currentTextChanged.connect(lambda *_: self._schedule_autosave('destination', node_id))
+            json_batch = QLineEdit(); json_batch.setText(str(node_data.get('json_batch_size', '') or ''))
+            json_batch.setPlaceholderText(f"{file_io.JSON_WRITE_BATCH_ROWS} (filas por bloque)")
+            dest_layout.addRow("Filas por bloque:", json_batch)
+            self.dest_option_fields['json_batch_size'] = json_batch
+            json_batch.editingFinished.connect(lambda: self._schedule_autosave('destination', node_id))
+            self._add_compression_fields(dest_layout, node_id, node_data)
         elif subtype == 'parquet' or dest_type.currentText() == "Parquet":
             file_path = QLineEdit()
             file_path.setText(node_data.get('path', ''))
@@ -1282,6 +1463,140 @@ class PropertiesPanel(QWidget):
                 format_type.setCurrentText(node_data['format'])
             dest_layout.addRow("Formato:", format_type)
             self.dest_format = format_type
+
+            # Opciones de layout Parquet (row groups, compresión, estadísticas, orden)
+            pq_compression = QComboBox()
+            pq_compression.addItems(["zstd", "lz4", "snappy", "gzip", "brotli", "uncompressed"])
+            pq_compression.setCurrentText(str(node_data.get('parquet_compression') or 'zstd'))
+            pq_level = QLineEdit(); pq_level.setText(str(node_data.get('parquet_compression_level', '') or ''))
+            pq_level.setPlaceholderText("por defecto del códec")
+            pq_row_group = QLineEdit(); pq_row_group.setText(str(node_data.get('parquet_row_group_size', '') or ''))
+            pq_row_group.setPlaceholderText("ej. 122880")
+            pq_sort_by = QLineEdit(); pq_sort_by.setText(str(node_data.get('parquet_sort_by', '') or ''))
+            pq_sort_by.setPlaceholderText("col1,col2")
+            pq_sort_by.setToolTip("Ordenar antes de escribir para que las estadísticas min/max permitan saltar row groups")
+            pq_stats = QCheckBox("Escribir estadísticas"); pq_stats.setChecked(bool(node_data.get('parquet_statistics', True)))
+            pq_dict = QCheckBox("Codificación diccionario"); pq_dict.setChecked(bool(node_data.get('parquet_dictionary', True)))
+            dest_layout.addRow("Compresión:", pq_compression)
+            dest_layout.addRow("Nivel compresión:", pq_level)
+            dest_layout.addRow("Filas por row group:", pq_row_group)
+            dest_layout.addRow("Ordenar por:", pq_sort_by)
+            dest_layout.addRow(pq_stats)
+            dest_layout.addRow(pq_dict)
+            self.dest_option_fields.update({
+                'parquet_compression': pq_compression,
+                'parquet_compression_level': pq_level,
+                'parquet_row_group_size': pq_row_group,
+                'parquet_sort_by': pq_sort_by,
+                'parquet_statistics': pq_stats,
+                'parquet_dictionary': pq_dict,
+            })
+            pq_compression.currentTextChanged.connect(lambda *_: self._schedule_autosave('destination', node_id))
+            for _fld in [pq_level, pq_row_group, pq_sort_by]:
+                _fld.editingFinished.connect(lambda: self._schedule_autosave('destination', node_id))
+            for _chk in [pq_stats, pq_dict]:
+                _chk.toggled.connect(lambda *_: self._schedule_autosave('destination', node_id))
+        elif subtype in ('ipc', 'feather', 'arrow') or dest_type.currentText() == "IPC/Feather":
+            file_path = QLineEdit()
+            file_path.setText(node_data.get('path', ''))
+            dest_layout.addRow("Ruta del archivo:", file_path)
+            self.dest_file_path = file_path
+            file_path.editingFinished.connect(lambda: self._schedule_autosave('destination', node_id))
+            select_path = QPushButton("Seleccionar ruta")
+            select_path.clicked.connect(lambda: self.select_output_path('ipc'))
+            dest_layout.addRow(select_path)
+            format_type = QComboBox()
+            format_type.addItems(["IPC/Feather"])
+            dest_layout.addRow("Formato:", format_type)
+            self.dest_format = format_type
+            # Sin compresión el archivo se puede abrir con memory-map (lectura zero-copy)
+            ipc_compression = QComboBox()
+            ipc_compression.addItems(["uncompressed", "lz4", "zstd"])
+            ipc_compression.setCurrentText(str(node_data.get('ipc_compression') or 'uncompressed'))
+            ipc_compression.setToolTip("Sin compresión permite lectura por memory-map sin copias")
+            dest_layout.addRow("Compresión:", ipc_compression)
+            self.dest_option_fields['ipc_compression'] = ipc_compression
+            ipc_compression.currentTextChanged.connect(lambda *_: self._schedule_autosave('destination', node_id))
+        elif subtype == 'orc' or dest_type.currentText() == "ORC":
+            file_path = QLineEdit()
+            file_path.setText(node_data.get('path', ''))
+            dest_layout.addRow("Ruta del archivo:", file_path)
+            self.dest_file_path = file_path
+            file_path.editingFinished.connect(lambda: self._schedule_autosave('destination', node_id))
+            select_path = QPushButton("Seleccionar ruta")
+            select_path.clicked.connect(lambda: self.select_output_path('orc'))
+            dest_layout.addRow(select_path)
+            format_type = QComboBox()
+            format_type.addItems(["ORC"])
+            dest_layout.addRow("Formato:", format_type)
+            self.dest_format = format_type
+            orc_compression = QComboBox()
+            orc_compression.addItems(list(orc_avro.ORC_COMPRESSIONS))
+            orc_compression.setCurrentText(str(node_data.get('orc_compression') or 'zstd'))
+            orc_stripe = QLineEdit(); orc_stripe.setText(str(node_data.get('orc_stripe_size_mb', '') or ''))
+            orc_stripe.setPlaceholderText("64 (MB por stripe)")
+            dest_layout.addRow("Compresión:", orc_compression)
+            dest_layout.addRow("Tamaño de stripe:", orc_stripe)
+            self.dest_option_fields.update({'orc_compression': orc_compression, 'orc_stripe_size_mb': orc_stripe})
+            orc_compression.currentTextChanged.connect(lambda *_: self._schedule_autosave('destination', node_id))
+            orc_stripe.editingFinished.connect(lambda: self._schedule_autosave('destination', node_id))
+        elif subtype == 'avro' or dest_type.currentText() == "Avro":
+            file_path = QLineEdit()
+            file_path.setText(node_data.get('path', ''))
+            dest_layout.addRow("Ruta del archivo:", file_path)
+            self.dest_file_path = file_path
+            file_path.editingFinished.connect(lambda: self._schedule_autosave('destination', node_id))
+            select_path = QPushButton("Seleccionar ruta")
+            select_path.clicked.connect(lambda: self.select_output_path('avro'))
+            dest_layout.addRow(select_path)
+            format_type = QComboBox()
+            format_type.addItems(["Avro"])
+            dest_layout.addRow("Formato:", format_type)
+            self.dest_format = format_type
+            avro_compression = QComboBox()
+            avro_compression.addItems(list(orc_avro.AVRO_COMPRESSIONS))
+            avro_compression.setCurrentText(str(node_data.get('avro_compression') or 'uncompressed'))
+            dest_layout.addRow("Compresión:", avro_compression)
+            self.dest_option_fields['avro_compression'] = avro_compression
+            avro_compression.currentTextChanged.connect(lambda *_: self._schedule_autosave('destination', node_id))
+        elif subtype == 'delta' or dest_type.currentText() == "Delta Lake":
+            file_path = QLineEdit()
+            file_path.setText(node_data.get('path', ''))
+            dest_layout.addRow("Ruta de la tabla:", file_path)
+            self.dest_file_path = file_path
+            file_path.editingFinished.connect(lambda: self._schedule_autosave('destination', node_id))
+            select_path = QPushButton("Seleccionar carpeta")
+            select_path.clicked.connect(lambda: self.select_delta_path(node_id))
+            dest_layout.addRow(select_path)
+            format_type = QComboBox()
+            format_type.addItems(["Delta Lake"])
+            dest_layout.addRow("Formato:", format_type)
+            self.dest_format = format_type
+            delta_mode = QComboBox()
+            delta_mode.addItems(list(delta_lake.DELTA_MODES))
+            delta_mode.setCurrentText(str(node_data.get('delta_mode') or 'append'))
+            delta_mode.setToolTip("overwrite_partitions reemplaza solo las particiones presentes; merge hace upsert por claves")
+            partition_by = QLineEdit(); partition_by.setText(str(node_data.get('partition_by', '') or ''))
+            partition_by.setPlaceholderText("col1,col2")
+            merge_keys = QLineEdit(); merge_keys.setText(str(node_data.get('merge_keys', '') or ''))
+            merge_keys.setPlaceholderText("id (solo merge)")
+            delta_predicate = QLineEdit(); delta_predicate.setText(str(node_data.get('delta_predicate', '') or ''))
+            delta_predicate.setPlaceholderText("ej. fecha >= '2024-01-01' (vacío = particiones del lote)")
+            dest_layout.addRow("Modo:", delta_mode)
+            dest_layout.addRow("Particionar por:", partition_by)
+            dest_layout.addRow("Claves merge:", merge_keys)
+            dest_layout.addRow("Predicado reemplazo:", delta_predicate)
+            self.dest_option_fields.update({
+                'delta_mode': delta_mode,
+                'partition_by': partition_by,
+                'merge_keys': merge_keys,
+                'delta_predicate': delta_predicate,
+            })
+            delta_mode.currentTextChanged.connect(lambda *_: self._schedule_autosave('destination', node_id))
+            for _fld in [partition_by, merge_keys, delta_predicate]:
+                _fld.editingFinished.connect(lambda: self._schedule_autosave('destination', node_id))
+        if subtype in ('csv', 'excel', 'json', 'parquet', 'ipc', 'feather', 'arrow', 'orc', 'avro', 'delta') or dest_type.currentText() in FILE_TYPE_LABELS:
+            self._add_storage_fields(dest_layout, node_id, node_data, self.dest_option_fields, 'destination')
         # Campos de Base de Datos (si aplica)
         if subtype == 'database' or dest_type.currentText() == "Base de Datos":
             db_type = QComboBox()
@@ -1297,7 +1612,8 @@ class PropertiesPanel(QWidget):
             password.setEchoMode(QLineEdit.EchoMode.Password)
             database = QLineEdit(); database.setText(node_data.get('database', ''))
             table = QLineEdit(); table.setText(node_data.get('table', ''))
-            if_exists = QComboBox(); if_exists.addItems(["replace", "append", "fail"])
+            if_exists = QComboBox(); if_exists.addItems(["replace", "append", "fail", "swap"])
+            if_exists.setToolTip("swap: carga en <tabla>__staging y la intercambia al terminar, sin dejar la tabla vacía")
             if 'if_exists' in node_data:
                 if_exists.setCurrentText(node_data['if_exists'])
 
@@ -1324,6 +1640,8 @@ class PropertiesPanel(QWidget):
             if_exists.currentTextChanged.connect(lambda *_: self._schedule_autosave('destination', node_id))
             for _fld in [host, port, user, password, database, table]:
                 _fld.editingFinished.connect(lambda: self._schedule_autosave('destination', node_id))
+            self._add_db_load_fields(dest_layout, node_id, node_data)
+            self._add_db_ddl_fields(dest_layout, node_id, node_data)
             # Botón Probar conexión (destino)
             test_btn = QPushButton("Probar conexión")
             test_btn.clicked.connect(self._on_test_dest_db_connection)
@@ -1381,7 +1699,7 @@ class PropertiesPanel(QWidget):
             QMessageBox.critical(self, "Error", f"Error al probar conexión: {e}")
     
     def _on_preview_source_db(self, node_id):
-        """Ejecuta la consulta del origen BD y muestra una vista previa (hasta 100 filas)."""
+        """Ejecuta la consulta del origen BD y muestra una vista previa (hasta DB_PREVIEW_ROWS filas)."""
         try:
             fields = getattr(self, 'db_fields', None)
             if not fields:
@@ -1439,29 +1757,24 @@ class PropertiesPanel(QWidget):
             else:
                 QMessageBox.warning(self, "Vista previa", f"Tipo de base de datos no soportado: {db_type}")
                 return
-            # Usar la consulta tal cual como vista previa (sin LIMIT/TOP)
-            q = query.strip().rstrip(';')
-            preview_sql = q
-            # Ejecutar y mostrar
-            import pandas as pd
+            # Ejecutar y mostrar: la consulta se envuelve con LIMIT/TOP según el dialecto
             engine = create_engine(url, pool_pre_ping=True, connect_args=connect_args or {})
             with engine.connect() as conn:
-                pdf = pd.read_sql(text(preview_sql), conn)
+                df = preview.read_sql_head(conn, query, db_type, DB_PREVIEW_ROWS)
             try:
                 engine.dispose()
             except Exception:
                 pass
-            # Convertir a Polars
-            df = pl.from_pandas(pdf) if hasattr(pdf, 'columns') else pl.DataFrame(pdf)
             # Guardar y refrescar UI
             self.node_configs.setdefault(node_id, {})
             self.node_configs[node_id]['dataframe'] = df
+            self.node_configs[node_id][preview.PREVIEW_KEY] = True
             self.current_dataframes[node_id] = df
             # Disparar cambio para propagar preview a nodos conectados
             self.node_config_changed.emit(node_id, self.node_configs[node_id])
             # Reconstruir panel para mostrar Vista previa + Columnas a pasar
             self.show_node_properties(node_id, 'source', self.node_configs[node_id])
-            self.log_message("Vista previa de base de datos cargada (hasta 100 filas)")
+            self.log_message(f"Vista previa de base de datos cargada (hasta {DB_PREVIEW_ROWS} filas)")
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -1541,8 +1854,7 @@ class PropertiesPanel(QWidget):
             return
         self.current_source_type = new_type
         # Convertir el tipo UI a subtipo interno
-        subtype_map = {"CSV": "csv", "Excel": "excel", "JSON": "json", "Parquet": "parquet", "Base de Datos": "database", "API": "api"}
-        subtype = subtype_map.get(new_type, "csv")
+        subtype = SUBTYPE_BY_LABEL.get(new_type, "csv")
         
         # Guardar el subtipo en la configuración del nodo
         self.node_configs[node_id]['subtype'] = subtype
@@ -1576,7 +1888,8 @@ class PropertiesPanel(QWidget):
             return
         self.current_transform_type = new_type
         # Convertir el tipo UI a subtipo interno
-        subtype_map = {"Filtro": "filter", "Unión": "join", "Agregación": "aggregate", "Mapeo": "map"}
+        subtype_map = {"Filtro": "filter", "Unión": "join", "Agregación": "aggregate", "Mapeo": "map",
+                       "Casteo": "cast", "Aplanar": "flatten"}
         subtype = subtype_map.get(new_type, "filter")
         
         # Guardar el subtipo en la configuración del nodo
@@ -1590,8 +1903,7 @@ class PropertiesPanel(QWidget):
         if getattr(self, '_ui_rebuilding', False):
             return
         self.current_dest_type = new_type
-        subtype_map = {"CSV": "csv", "Excel": "excel", "JSON": "json", "Parquet": "parquet", "Base de Datos": "database", "API": "api"}
-        subtype = subtype_map.get(new_type, "csv")
+        subtype = SUBTYPE_BY_LABEL.get(new_type, "csv")
         self.node_configs[node_id]['subtype'] = subtype
         QTimer.singleShot(0, lambda: self.show_node_properties(node_id, 'destination', self.node_configs[node_id]))
         QTimer.singleShot(0, lambda: self.node_config_changed.emit(node_id, self.node_configs[node_id]))
@@ -1638,16 +1950,18 @@ class PropertiesPanel(QWidget):
             str(config.get('method', '')),
             str(config.get('headers', '')),
             str(config.get('params', '')),
+            str(sorted((k, str(config.get(k, ''))) for k in (getattr(self, 'source_option_fields', None) or {}))),
         )
         
         # Guardar configuración según el tipo
-        if source_type in ("CSV", "Excel", "JSON", "Parquet"):
+        if source_type in FILE_TYPE_LABELS:
             if hasattr(self, 'file_path_field'):
                 try:
                     config['path'] = self.file_path_field.text()
                 except RuntimeError:
                     # El widget pudo haber sido destruido si se reconstruyó el panel
                     pass
+            self._collect_option_fields(getattr(self, 'source_option_fields', None), config)
             
             # Guardar mapeo de columnas si existe
             rows = 0
@@ -1681,6 +1995,7 @@ class PropertiesPanel(QWidget):
                         config[key] = field.currentText()
                     else:
                         config[key] = field.text()
+            self._collect_option_fields(getattr(self, 'source_option_fields', None), config)
                         
         elif source_type == "API":
             if hasattr(self, 'api_fields'):
@@ -1689,10 +2004,11 @@ class PropertiesPanel(QWidget):
                         config[key] = field.currentText()
                     else:
                         config[key] = field.text()
+            self._collect_option_fields(getattr(self, 'source_option_fields', None), config)
         
         # Validaciones básicas
         try:
-            if source_type in ("CSV", "Excel", "JSON", "Parquet"):
+            if source_type in FILE_TYPE_LABELS:
                 if not config.get('path'):
                     QMessageBox.warning(self, "Falta ruta", "Debe seleccionar la ruta del archivo de origen.")
                     return
@@ -1738,6 +2054,7 @@ class PropertiesPanel(QWidget):
             str(config.get('method', '')),
             str(config.get('headers', '')),
             str(config.get('params', '')),
+            str(sorted((k, str(config.get(k, ''))) for k in (getattr(self, 'source_option_fields', None) or {}))),
         )
         if new_fp == prev_fp:
             # No hay cambios efectivos; no emitir
@@ -1841,6 +2158,9 @@ class PropertiesPanel(QWidget):
             config['subtype'] = 'map'
             if hasattr(self, 'map_expr_field'):
                 config['map_expr'] = self.map_expr_field.text()
+        elif transform_type == "Aplanar":
+            config['subtype'] = 'flatten'
+            self._collect_option_fields(getattr(self, 'transform_option_fields', None), config)
         elif transform_type == "Casteo":
             config['subtype'] = 'cast'
             # Guardar estructuras de casteo
@@ -2020,7 +2340,7 @@ class PropertiesPanel(QWidget):
         config = self.node_configs.get(node_id, {})
         
         # Guardar configuración según el tipo
-        if dest_type in ("CSV", "Excel", "JSON", "Parquet"):
+        if dest_type in FILE_TYPE_LABELS:
             if hasattr(self, 'dest_file_path'):
                 try:
                     config['path'] = self.dest_file_path.text()
@@ -2032,6 +2352,7 @@ class PropertiesPanel(QWidget):
                     config['format'] = self.dest_format.currentText()
                 except RuntimeError:
                     pass
+            self._collect_option_fields(getattr(self, 'dest_option_fields', None), config)
 
         elif dest_type == "Base de Datos":
             if hasattr(self, 'dest_db_fields'):
@@ -2044,6 +2365,7 @@ class PropertiesPanel(QWidget):
                     except RuntimeError:
                         # Campo ya destruido; ignorar
                         pass
+            self._collect_option_fields(getattr(self, 'dest_option_fields', None), config)
                         
         elif dest_type == "API":
             if hasattr(self, 'dest_api_fields'):
@@ -2083,7 +2405,7 @@ class PropertiesPanel(QWidget):
 
         # Validaciones básicas
         try:
-            if dest_type in ("CSV", "Excel", "JSON", "Parquet"):
+            if dest_type in FILE_TYPE_LABELS:
                 if not (config.get('path') and str(config.get('path')).strip()):
                     QMessageBox.warning(self, "Falta ruta", "Debe seleccionar la ruta del archivo de destino.")
                     return
@@ -2126,6 +2448,334 @@ class PropertiesPanel(QWidget):
         
         QMessageBox.information(self, "Configuración guardada", "La configuración del nodo ha sido guardada")
         
+    def _add_compression_fields(self, dest_layout, node_id, node_data):
+        """Agrega selector de compresión de salida (auto = según extensión) y nivel."""
+        compression = QComboBox()
+        compression.addItems(["auto", "none", "gzip", "bz2", "xz", "zstd", "zip"])
+        compression.setCurrentText(str(node_data.get('compression') or 'auto'))
+        compression.setToolTip("auto: según la extensión de la ruta (.gz, .bz2, .xz, .zst, .zip)")
+        level = QLineEdit(); level.setText(str(node_data.get('compression_level', '') or ''))
+        level.setPlaceholderText("por defecto del códec")
+        dest_layout.addRow("Compresión:", compression)
+        dest_layout.addRow("Nivel compresión:", level)
+        self.dest_option_fields.update({'compression': compression, 'compression_level': level})
+        compression.currentTextChanged.connect(lambda *_: self._schedule_autosave('destination', node_id))
+        level.editingFinished.connect(lambda: self._schedule_autosave('destination', node_id))
+
+    def _add_db_load_fields(self, dest_layout, node_id, node_data):
+        """Opciones de carga en tabla: bloques en paralelo, modo atómico o reanudable."""
+        load_mode = QComboBox()
+        load_mode.addItems(["direct", "atomic", "resumable"])
+        load_mode.setCurrentText(str(node_data.get('load_mode') or 'direct'))
+        load_mode.setToolTip("atomic: staging + INSERT SELECT en una transacción; "
+                             "resumable: un reintento continúa desde el último bloque confirmado")
+        workers = QLineEdit(); workers.setText(str(node_data.get('insert_workers', '') or ''))
+        workers.setPlaceholderText("1 (conexiones en paralelo)")
+        chunk_size = QLineEdit(); chunk_size.setText(str(node_data.get('insert_chunk_size', '') or ''))
+        chunk_size.setPlaceholderText("10000 (filas por commit)")
+        load_id = QLineEdit(); load_id.setText(str(node_data.get('load_id', '') or ''))
+        load_id.setPlaceholderText("automático: hash de los datos (solo reanudable)")
+        dest_layout.addRow("Modo de carga:", load_mode)
+        dest_layout.addRow("Conexiones:", workers)
+        dest_layout.addRow("Filas por bloque:", chunk_size)
+        dest_layout.addRow("Id de carga:", load_id)
+        self.dest_option_fields.update({
+            'load_mode': load_mode,
+            'insert_workers': workers,
+            'insert_chunk_size': chunk_size,
+            'load_id': load_id,
+        })
+        load_mode.currentTextChanged.connect(lambda *_: self._schedule_autosave('destination', node_id))
+        for _fld in [workers, chunk_size, load_id]:
+            _fld.editingFinished.connect(lambda: self._schedule_autosave('destination', node_id))
+
+    def _add_db_ddl_fields(self, dest_layout, node_id, node_data):
+        """Definición de la tabla destino: clave primaria, longitudes VARCHAR e índices."""
+        primary_key = QLineEdit(); primary_key.setText(str(node_data.get('primary_key', '') or ''))
+        primary_key.setPlaceholderText("col1,col2")
+        varchar_default = QLineEdit(); varchar_default.setText(str(node_data.get('varchar_default', '') or ''))
+        varchar_default.setPlaceholderText("TEXT; número o 'auto'")
+        varchar_lengths = QLineEdit(); varchar_lengths.setText(str(node_data.get('varchar_lengths', '') or ''))
+        varchar_lengths.setPlaceholderText("col:100,col2:20")
+        indexes = QLineEdit(); indexes.setText(str(node_data.get('indexes', '') or ''))
+        indexes.setPlaceholderText("col1;col2,col3 (un índice por grupo)")
+        indexes.setToolTip("Se crean después de la carga")
+        drop_indexes = QCheckBox("Quitar índices durante la carga")
+        drop_indexes.setChecked(str(node_data.get('drop_indexes', '')).strip().lower() in ('1', 'true', 'yes', 'si', 'sí'))
+        drop_indexes.setToolTip("Elimina los índices existentes antes de cargar y los recrea al terminar")
+        dest_layout.addRow("Clave primaria:", primary_key)
+        dest_layout.addRow("Longitud VARCHAR:", varchar_default)
+        dest_layout.addRow("VARCHAR por columna:", varchar_lengths)
+        dest_layout.addRow("Índices:", indexes)
+        dest_layout.addRow(drop_indexes)
+        self.dest_option_fields.update({
+            'primary_key': primary_key,
+            'varchar_default': varchar_default,
+            'varchar_lengths': varchar_lengths,
+            'indexes': indexes,
+            'drop_indexes': drop_indexes,
+        })
+        for _fld in [primary_key, varchar_default, varchar_lengths, indexes]:
+            _fld.editingFinished.connect(lambda: self._schedule_autosave('destination', node_id))
+        drop_indexes.toggled.connect(lambda *_: self._schedule_autosave('destination', node_id))
+        keep_old = QCheckBox("Conservar tabla anterior (swap)")
+        keep_old.setChecked(str(node_data.get('swap_keep_old', '')).strip().lower() in ('1', 'true', 'yes', 'si', 'sí'))
+        keep_old.setToolTip("Tras el intercambio la tabla previa queda como <tabla>__old")
+        dest_layout.addRow(keep_old)
+        self.dest_option_fields['swap_keep_old'] = keep_old
+        keep_old.toggled.connect(lambda *_: self._schedule_autosave('destination', node_id))
+        pandas_to_sql = QCheckBox("Crear tabla con pandas.to_sql")
+        pandas_to_sql.setChecked(str(node_data.get('pandas_to_sql', '')).strip().lower() in ('1', 'true', 'yes', 'si', 'sí'))
+        pandas_to_sql.setToolTip("Tipos inferidos por pandas en lugar del DDL generado desde el esquema "
+                                 "(se ignora con clave primaria, VARCHAR, índices u opciones de carga)")
+        dest_layout.addRow(pandas_to_sql)
+        self.dest_option_fields['pandas_to_sql'] = pandas_to_sql
+        pandas_to_sql.toggled.connect(lambda *_: self._schedule_autosave('destination', node_id))
+
+    def _add_storage_fields(self, layout, node_id, node_data, fields, scope):
+        """Opciones para rutas remotas (s3://, sftp://, memory://, ...): credenciales y caché local."""
+        storage = node_data.get('storage_options', '')
+        storage_opts = QLineEdit()
+        storage_opts.setText(json.dumps(storage) if isinstance(storage, dict) else str(storage or ''))
+        storage_opts.setPlaceholderText("key:...,secret:...,endpoint_url:...")
+        storage_opts.setToolTip("Opciones del sistema de archivos fsspec (solo rutas con protocolo)")
+        cache_dir = QLineEdit(); cache_dir.setText(str(node_data.get('fs_cache_dir', '') or ''))
+        cache_dir.setPlaceholderText("directorio de caché local (opcional)")
+        layout.addRow("Opciones almacenamiento:", storage_opts)
+        layout.addRow("Caché remota:", cache_dir)
+        fields.update({'storage_options': storage_opts, 'fs_cache_dir': cache_dir})
+        for _fld in [storage_opts, cache_dir]:
+            _fld.editingFinished.connect(lambda: self._schedule_autosave(scope, node_id))
+
+    def _add_csv_format_fields(self, layout, node_id, node_data):
+        """Codificación, delimitador y comillas del CSV; vacíos se detectan al cargar el archivo."""
+        encoding = QLineEdit(); encoding.setText(str(node_data.get('encoding', '') or ''))
+        encoding.setPlaceholderText("auto (utf-8, cp1252, latin-1, ...)")
+        separator = QLineEdit(); separator.setText(str(node_data.get('separator', '') or ''))
+        separator.setPlaceholderText("auto (, ; \\t |)")
+        quote_char = QLineEdit(); quote_char.setText(str(node_data.get('quote_char', '') or ''))
+        quote_char.setPlaceholderText('auto (")')
+        layout.addRow("Codificación:", encoding)
+        layout.addRow("Delimitador:", separator)
+        layout.addRow("Comillas:", quote_char)
+        self.source_option_fields.update({'encoding': encoding, 'separator': separator, 'quote_char': quote_char})
+        for _fld in [encoding, separator, quote_char]:
+            _fld.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
+
+    def _add_fixed_width_fields(self, layout, node_id, node_data):
+        """Columnas (nombre:inicio:longitud:tipo), codificación, filtro por tipo de registro y lotes."""
+        spec = node_data.get('fixed_width_spec', '')
+        if isinstance(spec, (list, tuple)):
+            spec = ', '.join(f"{c.get('name')}:{c.get('start')}:{c.get('length')}:{c.get('dtype') or 'str'}" for c in spec)
+        fw_spec = QLineEdit(); fw_spec.setText(str(spec or ''))
+        fw_spec.setPlaceholderText("id:1:6:int, nombre:7:20:str, fecha:27:8:date")
+        fw_spec.setToolTip("Inicio 1 = primer carácter. Tipos: str, int, float, date, datetime")
+        encoding = QLineEdit(); encoding.setText(str(node_data.get('encoding', '') or ''))
+        encoding.setPlaceholderText("utf-8 (cp037/cp500 para EBCDIC)")
+        record_length = QLineEdit(); record_length.setText(str(node_data.get('record_length', '') or ''))
+        record_length.setPlaceholderText("vacío = un registro por línea")
+        rt_start = QLineEdit(); rt_start.setText(str(node_data.get('record_type_start', '') or ''))
+        rt_start.setPlaceholderText("posición del tipo de registro")
+        rt_length = QLineEdit(); rt_length.setText(str(node_data.get('record_type_length', '') or ''))
+        rt_length.setPlaceholderText("longitud (defecto: la de los valores)")
+        rt_values = QLineEdit(); rt_values.setText(str(node_data.get('record_types', '') or ''))
+        rt_values.setPlaceholderText("ej. 01,02")
+        date_fmt = QLineEdit(); date_fmt.setText(str(node_data.get('fixed_width_date_format', '') or ''))
+        date_fmt.setPlaceholderText(fixed_width.DEFAULT_DATE_FORMAT)
+        trim = QCheckBox("Recortar espacios")
+        trim.setChecked(str(node_data.get('fixed_width_trim', True)).strip().lower() not in ('0', 'false', 'no'))
+        stream = QCheckBox("Leer por lotes (streaming)")
+        stream.setChecked(str(node_data.get('stream_results', '')).strip().lower() in ('1', 'true', 'yes', 'si', 'sí'))
+        batch = QLineEdit(); batch.setText(str(node_data.get('stream_batch_size', '') or ''))
+        batch.setPlaceholderText("50000 (registros por lote)")
+        layout.addRow("Columnas:", fw_spec)
+        layout.addRow("Codificación:", encoding)
+        layout.addRow("Longitud de registro:", record_length)
+        layout.addRow("Tipo de registro (inicio):", rt_start)
+        layout.addRow("Tipo de registro (longitud):", rt_length)
+        layout.addRow("Tipos a conservar:", rt_values)
+        layout.addRow("Formato de fecha:", date_fmt)
+        layout.addRow(trim)
+        layout.addRow(stream)
+        layout.addRow("Tamaño de lote:", batch)
+        self.source_option_fields.update({
+            'fixed_width_spec': fw_spec, 'encoding': encoding, 'record_length': record_length,
+            'record_type_start': rt_start, 'record_type_length': rt_length, 'record_types': rt_values,
+            'fixed_width_date_format': date_fmt, 'fixed_width_trim': trim,
+            'stream_results': stream, 'stream_batch_size': batch,
+        })
+        for _fld in [fw_spec, encoding, record_length, rt_start, rt_length, rt_values, date_fmt, batch]:
+            _fld.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
+        for _chk in [trim, stream]:
+            _chk.toggled.connect(lambda *_: self._schedule_autosave('source', node_id))
+
+    def _add_xml_fields(self, layout, node_id, node_data):
+        """Ruta del elemento de registro, columnas a extraer, prefijo de atributos y lotes."""
+        record_path = QLineEdit(); record_path.setText(str(node_data.get('xml_record_path', '') or ''))
+        record_path.setPlaceholderText("ej. productos/producto (o /catalogo/productos/producto)")
+        record_path.setToolTip("Elemento que forma cada registro; con '/' inicial la ruta es absoluta desde la raíz")
+        columns = QLineEdit(); columns.setText(str(node_data.get('xml_columns', '') or ''))
+        columns.setPlaceholderText("vacío = todas (ej. id, nombre, precio_moneda)")
+        columns.setToolTip("Atributos e hijos del registro; los anidados como 'hijo_nieto' o 'hijo_atributo'")
+        attr_prefix = QLineEdit(); attr_prefix.setText(str(node_data.get('xml_attr_prefix', '') or ''))
+        attr_prefix.setPlaceholderText("ninguno")
+        stream = QCheckBox("Leer por lotes (streaming)")
+        stream.setChecked(str(node_data.get('stream_results', '')).strip().lower() in ('1', 'true', 'yes', 'si', 'sí'))
+        batch = QLineEdit(); batch.setText(str(node_data.get('stream_batch_size', '') or ''))
+        batch.setPlaceholderText("50000 (registros por lote)")
+        layout.addRow("Elemento de registro:", record_path)
+        layout.addRow("Columnas:", columns)
+        layout.addRow("Prefijo de atributos:", attr_prefix)
+        layout.addRow(stream)
+        layout.addRow("Tamaño de lote:", batch)
+        self.source_option_fields.update({
+            'xml_record_path': record_path, 'xml_columns': columns, 'xml_attr_prefix': attr_prefix,
+            'stream_results': stream, 'stream_batch_size': batch,
+        })
+        for _fld in [record_path, columns, attr_prefix, batch]:
+            _fld.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
+        stream.toggled.connect(lambda *_: self._schedule_autosave('source', node_id))
+
+    def _add_tail_fields(self, layout, node_id, node_data):
+        """Modo tail: solo las líneas nuevas de un log que crece (offset guardado en el proyecto)."""
+        tail = QCheckBox("Seguir archivo (solo líneas nuevas)")
+        tail.setChecked(str(node_data.get('tail_follow', '')).strip().lower() in ('1', 'true', 'yes', 'si', 'sí'))
+        tail.setToolTip("Cada ejecución lee desde el último offset confirmado; JSON se lee como NDJSON. "
+                        "El offset se guarda solo si todos los destinos terminan bien.")
+        max_bytes = QLineEdit(); max_bytes.setText(str(node_data.get('tail_max_bytes', '') or ''))
+        max_bytes.setPlaceholderText("vacío = todo lo nuevo")
+        state_key = QLineEdit(); state_key.setText(str(node_data.get('tail_state_key', '') or ''))
+        state_key.setPlaceholderText("defecto: nodo + ruta")
+        layout.addRow(tail)
+        layout.addRow("Máx. bytes por ejecución:", max_bytes)
+        layout.addRow("Clave del offset:", state_key)
+        self.source_option_fields.update({'tail_follow': tail, 'tail_max_bytes': max_bytes, 'tail_state_key': state_key})
+        for _fld in [max_bytes, state_key]:
+            _fld.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
+        tail.toggled.connect(lambda *_: self._schedule_autosave('source', node_id))
+
+    def _add_manifest_fields(self, layout, node_id, node_data):
+        """Manifiesto de archivos procesados: 'path' es un directorio de llegada y cada
+        ejecución lee solo los archivos nuevos o modificados."""
+        def _flag(key, default):
+            val = node_data.get(key)
+            if val is None or val == '':
+                return default
+            return val if isinstance(val, bool) else str(val).strip().lower() in ('1', 'true', 'yes', 'si', 'sí')
+
+        enabled = QCheckBox("Directorio con manifiesto (solo archivos nuevos)")
+        enabled.setChecked(_flag('file_manifest', False))
+        enabled.setToolTip("La ruta es un directorio o un patrón (p.ej. /entrada/*.csv). Los archivos leídos "
+                           "se registran en <proyecto>.fetl.logs/state/manifest.sqlite al terminar sin errores.")
+        pattern = QLineEdit(); pattern.setText(str(node_data.get('manifest_pattern', '') or ''))
+        pattern.setPlaceholderText("* (ej. ventas_*.csv)")
+        recursive = QCheckBox("Incluir subdirectorios"); recursive.setChecked(_flag('manifest_recursive', False))
+        with_hash = QCheckBox("Comparar hash del contenido"); with_hash.setChecked(_flag('manifest_hash', True))
+        window = QLineEdit(); window.setText(str(node_data.get('reprocess_window_hours', '') or ''))
+        window.setPlaceholderText("vacío = no reprocesar")
+        scope = QLineEdit(); scope.setText(str(node_data.get('manifest_scope', '') or ''))
+        scope.setPlaceholderText("defecto: nodo + ruta")
+        layout.addRow(enabled)
+        layout.addRow("Patrón de archivos:", pattern)
+        layout.addRow(recursive)
+        layout.addRow(with_hash)
+        layout.addRow("Reprocesar últimas (horas):", window)
+        layout.addRow("Clave del manifiesto:", scope)
+        self.source_option_fields.update({'file_manifest': enabled, 'manifest_pattern': pattern,
+                                          'manifest_recursive': recursive, 'manifest_hash': with_hash,
+                                          'reprocess_window_hours': window, 'manifest_scope': scope})
+        for _fld in [pattern, window, scope]:
+            _fld.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
+        for _chk in [enabled, recursive, with_hash]:
+            _chk.toggled.connect(lambda *_: self._schedule_autosave('source', node_id))
+
+    def _add_csv_reader_fields(self, layout, node_id, node_data):
+        """Opciones del lector CSV (mismas en la lectura directa y en el escaneo lazy)."""
+        def _flag(key, default):
+            val = node_data.get(key)
+            if val is None or val == '':
+                return default
+            return val if isinstance(val, bool) else str(val).strip().lower() in ('1', 'true', 'yes', 'si', 'sí')
+
+        def _text(key):
+            val = node_data.get(key)
+            return ','.join(str(v) for v in val) if isinstance(val, (list, tuple)) else str(val if val is not None else '')
+
+        has_header = QCheckBox("Primera fila es cabecera"); has_header.setChecked(_flag('has_header', True))
+        skip_rows = QLineEdit(); skip_rows.setText(_text('skip_rows')); skip_rows.setPlaceholderText("0")
+        comment_prefix = QLineEdit(); comment_prefix.setText(_text('comment_prefix')); comment_prefix.setPlaceholderText("ej. #")
+        null_values = QLineEdit(); null_values.setText(_text('null_values')); null_values.setPlaceholderText("ej. NULL,N/A,-")
+        infer_len = QLineEdit(); infer_len.setText(_text('infer_schema_length'))
+        infer_len.setPlaceholderText("100 (all = archivo completo, 0 = todo texto)")
+        n_threads = QLineEdit(); n_threads.setText(_text('n_threads')); n_threads.setPlaceholderText("auto")
+        columns = QLineEdit(); columns.setText(_text('columns')); columns.setPlaceholderText("todas (col1,col2,...)")
+        try_dates = QCheckBox("Detectar fechas"); try_dates.setChecked(_flag('try_parse_dates', False))
+        decimal_comma = QCheckBox("Coma decimal (1.234,56)"); decimal_comma.setChecked(_flag('decimal_comma', False))
+        decimal_comma.setToolTip("Requiere un delimitador distinto de la coma (p.ej. ';')")
+        low_memory = QCheckBox("Bajo consumo de memoria"); low_memory.setChecked(_flag('low_memory', False))
+        rechunk = QCheckBox("Reagrupar en memoria contigua"); rechunk.setChecked(_flag('rechunk', True))
+        layout.addRow(has_header)
+        layout.addRow("Saltar filas:", skip_rows)
+        layout.addRow("Comentario:", comment_prefix)
+        layout.addRow("Valores nulos:", null_values)
+        layout.addRow("Filas para inferir tipos:", infer_len)
+        layout.addRow("Hilos:", n_threads)
+        layout.addRow("Columnas a leer:", columns)
+        for _chk in [try_dates, decimal_comma, low_memory, rechunk]:
+            layout.addRow(_chk)
+        self.source_option_fields.update({
+            'has_header': has_header, 'skip_rows': skip_rows, 'comment_prefix': comment_prefix,
+            'null_values': null_values, 'infer_schema_length': infer_len, 'n_threads': n_threads,
+            'columns': columns, 'try_parse_dates': try_dates, 'decimal_comma': decimal_comma,
+            'low_memory': low_memory, 'rechunk': rechunk,
+        })
+        for _fld in [skip_rows, comment_prefix, null_values, infer_len, n_threads, columns]:
+            _fld.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
+        for _chk in [has_header, try_dates, decimal_comma, low_memory, rechunk]:
+            _chk.toggled.connect(lambda *_: self._schedule_autosave('source', node_id))
+
+    def _add_source_cache_fields(self, layout, node_id, node_data):
+        """Caché columnar del CSV: se parsea una vez y después se lee la copia Parquet/IPC."""
+        use_cache = QCheckBox("Caché columnar (parsear una sola vez)")
+        use_cache.setChecked(str(node_data.get('source_cache', '')).strip().lower() in ('1', 'true', 'yes', 'si', 'sí'))
+        use_cache.setToolTip("Guarda una copia Parquet/IPC en la carpeta de caché del proyecto; "
+                             "se invalida si cambian el archivo o las opciones de lectura")
+        cache_fmt = QComboBox(); cache_fmt.addItems(["parquet", "ipc"])
+        cache_fmt.setCurrentText(str(node_data.get('source_cache_format') or 'parquet'))
+        cache_max = QLineEdit(); cache_max.setText(str(node_data.get('source_cache_max_mb', '') or ''))
+        cache_max.setPlaceholderText(f"MB (defecto {source_cache.DEFAULT_MAX_MB})")
+        layout.addRow(use_cache)
+        layout.addRow("Formato caché:", cache_fmt)
+        layout.addRow("Tamaño máx. caché:", cache_max)
+        self.source_option_fields.update({'source_cache': use_cache, 'source_cache_format': cache_fmt,
+                                          'source_cache_max_mb': cache_max})
+        use_cache.toggled.connect(lambda *_: self._schedule_autosave('source', node_id))
+        cache_fmt.currentTextChanged.connect(lambda *_: self._schedule_autosave('source', node_id))
+        cache_max.editingFinished.connect(lambda: self._schedule_autosave('source', node_id))
+
+    def _collect_option_fields(self, fields, config):
+        """Vuelca en config los valores de un dict {clave: widget} de opciones avanzadas."""
+        if not fields:
+            return
+        for key, field in fields.items():
+            try:
+                if isinstance(field, QCheckBox):
+                    config[key] = field.isChecked()
+                elif isinstance(field, QComboBox):
+                    config[key] = field.currentText()
+                else:
+                    config[key] = field.text().strip()
+            except RuntimeError:
+                # Widget destruido al reconstruir el panel; conservar valor previo
+                pass
+
+    def select_delta_path(self, node_id):
+        """Carpeta de la tabla Delta de destino (se crea en la primera escritura)."""
+        directory = QFileDialog.getExistingDirectory(self, "Seleccionar carpeta de la tabla Delta", os.path.expanduser("~"))
+        if directory and hasattr(self, 'dest_file_path'):
+            self.dest_file_path.setText(directory)
+            self._schedule_autosave('destination', node_id)
+
     def select_output_path(self, file_type=None):
         # Determinar filtro y extensión por tipo
         if file_type == 'excel':
@@ -2137,6 +2787,15 @@ class PropertiesPanel(QWidget):
         elif file_type == 'parquet':
             format_filter = "Parquet (*.parquet)"
             extension = ".parquet"
+        elif file_type == 'ipc':
+            format_filter = "Arrow IPC/Feather (*.arrow *.feather *.ipc)"
+            extension = ".arrow"
+        elif file_type == 'orc':
+            format_filter = "ORC (*.orc)"
+            extension = ".orc"
+        elif file_type == 'avro':
+            format_filter = "Avro (*.avro)"
+            extension = ".avro"
         else:
             format_filter = "CSV (*.csv)"
             extension = ".csv"
@@ -2151,11 +2810,12 @@ class PropertiesPanel(QWidget):
                 self,
                 "Guardar archivo",
                 directory + "/output" + extension,
-                "Excel (*.xlsx);;CSV (*.csv);;JSON (*.json);;Parquet (*.parquet)",
+                "Excel (*.xlsx);;CSV (*.csv);;JSON (*.json);;Parquet (*.parquet);;Arrow IPC/Feather (*.arrow *.feather *.ipc);;ORC (*.orc);;Avro (*.avro)",
                 format_filter
             )
             if file_name:
-                valid_exts = ['.csv', '.xlsx', '.json', '.parquet']
+                valid_exts = ['.csv', '.xlsx', '.json', '.parquet', '.arrow', '.feather', '.ipc']
+                valid_exts += list(file_io.COMPRESSION_BY_EXT)
                 if not any(file_name.endswith(ext) for ext in valid_exts):
                     file_name += extension
                 if hasattr(self, 'dest_file_path'):
@@ -2169,6 +2829,33 @@ class PropertiesPanel(QWidget):
         """Muestra un mensaje en la consola para depuración"""
         print(f"[PropertiesPanel] {message}")
         
+    def load_delta_table(self, node_id):
+        """Selecciona una tabla Delta (carpeta con _delta_log) y carga la versión configurada."""
+        node_cfg = self.node_configs.setdefault(node_id, {})
+        directory = node_cfg.get('path') or ''
+        if hasattr(self, 'file_path_field'):
+            try:
+                directory = self.file_path_field.text().strip() or directory
+            except RuntimeError:
+                pass
+        if not directory or not os.path.isdir(directory):
+            directory = QFileDialog.getExistingDirectory(self, "Seleccionar tabla Delta", os.path.expanduser("~"))
+        if not directory:
+            return
+        self._collect_option_fields(self.source_option_fields, node_cfg)
+        try:
+            version = str(node_cfg.get('delta_version') or '').strip()
+            df = preview.read_file_head('delta', directory, node_cfg, preview.DEFAULT_PREVIEW_ROWS)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error al cargar la tabla Delta: {str(e)}")
+            return
+        node_cfg['path'] = directory
+        node_cfg['dataframe'] = df
+        node_cfg[preview.PREVIEW_KEY] = True
+        self.current_dataframes[node_id] = df
+        self.node_config_changed.emit(node_id, node_cfg)
+        self.show_node_properties(node_id, self.current_node_type, node_cfg)
+
     def load_file(self, node_id, file_type=None):
         if file_type == 'excel':
             file_name, _ = QFileDialog.getOpenFileName(
@@ -2182,14 +2869,14 @@ class PropertiesPanel(QWidget):
                 self,
                 "Seleccionar archivo CSV",
                 "",
-                "CSV (*.csv)"
+                "CSV (*.csv *.csv.gz *.csv.bz2 *.csv.xz *.csv.zst *.zip);;Todos los archivos (*.*)"
             )
         elif file_type == 'json':
             file_name, _ = QFileDialog.getOpenFileName(
                 self,
                 "Seleccionar archivo JSON",
                 "",
-                "JSON (*.json)"
+                "JSON (*.json *.json.gz *.json.bz2 *.json.xz *.json.zst *.zip);;Todos los archivos (*.*)"
             )
         elif file_type == 'parquet':
             file_name, _ = QFileDialog.getOpenFileName(
@@ -2198,6 +2885,34 @@ class PropertiesPanel(QWidget):
                 "",
                 "Parquet (*.parquet)"
             )
+        elif file_type == 'ipc':
+            file_name, _ = QFileDialog.getOpenFileName(
+                self,
+                "Seleccionar archivo IPC/Feather",
+                "",
+                "Arrow IPC/Feather (*.arrow *.feather *.ipc)"
+            )
+        elif file_type == 'fixed_width':
+            file_name, _ = QFileDialog.getOpenFileName(
+                self,
+                "Seleccionar archivo de ancho fijo",
+                "",
+                "Ancho fijo (*.txt *.dat *.fwf *.gz *.zip);;Todos los archivos (*.*)"
+            )
+        elif file_type == 'xml':
+            file_name, _ = QFileDialog.getOpenFileName(
+                self,
+                "Seleccionar archivo XML",
+                "",
+                "XML (*.xml *.xml.gz *.xml.bz2 *.xml.xz *.xml.zst *.zip);;Todos los archivos (*.*)"
+            )
+        elif file_type in ('orc', 'avro'):
+            file_name, _ = QFileDialog.getOpenFileName(
+                self,
+                f"Seleccionar archivo {file_type.upper() if file_type == 'orc' else 'Avro'}",
+                "",
+                f"{'ORC' if file_type == 'orc' else 'Avro'} (*.{file_type} *.zip);;Todos los archivos (*.*)"
+            )
         else:
             file_name, _ = QFileDialog.getOpenFileName(
                 self,
@@ -2208,37 +2923,33 @@ class PropertiesPanel(QWidget):
         
         if file_name:
             try:
-                if file_type == 'excel' or file_name.endswith('.xlsx'):
-                    try:
-                        df = pl.read_excel(file_name)
-                    except Exception:
-                        pdf = pd.read_excel(file_name)
-                        df = pl.from_pandas(pdf)
-                elif file_type == 'csv' or file_name.endswith('.csv'):
-                    try:
-                        df = pl.read_csv(file_name)
-                    except:
-                        try:
-                            df = pl.read_csv(file_name, encoding='latin-1')
-                        except:
-                            df = pd.read_csv(file_name, encoding='latin-1')
-                            df = pl.from_pandas(df)
-                elif file_type == 'parquet' or file_name.endswith('.parquet'):
-                    df = pl.read_parquet(file_name)
-                elif file_name.endswith('.json'):
-                    df = pl.read_json(file_name)
+                compressed_type = file_type or os.path.splitext(file_io.strip_compression_ext(file_name))[1].lstrip('.').lower()
+                node_cfg = self.node_configs.setdefault(node_id, {})
+                if node_cfg.get('path') != file_name:
+                    # Archivo nuevo: la detección anterior no aplica
+                    for key in ('encoding', 'separator', 'quote_char'):
+                        node_cfg.pop(key, None)
+                # Extensiones desconocidas se leen como CSV
+                is_csv = compressed_type not in ('excel', 'xlsx', 'xls', 'json', 'parquet', 'ipc', 'arrow', 'feather',
+                                                 'orc', 'avro', 'fixed_width', 'xml')
+                if is_csv:
+                    head_type = 'csv'
+                elif compressed_type in ('excel', 'xlsx', 'xls') or file_name.endswith('.xlsx'):
+                    head_type = 'excel'
+                elif compressed_type in ('ipc', 'arrow', 'feather'):
+                    head_type = 'ipc'
                 else:
-                    try:
-                        df = pl.read_csv(file_name)
-                    except:
-                        try:
-                            df = pl.read_csv(file_name, encoding='latin-1')
-                        except:
-                            df = pd.read_csv(file_name, encoding='latin-1')
-                            df = pl.from_pandas(df)
+                    head_type = compressed_type
+                if head_type in ('fixed_width', 'xml'):
+                    # Con las columnas ya configuradas en el panel
+                    self._collect_option_fields(self.source_option_fields, node_cfg)
+                # Vista previa: solo las primeras filas (la ejecución lee el archivo completo).
+                # En CSV la codificación/delimitador/comillas detectados quedan en el config
+                df = preview.read_file_head(head_type, file_name, node_cfg, preview.DEFAULT_PREVIEW_ROWS)
                 # Guardar la ruta del archivo y dataframe en los datos del nodo
                 self.node_configs[node_id]['path'] = file_name
                 self.node_configs[node_id]['dataframe'] = df
+                self.node_configs[node_id][preview.PREVIEW_KEY] = True
                 self.current_dataframes[node_id] = df
                 self.node_config_changed.emit(node_id, self.node_configs[node_id])
                 # En vez de show_data_preview, refresco el panel completo:
@@ -5,6 +5,7 @@ from typing import Any, Dict, Iterable, Optional, Set
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
     QCheckBox,
+    QComboBox,
     QDialog,
     QDialogButtonBox,
     QFormLayout,
@@ -14,6 +15,7 @@ from PyQt6.QtWidgets import (
     QMessageBox,
     QSpinBox,
     QVBoxLayout,
+    QWidget,
 )
 
 
@@ -25,6 +27,7 @@ class ServiceEditorDialog(QDialog):
     - name (string)
     - port (usar default o valor)
     - auth: basic_user, basic_pass, jwt_secret (opcionales)
+    - kind 'watch': vigilancia de directorio por micro-lotes (ver core.watch_runner)
     """
 
     def __init__(
@@ -40,10 +43,15 @@ class ServiceEditorDialog(QDialog):
         self._existing_ids: Set[str] = set(existing_ids or [])
         self._default_port = int(default_port or 8080)
         self._mode = mode
+        self._watch_extra: Dict[str, Any] = {}
 
         main = QVBoxLayout(self)
         form = QFormLayout()
 
+        self.cmb_kind = QComboBox()
+        self.cmb_kind.addItems(["API", "Vigilancia de directorio"])
+        form.addRow("Tipo:", self.cmb_kind)
+
         # Identificación
         self.ed_id = QLineEdit()
         self.ed_name = QLineEdit()
@@ -77,11 +85,77 @@ class ServiceEditorDialog(QDialog):
 
         main.addLayout(form)
 
+        # Vigilancia de directorio: micro-lotes de archivos nuevos -> ETL
+        self.watch_box = QWidget()
+        wform = QFormLayout(self.watch_box)
+        wform.setContentsMargins(0, 0, 0, 0)
+        self.ed_watch_dir = QLineEdit()
+        self.ed_watch_pattern = QLineEdit()
+        self.ed_watch_pattern.setPlaceholderText("*")
+        self.chk_watch_recursive = QCheckBox("Incluir subdirectorios (solo sondeo)")
+        self.ed_watch_etl = QLineEdit()
+        self.ed_watch_node = QLineEdit()
+        self.ed_watch_node.setPlaceholderText("ID del nodo origen que recibe el lote")
+        self.ed_watch_files = QLineEdit()
+        self.ed_watch_files.setPlaceholderText("100")
+        self.ed_watch_mb = QLineEdit()
+        self.ed_watch_mb.setPlaceholderText("512")
+        self.ed_watch_window = QLineEdit()
+        self.ed_watch_window.setPlaceholderText("30")
+        self.ed_watch_settle = QLineEdit()
+        self.ed_watch_settle.setPlaceholderText("2")
+        self.cmb_watch_processed = QComboBox()
+        self.cmb_watch_processed.addItems(["move", "manifest"])
+        self.ed_watch_processed_dir = QLineEdit()
+        self.ed_watch_processed_dir.setPlaceholderText("<directorio>/processed")
+        self.ed_watch_failed_dir = QLineEdit()
+        self.ed_watch_failed_dir.setPlaceholderText("vacío = no mover")
+        wform.addRow("Directorio:", self.ed_watch_dir)
+        wform.addRow("Patrón:", self.ed_watch_pattern)
+        wform.addRow(self.chk_watch_recursive)
+        wform.addRow("ETL ID:", self.ed_watch_etl)
+        wform.addRow("Nodo origen:", self.ed_watch_node)
+        wform.addRow("Máx. archivos por lote:", self.ed_watch_files)
+        wform.addRow("Máx. MB por lote:", self.ed_watch_mb)
+        wform.addRow("Ventana de lote (s):", self.ed_watch_window)
+        wform.addRow("Estabilización (s):", self.ed_watch_settle)
+        wform.addRow("Procesados:", self.cmb_watch_processed)
+        wform.addRow("Carpeta procesados:", self.ed_watch_processed_dir)
+        wform.addRow("Carpeta fallidos:", self.ed_watch_failed_dir)
+        main.addWidget(self.watch_box)
+        self.cmb_kind.currentIndexChanged.connect(lambda *_: self._sync_kind())
+        self._sync_kind()
+
         btns = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
         btns.accepted.connect(self._on_accept)
         btns.rejected.connect(self.reject)
         main.addWidget(btns)
 
+    def _is_watch(self) -> bool:
+        return self.cmb_kind.currentIndex() == 1
+
+    def _sync_kind(self) -> None:
+        self.watch_box.setVisible(self._is_watch())
+
+    def _watch_config(self) -> Dict[str, Any]:
+        # Claves sin campo en el diálogo (overrides, poll_seconds, ...) se conservan
+        watch: Dict[str, Any] = dict(self._watch_extra)
+        watch.update({
+            'directory': self.ed_watch_dir.text().strip(),
+            'pattern': self.ed_watch_pattern.text().strip() or '*',
+            'recursive': self.chk_watch_recursive.isChecked(),
+            'etl_id': self.ed_watch_etl.text().strip(),
+            'source_node': self.ed_watch_node.text().strip(),
+            'batch_max_files': self.ed_watch_files.text().strip(),
+            'batch_max_mb': self.ed_watch_mb.text().strip(),
+            'batch_window_seconds': self.ed_watch_window.text().strip(),
+            'settle_seconds': self.ed_watch_settle.text().strip(),
+            'processed': self.cmb_watch_processed.currentText(),
+            'processed_dir': self.ed_watch_processed_dir.text().strip(),
+            'failed_dir': self.ed_watch_failed_dir.text().strip(),
+        })
+        return watch
+
     def _on_accept(self) -> None:
         sid = self.ed_id.text().strip()
         name = self.ed_name.text().strip()
@@ -95,6 +169,15 @@ class ServiceEditorDialog(QDialog):
             QMessageBox.warning(self, "Validación", "El nombre es obligatorio.")
             return
 
+        if self._is_watch():
+            watch = self._watch_config()
+            if not watch['directory'] or not watch['etl_id'] or not watch['source_node']:
+                QMessageBox.warning(self, "Validación", "Directorio, ETL ID y nodo origen son obligatorios.")
+                return
+            if not str(watch['source_node']).isdigit():
+                QMessageBox.warning(self, "Validación", "El nodo origen debe ser el ID numérico del nodo.")
+                return
+
         port_val = None if self.chk_default_port.isChecked() else int(self.sp_port.value())
         auth: Dict[str, Any] = {}
         if self.ed_basic_user.text().strip():
@@ -110,6 +193,9 @@ class ServiceEditorDialog(QDialog):
             'port': port_val,
             'auth': auth,
         }
+        if self._is_watch():
+            self._service['kind'] = 'watch'
+            self._service['watch'] = self._watch_config()
         self.accept()
 
     def set_service(self, svc: Dict[str, Any], default_port: Optional[int] = None) -> None:
@@ -132,6 +218,22 @@ class ServiceEditorDialog(QDialog):
         self.ed_basic_user.setText(str(auth.get('basic_user') or ''))
         self.ed_basic_pass.setText(str(auth.get('basic_pass') or ''))
         self.ed_jwt_secret.setText(str(auth.get('jwt_secret') or ''))
+        watch = svc.get('watch') or {}
+        self._watch_extra = dict(watch)
+        self.cmb_kind.setCurrentIndex(1 if str(svc.get('kind') or '') == 'watch' else 0)
+        self.ed_watch_dir.setText(str(watch.get('directory') or ''))
+        self.ed_watch_pattern.setText(str(watch.get('pattern') or ''))
+        self.chk_watch_recursive.setChecked(bool(watch.get('recursive')))
+        self.ed_watch_etl.setText(str(watch.get('etl_id') or ''))
+        self.ed_watch_node.setText(str(watch.get('source_node') or ''))
+        self.ed_watch_files.setText(str(watch.get('batch_max_files') or ''))
+        self.ed_watch_mb.setText(str(watch.get('batch_max_mb') or ''))
+        self.ed_watch_window.setText(str(watch.get('batch_window_seconds') or ''))
+        self.ed_watch_settle.setText(str(watch.get('settle_seconds') or ''))
+        self.cmb_watch_processed.setCurrentText(str(watch.get('processed') or 'move'))
+        self.ed_watch_processed_dir.setText(str(watch.get('processed_dir') or ''))
+        self.ed_watch_failed_dir.setText(str(watch.get('failed_dir') or ''))
+        self._sync_kind()
 
     def get_service(self) -> Dict[str, Any]:
         return getattr(self, '_service', {})
@@ -10,7 +10,7 @@ from PyQt6.QtWidgets import (
     QTextEdit, QMessageBox, QInputDialog
 )
 
-from core.service_runner import ServiceRunner
+from core.service_runner import create_service_runner
 
 
 class ServicesTab(QWidget):
@@ -19,7 +19,7 @@ class ServicesTab(QWidget):
     def __init__(self, project_manager, parent=None):
         super().__init__(parent)
         self.pm = project_manager
-        self.runners: Dict[str, ServiceRunner] = {}
+        self.runners: Dict[str, Any] = {}  # ServiceRunner o WatchRunner
         self._bearer_tokens: Dict[str, str] = {}
 
         layout = QVBoxLayout(self)
@@ -137,11 +137,11 @@ class ServicesTab(QWidget):
             return {"Authorization": f"Bearer {tok}"}
         return None
 
-    def _get_runner(self, svc: Dict[str, Any]) -> ServiceRunner:
+    def _get_runner(self, svc: Dict[str, Any]):
         sid = str(svc.get('id') or svc.get('name') or 'service')
         r = self.runners.get(sid)
         if r is None:
-            r = ServiceRunner(self.pm.project, svc, self.pm.logs_root(), ui_writer=self._writer)
+            r = create_service_runner(self.pm.project, svc, self.pm.logs_root(), ui_writer=self._writer)
             self.runners[sid] = r
         return r
 
@@ -166,7 +166,8 @@ class ServicesTab(QWidget):
         for i, s in enumerate(svcs):
             sid = str(s.get('id') or '')
             name = str(s.get('name') or '')
-            port = self._get_port_for_service(s)
+            # Los servicios de vigilancia no escuchan en ningún puerto
+            port = '-' if s.get('kind') == 'watch' else self._get_port_for_service(s)
             auth = s.get('auth') or {}
             basic = '✔' if auth.get('basic_user') and auth.get('basic_pass') else ''
             jwt = '✔' if auth.get('jwt_secret') else ''
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+
+import networkx as nx
+import pytest
+
+from core.etl_engine import ETLEngine
+
+
+def _run_pipeline(nodes: List[Dict[str, Any]], edges: List[tuple], state_dir: Optional[str] = None) -> Any:
+    g = nx.DiGraph()
+    cfgs: Dict[int, Dict[str, Any]] = {}
+    for n in nodes:
+        g.add_node(n['id'], type=n['type'], config=n['config'])
+        cfgs[n['id']] = n['config']
+    for s, t in edges:
+        g.add_edge(s, t)
+    eng = ETLEngine()
+    if state_dir:
+        eng.state_dir = state_dir
+    eng.set_pipeline(g, cfgs)
+    return eng.execute_pipeline()
+
+
+@pytest.fixture
+def run_pipeline() -> Callable[..., Any]:
+    """run_pipeline(nodes, edges, state_dir=None): ejecuta un pipeline con ETLEngine y
+    devuelve el resultado de execute_pipeline (False si falló)."""
+    return _run_pipeline
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from datetime import date
+
+import polars as pl
+import pytest
+
+from core.etl_engine import ETLEngine
+
+
+def _make_db(path: str, rows: int) -> None:
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE t (id INTEGER, name TEXT, amount REAL)")
+    con.executemany("INSERT INTO t VALUES (?, ?, ?)", [(i, f"n{i}", i * 1.5) for i in range(rows)])
+    con.commit()
+    con.close()
+
+
+def test_streaming_database_source_writes_batches(tmp_path, run_pipeline):
+    db = os.path.join(tmp_path, 'src.db')
+    _make_db(db, 25)
+    out = os.path.join(tmp_path, 'out.parquet')
+    src = {'subtype': 'database', 'db_type': 'SQLite', 'database': db, 'query': 'SELECT * FROM t ORDER BY id',
+           'stream_results': True, 'stream_batch_size': '10'}
+    res = run_pipeline(
+        [
+            {'id': 1, 'type': 'source', 'config': src},
+            {'id': 2, 'type': 'transform', 'config': {
+                'subtype': 'filter', 'filter_rules': [{'column': 'id', 'op': '>=', 'value': 5}]}},
+            {'id': 3, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': out}},
+        ],
+        [(1, 2), (2, 3)],
+    )
+    assert res is not False
+    # Solo se conserva el primer lote como vista previa
+    assert res[1].height == 10
+    import pyarrow.parquet as pq
+    assert pq.ParquetFile(out).metadata.num_row_groups == 3
+    assert pl.read_parquet(out)['id'].to_list() == list(range(5, 25))
+
+    # parquet_sort_by ordena el archivo completo: el destino no se escribe por lotes
+    sorted_out = os.path.join(tmp_path, 'sorted.parquet')
+    res = run_pipeline(
+        [
+            {'id': 1, 'type': 'source', 'config': {**src, 'query': 'SELECT * FROM t ORDER BY id DESC'}},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': sorted_out,
+                                                        'parquet_sort_by': 'id'}},
+        ],
+        [(1, 2)],
+    )
+    assert res[1].height == 25
+    assert pl.read_parquet(sorted_out)['id'].to_list() == list(range(25))
+
+    # Sin cadena por lotes (dos destinos) se concatenan los lotes
+    dst_db = os.path.join(tmp_path, 'dst.db')
+    res = run_pipeline(
+        [
+            {'id': 1, 'type': 'source', 'config': dict(src)},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'database', 'db_type': 'SQLite',
+                                                        'database': dst_db, 'table': 'copy'}},
+            {'id': 3, 'type': 'destination', 'config': {'subtype': 'json', 'path': os.path.join(tmp_path, 'o.json')}},
+        ],
+        [(1, 2), (1, 3)],
+    )
+    assert res[1].height == 25
+    con = sqlite3.connect(dst_db)
+    assert con.execute("SELECT id, name FROM copy ORDER BY id").fetchall() == [(i, f"n{i}") for i in range(25)]
+    con.close()
+    assert pl.read_json(os.path.join(tmp_path, 'o.json'))['id'].to_list() == list(range(25))
+
+
+def test_streaming_database_source_to_json_sinks(tmp_path, run_pipeline):
+    import json
+
+    db = os.path.join(tmp_path, 'src.db')
+    _make_db(db, 25)
+    src = {'subtype': 'database', 'db_type': 'SQLite', 'database': db, 'query': 'SELECT * FROM t ORDER BY id',
+           'stream_results': True, 'stream_batch_size': '10'}
+    for fmt, name in (('JSON Lines', 'out.ndjson'), ('JSON', 'out.json')):
+        out = os.path.join(tmp_path, name)
+        res = run_pipeline(
+            [
+                {'id': 1, 'type': 'source', 'config': dict(src)},
+                {'id': 2, 'type': 'destination', 'config': {'subtype': 'json', 'path': out, 'format': fmt}},
+            ],
+            [(1, 2)],
+        )
+        # Vista previa de un solo lote: los datos se escribieron por lotes
+        assert res[1].height == 10
+        with open(out, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f] if fmt == 'JSON Lines' else json.load(f)
+        assert [r['id'] for r in rows] == list(range(25))
+
+
+def test_streaming_source_atomic_load_mode_materializes(tmp_path, run_pipeline):
+    db = os.path.join(tmp_path, 'src.db')
+    _make_db(db, 25)
+    dst_db = os.path.join(tmp_path, 'dst.db')
+    src = {'subtype': 'database', 'db_type': 'SQLite', 'database': db, 'query': 'SELECT * FROM t ORDER BY id',
+           'stream_results': True, 'stream_batch_size': '10'}
+    for mode, preview_rows in (('direct', 10), ('atomic', 25), ('resumable', 25)):
+        res = run_pipeline(
+            [
+                {'id': 1, 'type': 'source', 'config': dict(src)},
+                {'id': 2, 'type': 'destination', 'config': {'subtype': 'database', 'db_type': 'SQLite',
+                                                            'database': dst_db, 'table': f'copy_{mode}',
+                                                            'load_mode': mode, 'load_id': 'run1'}},
+            ],
+            [(1, 2)],
+        )
+        # atomic/resumable no se escriben lote a lote: una sola carga con todas las filas
+        assert res[1].height == preview_rows
+        con = sqlite3.connect(dst_db)
+        assert con.execute(f"SELECT COUNT(*) FROM copy_{mode}").fetchone()[0] == 25
+        con.close()
+
+
+def test_parallel_chunked_insert_modes(tmp_path):
+    from sqlalchemy import create_engine
+
+    from core import db_load
+
+    dst = os.path.join(tmp_path, 'dst.db')
+    df = pl.DataFrame({'id': list(range(50)), 'name': [f"n{i}" for i in range(50)]})
+
+    def ids(table: str) -> list:
+        con = sqlite3.connect(dst)
+        try:
+            return [r[0] for r in con.execute(f"SELECT id FROM {table} ORDER BY id")]
+        finally:
+            con.close()
+
+    eng = ETLEngine()
+    engine = create_engine(f"sqlite:///{dst}")
+    base = {'subtype': 'database', 'db_type': 'SQLite', 'database': dst, 'table': 't'}
+    eng._write_database(df, engine, 't', 'replace', {**base, 'insert_workers': '3', 'insert_chunk_size': '7'})
+    assert ids('t') == list(range(50))
+
+    # Atómico: reemplaza el contenido en una sola transacción y elimina el staging
+    eng._write_database(df.head(20), engine, 't', 'replace', {**base, 'load_mode': 'atomic', 'insert_chunk_size': '6'})
+    assert ids('t') == list(range(20))
+    assert not db_load.table_exists(engine, 't__load')
+
+    # Reanudable: se interrumpe tras dos bloques y el reintento continúa desde ahí
+    calls = {'n': 0}
+
+    def stop_after_two() -> bool:
+        calls['n'] += 1
+        return calls['n'] > 2
+
+    opts = {'load_mode': 'resumable', 'workers': 1, 'chunk_size': 10, 'load_id': 'job-1'}
+    try:
+        db_load.load_frame(engine, df, 'r', 'replace', opts, should_stop=stop_after_two)
+    except db_load.LoadStopped:
+        pass
+    assert ids('r') == list(range(20))
+    # Con otro tamaño de bloque los offsets registrados no valen: se rechaza
+    with pytest.raises(ValueError, match='chunk_size'):
+        db_load.load_frame(engine, df, 'r', 'replace', {**opts, 'chunk_size': 15})
+    db_load.load_frame(engine, df, 'r', 'replace', opts)
+    con = sqlite3.connect(dst)
+    assert sorted(r[0] for r in con.execute("SELECT id FROM r")) == list(range(50))
+    assert con.execute("SELECT COUNT(*) FROM etl_load_progress").fetchone()[0] == 0
+    con.close()
+
+    # load_id por defecto: misma forma pero otros datos no reutilizan el progreso
+    calls['n'] = 0
+    auto = {'load_mode': 'resumable', 'workers': 1, 'chunk_size': 10}
+    try:
+        db_load.load_frame(engine, df, 'a', 'replace', auto, should_stop=stop_after_two)
+    except db_load.LoadStopped:
+        pass
+    other = df.with_columns(pl.col('id') + 100)
+    assert db_load.default_load_id(other, 'a') != db_load.default_load_id(df, 'a')
+    db_load.load_frame(engine, other, 'a', 'replace', auto)
+    con = sqlite3.connect(dst)
+    assert sorted(r[0] for r in con.execute("SELECT id FROM a")) == list(range(100, 150))
+    con.close()
+
+
+def test_database_destination_explicit_ddl_and_indexes(tmp_path):
+    from sqlalchemy import create_engine, inspect
+
+    from core import db_load
+
+    dst = os.path.join(tmp_path, 'dst.db')
+    df = pl.DataFrame({
+        'id': [1, 2, 3],
+        'code': ['a', 'bb', 'ccc'],
+        'day': [date(2024, 1, d) for d in (1, 2, 3)],
+        'ok': [True, False, True],
+    })
+    # El DDL se genera sin conectar: solo hace falta el dialecto del engine
+    pg = create_engine('postgresql+psycopg2://u:p@localhost/db')
+    ddl = db_load.create_table_sql(pg, df, 'ventas', primary_key=['id'], varchar_lengths={'code': 8})
+    assert 'id BIGINT NOT NULL' in ddl
+    assert 'code VARCHAR(8)' in ddl
+    assert 'day DATE' in ddl and 'ok BOOLEAN' in ddl
+    assert 'PRIMARY KEY (id)' in ddl
+    # MySQL no indexa TEXT: las columnas de texto de índices llevan longitud acotada
+    my = create_engine('mysql+pymysql://u:p@localhost/db')
+    ddl = db_load.create_table_sql(my, df, 'ventas', indexed=['code'])
+    assert 'code VARCHAR(255)' in ddl
+
+    eng = ETLEngine()
+    lite = create_engine(f"sqlite:///{dst}")
+    cfg = {'primary_key': 'id', 'varchar_default': 'auto', 'indexes': 'code;day,ok'}
+    eng._write_database(df, lite, 't', 'replace', cfg)
+    insp = inspect(lite)
+    assert insp.get_pk_constraint('t')['constrained_columns'] == ['id']
+    assert sorted(tuple(ix['column_names']) for ix in insp.get_indexes('t')) == [('code',), ('day', 'ok')]
+
+    # Append con drop_indexes: los índices se eliminan durante la carga y se recrean
+    eng._write_database(df.with_columns(pl.col('id') + 10), lite, 't', 'append', {**cfg, 'drop_indexes': True})
+    assert len(inspect(lite).get_indexes('t')) == 2
+    con = sqlite3.connect(dst)
+    assert con.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 6
+
+    # Sin opciones de DDL la tabla también sale del esquema de Polars (fecha como DATE);
+    # pandas.to_sql solo con pandas_to_sql (fecha como DATETIME)
+    eng._write_database(df, lite, 'plain', 'replace', {})
+    eng._write_database(df.with_columns(pl.col('id') + 10), lite, 'plain', 'append', {})
+    assert dict(r[1:3] for r in con.execute("PRAGMA table_info(plain)"))['day'] == 'DATE'
+    assert con.execute("SELECT COUNT(*) FROM plain").fetchone()[0] == 6
+    eng._write_database(df, lite, 'legacy', 'replace', {'pandas_to_sql': True})
+    assert dict(r[1:3] for r in con.execute("PRAGMA table_info(legacy)"))['day'] == 'DATETIME'
+    assert dict(r[1:3] for r in con.execute("PRAGMA table_info(t)"))['day'] == 'DATE'
+    con.close()
+
+
+def test_swap_write_mode_replaces_table_atomically(tmp_path):
+    from sqlalchemy import create_engine, inspect
+
+    dst = os.path.join(tmp_path, 'dst.db')
+    lite = create_engine(f"sqlite:///{dst}")
+    eng = ETLEngine()
+    cfg = {'indexes': 'code', 'insert_workers': '2', 'insert_chunk_size': '2'}
+    first = pl.DataFrame({'id': [1, 2, 3], 'code': ['a', 'b', 'c']})
+    eng._write_database(first, lite, 't', 'swap', cfg)
+    eng._write_database(pl.DataFrame({'id': [9], 'code': ['z']}), lite, 't', 'swap', {**cfg, 'swap_keep_old': True})
+
+    tables = set(inspect(lite).get_table_names())
+    assert tables == {'t', 't__old'}
+    con = sqlite3.connect(dst)
+    assert con.execute("SELECT id FROM t").fetchall() == [(9,)]
+    assert con.execute("SELECT COUNT(*) FROM t__old").fetchone()[0] == 3
+    con.close()
+    assert [ix['column_names'] for ix in inspect(lite).get_indexes('t')] == [['code']]
+
+    eng._write_database(first, lite, 't', 'swap', cfg)
+    assert set(inspect(lite).get_table_names()) == {'t'}
+
+    # Con clave primaria: cada staging declara una restricción con nombre propio, porque
+    # PostgreSQL/SQL Server no la renombran con la tabla y '<tabla>__staging_pkey' chocaría
+    from core import db_load
+    pg = create_engine('postgresql+psycopg2://u:p@localhost/db')
+    ddls = [db_load.create_table_sql(pg, first, 't__staging', primary_key=['id']) for _ in range(2)]
+    assert all('CONSTRAINT pk_t_' in ddl for ddl in ddls) and ddls[0] != ddls[1]
+    assert 'CONSTRAINT' not in db_load.create_table_sql(pg, first, 't', primary_key=['id'])
+    names = []
+    for df in (first, pl.DataFrame({'id': [4], 'code': ['d']})):
+        eng._write_database(df, lite, 't', 'swap', {**cfg, 'primary_key': 'id'})
+        pk = inspect(lite).get_pk_constraint('t')
+        assert pk['constrained_columns'] == ['id']
+        names.append(pk['name'])
+    assert names[0].startswith('pk_t_') and names[0] != names[1]
+    con = sqlite3.connect(dst)
+    assert con.execute("SELECT id, code FROM t").fetchall() == [(4, 'd')]
+    con.close()
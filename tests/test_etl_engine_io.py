@@ -0,0 +1,765 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+import polars as pl
+import pyarrow.parquet as pq
+
+from core.etl_engine import ETLEngine
+
+
+def test_parquet_destination_layout_options(tmp_path, run_pipeline):
+    src = os.path.join(tmp_path, 'in.csv')
+    pl.DataFrame({'k': [3, 1, 2, 5, 4, 6], 'v': list('abcdef')}).write_csv(src)
+    out = os.path.join(tmp_path, 'out.parquet')
+    res = run_pipeline(
+        [
+            {'id': 1, 'type': 'source', 'config': {'subtype': 'csv', 'path': src}},
+            {'id': 2, 'type': 'destination', 'config': {
+                'subtype': 'parquet', 'path': out,
+                'parquet_compression': 'gzip', 'parquet_compression_level': '6',
+                'parquet_row_group_size': '2', 'parquet_sort_by': 'k',
+            }},
+        ],
+        [(1, 2)],
+    )
+    assert res is not False
+    meta = pq.ParquetFile(out).metadata
+    assert meta.num_row_groups == 3
+    assert meta.row_group(0).column(0).compression == 'GZIP'
+    stats = meta.row_group(0).column(0).statistics
+    assert stats.min == 1 and stats.max == 2
+    assert pl.read_parquet(out)['k'].to_list() == [1, 2, 3, 4, 5, 6]
+
+
+def test_excel_destination_splits_sheets_without_pandas(tmp_path):
+    import openpyxl
+
+    df = pl.DataFrame({'g': ['a', 'a', 'a', 'b'], 'n': [1, 2, 3, 4]})
+    out = os.path.join(tmp_path, 'out.xlsx')
+    eng = ETLEngine()
+    eng._write_excel(df, out, {'excel_split_by': 'g', 'excel_max_rows': '2'})
+    wb = openpyxl.load_workbook(out, read_only=True)
+    assert wb.sheetnames == ['a', 'a_2', 'b']
+    rows = list(wb['a_2'].iter_rows(values_only=True))
+    assert rows == [('g', 'n'), ('a', 3)]
+
+
+def test_ipc_roundtrip_compressed_and_memory_mapped(tmp_path, run_pipeline):
+    src = os.path.join(tmp_path, 'in.csv')
+    pl.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']}).write_csv(src)
+    for compression in ('uncompressed', 'zstd'):
+        out = os.path.join(tmp_path, f'out_{compression}.arrow')
+        copy = os.path.join(tmp_path, f'copy_{compression}.parquet')
+        res = run_pipeline(
+            [
+                {'id': 1, 'type': 'source', 'config': {'subtype': 'csv', 'path': src}},
+                {'id': 2, 'type': 'destination', 'config': {'subtype': 'ipc', 'path': out, 'ipc_compression': compression}},
+            ],
+            [(1, 2)],
+        )
+        assert res is not False
+        res = run_pipeline(
+            [
+                {'id': 1, 'type': 'source', 'config': {'subtype': 'ipc', 'path': out}},
+                {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': copy}},
+            ],
+            [(1, 2)],
+        )
+        assert res is not False
+        assert pl.read_parquet(copy).to_dicts() == [{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'y'}, {'a': 3, 'b': 'z'}]
+
+
+def test_compressed_sources_and_destinations(tmp_path, run_pipeline):
+    import zipfile
+
+    from core import file_io
+
+    gz_out = os.path.join(tmp_path, 'part1.csv.gz')
+    res = run_pipeline(
+        [
+            {'id': 1, 'type': 'source', 'config': {'subtype': 'json', 'path': _write_json(tmp_path, [{'a': 1}, {'a': 2}])}},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'csv', 'path': gz_out, 'compression_level': '1'}},
+        ],
+        [(1, 2)],
+    )
+    assert res is not False
+    assert file_io.detect_compression(gz_out) == 'gzip'
+
+    # Un .zip con varios CSV se lee como origen multi-archivo
+    zpath = os.path.join(tmp_path, 'landing.zip')
+    with zipfile.ZipFile(zpath, 'w') as zf:
+        zf.writestr('a.csv', 'a,b\n1,x\n')
+        zf.writestr('b.csv', 'a,b\n2,y\n')
+        zf.writestr('readme.md', 'ignored')
+    out = os.path.join(tmp_path, 'out.json.zst')
+    res = run_pipeline(
+        [
+            {'id': 1, 'type': 'source', 'config': {'subtype': 'csv', 'path': zpath}},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'json', 'path': out}},
+        ],
+        [(1, 2)],
+    )
+    assert res is not False
+    assert file_io.detect_compression(out) == 'zstd'
+    df = file_io.read_file('json', out)
+    assert sorted(df['a'].to_list()) == [1, 2]
+    assert file_io.read_file('csv', gz_out)['a'].to_list() == [1, 2]
+
+
+def test_json_destination_chunked_array_and_json_lines(tmp_path, run_pipeline):
+    import gzip
+    import json
+
+    src = _write_json(tmp_path, [{'a': i, 's': f'x{i}\ny'} for i in range(5)])
+    arr = os.path.join(tmp_path, 'out.json')
+    lines = os.path.join(tmp_path, 'out.ndjson.gz')
+    assert run_pipeline([
+        {'id': 1, 'type': 'source', 'config': {'subtype': 'json', 'path': src}},
+        {'id': 2, 'type': 'destination', 'config': {'subtype': 'json', 'path': arr, 'json_batch_size': '2'}},
+        {'id': 3, 'type': 'destination', 'config': {'subtype': 'json', 'path': lines, 'format': 'JSON Lines'}},
+    ], [(1, 2), (1, 3)]) is not False
+    with open(arr, encoding='utf-8') as f:
+        assert json.load(f) == [{'a': i, 's': f'x{i}\ny'} for i in range(5)]
+    with gzip.open(lines, 'rt', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert [r['a'] for r in rows] == list(range(5))
+
+
+def test_json_lines_destination_reads_back_as_json_source(tmp_path, run_pipeline):
+    from core import file_io
+
+    src = _write_json(tmp_path, [{'a': i, 's': f'x{i}'} for i in range(5)])
+    plain = os.path.join(tmp_path, 'out.jsonl')
+    packed = os.path.join(tmp_path, 'out.ndjson.gz')
+    forced = os.path.join(tmp_path, 'lines.json')
+    assert run_pipeline([
+        {'id': 1, 'type': 'source', 'config': {'subtype': 'json', 'path': src}},
+        {'id': 2, 'type': 'destination', 'config': {'subtype': 'json', 'path': plain, 'format': 'JSON Lines'}},
+        {'id': 3, 'type': 'destination', 'config': {'subtype': 'json', 'path': packed, 'format': 'JSON Lines'}},
+        {'id': 4, 'type': 'destination', 'config': {'subtype': 'json', 'path': forced, 'format': 'JSON Lines'}},
+    ], [(1, 2), (1, 3), (1, 4)]) is not False
+    for path, extra in ((plain, {}), (packed, {}), (forced, {'json_lines': True})):
+        out = os.path.join(tmp_path, 'back.csv')
+        assert run_pipeline([
+            {'id': 1, 'type': 'source', 'config': {'subtype': 'json', 'path': path, **extra}},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'csv', 'path': out}},
+        ], [(1, 2)]) is not False
+        assert file_io.read_file('csv', out)['a'].to_list() == list(range(5)), path
+    assert file_io.read_file('json', plain)['s'].to_list() == [f'x{i}' for i in range(5)]
+
+
+def test_orc_and_avro_roundtrip_with_projection(tmp_path, run_pipeline):
+    import pyarrow.orc as orc
+
+    df = pl.DataFrame({'id': list(range(2000)), 'name': [f'n{i}' for i in range(2000)], 'v': [i * 0.5 for i in range(2000)]})
+    src = os.path.join(tmp_path, 'in.parquet')
+    df.write_parquet(src)
+    orc_out = os.path.join(tmp_path, 'out.orc')
+    avro_out = os.path.join(tmp_path, 'out.avro')
+    assert run_pipeline([
+        {'id': 1, 'type': 'source', 'config': {'subtype': 'parquet', 'path': src}},
+        {'id': 2, 'type': 'destination', 'config': {'subtype': 'orc', 'path': orc_out, 'orc_compression': 'zlib'}},
+        {'id': 3, 'type': 'destination', 'config': {'subtype': 'avro', 'path': avro_out, 'avro_compression': 'deflate'}},
+    ], [(1, 2), (1, 3)]) is not False
+    assert orc.ORCFile(orc_out).compression == 'ZLIB'
+
+    for subtype, path in (('orc', orc_out), ('avro', avro_out)):
+        out = os.path.join(tmp_path, f'back_{subtype}.parquet')
+        assert run_pipeline([
+            {'id': 1, 'type': 'source', 'config': {'subtype': subtype, 'path': path, 'output_cols': 'id,v',
+                                                   'read_workers': '3',
+                                                   'source_filter_rules': [{'column': 'id', 'op': '<', 'value': 10}]}},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': out}},
+        ], [(1, 2)]) is not False
+        back = pl.read_parquet(out)
+        assert back.columns == ['id', 'v'] and back['id'].to_list() == list(range(10))
+
+
+def test_fixed_width_source_record_types_ebcdic_and_batches(tmp_path, run_pipeline):
+    import pyarrow.parquet as pq
+
+    rows = [f"01{i:06d}{'Nombre' + str(i):<12}{i * 3:08d}20240102" for i in range(25)]
+    src = os.path.join(tmp_path, 'extract.txt')
+    with open(src, 'w', newline='') as f:
+        f.write('HDR20240102\r\n' + '\r\n'.join(rows) + '\r\n99TRAILER\r\n')
+    spec = 'id:3:6:int, name:9:12:str; amount:21:8:float, fecha:29:8:date'
+    base = {'subtype': 'fixed_width', 'fixed_width_spec': spec, 'record_type_start': '1', 'record_types': '01'}
+    out = os.path.join(tmp_path, 'out.parquet')
+
+    def run(cfg):
+        res = run_pipeline([
+            {'id': 1, 'type': 'source', 'config': cfg},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': out}},
+        ], [(1, 2)])
+        assert res is not False
+        return res
+
+    run({**base, 'path': src})
+    df = pl.read_parquet(out)
+    assert df.schema == {'id': pl.Int64, 'name': pl.String, 'amount': pl.Float64, 'fecha': pl.Date}
+    assert df.height == 25 and df.row(7) == (7, 'Nombre7', 21.0, __import__('datetime').date(2024, 1, 2))
+
+    # Registros EBCDIC de longitud fija sin saltos de línea, leídos por lotes
+    ebcdic = os.path.join(tmp_path, 'extract.dat')
+    with open(ebcdic, 'wb') as f:
+        f.write(''.join(rows).encode('cp037'))
+    res = run({**base, 'path': ebcdic, 'encoding': 'cp037', 'record_length': '36',
+               'stream_results': True, 'stream_batch_size': '10'})
+    assert res[1].height == 10
+    assert pq.ParquetFile(out).metadata.num_row_groups == 3
+    assert pl.read_parquet(out)['id'].to_list() == list(range(25))
+
+    # Con la vista previa del diseñador en el nodo se sigue leyendo en streaming
+    from core import preview
+    cfg = {**base, 'path': ebcdic, 'encoding': 'cp037', 'record_length': '36',
+           'stream_results': True, 'stream_batch_size': '10'}
+    cfg.update({'dataframe': preview.read_file_head('fixed_width', ebcdic, cfg, 5), preview.PREVIEW_KEY: True})
+    run(cfg)
+    assert pq.ParquetFile(out).metadata.num_row_groups == 3
+    assert pl.read_parquet(out)['id'].to_list() == list(range(25))
+
+
+def test_xml_source_record_path_projection_and_batches(tmp_path, run_pipeline):
+    import gzip
+    import pyarrow.parquet as pq
+
+    items = ''.join(
+        f'<c:producto id="{i}"><nombre> P{i} </nombre><precio moneda="EUR">{i}.5</precio>'
+        f'<dim><alto>{i % 3}</alto></dim></c:producto>' for i in range(25))
+    src = os.path.join(tmp_path, 'catalogo.xml.gz')
+    with gzip.open(src, 'wt', encoding='utf-8') as f:
+        f.write(f'<?xml version="1.0" encoding="utf-8"?><c:catalogo xmlns:c="urn:cat">'
+                f'<c:cabecera><c:producto id="x"/></c:cabecera><c:productos>{items}</c:productos></c:catalogo>')
+    out = os.path.join(tmp_path, 'out.parquet')
+
+    def run(cfg):
+        res = run_pipeline([
+            {'id': 1, 'type': 'source', 'config': {'subtype': 'xml', 'path': src, **cfg}},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': out}},
+        ], [(1, 2)])
+        assert res is not False
+        return res
+
+    run({'xml_record_path': '/catalogo/productos/producto'})
+    df = pl.read_parquet(out)
+    assert df.columns == ['id', 'nombre', 'precio_moneda', 'precio', 'dim_alto']
+    assert df.height == 25 and df.row(4) == ('4', 'P4', 'EUR', '4.5', '1')
+
+    # Ruta relativa: también coincide el producto de la cabecera; proyección y lotes
+    res = run({'xml_record_path': 'producto', 'output_cols': 'id,precio',
+               'stream_results': True, 'stream_batch_size': '10'})
+    assert res[1].columns == ['id', 'precio'] and res[1].height == 10
+    assert pq.ParquetFile(out).metadata.num_row_groups == 3
+    df = pl.read_parquet(out)
+    assert df.height == 26 and df.row(0) == ('x', None)
+
+
+def test_xml_streaming_late_columns_and_partial_output_removed(tmp_path, run_pipeline):
+    import pyarrow.parquet as pq
+
+    # 'descuento' solo aparece a partir del registro 15 (segundo lote)
+    items = ''.join(f'<producto><id>{i}</id>' + (f'<descuento>{i}</descuento>' if i >= 15 else '') + '</producto>'
+                    for i in range(25))
+    src = os.path.join(tmp_path, 'catalogo.xml')
+    with open(src, 'w', encoding='utf-8') as f:
+        f.write(f'<catalogo>{items}</catalogo>')
+    out = os.path.join(tmp_path, 'out.parquet')
+    stream = {'subtype': 'xml', 'xml_record_path': 'producto', 'stream_results': True, 'stream_batch_size': '10'}
+    dest = {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': out}}
+    assert run_pipeline([{'id': 1, 'type': 'source', 'config': {**stream, 'path': src}}, dest], [(1, 2)]) is not False
+    assert pq.ParquetFile(out).metadata.num_row_groups == 3
+    df = pl.read_parquet(out)
+    assert df.columns == ['id', 'descuento'] and df.height == 25
+    assert df['descuento'].null_count() == 15 and df['descuento'][-1] == '24'
+
+    # Documento truncado tras el primer lote: la ejecución falla y no queda un Parquet parcial
+    broken = os.path.join(tmp_path, 'roto.xml')
+    with open(broken, 'w', encoding='utf-8') as f:
+        f.write(f'<catalogo>{items[:len(items) // 2]}<producto><id>')
+    os.remove(out)
+    assert run_pipeline([{'id': 1, 'type': 'source', 'config': {**stream, 'path': broken, 'xml_columns': 'id'}},
+                         dest], [(1, 2)]) is False
+    assert not os.path.exists(out)
+
+
+def test_tail_follow_offsets_rotation_and_failed_destination(tmp_path, run_pipeline):
+    log = os.path.join(tmp_path, 'app.log')
+    state_dir = os.path.join(tmp_path, 'state')
+
+    def append(text, path=log):
+        with open(path, 'a') as f:
+            f.write(text)
+
+    def run(dest_path):
+        res = run_pipeline([
+            {'id': 1, 'type': 'source', 'config': {'subtype': 'csv', 'path': log, 'tail_follow': True}},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': dest_path}},
+        ], [(1, 2)], state_dir=state_dir)
+        return res[1]['n'].to_list() if res is not False else None
+
+    out = os.path.join(tmp_path, 'out.parquet')
+    append('n,msg\n1,a\n2,b\n3,')
+    # La última línea incompleta queda para la siguiente ejecución
+    assert run(out) == [1, 2]
+    append('c\n4,d\n')
+    # Destino que falla: el offset no avanza
+    os.makedirs(os.path.join(tmp_path, 'taken.parquet'))
+    assert run(os.path.join(tmp_path, 'taken.parquet')) is None
+    assert run(out) == [3, 4]
+    assert run(out) == []
+    # Rotación: líneas escritas en el archivo rotado después de la última lectura
+    append('5,e\n')
+    os.rename(log, log + '.1')
+    append('n,msg\n6,f\n')
+    assert run(out) == [5, 6]
+    # Truncado (copytruncate)
+    with open(log, 'w') as f:
+        f.write('n,msg\n7,g\n')
+    assert run(out) == [7]
+
+    # Sin líneas nuevas el origen conserva el esquema: filtro y output_cols siguen funcionando
+    events = os.path.join(tmp_path, 'events.ndjson')
+    append('{"n": 1, "msg": "a"}\n{"n": 2, "msg": "b"}\n', events)
+    filtered = os.path.join(tmp_path, 'filtered.parquet')
+    nodes = [
+        {'id': 1, 'type': 'source', 'config': {'subtype': 'json', 'path': events, 'tail_follow': True,
+                                               'output_cols': 'n'}},
+        {'id': 2, 'type': 'transform', 'config': {'subtype': 'filter',
+                                                  'filter_rules': [{'column': 'n', 'op': '>', 'value': 1}]}},
+        {'id': 3, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': filtered}},
+    ]
+    assert run_pipeline(nodes, [(1, 2), (2, 3)], state_dir=state_dir)[2]['n'].to_list() == [2]
+    res = run_pipeline(nodes, [(1, 2), (2, 3)], state_dir=state_dir)
+    assert res is not False and res[2].schema == pl.Schema({'n': pl.Int64}) and res[2].height == 0
+    assert pl.read_parquet(filtered).columns == ['n']
+
+    # tail_max_bytes también limita el resto del archivo rotado y el archivo nuevo
+    capped = os.path.join(tmp_path, 'capped.log')
+    tail = {'subtype': 'csv', 'path': capped, 'tail_follow': True, 'tail_max_bytes': '12'}
+
+    def run_capped():
+        res = run_pipeline([
+            {'id': 1, 'type': 'source', 'config': dict(tail)},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': out}},
+        ], [(1, 2)], state_dir=state_dir)
+        return res[1]['n'].to_list()
+
+    append('n,msg\n1,a\n', capped)
+    assert run_capped() == [1]
+    append(''.join(f'{i},x\n' for i in range(2, 8)), capped)
+    os.rename(capped, capped + '.1')
+    append('n,msg\n' + ''.join(f'{i},y\n' for i in range(8, 12)), capped)
+    seen = [run_capped() for _ in range(8)]
+    assert all(len(rows) <= 3 for rows in seen)
+    assert [n for rows in seen for n in rows] == list(range(2, 12))
+
+
+def test_file_manifest_reads_only_new_or_changed_files(tmp_path, run_pipeline):
+    landing = os.path.join(tmp_path, 'landing')
+    os.makedirs(landing)
+    state_dir = os.path.join(tmp_path, 'state')
+
+    def drop(name, values, mtime):
+        path = os.path.join(landing, name)
+        pl.DataFrame({'n': values}).write_csv(path)
+        os.utime(path, (mtime, mtime))
+
+    def run(dest_path, **extra):
+        res = run_pipeline([
+            {'id': 1, 'type': 'source', 'config': {'subtype': 'csv', 'path': os.path.join(landing, '*.csv'),
+                                                   'file_manifest': True, **extra}},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': dest_path}},
+        ], [(1, 2)], state_dir=state_dir)
+        if res is False:
+            return None
+        return sorted(res[1]['n'].to_list()) if res[1].width else []
+
+    out = os.path.join(tmp_path, 'out.parquet')
+    drop('a.csv', [1, 2], 1000)
+    drop('b.csv', [3], 1000)
+    drop('c.csv.part', [99], 1000)
+    assert run(out) == [1, 2, 3]
+    assert run(out) == []
+    # Destino que falla: el archivo nuevo no queda registrado
+    drop('c.csv', [4], 1000)
+    os.makedirs(os.path.join(tmp_path, 'taken.parquet'))
+    assert run(os.path.join(tmp_path, 'taken.parquet')) is None
+    assert run(out) == [4]
+    # Solo mtime distinto (mismo contenido): no se relee; contenido distinto sí
+    drop('a.csv', [1, 2], 2000)
+    assert run(out) == []
+    drop('b.csv', [5], 2000)
+    assert run(out) == [5]
+    # Ventana de reproceso: archivos modificados en las últimas horas
+    import time
+    drop('d.csv', [6], time.time())
+    assert run(out) == [6]
+    assert run(out, reprocess_window_hours='1') == [6]
+
+    # Sin archivos nuevos el origen conserva el esquema: filtro y output_cols siguen funcionando
+    filtered = os.path.join(tmp_path, 'filtered.parquet')
+    res = run_pipeline([
+        {'id': 1, 'type': 'source', 'config': {'subtype': 'csv', 'path': os.path.join(landing, '*.csv'),
+                                               'file_manifest': True, 'output_cols': 'n'}},
+        {'id': 2, 'type': 'transform', 'config': {'subtype': 'filter',
+                                                  'filter_rules': [{'column': 'n', 'op': '>', 'value': 1}]}},
+        {'id': 3, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': filtered}},
+    ], [(1, 2), (2, 3)], state_dir=state_dir)
+    assert res is not False and res[1].schema == pl.Schema({'n': pl.Int64}) and res[1].height == 0
+    assert pl.read_parquet(filtered).columns == ['n']
+
+
+def _write_json(tmp_path, records) -> str:
+    import json
+
+    path = os.path.join(tmp_path, 'in.json')
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(records, fh)
+    return path
+
+
+def test_remote_paths_through_fsspec(tmp_path, run_pipeline):
+    fsspec = pytest.importorskip('fsspec')
+    mem = fsspec.filesystem('memory')
+    df = pl.DataFrame({'k': list(range(10)), 'v': [f"x{i}" for i in range(10)], 'extra': [0.5] * 10})
+    with mem.open('/bucket/in.parquet', 'wb') as fh:
+        df.write_parquet(fh, row_group_size=2)
+
+    res = run_pipeline(
+        [
+            {'id': 1, 'type': 'source', 'config': {
+                'subtype': 'parquet', 'path': 'memory://bucket/in.parquet', 'output_cols': 'k,v',
+                'source_filter_rules': [{'column': 'k', 'op': '>=', 'value': 6}],
+                'fs_cache_dir': os.path.join(tmp_path, 'cache'),
+            }},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'csv', 'path': 'memory://bucket/out/res.csv.gz'}},
+            {'id': 3, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': 'memory://bucket/out/res.parquet'}},
+        ],
+        [(1, 2), (1, 3)],
+    )
+    assert res is not False
+    eng = ETLEngine()
+    back = eng._read_file_source('csv', 'memory://bucket/out/res.csv.gz', {})
+    assert back.columns == ['k', 'v'] and back['k'].to_list() == [6, 7, 8, 9]
+    with mem.open('/bucket/out/res.parquet', 'rb') as fh:
+        assert pl.read_parquet(fh)['v'].to_list() == ['x6', 'x7', 'x8', 'x9']
+
+    # file:// se resuelve como ruta local con los lectores nativos
+    local = os.path.join(tmp_path, 'in.parquet')
+    df.write_parquet(local)
+    out = eng._read_file_source('parquet', 'file://' + local, {'output_cols': 'v'})
+    assert out.columns == ['v'] and out.height == 10
+
+
+def test_in_filter_values_same_for_pushdown_and_exact_filter(tmp_path):
+    src = os.path.join(tmp_path, 'in.parquet')
+    pl.DataFrame({'k': list(range(10)), 'v': [f"x{i}" for i in range(10)]}).write_parquet(src, row_group_size=2)
+    eng = ETLEngine()
+    # Solo una lista se poda por row groups; el texto 'a,b' lo resuelve el filtro exacto
+    assert eng._pushdown_filters([{'column': 'v', 'op': 'in', 'value': ('x1', 'x3')}], 'all') == [('v', 'in', ['x1', 'x3'])]
+    assert eng._pushdown_filters([{'column': 'v', 'op': 'in', 'value': 'x1,x3'}], 'all') is None
+    for value in (['x1', 'x3'], 'x1, x3'):
+        rules = [{'column': 'v', 'op': 'in', 'value': value}]
+        read = eng._read_file_source('parquet', src, {'source_filter_rules': rules})
+        filtered = eng._execute_filter_rules(pl.read_parquet(src), rules, 'all')
+        assert read['k'].to_list() == filtered['k'].to_list() == [1, 3]
+
+
+def test_csv_source_cache_hits_and_evicts(tmp_path, run_pipeline):
+    from core import source_cache
+
+    cache_dir = os.path.join(tmp_path, 'cache')
+    src = os.path.join(tmp_path, 'big.csv')
+    pl.DataFrame({'k': list(range(10)), 'v': [str(i) for i in range(10)]}).write_csv(src)
+    out = os.path.join(tmp_path, 'out.csv')
+    cfg = {'subtype': 'csv', 'path': src, 'source_cache': True, 'source_cache_dir': cache_dir,
+           'output_cols': 'k', 'source_filter_rules': [{'column': 'k', 'op': '>=', 'value': 7}]}
+    nodes = [
+        {'id': 1, 'type': 'source', 'config': cfg},
+        {'id': 2, 'type': 'destination', 'config': {'subtype': 'csv', 'path': out}},
+    ]
+    for _ in range(2):
+        assert run_pipeline(nodes, [(1, 2)]) is not False
+        assert pl.read_csv(out)['k'].to_list() == [7, 8, 9]
+    entries = os.listdir(cache_dir)
+    assert len(entries) == 1 and entries[0].endswith('.parquet')
+
+    # Al cambiar el archivo la clave cambia y el límite de tamaño desaloja la entrada antigua
+    pl.DataFrame({'k': list(range(20)), 'v': [str(i) for i in range(20)]}).write_csv(src)
+    os.utime(src, (1, 1))
+    cache = source_cache.SourceCache(cache_dir, max_bytes=1)
+    entry, hit, df = cache.get_or_create(src, source_cache.reader_options('csv', {}), lambda: pl.read_csv(src))
+    assert not hit and df.height == 20
+    assert os.listdir(cache_dir) == [os.path.basename(entry)]
+    assert cache.get_or_create(src, source_cache.reader_options('csv', {}), lambda: pl.read_csv(src))[1]
+
+
+def test_csv_encoding_and_dialect_detected_once(tmp_path, run_pipeline):
+    import gzip
+
+    from core import file_io
+
+    text = 'ciudad;"nota; extra";n\nMálaga;"a;b";1\nCádiz;"c";2\n'
+    src = os.path.join(tmp_path, 'latin.csv')
+    with open(src, 'wb') as f:
+        f.write(text.encode('cp1252'))
+    gz = os.path.join(tmp_path, 'latin.csv.gz')
+    with gzip.open(gz, 'wb') as f:
+        f.write(text.encode('cp1252'))
+
+    assert file_io.sniff_csv(src) == {'encoding': 'cp1252', 'separator': ';', 'quote_char': '"'}
+    assert file_io.detect_encoding('ñ'.encode('utf-8')[:1]) == 'utf-8'
+
+    for path in (src, gz):
+        cfg = {'subtype': 'csv', 'path': path}
+        out = os.path.join(tmp_path, 'out.csv')
+        assert run_pipeline([
+            {'id': 1, 'type': 'source', 'config': cfg},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'csv', 'path': out}},
+        ], [(1, 2)]) is not False
+        assert cfg['encoding'] == 'cp1252' and cfg['separator'] == ';'
+        df = pl.read_csv(out)
+        assert df.columns == ['ciudad', 'nota; extra', 'n']
+        assert df['ciudad'].to_list() == ['Málaga', 'Cádiz'] and df['nota; extra'][0] == 'a;b'
+
+
+def test_csv_non_utf8_byte_past_sniff_window_falls_back_to_cp1252(tmp_path, run_pipeline):
+    import gzip
+
+    from core import file_io
+
+    data = b'pais,n\n' + b''.join(b'Espana,%d\n' % i for i in range(10000)) + b'Espa\xf1a,10000\n'
+    assert len(data) > file_io.SNIFF_BYTES
+    src = os.path.join(tmp_path, 'erp.csv')
+    with open(src, 'wb') as f:
+        f.write(data)
+    gz = os.path.join(tmp_path, 'erp.csv.gz')
+    with gzip.open(gz, 'wb') as f:
+        f.write(data)
+    for path in (src, gz):
+        cfg = {'subtype': 'csv', 'path': path}
+        out = os.path.join(tmp_path, 'out.parquet')
+        assert run_pipeline([
+            {'id': 1, 'type': 'source', 'config': cfg},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': out}},
+        ], [(1, 2)]) is not False
+        df = pl.read_parquet(out)
+        assert df.height == 10001 and df['pais'][-1] == 'España', path
+        # La codificación corregida queda en el config: la siguiente lectura no reintenta
+        assert cfg['encoding'] == file_io.FALLBACK_ENCODING
+
+
+def test_csv_reader_options_on_scan_and_eager_paths(tmp_path, run_pipeline):
+    import gzip
+
+    text = ('Exportación ERP\n'
+            'id;importe;fecha;nota\n'
+            '# fila de control\n'
+            '1;1234,56;2024-01-02;a\n'
+            '2;N/D;2024-02-03;b\n')
+    src = os.path.join(tmp_path, 'erp.csv')
+    with open(src, 'w', encoding='utf-8') as f:
+        f.write(text)
+    gz = src + '.gz'
+    with gzip.open(gz, 'wt', encoding='utf-8') as f:
+        f.write(text)
+
+    opts = {'separator': ';', 'skip_rows': '1', 'comment_prefix': '#', 'null_values': 'N/D',
+            'decimal_comma': True, 'try_parse_dates': 'true', 'infer_schema_length': 'all',
+            'n_threads': '2', 'rechunk': True, 'columns': 'id,importe,fecha'}
+    # Archivo plano: escaneo lazy; .gz: lectura directa del stream descomprimido
+    for path in (src, gz):
+        out = os.path.join(tmp_path, 'out.parquet')
+        assert run_pipeline([
+            {'id': 1, 'type': 'source', 'config': {'subtype': 'csv', 'path': path, **opts}},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': out}},
+        ], [(1, 2)]) is not False
+        df = pl.read_parquet(out)
+        assert df.columns == ['id', 'importe', 'fecha']
+        assert df.schema['importe'] == pl.Float64 and df.schema['fecha'] == pl.Date
+        assert df['importe'].to_list() == [1234.56, None]
+
+
+@pytest.fixture
+def api_server():
+    import gzip
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    rows = [{'id': i, 'name': f'n{i}', 'tags': {'k': i % 2}} for i in range(25)]
+    bodies = {
+        '/nested': ('application/json', json.dumps({'meta': {'n': 25}, 'result': {'items': rows}}).encode()),
+        '/rows': ('application/json', json.dumps(rows).encode()),
+        '/wrapped': ('application/json', json.dumps({'data': rows}).encode()),
+        '/ndjson': ('application/x-ndjson', '\n'.join(json.dumps(r) for r in rows).encode()),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            ctype, body = bodies[self.path]
+            body = gzip.compress(body)
+            self.send_response(200)
+            self.send_header('Content-Type', ctype)
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+
+
+def test_api_source_streams_json_and_ndjson(tmp_path, api_server, run_pipeline):
+    cases = [('/nested', {'json_path': 'result.items'}), ('/rows', {}), ('/wrapped', {}), ('/ndjson', {})]
+    for path, extra in cases:
+        out = os.path.join(tmp_path, 'out.parquet')
+        src = {'subtype': 'api', 'url': api_server + path, 'stream_results': path != '/wrapped',
+               'stream_batch_size': '10', **extra}
+        assert run_pipeline([
+            {'id': 1, 'type': 'source', 'config': src},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': out}},
+        ], [(1, 2)]) is not False
+        df = pl.read_parquet(out)
+        assert df['id'].to_list() == list(range(25)), path
+        assert df['tags'].struct.field('k').sum() == 12
+
+
+def test_flatten_transform_paths_depth_and_explode(tmp_path, run_pipeline):
+    records = [
+        {'id': 1, 'customer': {'name': 'a', 'address': {'city': 'X', 'zip': '1'}},
+         'items': [{'sku': 's1', 'q': 1}, {'sku': 's2', 'q': 2}]},
+        {'id': 2, 'customer': {'name': 'b', 'address': {'city': 'Y', 'zip': '2'}},
+         'items': [{'sku': 's3', 'q': 3}]},
+    ]
+    src = _write_json(tmp_path, records)
+    out = os.path.join(tmp_path, 'flat.parquet')
+
+    def run(flatten_cfg):
+        assert run_pipeline([
+            {'id': 1, 'type': 'source', 'config': {'subtype': 'json', 'path': src}},
+            {'id': 2, 'type': 'transform', 'config': {'subtype': 'flatten', **flatten_cfg}},
+            {'id': 3, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': out}},
+        ], [(1, 2), (2, 3)]) is not False
+        return pl.read_parquet(out)
+
+    df = run({'flatten_paths': 'customer.address.city, items', 'explode_columns': 'items'})
+    assert df.columns == ['id', 'customer_address_city', 'items_sku', 'items_q']
+    assert df['items_sku'].to_list() == ['s1', 's2', 's3'] and df['customer_address_city'].to_list() == ['X', 'X', 'Y']
+
+    df = run({'flatten_depth': '1'})
+    assert df.columns == ['id', 'customer_name', 'customer_address', 'items']
+
+    df = run({'flatten_paths': 'items.sku', 'flatten_separator': '__'})
+    assert df['items__sku'].to_list() == [['s1', 's2'], ['s3']]
+
+
+def test_delta_modes_time_travel_and_maintenance(tmp_path, run_pipeline):
+    pytest.importorskip('deltalake')
+    from core.job_runner import JobRunner
+
+    table = os.path.join(tmp_path, 'tbl')
+    src = os.path.join(tmp_path, 'in.parquet')
+
+    def write(df, **dest):
+        df.write_parquet(src)
+        assert run_pipeline([
+            {'id': 1, 'type': 'source', 'config': {'subtype': 'parquet', 'path': src}},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'delta', 'path': table, **dest}},
+        ], [(1, 2)]) is not False
+
+    def read(**cfg):
+        out = os.path.join(tmp_path, 'out.parquet')
+        assert run_pipeline([
+            {'id': 1, 'type': 'source', 'config': {'subtype': 'delta', 'path': table, **cfg}},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': out}},
+        ], [(1, 2)]) is not False
+        return pl.read_parquet(out).sort('id')
+
+    write(pl.DataFrame({'id': [1, 2, 3], 'day': ['a', 'a', 'b'], 'v': [1, 2, 3]}), partition_by='day')
+    write(pl.DataFrame({'id': [4], 'day': ['b'], 'v': [4]}), delta_mode='append', partition_by='day')
+    # Solo se reemplaza la partición 'a'; 'b' conserva sus filas
+    write(pl.DataFrame({'id': [10], 'day': ['a'], 'v': [10]}), delta_mode='overwrite_partitions', partition_by='day')
+    assert read()['id'].to_list() == [3, 4, 10]
+    write(pl.DataFrame({'id': [3, 11], 'day': ['b', 'c'], 'v': [30, 11]}), delta_mode='merge', merge_keys='id')
+    df = read()
+    assert df['id'].to_list() == [3, 4, 10, 11] and df.filter(pl.col('id') == 3)['v'].item() == 30
+
+    assert read(delta_version='0')['id'].to_list() == [1, 2, 3]
+    pushed = read(source_filter_rules=[{'column': 'v', 'op': '>', 'value': 10}], output_cols='id,v')
+    assert pushed.columns == ['id', 'v'] and pushed['id'].to_list() == [3, 11]
+
+    runner = JobRunner({'etls': []}, str(tmp_path / 'logs'))
+    res = runner.run_job({'name': 'mant', 'stages': [{'steps': [
+        {'delta_path': table, 'action': 'compact'},
+        {'delta_path': table, 'action': 'vacuum', 'retention_hours': 0, 'enforce_retention': False},
+    ]}]})
+    assert res['success'], res['errors']
+    assert read()['id'].to_list() == [3, 4, 10, 11]
+
+
+def test_preview_reads_only_head_and_engine_rereads_source(tmp_path, api_server, run_pipeline):
+    import gzip
+    import sqlite3
+
+    from core import preview
+
+    df = pl.DataFrame({'id': list(range(50)), 'txt': ['línea\ncon salto' if i == 1 else f'v{i}' for i in range(50)]})
+    plain = os.path.join(tmp_path, 'in.csv')
+    df.write_csv(plain)
+    packed = os.path.join(tmp_path, 'in.csv.gz')
+    with open(plain, 'rb') as f, gzip.open(packed, 'wb') as g:
+        g.write(f.read())
+    latin = os.path.join(tmp_path, 'latin.csv')
+    with open(latin, 'wb') as f:
+        f.write(df.write_csv().encode('cp1252'))
+    for path in (plain, packed, latin):
+        head = preview.read_file_head('csv', path, {}, 5)
+        assert head['id'].to_list() == [0, 1, 2, 3, 4], path
+        assert head['txt'][1] == 'línea\ncon salto', path
+
+    df.write_parquet(os.path.join(tmp_path, 'in.parquet'))
+    df.write_ipc(os.path.join(tmp_path, 'in.arrow'))
+    df.write_ndjson(os.path.join(tmp_path, 'in.ndjson'))
+    df.write_json(os.path.join(tmp_path, 'in.json'))
+    df.write_avro(os.path.join(tmp_path, 'in.avro'))
+    for name, subtype in (('in.parquet', 'parquet'), ('in.arrow', 'ipc'), ('in.ndjson', 'json'),
+                          ('in.json', 'json'), ('in.avro', 'avro')):
+        head = preview.read_file_head(subtype, os.path.join(tmp_path, name), {}, 3)
+        assert head['id'].to_list() == [0, 1, 2], name
+
+    assert preview.limit_query('select * from t;', 'PostgreSQL', 10) == 'SELECT * FROM (select * from t) AS _preview LIMIT 10'
+    assert preview.limit_query('SELECT a FROM t', 'SQL Server', 10) == 'SELECT TOP 10 * FROM (SELECT a FROM t) AS _preview'
+    assert preview.limit_query('SELECT a FROM t ORDER BY a', 'SQL Server', 10) == 'SELECT a FROM t ORDER BY a'
+    assert preview.limit_query('EXEC proc', 'MySQL', 10) == 'EXEC proc'
+    db = os.path.join(tmp_path, 'src.db')
+    con = sqlite3.connect(db)
+    con.execute('CREATE TABLE t (id INTEGER)')
+    con.executemany('INSERT INTO t VALUES (?)', [(i,) for i in range(100)])
+    con.commit()
+    con.close()
+    from sqlalchemy import create_engine
+    engine = create_engine(f'sqlite:///{db}')
+    with engine.connect() as conn:
+        assert preview.read_sql_head(conn, 'SELECT id FROM t ORDER BY id', 'SQLite', 7)['id'].to_list() == list(range(7))
+    engine.dispose()
+
+    api = preview.read_api_head({'url': api_server + '/rows', 'stream_results': True}, ETLEngine(), 4)
+    assert api['id'].to_list() == [0, 1, 2, 3]
+
+    # Una vista previa en el nodo no sustituye al origen en la ejecución
+    out = os.path.join(tmp_path, 'out.parquet')
+    src = {'subtype': 'csv', 'path': plain, 'dataframe': preview.read_file_head('csv', plain, {}, 5),
+           preview.PREVIEW_KEY: True}
+    assert run_pipeline([
+        {'id': 1, 'type': 'source', 'config': src},
+        {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': out}},
+    ], [(1, 2)]) is not False
+    assert pl.read_parquet(out).height == 50
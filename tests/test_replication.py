@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+
+import polars as pl
+
+from core.job_runner import JobRunner
+from core.replication import select_tables, split_ranges
+
+
+def _make_db(path: str) -> None:
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, amount REAL, updated TEXT)")
+    con.execute("CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT)")
+    con.execute("CREATE TABLE orders_tmp (id INTEGER)")
+    con.executemany("INSERT INTO orders VALUES (?, ?, ?)",
+                    [(i, i * 1.5, f"2024-01-{1 + i % 20:02d} 10:00:00") for i in range(1, 101)])
+    con.executemany("INSERT INTO customers VALUES (?, ?)", [(i, f"c{i}") for i in range(1, 6)])
+    con.commit()
+    con.close()
+
+
+def test_select_tables_and_ranges():
+    available = ['orders', 'orders_tmp', 'customers', 'audit']
+    assert select_tables(available, include='orders*,cust*', exclude='*_tmp') == ['customers', 'orders']
+    assert select_tables(available, tables='audit,orders') == ['audit', 'orders']
+    assert split_ranges(1, 100, 4) == [(1, 26, False), (26, 51, False), (51, 76, False), (76, 100, True)]
+    assert split_ranges(5, 5, 3) == [(5, 5, True)]
+
+
+def test_replication_step_partitions_and_watermarks(tmp_path):
+    db = os.path.join(tmp_path, 'src.db')
+    _make_db(db)
+    mirror = os.path.join(tmp_path, 'mirror.db')
+    step = {'replicate': {
+        'connection': {'db_type': 'SQLite', 'database': db},
+        'include': 'orders*,customers', 'exclude': '*_tmp',
+        'destination': {'subtype': 'database', 'db_type': 'SQLite', 'database': mirror, 'table': '{table}'},
+        'name': 'mirror', 'max_workers': 3, 'partitions': 4, 'watermark_column': 'updated',
+        'stream_batch_size': 7,
+    }}
+    job = {'name': 'mirror', 'stages': [{'parallel': False, 'steps': [step]}]}
+    project = {'defaults': {}, 'etls': [], 'jobs': [job]}
+
+    def mirrored(table: str) -> list:
+        con = sqlite3.connect(mirror)
+        try:
+            return [r[0] for r in con.execute(f"SELECT id FROM {table} ORDER BY id")]
+        finally:
+            con.close()
+
+    res = JobRunner(project, str(tmp_path)).run_job(job)
+    assert res['success'], res['errors']
+    assert mirrored('orders') == list(range(1, 101))
+    assert mirrored('customers') == [1, 2, 3, 4, 5]
+
+    # Segunda ejecución: solo filas posteriores a la marca de agua, añadidas a la copia
+    con = sqlite3.connect(db)
+    con.execute("INSERT INTO orders VALUES (101, 1.0, '2024-02-01 00:00:00')")
+    con.commit()
+    con.close()
+    res = JobRunner(project, str(tmp_path)).run_job(job)
+    assert res['success'], res['errors']
+    assert mirrored('orders') == list(range(1, 102))
+    # customers no tiene la columna: copia completa que reemplaza la anterior
+    assert mirrored('customers') == [1, 2, 3, 4, 5]
+    assert os.path.exists(os.path.join(tmp_path, 'state', 'replication', 'mirror.json'))
+
+
+def test_replication_watermark_requires_timestamped_files(tmp_path):
+    db = os.path.join(tmp_path, 'src.db')
+    _make_db(db)
+    out_dir = os.path.join(tmp_path, 'mirror')
+    spec = {'connection': {'db_type': 'SQLite', 'database': db}, 'tables': 'orders', 'name': 'files',
+            'partitions': 3, 'watermark_column': 'updated',
+            'destination': {'subtype': 'parquet', 'path': os.path.join(out_dir, '{table}.parquet')}}
+    job = {'name': 'files', 'stages': [{'parallel': False, 'steps': [{'replicate': spec}]}]}
+    project = {'defaults': {}, 'etls': [], 'jobs': [job]}
+    # Una ruta fija se sobrescribiría con solo las filas nuevas: el paso falla sin escribir
+    assert not JobRunner(project, str(tmp_path)).run_job(job)['success']
+    assert not os.path.exists(out_dir)
+
+    spec['destination']['path'] = os.path.join(out_dir, '{table}_{ts}.parquet')
+    res = JobRunner(project, str(tmp_path)).run_job(job)
+    assert res['success'], res['errors']
+    [name] = os.listdir(out_dir)
+    orders = pl.read_parquet(os.path.join(out_dir, name))
+    assert sorted(orders['id'].to_list()) == list(range(1, 101))
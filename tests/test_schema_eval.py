@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import os
+
+import networkx as nx
+import polars as pl
+
+from core import schema_eval
+
+
+def _graph(csv_path: str, parquet_path: str) -> nx.DiGraph:
+    g = nx.DiGraph()
+    g.add_node(1, type='source', config={'subtype': 'csv', 'path': csv_path})
+    g.add_node(2, type='source', config={'subtype': 'parquet', 'path': parquet_path,
+                                         'column_rename': 'name:customer'})
+    g.add_node(3, type='transform', config={'subtype': 'filter',
+                                            'filter_rules': [{'column': 'amount', 'op': '>', 'value': '1'}]})
+    g.add_node(4, type='transform', config={'subtype': 'map', 'map_ops': [
+        {'new_col': 'double', 'op_type': 'add', 'a': 'amount', 'b': 'amount'}]})
+    g.add_node(5, type='transform', config={'subtype': 'cast', 'cast_ops': [{'col': 'id', 'to': 'utf8'}]})
+    g.add_node(6, type='transform', config={'subtype': 'join', 'join_cols': 'cid', 'join_type': 'Left'})
+    g.add_node(7, type='destination', config={'subtype': 'csv', 'path': 'out.csv', 'output_cols': 'id,customer,double'})
+    g.add_node(8, type='source', config={'subtype': 'database'})
+    g.add_node(9, type='transform', config={'subtype': 'filter'})
+    g.add_edges_from([(1, 3), (3, 4), (4, 5), (5, 6), (2, 6), (6, 7), (8, 9)])
+    return g
+
+
+def test_output_schemas_without_reading_rows(tmp_path):
+    csv_path = os.path.join(tmp_path, 'orders.csv')
+    pl.DataFrame({'id': [1, 2], 'cid': [10, 20], 'amount': [1.5, 2.5]}).write_csv(csv_path)
+    parquet_path = os.path.join(tmp_path, 'customers.parquet')
+    pl.DataFrame({'cid': [10], 'name': ['a']}).write_parquet(parquet_path)
+
+    g = _graph(csv_path, parquet_path)
+    schemas = schema_eval.output_schemas(g)
+    assert dict(schemas[1]) == {'id': pl.Int64, 'cid': pl.Int64, 'amount': pl.Float64}
+    assert dict(schemas[2]) == {'cid': pl.Int64, 'customer': pl.String}
+    assert schemas[4]['double'] == pl.Float64
+    assert schemas[5]['id'] == pl.String
+    assert schemas[6].names() == ['id', 'cid', 'amount', 'double', 'customer']
+    assert dict(schemas[7]) == {'id': pl.String, 'customer': pl.String, 'double': pl.Float64}
+    # Base de datos: esquema desconocido hasta cargar datos, y también su descendiente
+    assert schemas[8] is None and schemas[9] is None
+    # La evaluación no deja datos en la configuración del grafo original
+    assert all('dataframe' not in d['config'] and 'other_dataframe' not in d['config']
+               for _, d in g.nodes(data=True))
+    assert [s.names() for s in schema_eval.input_schemas(g, 6, schemas)] == [
+        ['id', 'cid', 'amount', 'double'], ['cid', 'customer']]
+
+    # Un DataFrame ya cargado en el nodo prevalece sobre los metadatos del archivo
+    g.nodes[8]['config']['dataframe'] = pl.DataFrame({'x': [1]})
+    assert dict(schema_eval.output_schemas(g)[9]) == {'x': pl.Int64}
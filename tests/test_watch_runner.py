@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict
+
+import polars as pl
+
+from core.watch_runner import WatchRunner
+
+
+def _project(out_path: str) -> Dict[str, Any]:
+    content = {
+        'nodes': [
+            {'id': 1, 'type': 'source', 'config': {'subtype': 'csv', 'path': ''}},
+            {'id': 2, 'type': 'destination', 'config': {'subtype': 'parquet', 'path': out_path}},
+        ],
+        'edges': [{'source': 1, 'target': 2}],
+    }
+    return {'defaults': {}, 'etls': [{'id': 'ingest', 'name': 'ingest', 'content': content}], 'runs': []}
+
+
+def _drop(folder, name: str, rows: int, mtime: float) -> str:
+    path = os.path.join(folder, name)
+    pl.DataFrame({'f': [name] * rows, 'n': list(range(rows))}).write_csv(path)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_micro_batches_move_and_manifest(tmp_path):
+    inbox = os.path.join(tmp_path, 'inbox')
+    os.makedirs(inbox)
+    out = os.path.join(tmp_path, 'out.parquet')
+    project = _project(out)
+    watch = {'directory': inbox, 'pattern': '*.csv', 'etl_id': 'ingest', 'source_node': '1',
+             'batch_max_files': 2, 'batch_window_seconds': 3600, 'settle_seconds': 0}
+    runner = WatchRunner(project, {'id': 'w1', 'name': 'w1', 'kind': 'watch', 'watch': watch}, str(tmp_path))
+    _drop(inbox, 'a.csv', 2, 1000)
+    # Un archivo: ni el máximo de archivos ni la ventana de tiempo se alcanzan
+    assert runner.run_once() == 0
+    _drop(inbox, 'b.csv', 3, 1001)
+    _drop(inbox, 'c.partial', 1, 1002)
+    assert runner.run_once() == 2
+    assert sorted(pl.read_parquet(out)['f'].unique().to_list()) == ['a.csv', 'b.csv']
+    assert sorted(os.listdir(os.path.join(inbox, 'processed'))) == ['a.csv', 'b.csv']
+    assert [r['files'] for r in project['runs']] == [2]
+    # El ETL del proyecto no se modifica con los overrides del lote
+    assert project['etls'][0]['content']['nodes'][0]['config']['path'] == ''
+
+    # Manifiesto: los archivos se quedan en su sitio y solo se reprocesan si cambian
+    watch.update(processed='manifest', batch_window_seconds=0)
+    runner = WatchRunner(project, {'id': 'w2', 'name': 'w2', 'kind': 'watch', 'watch': watch}, str(tmp_path))
+    d = _drop(inbox, 'd.csv', 4, 1003)
+    assert runner.run_once() == 1 and pl.read_parquet(out).height == 4
+    assert runner.run_once() == 0
+    runner = WatchRunner(project, {'id': 'w2', 'name': 'w2', 'kind': 'watch', 'watch': watch}, str(tmp_path))
+    assert runner.run_once() == 0
+    _drop(inbox, 'd.csv', 5, 1004)
+    assert runner.run_once() == 1 and pl.read_parquet(out).height == 5
+    assert os.path.exists(d)
+
+
+def test_watch_service_picks_up_new_files(tmp_path):
+    inbox = os.path.join(tmp_path, 'inbox')
+    out = os.path.join(tmp_path, 'out.parquet')
+    watch = {'directory': inbox, 'pattern': '*.csv', 'etl_id': 'ingest', 'source_node': 1,
+             'batch_window_seconds': 0, 'settle_seconds': 0, 'poll_seconds': 0.2}
+    runner = WatchRunner(_project(out), {'id': 'w3', 'name': 'w3', 'kind': 'watch', 'watch': watch}, str(tmp_path))
+    runner.start()
+    try:
+        deadline = time.time() + 20
+        while not runner.is_running() and time.time() < deadline:
+            time.sleep(0.05)
+        os.makedirs(inbox, exist_ok=True)
+        _drop(inbox, 'e.csv', 3, time.time())
+        processed = os.path.join(inbox, 'processed', 'e.csv')
+        while not os.path.exists(processed) and time.time() < deadline:
+            time.sleep(0.1)
+        assert os.path.exists(processed)
+        assert pl.read_parquet(out).height == 3
+    finally:
+        runner.stop()
+    assert not runner.is_running()
+
+
+def test_multi_file_batches_for_non_csv_sources(tmp_path):
+    inbox = os.path.join(tmp_path, 'inbox')
+    os.makedirs(inbox)
+    out = os.path.join(tmp_path, 'out.parquet')
+    project = _project(out)
+    source = project['etls'][0]['content']['nodes'][0]['config']
+    watch = {'directory': inbox, 'etl_id': 'ingest', 'source_node': 1, 'settle_seconds': 0}
+
+    # Ancho fijo: cada archivo del lote se lee con el mismo layout y se concatenan
+    source.update(subtype='fixed_width', fixed_width_spec='id:1:3:int,name:4:5')
+    for i, name in enumerate(('a.txt', 'b.txt')):
+        with open(os.path.join(inbox, name), 'w', encoding='utf-8') as f:
+            f.write(f"{i}01alpha\n{i}02beta \n")
+    runner = WatchRunner(project, {'id': 'fw', 'name': 'fw', 'kind': 'watch', 'watch': {**watch, 'pattern': '*.txt'}},
+                         str(tmp_path))
+    assert runner.run_once(force=True) == 2
+    assert sorted(pl.read_parquet(out)['id'].to_list()) == [1, 2, 101, 102]
+    assert [r['ok'] for r in project['runs']] == [True]
+
+    # XML por lotes: una columna que solo aparece en el segundo archivo llega al destino
+    source.clear()
+    source.update(subtype='xml', path='', xml_record_path='item', stream_results=True, stream_batch_size='1')
+    with open(os.path.join(inbox, 'a.xml'), 'w', encoding='utf-8') as f:
+        f.write('<r><item><id>1</id></item></r>')
+    with open(os.path.join(inbox, 'b.xml'), 'w', encoding='utf-8') as f:
+        f.write('<r><item><id>2</id><extra>x</extra></item></r>')
+    runner = WatchRunner(project, {'id': 'xml', 'name': 'xml', 'kind': 'watch', 'watch': {**watch, 'pattern': '*.xml'}},
+                         str(tmp_path))
+    assert runner.run_once(force=True) == 2
+    assert pl.read_parquet(out).sort('id').rows() == [('1', None), ('2', 'x')]
+
+    # Delta no admite una lista de archivos: el servicio no arranca
+    source.clear()
+    source.update(subtype='delta', path='')
+    runner = WatchRunner(project, {'id': 'dl', 'name': 'dl', 'kind': 'watch', 'watch': watch}, str(tmp_path))
+    runner.start()
+    assert not runner.is_running()
+    with open(runner._log_file_path, encoding='utf-8') as f:
+        assert "no se inicia: El origen 'delta'" in f.read()